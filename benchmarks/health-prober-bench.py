@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Health prober benchmark against an offline stub fleet
+Measures sweep time, sockets used and CPU per probe for 10-500 stub services
+
+The stub fleet runs in a child process, so the CPU figures are the prober's
+own cost. Each fleet size is swept several times with one prober, so the
+first sweep shows cold-connection cost and later sweeps show keep-alive reuse.
+
+Usage:
+    python benchmarks/health-prober-bench.py
+    python benchmarks/health-prober-bench.py --sizes 10,100,500 --concurrency 32,128 \\
+        --latency lognormal:20:0.6 --p-hang 0.01 --timeout 1 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from health_prober import AsyncHealthProber
+from stub_fleet import FleetProcess, add_behavior_arguments, behavior_options_from_args
+
+# Constants
+DEFAULT_SIZES = [10, 50, 100, 250, 500]
+DEFAULT_PATHS = ["/health", "/api/health", "/api/v1/health", "/health/live", "/health/ready"]
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+def raise_fd_limit(needed: int):
+    """Lift the soft open-files limit toward the hard limit when a run needs it"""
+    if resource is None:
+        return  # no RLIMIT_NOFILE; sockets are bounded by the OS instead
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+async def _run_sweeps(services, paths, sweeps: int, concurrency: int, timeout: float,
+                      per_host: int) -> List[Dict]:
+    targets = [("127.0.0.1", port, path) for _, port in services for path in paths]
+    prober = AsyncHealthProber(concurrency=concurrency, timeout=timeout, per_host_connections=per_host)
+    rows = []
+    try:
+        for sweep in range(sweeps):
+            opened_before = prober.pool.opened
+            cpu_before = time.process_time()
+            wall_before = time.perf_counter()
+
+            results = await prober.probe_many(targets)
+
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            statuses: Dict[str, int] = {}
+            for result in results:
+                statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+            totals = [r["timings"]["total_ms"] for r in results if r["timings"]["total_ms"] is not None]
+
+            rows.append({
+                "sweep": sweep + 1,
+                "probes": len(targets),
+                "sweep_ms": round(wall * 1000, 1),
+                "sockets_opened": prober.pool.opened - opened_before,
+                "cpu_ms_per_probe": round(cpu * 1000 / len(targets), 4) if targets else 0.0,
+                "p50_ms": round(_percentile(totals, 50), 2),
+                "p95_ms": round(_percentile(totals, 95), 2),
+                "statuses": statuses,
+            })
+    finally:
+        prober.close()
+    return rows
+
+
+def run_benchmark(sizes: List[int], concurrency_levels: List[int], behavior: Dict,
+                  sweeps: int = 3, timeout: float = 2.0, per_host: int = 6,
+                  paths: List[str] = None) -> List[Dict]:
+    """Run every (fleet size, concurrency) combination; returns one record per sweep"""
+    paths = paths or DEFAULT_PATHS
+    raise_fd_limit(max(sizes) * (per_host + 2) + 256)
+    records = []
+
+    for size in sizes:
+        with FleetProcess(size, behavior) as fleet:
+            for concurrency in concurrency_levels:
+                fleet.reset_stats()
+                rows = asyncio.run(_run_sweeps(fleet.services, paths, sweeps, concurrency, timeout, per_host))
+                server_stats = fleet.stats()
+                for row in rows:
+                    row.update(stubs=size, concurrency=concurrency)
+                    records.append(row)
+                records[-1]["server_connections"] = server_stats.get("connections", 0)
+                print_rows(rows, size, concurrency, server_stats)
+    return records
+
+
+def print_rows(rows: List[Dict], size: int, concurrency: int, server_stats: Dict):
+    print(f"\n{size} stubs, concurrency {concurrency} "
+          f"(server accepted {server_stats.get('connections', 0)} connections)")
+    print(f"  {'SWEEP':<6}{'PROBES':>7}{'SWEEP ms':>10}{'SOCKETS':>9}{'CPU ms/probe':>14}"
+          f"{'p50 ms':>9}{'p95 ms':>9}  STATUSES")
+    for row in rows:
+        statuses = ", ".join(f"{k}={v}" for k, v in sorted(row["statuses"].items()))
+        print(f"  {row['sweep']:<6}{row['probes']:>7}{row['sweep_ms']:>10}{row['sockets_opened']:>9}"
+              f"{row['cpu_ms_per_probe']:>14}{row['p50_ms']:>9}{row['p95_ms']:>9}  {statuses}")
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the async health prober against stub fleets')
+    parser.add_argument('--sizes', type=_int_list, default=DEFAULT_SIZES, help='Comma-separated fleet sizes')
+    parser.add_argument('--concurrency', type=_int_list, default=[64], help='Comma-separated concurrency caps')
+    parser.add_argument('--sweeps', type=int, default=3, help='Sweeps per combination')
+    parser.add_argument('--timeout', type=float, default=2.0, help='Per-request deadline (seconds)')
+    parser.add_argument('--per-host', type=int, default=6, help='Max connections per stub')
+    parser.add_argument('--output', help='Write all records as JSON to this file')
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    behavior = behavior_options_from_args(args)
+    print(f"Stub behavior: {behavior}")
+    records = run_benchmark(args.sizes, args.concurrency, behavior, args.sweeps, args.timeout, args.per_host)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"behavior": behavior, "timeout": args.timeout, "records": records}, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
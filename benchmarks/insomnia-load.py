@@ -0,0 +1,748 @@
+#!/usr/bin/env python3
+"""
+Insomnia collection load generator (pure Python, no k6/artillery runtime)
+Replays the requests of an Insomnia v4 export at a ramped concurrency or
+arrival rate and checks k6-style thresholds
+
+The collection's environment variables ({{ _.base_url }}, {{ _.jwt_token }}, ...)
+are resolved from the base environment, an optional sub-environment and
+--var overrides. Stages and thresholds use k6 syntax and can be lifted
+straight from one of the k6 scripts in this directory:
+
+- vus mode (k6 ramping-vus):           stage targets are concurrent virtual users,
+                                        each replaying the collection in a loop
+- rps mode (k6 ramping-arrival-rate):  stage targets are requests per second;
+                                        arrivals that find every VU busy are dropped
+
+Requests fail on transport errors, HTTP status >= 400, or a GraphQL response
+carrying "errors". Supported threshold metrics: http_req_duration,
+http_req_waiting (trends: avg/min/med/max/p(N)), http_req_failed (rate),
+http_reqs, iterations and dropped_iterations (count/rate). A {name:...} tag
+narrows a metric to one request. Exits with 99 (as k6 does) when a threshold fails.
+
+Latencies are kept in log-bucketed histograms (bench_results.Histogram, ~2%
+relative precision), so memory stays flat however long the run; percentiles
+are nearest-rank like k6's.
+
+Usage:
+    python benchmarks/insomnia-load.py --dry-run
+    python benchmarks/insomnia-load.py --stages 10s:10,30s:10,5s:0 --var jwt_token=$TOKEN
+    python benchmarks/insomnia-load.py --k6-options benchmarks/k6-database.js
+    python benchmarks/insomnia-load.py --mode rps --stages 30s:100,1m:100 \\
+        --threshold 'http_req_duration{name:1. Health Check}:p(99)<200' --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from bench_results import Histogram
+from health_prober import AsyncHealthProber
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_COLLECTION = PROJECT_ROOT / "insomnia-master-data.json"
+DEFAULT_STAGES = "10s:10,30s:10,10s:0"
+DEFAULT_THRESHOLDS = {"http_req_duration": ["p(95)<1000"], "http_req_failed": ["rate<0.01"]}
+DEFAULT_MAX_VUS = 200
+CONTROL_INTERVAL = 0.01   # seconds between scheduler ticks
+PROGRESS_INTERVAL = 5.0   # seconds between progress lines
+THRESHOLD_EXIT_CODE = 99  # k6's exit code for failed thresholds
+PERCENTILES = [50, 90, 95, 99]
+MAX_ERROR_SAMPLES = 3
+
+TEMPLATE_PATTERN = re.compile(r"\{\{\s*(?:_\.)?([A-Za-z_][\w.]*)\s*\}\}")
+TAG_PATTERN = re.compile(r"\{%.*?%\}")
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+THRESHOLD_PATTERN = re.compile(
+    r"^\s*(avg|min|med|max|rate|count|p\((\d+(?:\.\d+)?)\))\s*(<=|>=|<|>|===|==|!=)\s*(-?\d+(?:\.\d+)?)\s*$"
+)
+METRIC_PATTERN = re.compile(r"^([A-Za-z_]\w*)(?:\{([^}]*)\})?$")
+K6_STAGE_PATTERN = re.compile(r"duration:\s*['\"]([^'\"]+)['\"]\s*,\s*target:\s*(\d+)")
+K6_THRESHOLD_PATTERN = re.compile(r"['\"]?([A-Za-z_]\w*(?:\{[^}]*\})?)['\"]?\s*:\s*\[([^\]]*)\]")
+COMPARATORS = {
+    "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b, "===": lambda a, b: a == b, "!=": lambda a, b: a != b,
+}
+TREND_METRICS = {"http_req_duration", "http_req_waiting"}
+COUNTER_METRICS = {"http_reqs", "iterations", "dropped_iterations"}
+
+
+# ---------------------------------------------------------------------------
+# Stages and thresholds (k6 syntax)
+# ---------------------------------------------------------------------------
+
+def parse_duration(text: str) -> float:
+    """Parse a k6 duration ("30s", "1m30s", "500ms") into seconds"""
+    text = text.strip()
+    matches = list(DURATION_PATTERN.finditer(text))
+    if not matches or "".join(m.group(0) for m in matches) != text:
+        raise ValueError(f"Invalid duration: {text!r}")
+    return sum(float(m.group(1)) * DURATION_UNITS[m.group(2)] for m in matches)
+
+
+def format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}m{secs}s" if minutes else f"{secs}s"
+
+
+def parse_stages(text: str) -> List[Tuple[float, int]]:
+    """Parse "30s:50,1m:200" into [(seconds, target), ...]"""
+    stages = []
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        duration, _, target = item.rpartition(":")
+        if not duration:
+            raise ValueError(f"Invalid stage {item!r} (expected DURATION:TARGET)")
+        stages.append((parse_duration(duration), int(target)))
+    if not stages:
+        raise ValueError("At least one stage is required")
+    return stages
+
+
+def _js_block(source: str, key: str, open_char: str, close_char: str) -> Optional[str]:
+    """Body of the first `key: <open> ... <close>` block in a JS source (comments stripped)"""
+    match = re.search(rf"\b{key}\s*:\s*\{open_char}", source)
+    if not match:
+        return None
+    depth, start = 1, match.end()
+    for index in range(start, len(source)):
+        if source[index] == open_char:
+            depth += 1
+        elif source[index] == close_char:
+            depth -= 1
+            if depth == 0:
+                return source[start:index]
+    return None
+
+
+def load_k6_options(path: Path) -> Dict:
+    """
+    Lift `stages` and `thresholds` out of a k6 script's exported options.
+
+    Returns:
+        Dict with stages ([(seconds, target)]) and thresholds ({metric: [expr]})
+    """
+    source = re.sub(r"/\*.*?\*/", "", path.read_text(encoding="utf-8"), flags=re.DOTALL)
+    source = re.sub(r"(?<![:'\"\w])//.*$", "", source, flags=re.MULTILINE)  # keeps http:// in strings
+    options = {"stages": [], "thresholds": {}}
+
+    stages_block = _js_block(source, "stages", "[", "]")
+    if stages_block:
+        options["stages"] = [(parse_duration(duration), int(target))
+                             for duration, target in K6_STAGE_PATTERN.findall(stages_block)]
+
+    thresholds_block = _js_block(source, "thresholds", "{", "}")
+    if thresholds_block:
+        for metric, expressions in K6_THRESHOLD_PATTERN.findall(thresholds_block):
+            options["thresholds"][metric] = re.findall(r"['\"]([^'\"]+)['\"]", expressions)
+    return options
+
+
+def parse_threshold_arg(text: str) -> Tuple[str, str]:
+    """Parse a --threshold value "metric[{tag:value}]:expression" """
+    match = re.match(r"^\s*([A-Za-z_]\w*(?:\{[^}]*\})?)\s*:\s*(.+)$", text)
+    if not match:
+        raise ValueError(f"Invalid threshold {text!r} (expected METRIC:EXPRESSION)")
+    return match.group(1), match.group(2).strip()
+
+
+class Schedule:
+    """Piecewise-linear ramp over k6-style stages, starting from zero."""
+
+    def __init__(self, stages: List[Tuple[float, int]]):
+        self.stages = stages
+        self.duration = sum(seconds for seconds, _ in stages)
+        self.peak = max(target for _, target in stages)
+
+    def target_at(self, t: float) -> float:
+        """Interpolated stage target at t seconds"""
+        start_value, elapsed = 0.0, 0.0
+        for seconds, target in self.stages:
+            if t < elapsed + seconds:
+                fraction = (t - elapsed) / seconds if seconds else 1.0
+                return start_value + (target - start_value) * fraction
+            start_value, elapsed = float(target), elapsed + seconds
+        return start_value
+
+    def cumulative(self, t: float) -> float:
+        """Integral of target_at over [0, t] (expected arrivals in rps mode)"""
+        total, start_value, elapsed = 0.0, 0.0, 0.0
+        for seconds, target in self.stages:
+            span = min(seconds, max(0.0, t - elapsed))
+            if span <= 0:
+                break
+            end_value = start_value + (target - start_value) * (span / seconds if seconds else 1.0)
+            total += (start_value + end_value) / 2 * span
+            start_value, elapsed = float(target), elapsed + seconds
+        return total
+
+
+# ---------------------------------------------------------------------------
+# Insomnia collection
+# ---------------------------------------------------------------------------
+
+def render_template(text: str, variables: Dict, missing: set, depth: int = 0) -> str:
+    """Substitute {{ _.name }} / {{ name }} references (nested values rendered too)"""
+    if not isinstance(text, str) or "{{" not in text:
+        return text
+
+    def substitute(match):
+        value = variables
+        for part in match.group(1).split("."):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                missing.add(match.group(1))
+                return ""
+        value = value if isinstance(value, str) else json.dumps(value)
+        return render_template(value, variables, missing, depth + 1) if depth < 5 else value
+
+    return TEMPLATE_PATTERN.sub(substitute, text)
+
+
+def _merge_environment(resources: List[Dict], workspace_id: str, name: Optional[str]) -> Tuple[Dict, str]:
+    """Base environment data overlaid with the named sub-environment"""
+    environments = [r for r in resources if r.get("_type") == "environment"]
+    base = next((e for e in environments if e.get("parentId") == workspace_id), None)
+    data = dict(base.get("data") or {}) if base else {}
+    label = base.get("name", "base") if base else "none"
+    if name:
+        sub = next((e for e in environments if e.get("name") == name
+                    and (base is None or e.get("parentId") == base["_id"])), None)
+        if sub is None:
+            raise ValueError(f"Environment {name!r} not found in collection")
+        data.update(sub.get("data") or {})
+        label = name
+    return data, label
+
+
+def _request_body(body: Dict, variables: Dict, missing: set) -> Tuple[bytes, Optional[str], bool]:
+    """Encode an Insomnia body; returns (bytes, content type, is_graphql)"""
+    mime = (body or {}).get("mimeType") or ""
+    if mime == "application/graphql":
+        text = render_template(body.get("text", ""), variables, missing)
+        try:
+            payload = json.loads(text)
+            if not isinstance(payload, dict) or "query" not in payload:
+                raise ValueError
+        except ValueError:
+            payload = {"query": text}
+        return json.dumps(payload).encode("utf-8"), "application/json", True
+    if mime == "application/x-www-form-urlencoded":
+        params = [(p["name"], render_template(p.get("value", ""), variables, missing))
+                  for p in body.get("params", []) if not p.get("disabled")]
+        return urlencode(params).encode("utf-8"), mime, False
+    text = render_template((body or {}).get("text", ""), variables, missing)
+    return text.encode("utf-8"), mime or None, False
+
+
+def load_collection(path: Path, environment: str = None, overrides: Dict = None,
+                    name_filter: str = None) -> Dict:
+    """
+    Load and resolve the requests of an Insomnia v4 export.
+
+    Args:
+        path: Export file
+        environment: Sub-environment name layered over the base environment
+        overrides: Variables that win over both environments
+        name_filter: Regex; only requests whose name matches are kept
+
+    Returns:
+        Dict with requests (ready to send), environment label and missing variables
+    """
+    export = json.loads(path.read_text(encoding="utf-8-sig"))
+    resources = export.get("resources", [])
+    by_id = {r["_id"]: r for r in resources if "_id" in r}
+    workspace = next((r for r in resources if r.get("_type") == "workspace"), {})
+    base_variables, label = _merge_environment(resources, workspace.get("_id"), environment)
+
+    requests = []
+    missing: set = set()
+    for resource in (r for r in resources if r.get("_type") == "request"):  # export order
+        if name_filter and not re.search(name_filter, resource.get("name", "")):
+            continue
+
+        # Folder environments apply between the workspace environment and the overrides
+        variables = dict(base_variables)
+        chain, parent = [], by_id.get(resource.get("parentId"))
+        while parent is not None and parent.get("_type") == "request_group":
+            chain.append(parent.get("environment") or {})
+            parent = by_id.get(parent.get("parentId"))
+        for group_env in reversed(chain):
+            variables.update(group_env)
+        variables.update(overrides or {})
+
+        url = render_template(resource.get("url", ""), variables, missing)
+        if TAG_PATTERN.search(url):
+            raise ValueError(f"{resource.get('name')}: template tags ({{% %}}) are not supported")
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"{resource.get('name')}: only http:// URLs are supported ({url!r})")
+
+        query = [(p["name"], render_template(p.get("value", ""), variables, missing))
+                 for p in resource.get("parameters", []) if not p.get("disabled")]
+        target = parts.path or "/"
+        if parts.query or query:
+            target += "?" + "&".join(filter(None, [parts.query, urlencode(query)]))
+
+        body, content_type, is_graphql = _request_body(resource.get("body"), variables, missing)
+        headers = {h["name"]: render_template(h.get("value", ""), variables, missing)
+                   for h in resource.get("headers", []) if h.get("name") and not h.get("disabled")}
+        if content_type and is_graphql:
+            headers = {k: v for k, v in headers.items() if k.lower() != "content-type"}
+            headers["Content-Type"] = content_type
+        elif content_type and not any(k.lower() == "content-type" for k in headers):
+            headers["Content-Type"] = content_type
+
+        auth = resource.get("authentication") or {}
+        if auth.get("type") == "bearer" and not auth.get("disabled"):
+            token = render_template(auth.get("token", ""), variables, missing)
+            headers["Authorization"] = f"{auth.get('prefix') or 'Bearer'} {token}"
+
+        requests.append({
+            "name": resource.get("name") or resource["_id"],
+            "method": (resource.get("method") or "GET").upper(),
+            "url": url,
+            "host": parts.hostname or "localhost",
+            "port": parts.port or 80,
+            "path": target,
+            "headers": headers,
+            "body": body,
+            "graphql": is_graphql or parts.path.endswith("/graphql"),
+        })
+
+    return {"requests": requests, "environment": label, "missing": sorted(missing)}
+
+
+# ---------------------------------------------------------------------------
+# Load runner
+# ---------------------------------------------------------------------------
+
+class RequestStats:
+    """Latency histograms and failure counts for one request."""
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.waiting = Histogram()
+        self.failures = 0
+        self.errors: Dict[str, int] = {}
+        self.samples: Dict[str, str] = {}
+
+    def record(self, duration_ms: float, waiting_ms: Optional[float], error: Optional[str],
+               detail: Optional[str]):
+        self.duration.add(duration_ms)
+        if waiting_ms is not None:
+            self.waiting.add(waiting_ms)
+        if error:
+            self.failures += 1
+            self.errors[error] = self.errors.get(error, 0) + 1
+            if detail and error not in self.samples and len(self.samples) < MAX_ERROR_SAMPLES:
+                self.samples[error] = detail[:200]
+
+
+def classify(request: Dict, result: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Failure kind and detail of one response (None when it succeeded)"""
+    if result["status"] != "ok":
+        return result["status"], result.get("error")
+    if result["code"] >= 400:
+        return f"http_{result['code']}", result["body"][:200].decode("utf-8", "replace")
+    if request["graphql"] and result["body"]:
+        try:
+            parsed = json.loads(result["body"])
+        except ValueError:
+            return "invalid_json", result["body"][:200].decode("utf-8", "replace")
+        errors = parsed.get("errors") if isinstance(parsed, dict) else None
+        if errors:
+            first = errors[0] if isinstance(errors[0], dict) else {"message": str(errors[0])}
+            return "graphql", first.get("message")
+    return None, None
+
+
+class LoadRunner:
+    """Replay a request list under a ramping-vus or ramping-arrival-rate schedule."""
+
+    def __init__(self, requests: List[Dict], stages: List[Tuple[float, int]], mode: str = "vus",
+                 timeout: float = 10.0, max_vus: int = DEFAULT_MAX_VUS, think_time: float = 0.0,
+                 graceful_stop: float = 5.0, quiet: bool = False):
+        if mode not in ("vus", "rps"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.requests = requests
+        self.schedule = Schedule(stages)
+        self.mode = mode
+        self.max_vus = self.schedule.peak if mode == "vus" else max_vus
+        self.think_time = think_time
+        self.graceful_stop = graceful_stop
+        self.quiet = quiet
+        connections = max(1, self.max_vus)
+        self.prober = AsyncHealthProber(concurrency=connections, timeout=timeout,
+                                        per_host_connections=connections)
+        self.stats: Dict[str, RequestStats] = {r["name"]: RequestStats() for r in requests}
+        self.dropped = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._cursor = 0
+        self._target = 0.0
+        self._stopping = False
+
+    def _next_request(self) -> Dict:
+        request = self.requests[self._cursor % len(self.requests)]
+        self._cursor += 1
+        return request
+
+    async def _send(self, request: Dict):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            result = await self.prober.fetch(request["host"], request["port"], request["method"],
+                                             request["path"], request["headers"], request["body"])
+        finally:
+            self.in_flight -= 1
+        error, detail = classify(request, result)
+        timings = result["timings"]
+        self.stats[request["name"]].record(timings["total_ms"], timings.get("ttfb_ms"), error, detail)
+
+    async def _vu(self, index: int):
+        """One virtual user: loop over the collection while the ramp keeps it active"""
+        while not self._stopping:
+            if index >= self._target:
+                await asyncio.sleep(CONTROL_INTERVAL * 5)
+                continue
+            await self._send(self._next_request())
+            if self.think_time:
+                await asyncio.sleep(self.think_time)
+
+    def _progress(self, elapsed: float):
+        sent = sum(s.duration.count for s in self.stats.values())
+        failed = sum(s.failures for s in self.stats.values())
+        unit = "VUs" if self.mode == "vus" else "rps"
+        error_rate = failed / sent * 100 if sent else 0.0
+        print(f"  [{format_duration(elapsed):>6}] target {self._target:7.1f} {unit}  "
+              f"in-flight {self.in_flight:4d}  requests {sent:7d}  errors {error_rate:5.1f}%")
+
+    async def run(self) -> Dict:
+        """Drive the schedule to completion; returns the raw run summary"""
+        tasks: List[asyncio.Task] = []
+        vus: List[asyncio.Task] = []
+        started = time.perf_counter()
+        next_progress = PROGRESS_INTERVAL
+        issued = 0
+
+        try:
+            while True:
+                elapsed = time.perf_counter() - started
+                if elapsed >= self.schedule.duration:
+                    break
+                self._target = self.schedule.target_at(elapsed)
+
+                if self.mode == "vus":
+                    while len(vus) < min(self.max_vus, int(self._target + 0.999)):
+                        vus.append(asyncio.create_task(self._vu(len(vus))))
+                else:
+                    due = int(self.schedule.cumulative(elapsed)) - issued
+                    for _ in range(max(0, due)):
+                        issued += 1
+                        if self.in_flight >= self.max_vus:
+                            self.dropped += 1
+                            continue
+                        tasks.append(asyncio.create_task(self._send(self._next_request())))
+                    tasks = [t for t in tasks if not t.done()]
+
+                if not self.quiet and elapsed >= next_progress:
+                    self._progress(elapsed)
+                    next_progress += PROGRESS_INTERVAL
+                await asyncio.sleep(CONTROL_INTERVAL)
+        finally:
+            # Let in-flight requests finish (k6's gracefulStop), then cancel stragglers
+            self._stopping = True
+            pending = [t for t in vus + tasks if not t.done()]
+            if pending:
+                _, still_running = await asyncio.wait(pending, timeout=self.graceful_stop)
+                for task in still_running:
+                    task.cancel()
+                await asyncio.gather(*still_running, return_exceptions=True)
+            self.prober.close()
+
+        return {
+            "mode": self.mode,
+            "duration_s": round(time.perf_counter() - started, 3),
+            "iterations": self._cursor // len(self.requests),  # full passes over the collection
+            "dropped_iterations": self.dropped,
+            "peak_in_flight": self.peak_in_flight,
+            "stats": self.stats,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Summary and thresholds
+# ---------------------------------------------------------------------------
+
+def _trend(histogram: Histogram) -> Dict:
+    count = histogram.count
+    result = {"count": count,
+              "avg": round(histogram.total / count, 3) if count else None,
+              "min": round(histogram.min, 3) if count else None,
+              "med": histogram.percentile(50),
+              "max": round(histogram.max, 3) if count else None}
+    for pct in PERCENTILES:
+        result[f"p{pct}"] = histogram.percentile(pct)
+    return result
+
+
+def summarize(run: Dict) -> Dict:
+    """Per-request and overall latency distributions and error rates"""
+    duration = max(run["duration_s"], 1e-9)
+    requests = {}
+    all_duration, all_waiting, all_failures, all_errors = Histogram(), Histogram(), 0, {}
+    for name, stats in run["stats"].items():
+        count = stats.duration.count
+        requests[name] = {
+            "requests": count,
+            "rps": round(count / duration, 2),
+            "failures": stats.failures,
+            "error_rate": round(stats.failures / count, 4) if count else 0.0,
+            "errors": stats.errors,
+            "error_samples": stats.samples,
+            "http_req_duration": _trend(stats.duration),
+            "http_req_waiting": _trend(stats.waiting),
+        }
+        all_duration.merge(stats.duration)
+        all_waiting.merge(stats.waiting)
+        all_failures += stats.failures
+        for kind, n in stats.errors.items():
+            all_errors[kind] = all_errors.get(kind, 0) + n
+
+    total = all_duration.count
+    return {
+        "mode": run["mode"],
+        "duration_s": run["duration_s"],
+        "peak_in_flight": run["peak_in_flight"],
+        "overall": {
+            "requests": total,
+            "rps": round(total / duration, 2),
+            "failures": all_failures,
+            "error_rate": round(all_failures / total, 4) if total else 0.0,
+            "errors": all_errors,
+            "iterations": run["iterations"],
+            "dropped_iterations": run["dropped_iterations"],
+            "http_req_duration": _trend(all_duration),
+            "http_req_waiting": _trend(all_waiting),
+        },
+        "requests": requests,
+    }
+
+
+def evaluate_thresholds(summary: Dict, thresholds: Dict[str, List[str]], samples: Dict) -> List[Dict]:
+    """
+    Check k6-style thresholds against a run summary.
+
+    Args:
+        summary: Output of summarize()
+        thresholds: {metric: [expression, ...]}
+        samples: {request name or None: {trend metric: Histogram}} for arbitrary percentiles
+
+    Returns:
+        One record per expression: metric, expression, observed, ok (None = not evaluated)
+    """
+    results = []
+    for metric, expressions in thresholds.items():
+        for expression in expressions:
+            record = {"metric": metric, "expression": expression, "observed": None, "ok": None}
+            match = THRESHOLD_PATTERN.match(expression)
+            if not match:
+                record["note"] = "unparseable expression"
+                results.append(record)
+                continue
+            aggregation, pct, operator, limit = match.groups()
+            observed = _observed(summary, samples, metric, aggregation, pct)
+            if observed is None:
+                record["note"] = "metric not produced by this runner"
+            else:
+                record["observed"] = observed
+                record["ok"] = COMPARATORS[operator](observed, float(limit))
+            results.append(record)
+    return results
+
+
+def _observed(summary: Dict, samples: Dict, metric: str, aggregation: str,
+              pct: Optional[str]) -> Optional[float]:
+    match = METRIC_PATTERN.match(metric)
+    if not match:
+        return None
+    name, tags = match.group(1), match.group(2)
+    request_name = None
+    if tags:
+        tag, _, value = tags.partition(":")
+        request_name = value.strip().strip("'\"")
+        if tag.strip() != "name" or request_name not in summary["requests"]:
+            return None
+    scope = summary["requests"][request_name] if request_name else summary["overall"]
+
+    if name in TREND_METRICS:
+        if pct is not None:
+            return samples[request_name][name].percentile(float(pct))
+        return scope[name].get(aggregation)
+    if name == "http_req_failed":
+        return {"rate": scope["error_rate"], "count": scope["failures"]}.get(aggregation)
+    if name in COUNTER_METRICS:
+        count = scope.get("requests" if name == "http_reqs" else name)
+        if count is None:
+            return None
+        if aggregation == "count":
+            return count
+        if aggregation == "rate":
+            return round(count / max(summary["duration_s"], 1e-9), 3)
+    return None
+
+
+def threshold_samples(run: Dict) -> Dict:
+    """Trend histograms keyed by request name (None = all requests) for p(N) thresholds"""
+    samples = {None: {"http_req_duration": Histogram(), "http_req_waiting": Histogram()}}
+    for name, stats in run["stats"].items():
+        samples[name] = {"http_req_duration": stats.duration, "http_req_waiting": stats.waiting}
+        samples[None]["http_req_duration"].merge(stats.duration)
+        samples[None]["http_req_waiting"].merge(stats.waiting)
+    return samples
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_summary(summary: Dict, thresholds: List[Dict]):
+    """Print the per-request table, error breakdown and threshold verdicts"""
+    overall = summary["overall"]
+    print(f"\n{'=' * 108}")
+    print(f"LOAD SUMMARY ({summary['mode']} mode, {summary['duration_s']:.1f}s, "
+          f"peak in-flight {summary['peak_in_flight']})")
+    print(f"{'=' * 108}")
+    print(f"{'REQUEST':<34}{'COUNT':>8}{'RPS':>8}{'ERR%':>7}{'p50':>9}{'p90':>9}"
+          f"{'p95':>9}{'p99':>9}{'MAX':>9}")
+    rows = list(summary["requests"].items()) + [("ALL", overall)]
+    for name, row in rows:
+        if name == "ALL":
+            print("-" * 108)
+        trend = row["http_req_duration"]
+        print(f"{name[:33]:<34}{row['requests']:>8}{row['rps']:>8.1f}{row['error_rate'] * 100:>6.1f}%"
+              f"{_fmt(trend['p50']):>9}{_fmt(trend['p90']):>9}{_fmt(trend['p95']):>9}"
+              f"{_fmt(trend['p99']):>9}{_fmt(trend['max']):>9}")
+    print(f"\nLatencies in ms. Iterations: {overall['iterations']}, "
+          f"dropped iterations: {overall['dropped_iterations']}")
+
+    if overall["errors"]:
+        print("\nErrors:")
+        for name, row in summary["requests"].items():
+            for kind, count in sorted(row["errors"].items(), key=lambda item: -item[1]):
+                sample = row["error_samples"].get(kind)
+                print(f"  {name[:33]:<34}{kind:<20}{count:>7}" + (f"  {sample}" if sample else ""))
+
+    if thresholds:
+        print("\nThresholds:")
+        for record in thresholds:
+            mark = "✓" if record["ok"] else "✗" if record["ok"] is False else "-"
+            observed = record["observed"]
+            detail = f"observed {observed}" if observed is not None else record.get("note", "")
+            print(f"  {mark} {record['metric']}: {record['expression']:<14} {detail}")
+
+
+def _parse_var(text: str) -> Tuple[str, str]:
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {text!r}")
+    return key, value
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Replay an Insomnia collection as a ramped load test')
+    parser.add_argument('--collection', type=Path, default=DEFAULT_COLLECTION, help='Insomnia v4 export')
+    parser.add_argument('--environment', help='Sub-environment layered over the base environment')
+    parser.add_argument('--var', type=_parse_var, action='append', default=[],
+                        help='Override a collection variable (KEY=VALUE, repeatable)')
+    parser.add_argument('--request', help='Only replay requests whose name matches this regex')
+    parser.add_argument('--mode', choices=['vus', 'rps'], default='vus',
+                        help='Stage targets are virtual users (vus) or requests per second (rps)')
+    parser.add_argument('--stages', help=f'DURATION:TARGET list (default {DEFAULT_STAGES})')
+    parser.add_argument('--k6-options', type=Path, help='Take stages and thresholds from a k6 script')
+    parser.add_argument('--threshold', action='append', default=[],
+                        help="METRIC:EXPRESSION, e.g. 'http_req_duration:p(95)<1000' (repeatable)")
+    parser.add_argument('--max-vus', type=int, default=DEFAULT_MAX_VUS,
+                        help='Concurrency cap in rps mode (arrivals beyond it are dropped)')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Pause between requests per VU (s)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request deadline (seconds)')
+    parser.add_argument('--dry-run', action='store_true', help='Print the resolved requests and exit')
+    parser.add_argument('--quiet', action='store_true', help='No progress lines')
+    parser.add_argument('--json', metavar='PATH', help='Write the summary and threshold results as JSON')
+    args = parser.parse_args()
+
+    try:
+        collection = load_collection(args.collection, args.environment, dict(args.var), args.request)
+        k6_options = load_k6_options(args.k6_options) if args.k6_options else {"stages": [], "thresholds": {}}
+        stages = parse_stages(args.stages) if args.stages else k6_options["stages"] or parse_stages(DEFAULT_STAGES)
+        thresholds = {metric: list(exprs)
+                      for metric, exprs in (k6_options["thresholds"] or DEFAULT_THRESHOLDS).items()}
+        for item in args.threshold:
+            metric, expression = parse_threshold_arg(item)
+            thresholds.setdefault(metric, []).append(expression)
+    except (OSError, ValueError) as e:
+        print(f"Error loading load test configuration: {e}")
+        sys.exit(2)
+
+    requests = collection["requests"]
+    if not requests:
+        print("Error: no requests selected from the collection")
+        sys.exit(2)
+
+    print(f"Collection: {args.collection.name} ({len(requests)} requests, "
+          f"environment: {collection['environment']})")
+    if collection["missing"]:
+        print(f"⚠️  Unresolved variables (sent as empty): {', '.join(collection['missing'])}")
+
+    if args.dry_run:
+        for request in requests:
+            print(f"\n{request['name']}\n  {request['method']} {request['url']}")
+            for key, value in request["headers"].items():
+                print(f"  {key}: {value}")
+            if request["body"]:
+                print(f"  {request['body'][:200].decode('utf-8', 'replace')}")
+        return
+
+    unit = "VUs" if args.mode == "vus" else "rps"
+    plan = ", ".join(f"{format_duration(seconds)}→{target}" for seconds, target in stages)
+    print(f"Stages ({unit}): {plan}")
+    runner = LoadRunner(requests, stages, args.mode, args.timeout, args.max_vus, args.think_time,
+                        quiet=args.quiet)
+    try:
+        run = asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        print("\nLoad test interrupted")
+        sys.exit(130)
+
+    summary = summarize(run)
+    results = evaluate_thresholds(summary, thresholds, threshold_samples(run))
+    print_summary(summary, results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"collection": str(args.collection), "stages": stages, "summary": summary,
+                       "thresholds": results}, f, indent=2)
+        print(f"\nResults saved to: {args.json}")
+
+    if any(record["ok"] is False for record in results):
+        print("\n❌ Thresholds failed")
+        sys.exit(THRESHOLD_EXIT_CODE)
+    print("\n✅ All evaluated thresholds passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,31 @@
 """
 Vextrus ERP Environment Diagnostic Tool
 Checks Git Bash/MinGW configuration and MCP server readiness
+
+Independent checks run concurrently, so total time is bounded by the
+slowest check. Tool versions (python/git --version) are cached on the
+binary's path + mtime + size in state/env-check/, and the DAIC toggle is
+exercised in-process against a temporary state directory instead of
+flipping the real mode through ./daic.
+
+Usage:
+    python check-environment.py            # colored report
+    python check-environment.py --json     # machine-readable (CI)
+    python check-environment.py --no-cache # re-run tool version probes
 """
 
+import argparse
+import importlib.util
 import json
 import os
+import shutil
 import sys
 import subprocess
 import platform
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import codecs
@@ -23,129 +41,214 @@ if sys.platform == 'win32':
 
 # ANSI colors
 COLORS = {
-    'green': '\033[38;5;114m',  
-    'red': '\033[38;5;203m',    
-    'yellow': '\033[38;5;215m', 
-    'cyan': '\033[38;5;111m',   
-    'gray': '\033[38;5;242m',   
+    'green': '\033[38;5;114m',
+    'red': '\033[38;5;203m',
+    'yellow': '\033[38;5;215m',
+    'cyan': '\033[38;5;111m',
+    'gray': '\033[38;5;242m',
     'reset': '\033[0m'
 }
 
-def print_header(text):
-    """Print a section header"""
-    print(f"\n{COLORS['cyan']}═══ {text} ═══{COLORS['reset']}")
+# Tool version cache (keyed on binary path + mtime + size)
+STATE_DIR = Path(__file__).resolve().parent / "state" / "env-check"
+TOOL_CACHE_FILE = STATE_DIR / "tool-versions.json"
+SUBPROCESS_TIMEOUT = 15
 
-def check_status(condition, success_msg, fail_msg):
-    """Print status with color"""
-    if condition:
-        print(f"  {COLORS['green']}✓{COLORS['reset']} {success_msg}")
-        return True
-    else:
-        print(f"  {COLORS['red']}✗{COLORS['reset']} {fail_msg}")
+# Hook modules: installed copy first, then the in-repo backup
+HOOK_DIRS = ['.claude/hooks', 'hooks-backup-code']
+
+
+class CheckReport:
+    """Collects one check's result lines so checks can run concurrently"""
+
+    def __init__(self, title):
+        self.title = title
+        self.items = []  # (kind, message): kind is ok / fail / active / idle
+
+    def status(self, condition, success_msg, fail_msg):
+        """Record status line; returns condition like the old check_status()"""
+        if condition:
+            self.items.append(('ok', success_msg))
+            return True
+        self.items.append(('fail', fail_msg))
         return False
 
-def check_python():
+    def note(self, message, active=True):
+        self.items.append(('active' if active else 'idle', message))
+
+
+# ---------------------------------------------------------------------------
+# Tool version cache
+# ---------------------------------------------------------------------------
+
+class ToolVersionCache:
+    """`<tool> --version` results keyed on the resolved binary's path, mtime and size
+
+    Shared by the check threads; entries are only touched under the lock,
+    the `--version` subprocesses run outside it.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.entries = {}
+        if enabled:
+            try:
+                with open(TOOL_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def version(self, cmd):
+        """Return `cmd --version` output, or None if cmd is not on PATH or fails"""
+        path = shutil.which(cmd)
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+            key = f"{os.path.realpath(path)}|{st.st_mtime_ns}|{st.st_size}"
+        except OSError:
+            key = None
+
+        if self.enabled:
+            with self.lock:
+                cached = self.entries.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            result = subprocess.run([path, '--version'], capture_output=True, text=True,
+                                    timeout=SUBPROCESS_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        # Python 2 printed its version on stderr
+        version = (result.stdout or result.stderr).strip()
+        if key:
+            # Drop stale records for the same binary (upgraded in place)
+            prefix = key.split('|', 1)[0] + '|'
+            with self.lock:
+                for old in [k for k in self.entries if k.startswith(prefix)]:
+                    del self.entries[old]
+                self.entries[key] = version
+                self.dirty = True
+        return version
+
+    def save(self):
+        if not (self.enabled and self.dirty):
+            return
+        try:
+            STATE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = TOOL_CACHE_FILE.with_name(f".{TOOL_CACHE_FILE.name}.{os.getpid()}.tmp")
+            with self.lock:
+                snapshot = dict(self.entries)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp, TOOL_CACHE_FILE)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Checks
+# ---------------------------------------------------------------------------
+
+def check_python(report, tools):
     """Check Python installation and version"""
-    print_header("Python Configuration")
-    
     # Check Python command
     python_cmd = None
     for cmd in ['python', 'python3', 'py']:
-        try:
-            result = subprocess.run([cmd, '--version'], capture_output=True, text=True)
-            if result.returncode == 0:
-                python_cmd = cmd
-                version = result.stdout.strip()
-                check_status(True, f"Python found: {cmd} ({version})", "")
-                break
-        except:
-            continue
-    
+        version = tools.version(cmd)
+        if version:
+            python_cmd = cmd
+            report.status(True, f"Python found: {cmd} ({version})", "")
+            break
+
     if not python_cmd:
-        check_status(False, "", "Python not found in PATH")
+        report.status(False, "", "Python not found in PATH")
         return False
-    
+
     # Check Python version
     version_info = sys.version_info
-    check_status(
+    report.status(
         version_info >= (3, 7),
         f"Python version: {version_info.major}.{version_info.minor}.{version_info.micro}",
         f"Python version too old: {version_info.major}.{version_info.minor}"
     )
-    
+
     # Check encoding
-    check_status(
+    report.status(
         sys.getdefaultencoding() == 'utf-8',
         f"Default encoding: {sys.getdefaultencoding()}",
         f"Encoding issue: {sys.getdefaultencoding()} (should be utf-8)"
     )
-    
+
     return True
 
-def check_git():
+def check_git(report, tools):
     """Check Git installation and configuration"""
-    print_header("Git Configuration")
-    
     try:
         # Check Git installation
-        result = subprocess.run(['git', '--version'], capture_output=True, text=True)
-        git_installed = result.returncode == 0
-        check_status(git_installed, f"Git installed: {result.stdout.strip()}", "Git not found")
-        
+        version = tools.version('git')
+        git_installed = version is not None
+        report.status(git_installed, f"Git installed: {version}", "Git not found")
+
         if git_installed:
-            # Check current branch
-            branch = subprocess.run(['git', 'branch', '--show-current'], 
-                                  capture_output=True, text=True).stdout.strip()
-            check_status(True, f"Current branch: {branch}", "")
-            
+            # Branch and autocrlf depend on the working tree, never cached;
+            # both run at once
+            branch_proc = subprocess.Popen(['git', 'branch', '--show-current'],
+                                           stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            autocrlf_proc = subprocess.Popen(['git', 'config', 'core.autocrlf'],
+                                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            branch = branch_proc.communicate(timeout=SUBPROCESS_TIMEOUT)[0].strip()
+            autocrlf = autocrlf_proc.communicate(timeout=SUBPROCESS_TIMEOUT)[0].strip()
+
+            report.status(True, f"Current branch: {branch}", "")
+
             # Check autocrlf setting
-            autocrlf = subprocess.run(['git', 'config', 'core.autocrlf'], 
-                                    capture_output=True, text=True).stdout.strip()
-            check_status(
+            report.status(
                 autocrlf in ['input', 'false'],
                 f"Line ending handling: core.autocrlf={autocrlf}",
                 f"Line ending issue: core.autocrlf={autocrlf} (should be 'input' or 'false')"
             )
-            
+
         return git_installed
     except:
-        check_status(False, "", "Git check failed")
+        report.status(False, "", "Git check failed")
         return False
 
-def check_environment():
+def check_environment(report, tools):
     """Check environment variables and platform"""
-    print_header("System Environment")
-    
     # Platform detection
     is_windows = sys.platform == 'win32'
     is_mingw = 'MINGW' in platform.platform() or 'MSYS' in os.environ.get('MSYSTEM', '')
-    
-    check_status(True, f"Platform: {sys.platform}", "")
-    check_status(True, f"System: {platform.system()} {platform.release()}", "")
-    
+
+    report.status(True, f"Platform: {sys.platform}", "")
+    report.status(True, f"System: {platform.system()} {platform.release()}", "")
+
     if is_windows:
-        check_status(is_mingw, "Git Bash/MinGW detected", "Not running in Git Bash/MinGW")
-    
+        report.status(is_mingw, "Git Bash/MinGW detected", "Not running in Git Bash/MinGW")
+
     # Check shell
     shell = os.environ.get('SHELL', 'not set')
-    check_status('/bash' in shell or shell == 'not set', f"Shell: {shell}", f"Unexpected shell: {shell}")
-    
+    report.status('/bash' in shell or shell == 'not set', f"Shell: {shell}", f"Unexpected shell: {shell}")
+
     # Check terminal encoding
     term_encoding = os.environ.get('LANG', 'not set')
-    check_status(
+    report.status(
         'UTF-8' in term_encoding.upper() or term_encoding == 'not set',
         f"Terminal encoding: {term_encoding}",
         f"Encoding issue: {term_encoding}"
     )
-    
+
     return True
 
-def check_project_structure():
+def check_project_structure(report, tools):
     """Check project directories and files"""
-    print_header("Project Structure")
-    
     project_root = Path.cwd()
-    
+
     # Essential directories
     essential_dirs = [
         '.claude',
@@ -155,15 +258,15 @@ def check_project_structure():
         'sessions/tasks',
         'sessions/protocols'
     ]
-    
+
     all_exist = True
     for dir_path in essential_dirs:
         full_path = project_root / dir_path
         exists = full_path.exists() and full_path.is_dir()
-        check_status(exists, f"Directory exists: {dir_path}", f"Missing directory: {dir_path}")
+        report.status(exists, f"Directory exists: {dir_path}", f"Missing directory: {dir_path}")
         if not exists:
             all_exist = False
-    
+
     # Essential files
     essential_files = [
         'daic',
@@ -173,104 +276,127 @@ def check_project_structure():
         '.claude/settings.local.json',
         '.claude/state/daic-mode.json'
     ]
-    
+
     for file_path in essential_files:
         full_path = project_root / file_path
         exists = full_path.exists() and full_path.is_file()
-        check_status(exists, f"File exists: {file_path}", f"Missing file: {file_path}")
+        report.status(exists, f"File exists: {file_path}", f"Missing file: {file_path}")
         if not exists:
             all_exist = False
-    
+
     return all_exist
 
-def check_mcp_config():
+def check_mcp_config(report, tools):
     """Check MCP server configuration"""
-    print_header("MCP Server Configuration")
-    
     mcp_file = Path.cwd() / '.mcp.json'
     if not mcp_file.exists():
-        check_status(False, "", "MCP configuration file not found")
+        report.status(False, "", "MCP configuration file not found")
         return False
-    
+
     try:
         with open(mcp_file, 'r', encoding='utf-8') as f:
             mcp_config = json.load(f)
-        
+
         servers = mcp_config.get('mcpServers', {})
-        check_status(True, f"MCP servers configured: {len(servers)}", "")
-        
+        report.status(True, f"MCP servers configured: {len(servers)}", "")
+
         # Check key servers
         important_servers = ['filesystem', 'github', 'serena', 'memory']
         for server in important_servers:
             has_server = server in servers
-            check_status(has_server, f"  • {server} server", f"  • {server} server missing")
-        
+            report.status(has_server, f"  • {server} server", f"  • {server} server missing")
+
         return True
     except Exception as e:
-        check_status(False, "", f"Error reading MCP config: {e}")
+        report.status(False, "", f"Error reading MCP config: {e}")
         return False
 
-def check_daic_mode():
+def _load_shared_state():
+    """Import a private copy of shared_state.py (hooks dir first, then backup)"""
+    for hook_dir in HOOK_DIRS:
+        path = Path.cwd() / hook_dir / 'shared_state.py'
+        if path.exists():
+            spec = importlib.util.spec_from_file_location('_envcheck_shared_state', path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    return None
+
+def _test_daic_toggle(mode):
+    """
+    Toggle twice through shared_state against a temporary state dir.
+
+    Returns (ok, message). The real daic-mode.json is never written.
+    """
+    shared_state = _load_shared_state()
+    if shared_state is None:
+        return False, "shared_state.py not found - cannot test DAIC toggle"
+
+    with tempfile.TemporaryDirectory(prefix='daic-check-') as tmp:
+        state_dir = Path(tmp)
+        state_file = state_dir / 'daic-mode.json'
+        with open(state_file, 'w', encoding='utf-8') as f:
+            json.dump({'mode': mode if mode in ('discussion', 'implementation') else 'discussion'}, f)
+        shared_state.STATE_DIR = state_dir
+        shared_state.DAIC_STATE_FILE = state_file
+
+        def current():
+            with open(state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('mode')
+
+        start = current()
+        shared_state.toggle_daic_mode()
+        toggled = current()
+        shared_state.toggle_daic_mode()
+        restored = current()
+
+    if toggled != start and restored == start:
+        return True, f"DAIC toggle working ({start} -> {toggled} -> {restored}, temp state)"
+    return False, "DAIC toggle not working"
+
+def check_daic_mode(report, tools):
     """Check DAIC mode status"""
-    print_header("DAIC Mode")
-    
     daic_file = Path.cwd() / '.claude/state/daic-mode.json'
     if not daic_file.exists():
-        check_status(False, "", "DAIC mode file not found")
+        report.status(False, "", "DAIC mode file not found")
         return False
-    
+
     try:
         with open(daic_file, 'r', encoding='utf-8') as f:
             daic_data = json.load(f)
-        
+
         mode = daic_data.get('mode', 'unknown')
         if mode == 'implementation':
-            print(f"  {COLORS['green']}▶{COLORS['reset']} Mode: IMPLEMENTATION (can use Write/Edit tools)")
+            report.note("Mode: IMPLEMENTATION (can use Write/Edit tools)", active=True)
         else:
-            print(f"  {COLORS['yellow']}▶{COLORS['reset']} Mode: DISCUSSION (planning mode)")
-        
-        # Test DAIC command
+            report.note("Mode: DISCUSSION (planning mode)", active=False)
+
+        # Test DAIC toggle logic without touching the real state
         try:
-            # Use bash to run the script on Windows
-            if sys.platform == 'win32':
-                result = subprocess.run(['bash', './daic'], capture_output=True, text=True)
-            else:
-                result = subprocess.run(['./daic'], capture_output=True, text=True, shell=False)
-                
-            # Read the mode again to see if toggle worked
-            with open(daic_file, 'r', encoding='utf-8') as f:
-                new_data = json.load(f)
-            new_mode = new_data.get('mode', 'unknown')
-            
-            check_status(
-                new_mode != mode,
-                f"DAIC toggle working (switched to {new_mode})",
-                "DAIC toggle not working"
-            )
-            
-            # Toggle back
-            if sys.platform == 'win32':
-                subprocess.run(['bash', './daic'], capture_output=True, text=True)
-            else:
-                subprocess.run(['./daic'], capture_output=True, text=True, shell=False)
-            
+            ok, message = _test_daic_toggle(mode)
+            report.status(ok, message, message)
         except Exception as e:
-            check_status(False, "", f"DAIC command failed: {e}")
-        
+            report.status(False, "", f"DAIC toggle test failed: {e}")
+
+        daic_script = Path.cwd() / 'daic'
+        report.status(
+            daic_script.exists() and (sys.platform == 'win32' or os.access(daic_script, os.X_OK)),
+            "daic command present",
+            "daic command missing or not executable"
+        )
+
         return True
     except Exception as e:
-        check_status(False, "", f"Error reading DAIC mode: {e}")
+        report.status(False, "", f"Error reading DAIC mode: {e}")
         return False
 
-def check_hooks():
+def check_hooks(report, tools):
     """Check hook scripts"""
-    print_header("Hook Scripts")
-    
     hooks_dir = Path.cwd() / '.claude/hooks'
     if not hooks_dir.exists():
-        check_status(False, "", "Hooks directory not found")
+        report.status(False, "", "Hooks directory not found")
         return False
-    
+
     hook_files = [
         'session-start.py',
         'sessions-enforce.py',
@@ -279,39 +405,111 @@ def check_hooks():
         'post-tool-use.py',
         'shared_state.py'
     ]
-    
+
     all_exist = True
     for hook in hook_files:
         hook_path = hooks_dir / hook
         exists = hook_path.exists()
-        check_status(exists, f"Hook: {hook}", f"Missing hook: {hook}")
+        report.status(exists, f"Hook: {hook}", f"Missing hook: {hook}")
         if not exists:
             all_exist = False
-    
+
     return all_exist
 
-def run_diagnostic():
+# (summary name, section title, check function) in report order
+CHECKS = [
+    ("Python", "Python Configuration", check_python),
+    ("Git", "Git Configuration", check_git),
+    ("Environment", "System Environment", check_environment),
+    ("Project", "Project Structure", check_project_structure),
+    ("MCP", "MCP Server Configuration", check_mcp_config),
+    ("DAIC", "DAIC Mode", check_daic_mode),
+    ("Hooks", "Hook Scripts", check_hooks),
+]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _run_check(name, title, fn, tools):
+    report = CheckReport(title)
+    start = time.perf_counter()
+    try:
+        passed = bool(fn(report, tools))
+    except Exception as e:
+        passed = report.status(False, "", f"{name} check crashed: {e}")
+    return name, report, passed, (time.perf_counter() - start) * 1000
+
+def run_checks(use_cache=True):
+    """Run all checks concurrently; returns (results in report order, elapsed ms)"""
+    tools = ToolVersionCache(enabled=use_cache)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(CHECKS)) as pool:
+        futures = [pool.submit(_run_check, name, title, fn, tools) for name, title, fn in CHECKS]
+        results = [f.result() for f in futures]
+    tools.save()
+    return results, (time.perf_counter() - start) * 1000
+
+def print_header(text):
+    """Print a section header"""
+    print(f"\n{COLORS['cyan']}═══ {text} ═══{COLORS['reset']}")
+
+def print_report(report):
+    """Print a check's collected lines"""
+    print_header(report.title)
+    for kind, message in report.items:
+        if kind == 'ok':
+            print(f"  {COLORS['green']}✓{COLORS['reset']} {message}")
+        elif kind == 'fail':
+            print(f"  {COLORS['red']}✗{COLORS['reset']} {message}")
+        else:
+            color = COLORS['green'] if kind == 'active' else COLORS['yellow']
+            print(f"  {color}▶{COLORS['reset']} {message}")
+
+def run_diagnostic(as_json=False, use_cache=True):
     """Run complete diagnostic"""
+    timestamp = datetime.now()
+    results, elapsed_ms = run_checks(use_cache)
+    passed = sum(1 for _, _, ok, _ in results if ok)
+    total = len(results)
+
+    if as_json:
+        print(json.dumps({
+            "timestamp": timestamp.isoformat(),
+            "platform": sys.platform,
+            "passed": passed,
+            "total": total,
+            "ok": passed == total,
+            "duration_ms": round(elapsed_ms, 1),
+            "checks": [
+                {
+                    "name": name,
+                    "title": report.title,
+                    "passed": ok,
+                    "duration_ms": round(ms, 1),
+                    "items": [{"status": kind, "message": message.strip()}
+                              for kind, message in report.items],
+                }
+                for name, report, ok, ms in results
+            ],
+        }, indent=2, ensure_ascii=False))
+        return 0 if passed == total else 1
+
     print(f"{COLORS['cyan']}{'='*50}{COLORS['reset']}")
     print(f"{COLORS['cyan']} VEXTRUS ERP ENVIRONMENT DIAGNOSTIC{COLORS['reset']}")
     print(f"{COLORS['cyan']}{'='*50}{COLORS['reset']}")
-    print(f"{COLORS['gray']}Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{COLORS['reset']}")
-    
-    # Run all checks
-    results = []
-    results.append(("Python", check_python()))
-    results.append(("Git", check_git()))
-    results.append(("Environment", check_environment()))
-    results.append(("Project", check_project_structure()))
-    results.append(("MCP", check_mcp_config()))
-    results.append(("DAIC", check_daic_mode()))
-    results.append(("Hooks", check_hooks()))
-    
+    print(f"{COLORS['gray']}Timestamp: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}{COLORS['reset']}")
+
+    for _, report, _, _ in results:
+        print_report(report)
+
     # Summary
     print_header("Summary")
-    passed = sum(1 for _, result in results if result)
-    total = len(results)
-    
+    slowest = max(results, key=lambda r: r[3])
+    print(f"{COLORS['gray']}Completed in {elapsed_ms:.0f} ms "
+          f"(slowest: {slowest[0]} {slowest[3]:.0f} ms){COLORS['reset']}")
+
     if passed == total:
         print(f"{COLORS['green']}✓ All checks passed! ({passed}/{total}){COLORS['reset']}")
         print(f"{COLORS['green']}Environment is properly configured for Git Bash/MinGW.{COLORS['reset']}")
@@ -319,13 +517,17 @@ def run_diagnostic():
     else:
         print(f"{COLORS['yellow']}⚠ Some checks failed: {passed}/{total} passed{COLORS['reset']}")
         print(f"{COLORS['yellow']}Please address the issues above.{COLORS['reset']}")
-        
+
         # Show failed categories
-        failed = [name for name, result in results if not result]
+        failed = [name for name, _, result, _ in results if not result]
         if failed:
             print(f"\n{COLORS['red']}Failed categories: {', '.join(failed)}{COLORS['reset']}")
-        
+
         return 1
 
 if __name__ == '__main__':
-    sys.exit(run_diagnostic())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Vextrus ERP environment diagnostic")
+    parser.add_argument('--json', action='store_true', help="Machine-readable output for CI")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore cached tool versions")
+    args = parser.parse_args()
+    sys.exit(run_diagnostic(as_json=args.json, use_cache=not args.no_cache))
@@ -7,18 +7,24 @@ Tests all core functionality including:
 - Cache storage
 - Cache lookup
 - Cache invalidation
+- File-edit invalidation when deployed in .claude/hooks/
 - Statistics tracking
 """
 
 import sys
 import os
 import importlib.util
+import shutil
+import subprocess
+import tempfile
 
 # Load agent-cache module dynamically (handles hyphenated filename)
-spec = importlib.util.spec_from_file_location(
-    "agent_cache",
-    os.path.join(os.path.dirname(__file__), "agent-cache.py")
-)
+# Falls back to hooks-backup-code/ when no sibling copy exists
+_here = os.path.dirname(os.path.abspath(__file__))
+_module_path = os.path.join(_here, "agent-cache.py")
+if not os.path.exists(_module_path):
+    _module_path = os.path.join(_here, "..", "..", "..", "hooks-backup-code", "agent-cache.py")
+spec = importlib.util.spec_from_file_location("agent_cache", _module_path)
 agent_cache = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(agent_cache)
 
@@ -163,6 +169,58 @@ def test_cache_invalidation():
     print(f"[OK] Invalidated {count} entries")
 
 
+# Runs inside a copy of the module deployed to <project>/.claude/hooks/
+_DEPLOYED_CHECK = """
+import importlib.util, os, sys, time
+spec = importlib.util.spec_from_file_location("agent_cache", sys.argv[1])
+cache = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cache)
+
+inputs = {"prompt": "Validate VAT rules", "files": ["src/vat.ts"], "parameters": {}}
+key = cache.generate_cache_key("business-logic-validator", inputs)
+cache.store_cache(key, "business-logic-validator", inputs, {"summary": "ok"}, 1000, 100, 24)
+assert cache.lookup_cache(key) is not None, "fresh entry should hit"
+
+with open("src/vat.ts", "a") as f:
+    f.write("export const VAT_RATE = 0.10;\\n")
+
+assert cache.generate_cache_key("business-logic-validator", inputs) != key, "edit should change the key"
+assert cache.invalidate_file(os.path.abspath("src/vat.ts")) == 1, "edit should drop the entry"
+assert cache.lookup_cache(key) is None, "edited file should miss"
+print(cache.PROJECT_ROOT)
+"""
+
+
+def test_edited_file_misses_when_deployed():
+    """Test an edited input file misses when the module lives in .claude/hooks/."""
+    print("\n" + "="*60)
+    print("TEST: Edited File Misses (.claude/hooks layout)")
+    print("="*60)
+
+    project = tempfile.mkdtemp(prefix="agent-cache-project-")
+    try:
+        hooks_dir = os.path.join(project, ".claude", "hooks")
+        os.makedirs(hooks_dir)
+        os.makedirs(os.path.join(project, "src"))
+        with open(os.path.join(project, "src", "vat.ts"), "w") as f:
+            f.write("export const VAT_RATE = 0.15;\n")
+        deployed = shutil.copy(_module_path, hooks_dir)
+
+        env = dict(os.environ, AGENT_CACHE_DIR=os.path.join(project, ".claude", "state", "agent-cache"))
+        env.pop("CLAUDE_PROJECT_DIR", None)
+        result = subprocess.run(
+            [sys.executable, "-c", _DEPLOYED_CHECK, deployed],
+            cwd=project, env=env, capture_output=True, text=True
+        )
+        assert result.returncode == 0, f"deployed check failed: {result.stderr.strip()}"
+        assert os.path.samefile(result.stdout.strip(), project), "PROJECT_ROOT should be the project, not .claude/"
+
+        print(f"[OK] PROJECT_ROOT resolved to the project directory")
+        print(f"[OK] Editing a referenced file changes the key and drops the entry")
+    finally:
+        shutil.rmtree(project, ignore_errors=True)
+
+
 def test_cache_statistics():
     """Test cache statistics tracking."""
     print("\n" + "="*60)
@@ -226,6 +284,7 @@ def run_all_tests():
         test_ttl_configuration()
         test_cache_storage_and_lookup()
         test_cache_invalidation()
+        test_edited_file_misses_when_deployed()
         test_cache_statistics()
         test_bangladesh_scenarios()
 
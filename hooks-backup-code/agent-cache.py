@@ -0,0 +1,767 @@
+#!/usr/bin/env python3
+"""
+Agent Result Cache
+Content-addressed cache for agent outputs so repeated validator/profiler
+runs with identical inputs return from disk instead of re-running the agent.
+
+Layout (state/agent-cache/):
+    index.json                 - entry metadata, file -> entries reverse index,
+                                 hit/miss statistics
+    entries/<k[:2]>/<k>.json   - full cached result, sharded by key prefix
+    file-hashes.json           - SHA256 per referenced file, keyed on stat()
+
+Keys cover the content of every file listed in inputs['files'], not just its
+path, so an edited file can never serve a stale result. Hashes are cached by
+(mtime, size, inode) so unchanged files are never re-read, and the reverse
+index lets a file change drop exactly the entries that referenced it.
+
+The index is loaded lazily on first use and reloaded only when another
+process has rewritten it (mtime check). Entries expire after a per-agent
+TTL, and the total on-disk size is bounded by least-recently-used eviction.
+
+Usage:
+    python agent-cache.py status
+    python agent-cache.py report
+    python agent-cache.py inspect <key-prefix>
+    python agent-cache.py invalidate [--agent NAME] [--key KEY] [--file PATH] [--all]
+    python agent-cache.py refresh      # drop entries whose files changed
+    python agent-cache.py prune
+    python agent-cache.py optimize [--max-mb 100]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def _find_project_root() -> Path:
+    """
+    Root that repo-relative inputs['files'] resolve against
+
+    Hooks are deployed to .claude/hooks/, so the module's own location says
+    nothing about the project; use CLAUDE_PROJECT_DIR (set by Claude Code)
+    or the same .claude lookup as the other hooks.
+    """
+    env_root = os.environ.get("CLAUDE_PROJECT_DIR")
+    if env_root:
+        return Path(env_root).resolve()
+    try:
+        from shared_state import get_project_root
+        return Path(get_project_root()).resolve()
+    except ImportError:
+        current = Path.cwd().resolve()
+        for candidate in (current, *current.parents):
+            if (candidate / ".claude").exists():
+                return candidate
+        return current
+
+
+# Constants
+PROJECT_ROOT = _find_project_root()
+CACHE_DIR = Path(os.environ.get(
+    "AGENT_CACHE_DIR", Path(__file__).resolve().parent.parent / "state" / "agent-cache"))
+ENTRIES_DIR = CACHE_DIR / "entries"
+INDEX_FILE = CACHE_DIR / "index.json"
+FILE_HASHES_FILE = CACHE_DIR / "file-hashes.json"
+INDEX_VERSION = 2
+
+# Files modified this recently are hashed but not remembered: a second write
+# within the same mtime tick would otherwise go unnoticed (git's "racy clean")
+RACY_WINDOW_NS = 2_000_000_000
+
+# Size bound enforced after every store (LRU eviction)
+MAX_CACHE_BYTES = int(os.environ.get("AGENT_CACHE_MAX_MB", "100")) * 1024 * 1024
+
+# TTL per agent (hours) - slow-changing domain rules live longest
+DEFAULT_TTL_HOURS = 24
+AGENT_TTL_HOURS = {
+    "business-logic-validator": 168,
+    "api-integration-tester": 48,
+    "performance-profiler": 72,
+    "data-migration-specialist": 24,
+}
+
+# In-memory index, loaded lazily (see _load_index)
+_index: Optional[Dict] = None
+_index_mtime_ns: Optional[int] = None
+_file_hashes: Optional[Dict] = None
+_file_hashes_dirty = False
+
+
+# ---------------------------------------------------------------------------
+# Index management
+# ---------------------------------------------------------------------------
+
+def _empty_index() -> Dict:
+    """Initialize index structure"""
+    return {
+        "version": INDEX_VERSION,
+        "entries": {},
+        "files": {},
+        "stats": {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+            "saved_ms": 0,
+            "saved_tokens": 0,
+            "agents": {},
+            "since": datetime.now().isoformat(),
+        },
+    }
+
+
+def _index_stat() -> Optional[int]:
+    try:
+        return INDEX_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_index() -> Dict:
+    """Return the in-memory index, reading index.json only when it changed on disk"""
+    global _index, _index_mtime_ns
+
+    mtime = _index_stat()
+    if _index is not None and mtime == _index_mtime_ns:
+        return _index
+
+    data = None
+    if mtime is not None:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                data = None
+        except Exception as e:
+            print(f"Error loading cache index: {e}")
+            data = None
+
+    _index = data if data is not None else _empty_index()
+    _index_mtime_ns = mtime
+    return _index
+
+
+def _save_index() -> bool:
+    """Atomically persist the in-memory index"""
+    global _index_mtime_ns
+
+    if _index is None:
+        return False
+    try:
+        _atomic_write_json(INDEX_FILE, _index)
+        _index_mtime_ns = _index_stat()
+        return True
+    except Exception as e:
+        print(f"Error saving cache index: {e}")
+        return False
+
+
+def _atomic_write_json(path: Path, data: Dict, indent: Optional[int] = None) -> int:
+    """Write JSON via temp file + rename; returns bytes written"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(payload)
+
+
+def _entry_path(cache_key: str) -> Path:
+    return ENTRIES_DIR / cache_key[:2] / f"{cache_key}.json"
+
+
+def _agent_stats(stats: Dict, agent_name: str) -> Dict:
+    return stats["agents"].setdefault(agent_name, {"hits": 0, "misses": 0, "saved_ms": 0})
+
+
+def _forget_entry(index: Dict, cache_key: str) -> bool:
+    """Remove an entry and its reverse-index links from the index"""
+    meta = index["entries"].pop(cache_key, None)
+    if meta is None:
+        return False
+    reverse = index["files"]
+    for path in meta.get("files", {}):
+        keys = reverse.get(path)
+        if keys is None:
+            continue
+        try:
+            keys.remove(cache_key)
+        except ValueError:
+            pass
+        if not keys:
+            del reverse[path]
+    return True
+
+
+def _link_entry(index: Dict, cache_key: str, meta: Dict) -> None:
+    """Add an entry to the index and register it under each referenced file"""
+    index["entries"][cache_key] = meta
+    for path in meta.get("files", {}):
+        index["files"].setdefault(path, []).append(cache_key)
+
+
+def _drop_entry(index: Dict, cache_key: str) -> bool:
+    """Remove an entry from index and disk; returns True if it existed"""
+    existed = _forget_entry(index, cache_key)
+    try:
+        _entry_path(cache_key).unlink()
+        existed = True
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error removing cache entry {cache_key[:8]}: {e}")
+    return existed
+
+
+def _now_ts() -> float:
+    return datetime.now().timestamp()
+
+
+# ---------------------------------------------------------------------------
+# File content hashing
+# ---------------------------------------------------------------------------
+
+def _normalize_path(path: str) -> str:
+    """Canonical form used in keys and the reverse index (repo-relative when possible)"""
+    resolved = (PROJECT_ROOT / path).resolve()
+    try:
+        return resolved.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def _load_file_hashes() -> Dict:
+    global _file_hashes
+    if _file_hashes is None:
+        try:
+            with open(FILE_HASHES_FILE, 'r', encoding='utf-8') as f:
+                _file_hashes = json.load(f)
+        except (OSError, ValueError):
+            _file_hashes = {}
+    return _file_hashes
+
+
+def _save_file_hashes() -> None:
+    global _file_hashes_dirty
+    if not _file_hashes_dirty:
+        return
+    try:
+        _atomic_write_json(FILE_HASHES_FILE, _file_hashes)
+        _file_hashes_dirty = False
+    except Exception as e:
+        print(f"Error saving file hash cache: {e}")
+
+
+def hash_file(path: str) -> Optional[str]:
+    """
+    SHA256 of a file's content, re-read only when its stat() signature changed
+
+    Args:
+        path: File path (absolute or repo-relative)
+
+    Returns:
+        Hex digest, or None if the file does not exist
+    """
+    global _file_hashes_dirty
+
+    norm = _normalize_path(path)
+    full = PROJECT_ROOT / norm
+    cache = _load_file_hashes()
+    try:
+        st = full.stat()
+    except OSError:
+        if cache.pop(norm, None) is not None:
+            _file_hashes_dirty = True
+        return None
+
+    signature = [st.st_mtime_ns, st.st_size, st.st_ino]
+    cached = cache.get(norm)
+    if cached is not None and cached[:3] == signature:
+        return cached[3]
+
+    digest = hashlib.sha256()
+    try:
+        with open(full, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    sha = digest.hexdigest()
+
+    if datetime.now().timestamp() * 1e9 - st.st_mtime_ns >= RACY_WINDOW_NS:
+        cache[norm] = signature + [sha]
+        _file_hashes_dirty = True
+    elif cache.pop(norm, None) is not None:
+        _file_hashes_dirty = True
+    return sha
+
+
+def hash_files(paths: List[str]) -> Dict[str, Optional[str]]:
+    """Content hashes for a list of files, keyed by normalized path"""
+    hashes = {_normalize_path(p): hash_file(p) for p in paths}
+    _save_file_hashes()
+    return hashes
+
+
+def _input_files(inputs: Dict) -> List[str]:
+    files = inputs.get("files") if isinstance(inputs, dict) else None
+    return [str(f) for f in files] if files else []
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def get_ttl_for_agent(agent_name: str) -> int:
+    """Return cache TTL in hours for an agent"""
+    return AGENT_TTL_HOURS.get(agent_name, DEFAULT_TTL_HOURS)
+
+
+def generate_cache_key(agent_name: str, inputs: Dict) -> str:
+    """
+    Derive a deterministic cache key from agent name, inputs and the current
+    content of every file in inputs['files']
+
+    Args:
+        agent_name: Name of the agent
+        inputs: Agent inputs (prompt, files, parameters, ...)
+
+    Returns:
+        32-character hex MD5 digest of the canonical JSON form
+    """
+    payload = {"agent": agent_name, "inputs": inputs}
+    files = _input_files(inputs)
+    if files:
+        payload["fileHashes"] = hash_files(files)
+    canonical = json.dumps(
+        payload,
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+    )
+    return hashlib.md5(canonical.encode('utf-8')).hexdigest()
+
+
+def store_cache(
+    cache_key: str,
+    agent_name: str,
+    inputs: Dict,
+    output: Dict,
+    duration_ms: int,
+    context_tokens: int = 0,
+    ttl_hours: Optional[int] = None
+) -> bool:
+    """
+    Store an agent result and evict least-recently-used entries over the size bound
+
+    Args:
+        cache_key: Key from generate_cache_key()
+        agent_name: Name of the agent
+        inputs: Agent inputs the key was derived from
+        output: Agent result to return on later hits
+        duration_ms: How long the agent took (credited as saved on each hit)
+        context_tokens: Tokens the agent consumed (credited as saved on each hit)
+        ttl_hours: Override for the agent's default TTL
+
+    Returns:
+        True if stored successfully
+    """
+    if ttl_hours is None:
+        ttl_hours = get_ttl_for_agent(agent_name)
+
+    now = _now_ts()
+    created = datetime.fromtimestamp(now).isoformat()
+    file_hashes = hash_files(_input_files(inputs))
+    entry = {
+        "cacheKey": cache_key,
+        "agentName": agent_name,
+        "inputs": inputs,
+        "output": output,
+        "metadata": {
+            "created": created,
+            "expires": datetime.fromtimestamp(now + ttl_hours * 3600).isoformat(),
+            "ttlHours": ttl_hours,
+            "durationMs": duration_ms,
+            "contextTokens": context_tokens,
+            "fileHashes": file_hashes,
+        },
+    }
+
+    try:
+        size = _atomic_write_json(_entry_path(cache_key), entry)
+    except Exception as e:
+        print(f"Error storing cache entry: {e}")
+        return False
+
+    index = _load_index()
+    _forget_entry(index, cache_key)
+    _link_entry(index, cache_key, {
+        "agent": agent_name,
+        "size": size,
+        "created": now,
+        "accessed": now,
+        "expires": now + ttl_hours * 3600,
+        "duration_ms": duration_ms,
+        "context_tokens": context_tokens,
+        "hits": 0,
+        "files": file_hashes,
+    })
+    index["stats"]["stores"] += 1
+    _evict_lru(index, MAX_CACHE_BYTES)
+    return _save_index()
+
+
+def lookup_cache(cache_key: str, agent_name: Optional[str] = None) -> Optional[Dict]:
+    """
+    Look up a cached agent result
+
+    Args:
+        cache_key: Key from generate_cache_key()
+        agent_name: Optional agent name; a mismatching entry counts as a miss
+
+    Returns:
+        Cached entry (agentName, inputs, output, metadata) or None on miss
+    """
+    index = _load_index()
+    stats = index["stats"]
+    meta = index["entries"].get(cache_key)
+    now = _now_ts()
+
+    entry = None
+    if meta is not None and (agent_name is None or meta["agent"] == agent_name):
+        if meta["expires"] <= now:
+            _drop_entry(index, cache_key)
+            stats["expired"] += 1
+        else:
+            try:
+                with open(_entry_path(cache_key), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                # Index outlived its file (manual cleanup, partial copy)
+                _forget_entry(index, cache_key)
+
+    agent = agent_name or (meta or {}).get("agent", "unknown")
+    per_agent = _agent_stats(stats, agent)
+    if entry is None:
+        stats["misses"] += 1
+        per_agent["misses"] += 1
+        _save_index()
+        return None
+
+    meta["accessed"] = now
+    meta["hits"] += 1
+    stats["hits"] += 1
+    stats["saved_ms"] += meta["duration_ms"]
+    stats["saved_tokens"] += meta["context_tokens"]
+    per_agent["hits"] += 1
+    per_agent["saved_ms"] += meta["duration_ms"]
+    _save_index()
+    return entry
+
+
+def invalidate_cache(cache_key: Optional[str] = None, agent_name: Optional[str] = None) -> int:
+    """
+    Invalidate cache entries
+
+    Args:
+        cache_key: Invalidate a single entry (takes precedence)
+        agent_name: Invalidate all entries for an agent
+                    (both None invalidates everything)
+
+    Returns:
+        Number of entries removed
+    """
+    index = _load_index()
+
+    if cache_key is not None:
+        keys = [cache_key]
+    elif agent_name is not None:
+        keys = [k for k, m in index["entries"].items() if m["agent"] == agent_name]
+    else:
+        keys = list(index["entries"])
+
+    count = sum(1 for key in keys if _drop_entry(index, key))
+    _save_index()
+    return count
+
+
+def invalidate_file(path: str) -> int:
+    """
+    Drop every entry that referenced a file (reverse-index lookup, O(affected))
+
+    Args:
+        path: Changed file (absolute or repo-relative)
+
+    Returns:
+        Number of entries removed
+    """
+    if not INDEX_FILE.exists():
+        return 0
+    index = _load_index()
+    keys = list(index["files"].get(_normalize_path(path), ()))
+    if not keys:
+        return 0
+    count = sum(1 for key in keys if _drop_entry(index, key))
+    _save_index()
+    return count
+
+
+def invalidate_changed_files() -> int:
+    """
+    Drop entries whose referenced files no longer match the hash they were
+    stored with. Costs one stat() per tracked file; only files whose stat
+    signature changed are re-read.
+
+    Returns:
+        Number of entries removed
+    """
+    index = _load_index()
+    entries = index["entries"]
+    count = 0
+    for path in list(index["files"]):
+        current = hash_file(path)
+        stale = [k for k in index["files"].get(path, ())
+                 if entries[k]["files"].get(path) != current]
+        count += sum(1 for key in stale if _drop_entry(index, key))
+    _save_file_hashes()
+    if count:
+        _save_index()
+    return count
+
+
+def prune_cache() -> int:
+    """
+    Remove expired entries and reconcile the index with the entries directory
+
+    Entry files missing from the index (e.g. lost to a concurrent index write)
+    are re-adopted if still valid; index records without a file are dropped.
+
+    Returns:
+        Number of entries removed
+    """
+    index = _load_index()
+    entries = index["entries"]
+    now = _now_ts()
+    removed = 0
+
+    for key in [k for k, m in entries.items() if m["expires"] <= now]:
+        _drop_entry(index, key)
+        index["stats"]["expired"] += 1
+        removed += 1
+
+    on_disk = set()
+    if ENTRIES_DIR.exists():
+        for path in ENTRIES_DIR.glob("*/*.json"):
+            key = path.stem
+            on_disk.add(key)
+            if key in entries:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                meta = entry["metadata"]
+                expires = datetime.fromisoformat(meta["expires"]).timestamp()
+            except (OSError, ValueError, KeyError):
+                expires = 0
+            if expires <= now:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            created = datetime.fromisoformat(meta["created"]).timestamp()
+            _link_entry(index, key, {
+                "agent": entry.get("agentName", "unknown"),
+                "size": path.stat().st_size,
+                "created": created,
+                "accessed": created,
+                "expires": expires,
+                "duration_ms": meta.get("durationMs", 0),
+                "context_tokens": meta.get("contextTokens", 0),
+                "hits": 0,
+                "files": meta.get("fileHashes", {}),
+            })
+
+    for key in [k for k in entries if k not in on_disk]:
+        _forget_entry(index, key)
+        removed += 1
+
+    _save_index()
+    return removed
+
+
+def _evict_lru(index: Dict, max_bytes: int) -> int:
+    """Evict least-recently-accessed entries until total size <= max_bytes"""
+    entries = index["entries"]
+    total = sum(m["size"] for m in entries.values())
+    if total <= max_bytes:
+        return 0
+
+    evicted = 0
+    for key in sorted(entries, key=lambda k: entries[k]["accessed"]):
+        if total <= max_bytes:
+            break
+        total -= entries[key]["size"]
+        _drop_entry(index, key)
+        evicted += 1
+    index["stats"]["evictions"] += evicted
+    return evicted
+
+
+def optimize_cache_size(max_bytes: Optional[int] = None) -> int:
+    """
+    Enforce the size bound by LRU eviction
+
+    Args:
+        max_bytes: Size bound (defaults to MAX_CACHE_BYTES)
+
+    Returns:
+        Number of entries evicted
+    """
+    index = _load_index()
+    evicted = _evict_lru(index, MAX_CACHE_BYTES if max_bytes is None else max_bytes)
+    if evicted:
+        _save_index()
+    return evicted
+
+
+def get_cache_stats() -> Dict:
+    """Return aggregate cache statistics"""
+    index = _load_index()
+    entries = index["entries"]
+    stats = index["stats"]
+    lookups = stats["hits"] + stats["misses"]
+
+    by_agent: Dict[str, Dict] = {}
+    for meta in entries.values():
+        agent = by_agent.setdefault(meta["agent"], {"entries": 0, "bytes": 0})
+        agent["entries"] += 1
+        agent["bytes"] += meta["size"]
+    for name, counters in stats["agents"].items():
+        by_agent.setdefault(name, {"entries": 0, "bytes": 0}).update(counters)
+
+    return {
+        "entries": len(entries),
+        "total_bytes": sum(m["size"] for m in entries.values()),
+        "max_bytes": MAX_CACHE_BYTES,
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+        "saved_seconds": stats["saved_ms"] / 1000,
+        "saved_tokens": stats["saved_tokens"],
+        "stores": stats["stores"],
+        "evictions": stats["evictions"],
+        "expired": stats["expired"],
+        "since": stats["since"],
+        "agents": by_agent,
+    }
+
+
+def generate_cache_report() -> str:
+    """Generate a human-readable cache report"""
+    s = get_cache_stats()
+    lines = [
+        "[CACHE] Agent Result Cache",
+        f"  Location:   {CACHE_DIR}",
+        f"  Entries:    {s['entries']} ({s['total_bytes'] / 1024:.1f} KB of "
+        f"{s['max_bytes'] / 1024 / 1024:.0f} MB)",
+        "",
+        f"[STATS] Since {s['since'][:19]}",
+        f"  Lookups:    {s['hits'] + s['misses']} "
+        f"(hits {s['hits']}, misses {s['misses']}, hit rate {s['hit_rate']:.1%})",
+        f"  Saved:      {s['saved_seconds']:.1f}s agent time, {s['saved_tokens']:,} tokens",
+        f"  Stores:     {s['stores']}  Evictions: {s['evictions']}  Expired: {s['expired']}",
+    ]
+    if s["agents"]:
+        lines.append("")
+        lines.append(f"  {'Agent':<32} {'Entries':>7} {'Hits':>6} {'Misses':>6} {'Saved(s)':>9}")
+        for name, a in sorted(s["agents"].items()):
+            lines.append(
+                f"  {name:<32} {a['entries']:>7} {a.get('hits', 0):>6} "
+                f"{a.get('misses', 0):>6} {a.get('saved_ms', 0) / 1000:>9.1f}"
+            )
+    return "\n".join(lines)
+
+
+def _resolve_key(prefix: str) -> List[str]:
+    return [k for k in _load_index()["entries"] if k.startswith(prefix)]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent result cache management")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("status", help="Show entry count and hit rate")
+    sub.add_parser("report", help="Show full statistics report")
+
+    p_inspect = sub.add_parser("inspect", help="Show a cached entry")
+    p_inspect.add_argument("key", help="Cache key or unique prefix")
+
+    p_inv = sub.add_parser("invalidate", help="Remove entries")
+    p_inv.add_argument("--agent", help="Remove all entries for this agent")
+    p_inv.add_argument("--key", help="Remove a single entry (key or unique prefix)")
+    p_inv.add_argument("--file", help="Remove entries that referenced this file")
+    p_inv.add_argument("--all", action="store_true", help="Remove every entry")
+
+    sub.add_parser("refresh", help="Remove entries whose referenced files changed")
+    sub.add_parser("prune", help="Remove expired entries and repair the index")
+
+    p_opt = sub.add_parser("optimize", help="Evict LRU entries over the size bound")
+    p_opt.add_argument("--max-mb", type=float, help="Size bound in MB (default: AGENT_CACHE_MAX_MB)")
+
+    args = parser.parse_args()
+
+    if args.command == "status":
+        s = get_cache_stats()
+        print(f"[CACHE] {s['entries']} entries, {s['total_bytes'] / 1024:.1f} KB, "
+              f"hit rate {s['hit_rate']:.1%}, saved {s['saved_seconds']:.1f}s")
+
+    elif args.command == "report":
+        print(generate_cache_report())
+
+    elif args.command == "inspect":
+        matches = _resolve_key(args.key)
+        if len(matches) != 1:
+            print(f"Error: {len(matches)} entries match '{args.key}'")
+            sys.exit(1)
+        with open(_entry_path(matches[0]), 'r', encoding='utf-8') as f:
+            print(json.dumps(json.load(f), indent=2, ensure_ascii=False))
+
+    elif args.command == "invalidate":
+        if args.key:
+            matches = _resolve_key(args.key)
+            if len(matches) != 1:
+                print(f"Error: {len(matches)} entries match '{args.key}'")
+                sys.exit(1)
+            count = invalidate_cache(matches[0])
+        elif args.file:
+            count = invalidate_file(args.file)
+        elif args.agent:
+            count = invalidate_cache(None, args.agent)
+        elif args.all:
+            count = invalidate_cache()
+        else:
+            parser.error("invalidate requires --key, --file, --agent or --all")
+        print(f"[DEL] Invalidated {count} entries")
+
+    elif args.command == "refresh":
+        print(f"[DEL] Invalidated {invalidate_changed_files()} entries with changed files")
+
+    elif args.command == "prune":
+        print(f"[CLEAN] Removed {prune_cache()} entries")
+
+    elif args.command == "optimize":
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        print(f"[CLEAN] Evicted {optimize_cache_size(max_bytes)} entries")
+
+
+if __name__ == '__main__':
+    main()
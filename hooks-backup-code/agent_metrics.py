@@ -10,15 +10,29 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from collections import defaultdict
 
+from change_detector import CusumDetector, new_state
+from metrics_stream import append_event
+from monitoring_snapshot import update_agent_snapshot
+
 # Constants
 STATE_DIR = Path(__file__).parent.parent / "state" / "monitoring"
 AGENT_METRICS_FILE = STATE_DIR / "agent_metrics.json"
+ROUTING_STATS_FILE = STATE_DIR / "routing_stats.json"
 
 # Success thresholds
 SUCCESS_RATE_EXCELLENT = 0.95
 SUCCESS_RATE_GOOD = 0.90
 SUCCESS_RATE_NEEDS_IMPROVEMENT = 0.85
 
+# Duration histogram bounds (seconds) for per-model latency percentiles
+DURATION_BUCKETS = [5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 450, 600, 900]
+ROUTING_PERCENTILES = [50, 90, 95, 99]
+
+# Change-point alerts (per agent/model CUSUM on duration and tokens)
+CHANGE_ALERT_DAYS = 7
+MAX_CHANGE_ALERTS = 20
+SEVERE_SHIFT_RATIO = 1.5
+
 
 def load_agent_metrics() -> Dict:
     """Load agent metrics data from JSON file"""
@@ -37,8 +51,12 @@ def save_agent_metrics(data: Dict) -> bool:
     """Save agent metrics data to JSON file"""
     try:
         STATE_DIR.mkdir(parents=True, exist_ok=True)
-        with open(AGENT_METRICS_FILE, 'w', encoding='utf-8') as f:
+        tmp_file = AGENT_METRICS_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp_file, AGENT_METRICS_FILE)
+        update_agent_snapshot(data)
+        save_routing_stats(data)
         return True
     except Exception as e:
         print(f"Error saving agent metrics: {e}")
@@ -123,7 +141,123 @@ def get_agent_category(agent_name: str) -> str:
     return "other"
 
 
-def track_agent_performance(
+def normalize_model_name(model: str) -> str:
+    """Map model aliases (e.g. "claude-haiku-4") to the canonical routing name"""
+    model_lower = model.lower()
+    if "haiku" in model_lower:
+        return "haiku-4.5"
+    if "sonnet" in model_lower:
+        return "sonnet-4.5"
+    return model
+
+
+def _update_model_stats(agent: Dict, model: str, success: bool,
+                        duration_seconds: float, cost_usd: float):
+    """Update the per-model duration histogram and counters for an agent"""
+    model_stats = agent.setdefault("model_stats", {})
+    model_key = normalize_model_name(model)
+
+    if model_key not in model_stats:
+        model_stats[model_key] = {
+            "invocations": 0,
+            "successful_invocations": 0,
+            "total_duration_seconds": 0.0,
+            "max_duration_seconds": 0.0,
+            "total_cost_usd": 0.0,
+            "duration_buckets": [0] * (len(DURATION_BUCKETS) + 1)
+        }
+
+    stats = model_stats[model_key]
+    stats["invocations"] += 1
+    if success:
+        stats["successful_invocations"] += 1
+    stats["total_duration_seconds"] += duration_seconds
+    stats["max_duration_seconds"] = max(stats["max_duration_seconds"], duration_seconds)
+    stats["total_cost_usd"] += cost_usd
+
+    bucket = next(
+        (i for i, bound in enumerate(DURATION_BUCKETS) if duration_seconds <= bound),
+        len(DURATION_BUCKETS)
+    )
+    stats["duration_buckets"][bucket] += 1
+
+
+def _update_change_points(agent: Dict, model: str, duration_seconds: float,
+                          tokens: int, when: datetime):
+    """Feed the per-model CUSUM detectors and record any distribution shift"""
+    model_key = normalize_model_name(model)
+    detectors = agent["model_stats"][model_key].setdefault("change_points", {})
+
+    for metric, value in (("duration_seconds", duration_seconds), ("tokens", tokens)):
+        alarm = CusumDetector(detectors.setdefault(metric, new_state())).update(value)
+        if alarm:
+            alarm.update({"timestamp": when.isoformat(), "model": model_key, "metric": metric})
+            alerts = agent.setdefault("change_alerts", [])
+            alerts.append(alarm)
+            del alerts[:-MAX_CHANGE_ALERTS]
+
+
+def _duration_percentile(stats: Dict, percentile: int) -> float:
+    """Conservative percentile estimate (bucket upper bound) from a histogram"""
+    target = stats["invocations"] * percentile / 100
+    cumulative = 0
+
+    for i, count in enumerate(stats["duration_buckets"]):
+        cumulative += count
+        if cumulative >= target and count > 0:
+            if i < len(DURATION_BUCKETS):
+                return float(min(DURATION_BUCKETS[i], stats["max_duration_seconds"]))
+            return stats["max_duration_seconds"]
+
+    return stats["max_duration_seconds"]
+
+
+def save_routing_stats(data: Dict) -> bool:
+    """
+    Write the compact per-agent, per-model routing stats file
+
+    ModelSelector reads this small precomputed file instead of scanning
+    invocation history, keeping latency-aware lookups in the microsecond range.
+    """
+    routing = {}
+
+    for agent_name, agent in data["agents"].items():
+        for model_key, stats in agent.get("model_stats", {}).items():
+            if not stats["invocations"]:
+                continue
+            entry = {
+                "invocations": stats["invocations"],
+                "success_rate": stats["successful_invocations"] / stats["invocations"],
+                "avg_duration_seconds": stats["total_duration_seconds"] / stats["invocations"],
+                "avg_cost_usd": stats["total_cost_usd"] / stats["invocations"]
+            }
+            for percentile in ROUTING_PERCENTILES:
+                entry[f"p{percentile}_duration_seconds"] = _duration_percentile(stats, percentile)
+            routing.setdefault(agent_name, {})[model_key] = entry
+
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = ROUTING_STATS_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"updated": datetime.now().isoformat(), "agents": routing}, f)
+        os.replace(tmp_file, ROUTING_STATS_FILE)
+        return True
+    except Exception as e:
+        print(f"Error saving routing stats: {e}")
+        return False
+
+
+def load_routing_stats() -> Dict:
+    """Load precomputed routing stats ({agent: {model: stats}})"""
+    try:
+        with open(ROUTING_STATS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get("agents", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _record_invocation(
+    data: Dict,
     agent_name: str,
     success: bool,
     duration_seconds: float,
@@ -131,29 +265,11 @@ def track_agent_performance(
     tokens_input: int,
     tokens_output: int,
     model: str,
-    user_corrections: Optional[int] = None,
-    error_message: Optional[str] = None
-) -> Dict:
-    """
-    Track performance metrics for an agent invocation
-
-    Args:
-        agent_name: Full agent name
-        success: Whether the invocation was successful
-        duration_seconds: Duration in seconds
-        cost_usd: Cost in USD
-        tokens_input: Input tokens
-        tokens_output: Output tokens
-        model: Model used
-        user_corrections: Optional count of user corrections
-        error_message: Optional error message if failed
-
-    Returns:
-        Updated metrics data
-    """
-    data = load_agent_metrics()
-    now = datetime.now()
-
+    user_corrections: Optional[int],
+    error_message: Optional[str],
+    when: datetime
+):
+    """Apply one invocation to the agent's counters (aggregates refreshed separately)"""
     # Initialize agent if not exists
     if agent_name not in data["agents"]:
         data["agents"][agent_name] = {
@@ -177,8 +293,8 @@ def track_agent_performance(
             "models_used": {},
             "common_failure_modes": [],
             "best_use_cases": [],
-            "first_seen": now.isoformat(),
-            "last_used": now.isoformat(),
+            "first_seen": when.isoformat(),
+            "last_used": when.isoformat(),
             "invocation_history": []
         }
 
@@ -219,13 +335,16 @@ def track_agent_performance(
     if model not in agent["models_used"]:
         agent["models_used"][model] = 0
     agent["models_used"][model] += 1
+    _update_model_stats(agent, model, success, duration_seconds, cost_usd)
+    _update_change_points(agent, model, duration_seconds, tokens_input + tokens_output, when)
 
-    # Update last used timestamp
-    agent["last_used"] = now.isoformat()
+    # Update timestamps (backfilled invocations may be older than the last one)
+    agent["first_seen"] = min(agent["first_seen"], when.isoformat())
+    agent["last_used"] = max(agent["last_used"], when.isoformat())
 
     # Add to invocation history (keep last 100)
     invocation_record = {
-        "timestamp": now.isoformat(),
+        "timestamp": when.isoformat(),
         "success": success,
         "duration_seconds": duration_seconds,
         "cost_usd": cost_usd,
@@ -237,7 +356,38 @@ def track_agent_performance(
     if len(agent["invocation_history"]) > 100:
         agent["invocation_history"] = agent["invocation_history"][-100:]
 
-    # Update last 30 days metrics
+    # Track failure modes
+    if not success and error_message:
+        # Simplify error message for grouping
+        simplified_error = error_message[:100]
+        existing_failure = next(
+            (f for f in agent["common_failure_modes"] if f["error"] == simplified_error),
+            None
+        )
+        if existing_failure:
+            existing_failure["count"] += 1
+        else:
+            agent["common_failure_modes"].append({
+                "error": simplified_error,
+                "count": 1,
+                "last_occurrence": when.isoformat()
+            })
+
+        # Keep top 10 failure modes
+        agent["common_failure_modes"] = sorted(
+            agent["common_failure_modes"],
+            key=lambda x: x["count"],
+            reverse=True
+        )[:10]
+
+    # Update category totals
+    category = get_agent_category(agent_name)
+    if category in data["categories"]:
+        data["categories"][category]["total_invocations"] += 1
+
+
+def _update_recent_trend(agent: Dict, now: datetime):
+    """Recompute the agent's last-30-days success rate and trend"""
     thirty_days_ago = now - timedelta(days=30)
     recent_invocations = [
         inv for inv in agent["invocation_history"]
@@ -264,40 +414,17 @@ def track_agent_performance(
             else:
                 agent["last_30_days"]["trend"] = "stable"
 
-    # Track failure modes
-    if not success and error_message:
-        # Simplify error message for grouping
-        simplified_error = error_message[:100]
-        existing_failure = next(
-            (f for f in agent["common_failure_modes"] if f["error"] == simplified_error),
-            None
-        )
-        if existing_failure:
-            existing_failure["count"] += 1
-        else:
-            agent["common_failure_modes"].append({
-                "error": simplified_error,
-                "count": 1,
-                "last_occurrence": now.isoformat()
-            })
 
-        # Keep top 10 failure modes
-        agent["common_failure_modes"] = sorted(
-            agent["common_failure_modes"],
-            key=lambda x: x["count"],
-            reverse=True
-        )[:10]
+def _refresh_aggregates(data: Dict, agent_names: List[str], now: datetime):
+    """Recompute trends for touched agents, category averages and the summary"""
+    for agent_name in agent_names:
+        _update_recent_trend(data["agents"][agent_name], now)
 
-    # Update category metrics
-    category = get_agent_category(agent_name)
-    if category in data["categories"]:
+    # Recalculate category averages
+    for category in {get_agent_category(name) for name in agent_names}:
+        if category not in data["categories"]:
+            continue
         cat = data["categories"][category]
-        cat_total = cat["total_invocations"]
-
-        # Update category totals
-        cat["total_invocations"] += 1
-
-        # Recalculate category averages
         all_agents_in_category = [
             a for name, a in data["agents"].items()
             if get_agent_category(name) == category
@@ -338,9 +465,119 @@ def track_agent_performance(
     # Update metadata
     data["metadata"]["last_updated"] = now.isoformat()
 
+
+def track_agent_performance(
+    agent_name: str,
+    success: bool,
+    duration_seconds: float,
+    cost_usd: float,
+    tokens_input: int,
+    tokens_output: int,
+    model: str,
+    user_corrections: Optional[int] = None,
+    error_message: Optional[str] = None
+) -> Dict:
+    """
+    Track performance metrics for an agent invocation
+
+    Args:
+        agent_name: Full agent name
+        success: Whether the invocation was successful
+        duration_seconds: Duration in seconds
+        cost_usd: Cost in USD
+        tokens_input: Input tokens
+        tokens_output: Output tokens
+        model: Model used
+        user_corrections: Optional count of user corrections
+        error_message: Optional error message if failed
+
+    Returns:
+        Updated metrics data
+    """
+    data = load_agent_metrics()
+    now = datetime.now()
+
+    _record_invocation(
+        data, agent_name, success, duration_seconds, cost_usd,
+        tokens_input, tokens_output, model, user_corrections, error_message, now
+    )
+    _refresh_aggregates(data, [agent_name], now)
+
     # Save updated data
     save_agent_metrics(data)
 
+    # Publish to live consumers (dashboard --watch)
+    append_event(
+        "invocation",
+        agent=agent_name,
+        model=model,
+        success=success,
+        duration_seconds=duration_seconds,
+        cost_usd=cost_usd
+    )
+
+    return data
+
+
+def track_agent_performance_batch(
+    invocations: List[Dict],
+    data: Optional[Dict] = None,
+    publish: bool = False
+) -> Dict:
+    """
+    Track many invocations with a single load and save
+
+    Used by sidechain_runs, so invocations carry their own timestamp.
+    Backfills leave publish off; the post-tool-use hook turns it on so
+    runs it records reach live consumers like track_agent_performance().
+
+    Args:
+        invocations: Dicts with the track_agent_performance() arguments plus
+                     an optional "timestamp" (datetime or ISO string)
+        data: Metrics data to update (default: load from disk); callers can
+              stash their own ledger in it so it is saved in the same write
+        publish: Append an "invocation" event per run to the metrics stream
+
+    Returns:
+        Updated metrics data
+    """
+    if data is None:
+        data = load_agent_metrics()
+    now = datetime.now()
+
+    touched = []
+    for inv in sorted(invocations, key=lambda i: str(i.get("timestamp") or "")):
+        when = inv.get("timestamp") or now
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when)
+        # History timestamps are naive local time like datetime.now()
+        if when.tzinfo is not None:
+            when = when.astimezone().replace(tzinfo=None)
+
+        _record_invocation(
+            data, inv["agent_name"], inv["success"], inv["duration_seconds"],
+            inv.get("cost_usd", 0.0), inv.get("tokens_input", 0), inv.get("tokens_output", 0),
+            inv["model"], inv.get("user_corrections"), inv.get("error_message"), when
+        )
+        if inv["agent_name"] not in touched:
+            touched.append(inv["agent_name"])
+
+    if touched:
+        _refresh_aggregates(data, touched, now)
+
+    save_agent_metrics(data)
+
+    if publish:
+        for inv in invocations:
+            append_event(
+                "invocation",
+                agent=inv["agent_name"],
+                model=inv["model"],
+                success=inv["success"],
+                duration_seconds=inv["duration_seconds"],
+                cost_usd=inv.get("cost_usd", 0.0)
+            )
+
     return data
 
 
@@ -414,6 +651,34 @@ def get_category_summary(category: str) -> Optional[Dict]:
     }
 
 
+def get_change_alerts(days: int = CHANGE_ALERT_DAYS, data: Optional[Dict] = None) -> List[Dict]:
+    """
+    Recent latency/token distribution shifts, newest first
+
+    Only the latest alert per agent, model and metric is returned, since a
+    later shift (e.g. back to normal) supersedes an earlier one.
+
+    Args:
+        days: Look-back window
+        data: Metrics data (default: load from disk)
+
+    Returns:
+        Alerts with agent, model, metric, direction, baseline, current, ratio
+    """
+    if data is None:
+        data = load_agent_metrics()
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+
+    latest = {}
+    for agent_name, agent in data["agents"].items():
+        for alert in agent.get("change_alerts", []):
+            latest[(agent_name, alert["model"], alert["metric"])] = dict(alert, agent=agent_name)
+
+    alerts = [a for a in latest.values() if a["timestamp"] >= cutoff]
+    alerts.sort(key=lambda a: a["timestamp"], reverse=True)
+    return alerts
+
+
 def get_performance_recommendations() -> List[Dict]:
     """Generate recommendations based on agent performance"""
     data = load_agent_metrics()
@@ -466,6 +731,33 @@ def get_performance_recommendations() -> List[Dict]:
                     "current_value": agent["avg_duration_seconds"]
                 })
 
+    # Check for recent latency / token distribution shifts
+    for alert in get_change_alerts(data=data):
+        if alert["direction"] != "increase":
+            continue
+        if alert["metric"] == "duration_seconds":
+            recommendations.append({
+                "type": "latency-shift",
+                "priority": "high" if alert["ratio"] >= SEVERE_SHIFT_RATIO else "medium",
+                "agent": alert["agent"],
+                "message": (f"{alert['agent']} ({alert['model']}) {alert['ratio']:.1f}x slower since "
+                            f"{alert['timestamp'][:10]}: {alert['baseline']:.0f}s -> {alert['current']:.0f}s"),
+                "action": "Check recent plugin, prompt or model changes for this agent",
+                "current_value": alert["current"],
+                "baseline_value": alert["baseline"]
+            })
+        else:
+            recommendations.append({
+                "type": "token-shift",
+                "priority": "medium",
+                "agent": alert["agent"],
+                "message": (f"{alert['agent']} ({alert['model']}) uses {alert['ratio']:.1f}x more tokens since "
+                            f"{alert['timestamp'][:10]}: {alert['baseline']:,.0f} -> {alert['current']:,.0f}"),
+                "action": "Review context passed to this agent and its prompt size",
+                "current_value": alert["current"],
+                "baseline_value": alert["baseline"]
+            })
+
     return recommendations
 
 
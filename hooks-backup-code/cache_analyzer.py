@@ -0,0 +1,473 @@
+"""
+Prompt Cache Analyzer for Multi-Agent System
+Correlates prompt-cache hit ratio with hook-injected context blocks
+
+For every main-chain turn (user prompt -> assistant requests) the hit
+ratio is cache_read / (input + cache_read + cache_write). A turn whose
+first request hits noticeably less than the previous turn's last request
+is a "drop"; drops after more than CACHE_TTL_SECONDS of idle time are
+counted as cache expiry instead, since the prefix was gone anyway.
+
+Hook output (SessionStart / UserPromptSubmit additionalContext) is split
+into labelled blocks - "[Agent Suggestion] ...", "**Active Task** ...",
+"[[ ultrathink ]]" - and each drop is attributed to the blocks injected
+on that turn. Blocks are ranked by how much more often they coincide
+with a drop than turns without them (lift, add-one smoothed so blocks
+present on every turn or never on a drop still get a finite score).
+
+Everything is one streaming pass over the transcripts; only per-session
+turn state and per-block counters are kept in memory.
+
+Usage:
+    python cache_analyzer.py                      # current project's transcripts
+    python cache_analyzer.py ~/.claude/projects/<slug> --threshold 0.25
+    python cache_analyzer.py --json --turns > cache-report.json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from transcript_reader import (
+    UsageDeduper,
+    find_transcripts,
+    message_text,
+    parse_timestamp,
+    read_records,
+    usage_of
+)
+
+# Constants
+DEFAULT_DROP_THRESHOLD = 0.3   # hit-ratio points lost vs the previous turn
+CACHE_TTL_SECONDS = 300        # default prompt-cache lifetime
+DEFAULT_TOP = 15
+
+# Hook output as it appears inside user/meta records
+HOOK_TAG_PATTERN = re.compile(r"<([a-z-]+-hook)>(.*?)</\1>", re.DOTALL)
+
+# Block headings: [Tag] lines, **Bold** lines, [[ ultrathink ]]
+BLOCK_HEADING_PATTERN = re.compile(r"^(?:\[\[\s*(\w+)\s*\]\]|\[([^\]]{2,60})\]|\*\*([^*]{2,60})\*\*)")
+
+# Hook tags / attachment types that carry injected context
+ATTACHMENT_HOOK_TYPES = ("hook_additional_context", "hook_success", "hook_system_message")
+
+
+# ---------------------------------------------------------------------------
+# Hook blocks
+# ---------------------------------------------------------------------------
+
+def _slug(text: str) -> str:
+    """Stable label for a heading (digits folded so "[75% WARNING]" == "[90% WARNING]")"""
+    text = re.sub(r"\d+", "n", text.lower())
+    return re.sub(r"[^a-z]+", "-", text).strip("-") or "unlabelled"
+
+
+def split_blocks(source: str, text: str) -> List[Dict]:
+    """
+    Split one hook's injected text into labelled blocks
+
+    A block starts at a heading line that opens a paragraph; text before
+    the first heading is labelled after the hook itself.
+
+    Args:
+        source: Hook name (e.g., "user-prompt-submit-hook", "UserPromptSubmit")
+        text: Injected context
+
+    Returns:
+        List of {"label", "source", "hash", "chars"}
+    """
+    blocks = []
+    label, lines = _slug(source), []
+    previous_blank = True
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            blocks.append({
+                "label": label,
+                "source": source,
+                "hash": hashlib.md5(body.encode("utf-8")).hexdigest()[:12],
+                "chars": len(body)
+            })
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        match = BLOCK_HEADING_PATTERN.match(stripped) if previous_blank else None
+        if match:
+            flush()
+            label, lines = _slug(next(g for g in match.groups() if g)), []
+        lines.append(line)
+        previous_blank = not stripped
+
+    flush()
+    return blocks
+
+
+def hook_blocks(record: Dict) -> List[Dict]:
+    """
+    Injected hook blocks carried by a record
+
+    Handles tagged hook output inside user/meta messages and hook
+    attachment records.
+    """
+    blocks = []
+
+    if record.get("type") == "attachment":
+        attachment = record.get("attachment") or {}
+        if attachment.get("type") in ATTACHMENT_HOOK_TYPES:
+            content = attachment.get("content")
+            if isinstance(content, list):
+                content = "\n".join(c for c in content if isinstance(c, str))
+            if isinstance(content, str):
+                source = attachment.get("hookEvent") or attachment.get("hookName") or "hook"
+                blocks.extend(split_blocks(source, content))
+        return blocks
+
+    if record.get("type") == "user":
+        for source, body in HOOK_TAG_PATTERN.findall(message_text(record)):
+            blocks.extend(split_blocks(source, body))
+
+    return blocks
+
+
+def _is_prompt(record: Dict) -> bool:
+    """A real user prompt (not meta, tool result or sidechain)"""
+    if record.get("type") != "user" or record.get("isMeta") or record.get("isSidechain"):
+        return False
+    content = (record.get("message") or {}).get("content")
+    if isinstance(content, list):
+        return any(isinstance(b, dict) and b.get("type") == "text" for b in content) and \
+            not any(isinstance(b, dict) and b.get("type") == "tool_result" for b in content)
+    return isinstance(content, str)
+
+
+def _wanted(line: bytes) -> bool:
+    """Cheap pre-filter: usage, hook output and prompts (not tool results)"""
+    return (
+        b'"usage"' in line
+        or b'-hook>' in line
+        or b'"attachment"' in line
+        or (b'"type":"user"' in line and b'"tool_use_id"' not in line)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def _ratio(read: int, total: int) -> Optional[float]:
+    """Hit ratio, None when nothing was sent"""
+    return read / total if total else None
+
+
+class CacheAnalyzer:
+    """Single-pass hit-ratio and hook-correlation accumulator."""
+
+    def __init__(self, threshold: float = DEFAULT_DROP_THRESHOLD, keep_turns: bool = False):
+        """
+        Initialize analyzer.
+
+        Args:
+            threshold: Hit-ratio drop (0-1) that counts as an invalidation
+            keep_turns: Keep per-turn rows for the report
+        """
+        self.threshold = threshold
+        self.keep_turns = keep_turns
+        self.sessions: Dict[str, Dict] = {}
+        self.blocks: Dict[str, Dict] = {}
+        self.turns: List[Dict] = []
+        self.totals = {
+            "turns": 0, "drops": 0, "expired": 0,
+            "scored_turns": 0, "scored_drops": 0, "plain_turns": 0, "plain_drops": 0
+        }
+
+    def _session(self, session_id: str) -> Dict:
+        """Get or create per-session state"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = {
+                "turns": 0, "drops": 0, "expired": 0, "requests": 0,
+                "input": 0, "cache_read": 0,
+                "sidechain_input": 0, "sidechain_cache_read": 0,
+                "current": None, "pending": [], "last_ratio": None, "last_ts": None,
+                "last_hash": {}
+            }
+        return session
+
+    def feed(self, record: Dict, deduper: UsageDeduper, fallback_session: str):
+        """Process one transcript record"""
+        session_id = record.get("sessionId") or fallback_session
+        session = self._session(session_id)
+
+        usage = usage_of(record)
+        if usage is not None:
+            usage = deduper.delta(usage)
+            if usage is None or not usage["first"]:
+                return
+            total = usage["input"] + usage["cache_read"] + usage["cache_write"] + usage["cache_write_1h"]
+
+            if record.get("isSidechain"):
+                session["sidechain_input"] += total
+                session["sidechain_cache_read"] += usage["cache_read"]
+                return
+
+            session["requests"] += 1
+            session["input"] += total
+            session["cache_read"] += usage["cache_read"]
+
+            turn = session["current"]
+            if turn is None:
+                turn = session["current"] = self._new_turn(session, session_id, record)
+            when = parse_timestamp(record.get("timestamp"))
+            if turn["requests"] == 0:
+                turn["first_read"], turn["first_total"] = usage["cache_read"], total
+                turn["first_ts"] = when
+            turn["requests"] += 1
+            turn["read"] += usage["cache_read"]
+            turn["total"] += total
+            turn["last_read"], turn["last_total"], turn["last_ts"] = usage["cache_read"], total, when
+            return
+
+        if record.get("isSidechain"):
+            return
+
+        blocks = hook_blocks(record)
+
+        if _is_prompt(record):
+            self._close_turn(session)
+            session["current"] = self._new_turn(session, session_id, record)
+            session["current"]["blocks"].extend(blocks)
+        elif blocks:
+            turn = session["current"]
+            # Hook output logged after the prompt but before the first request
+            if turn is not None and turn["requests"] == 0:
+                turn["blocks"].extend(blocks)
+            else:
+                session["pending"].extend(blocks)
+
+    def _new_turn(self, session: Dict, session_id: str, record: Dict) -> Dict:
+        """Start a turn, taking hook blocks injected ahead of it"""
+        turn = {
+            "session": session_id,
+            "timestamp": record.get("timestamp"),
+            "blocks": session["pending"],
+            "requests": 0, "read": 0, "total": 0,
+            "first_read": 0, "first_total": 0, "first_ts": None,
+            "last_read": 0, "last_total": 0, "last_ts": None
+        }
+        session["pending"] = []
+        return turn
+
+    def _close_turn(self, session: Dict):
+        """Score the session's current turn and attribute any drop"""
+        turn, session["current"] = session["current"], None
+        if turn is None or turn["requests"] == 0:
+            if turn is not None:
+                session["pending"] = turn["blocks"] + session["pending"]
+            return
+
+        ratio = _ratio(turn["first_read"], turn["first_total"])
+        previous = session["last_ratio"]
+        idle = None
+        if turn["first_ts"] and session["last_ts"]:
+            idle = (turn["first_ts"] - session["last_ts"]).total_seconds()
+
+        expired = idle is not None and idle > CACHE_TTL_SECONDS
+        drop = (
+            not expired and previous is not None and ratio is not None
+            and previous - ratio >= self.threshold
+        )
+        lost_tokens = int((previous - ratio) * turn["first_total"]) if drop else 0
+
+        session["turns"] += 1
+        session["drops"] += drop
+        session["expired"] += expired
+        self.totals["turns"] += 1
+        self.totals["drops"] += drop
+        self.totals["expired"] += expired
+
+        labels = {}
+        for block in turn["blocks"]:
+            labels.setdefault(block["label"], block)
+
+        scored = not expired and previous is not None
+        if scored:
+            self.totals["scored_turns"] += 1
+            self.totals["scored_drops"] += drop
+            if not labels:
+                self.totals["plain_turns"] += 1
+                self.totals["plain_drops"] += drop
+
+        for label, block in labels.items():
+            stats = self.blocks.setdefault(label, {
+                "label": label, "sources": set(), "turns": 0, "scored_turns": 0,
+                "drops": 0, "changed": 0, "changed_drops": 0, "lost_tokens": 0, "chars": 0
+            })
+            changed = session["last_hash"].get(label) not in (None, block["hash"])
+            session["last_hash"][label] = block["hash"]
+
+            stats["sources"].add(block["source"])
+            stats["turns"] += 1
+            stats["chars"] += block["chars"]
+            stats["changed"] += changed
+            if scored:
+                stats["scored_turns"] += 1
+                stats["drops"] += drop
+                stats["changed_drops"] += drop and changed
+                stats["lost_tokens"] += lost_tokens
+
+        if self.keep_turns:
+            self.turns.append({
+                "session": turn["session"],
+                "timestamp": turn["timestamp"],
+                "requests": turn["requests"],
+                "hit_ratio_first": ratio,
+                "hit_ratio_turn": _ratio(turn["read"], turn["total"]),
+                "previous_ratio": previous,
+                "idle_seconds": idle,
+                "drop": drop,
+                "expired": expired,
+                "blocks": sorted(labels)
+            })
+
+        session["last_ratio"] = _ratio(turn["last_read"], turn["last_total"])
+        session["last_ts"] = turn["last_ts"]
+
+    def analyze(self, paths: Optional[Iterable] = None) -> Dict:
+        """
+        Stream transcripts and build the report
+
+        Args:
+            paths: Transcript files/directories (default: current project)
+
+        Returns:
+            Report dict (overall, sessions, blocks, turns)
+        """
+        for path in find_transcripts(paths):
+            deduper = UsageDeduper()
+            for record in read_records(path, {}, _wanted):
+                self.feed(record, deduper, path.stem)
+
+        for session in self.sessions.values():
+            self._close_turn(session)
+
+        return self.report()
+
+    def report(self) -> Dict:
+        """Summarize sessions and blocks"""
+        totals = self.totals
+        baseline = totals["plain_drops"] / totals["plain_turns"] if totals["plain_turns"] else 0.0
+
+        blocks = []
+        for stats in self.blocks.values():
+            drop_rate = stats["drops"] / stats["scored_turns"] if stats["scored_turns"] else 0.0
+            without_turns = totals["scored_turns"] - stats["scored_turns"]
+            without_drops = totals["scored_drops"] - stats["drops"]
+            lift = ((stats["drops"] + 1) / (stats["scored_turns"] + 2)) / ((without_drops + 1) / (without_turns + 2))
+            blocks.append({
+                "label": stats["label"],
+                "sources": sorted(stats["sources"]),
+                "turns": stats["turns"],
+                "drops": stats["drops"],
+                "drop_rate": drop_rate,
+                "lift": lift,
+                "changed": stats["changed"],
+                "changed_drops": stats["changed_drops"],
+                "lost_tokens": stats["lost_tokens"],
+                "avg_chars": stats["chars"] // stats["turns"] if stats["turns"] else 0
+            })
+        blocks.sort(key=lambda b: (b["drops"], b["lift"]), reverse=True)
+
+        sessions = []
+        input_total = read_total = 0
+        for session_id, session in self.sessions.items():
+            if not session["requests"] and not session["sidechain_input"]:
+                continue
+            input_total += session["input"]
+            read_total += session["cache_read"]
+            sessions.append({
+                "session": session_id,
+                "turns": session["turns"],
+                "requests": session["requests"],
+                "hit_ratio": _ratio(session["cache_read"], session["input"]),
+                "sidechain_hit_ratio": _ratio(session["sidechain_cache_read"], session["sidechain_input"]),
+                "drops": session["drops"],
+                "expired": session["expired"]
+            })
+        sessions.sort(key=lambda s: s["hit_ratio"] if s["hit_ratio"] is not None else 1.0)
+
+        return {
+            "overall": {
+                "sessions": len(sessions),
+                "turns": totals["turns"],
+                "hit_ratio": _ratio(read_total, input_total),
+                "drops": totals["drops"],
+                "expired": totals["expired"],
+                "baseline_drop_rate": baseline,
+                "threshold": self.threshold
+            },
+            "sessions": sessions,
+            "blocks": blocks,
+            "turns": self.turns
+        }
+
+
+def _pct(value: Optional[float]) -> str:
+    """Format a ratio as a percentage"""
+    return "   -  " if value is None else f"{value * 100:5.1f}%"
+
+
+def print_report(report: Dict, top: int = DEFAULT_TOP):
+    """Print a human-readable report"""
+    overall = report["overall"]
+    print("=" * 78)
+    print("PROMPT CACHE ANALYSIS")
+    print("=" * 78)
+    print(f"  Sessions: {overall['sessions']}   Turns: {overall['turns']}   "
+          f"Hit ratio: {_pct(overall['hit_ratio']).strip()}")
+    print(f"  Drops (>= {overall['threshold'] * 100:.0f} pts): {overall['drops']}   "
+          f"Cache expired (idle > {CACHE_TTL_SECONDS}s): {overall['expired']}   "
+          f"Drop rate without hook blocks: {_pct(overall['baseline_drop_rate']).strip()}")
+
+    print("\n  Injected blocks most often on a cache drop:")
+    print(f"    {'block':32s} {'turns':>6} {'drops':>6} {'rate':>7} {'lift':>6} {'changed':>8} {'lost tok':>10}")
+    for block in report["blocks"][:top]:
+        lift = f"{block['lift']:.1f}x"
+        print(f"    {block['label'][:32]:32s} {block['turns']:>6} {block['drops']:>6} "
+              f"{_pct(block['drop_rate']):>7} {lift:>6} {block['changed']:>8} {block['lost_tokens']:>10,}")
+
+    print("\n  Sessions with the lowest hit ratio:")
+    print(f"    {'session':38s} {'turns':>6} {'main':>7} {'sidechain':>10} {'drops':>6}")
+    for session in report["sessions"][:top]:
+        print(f"    {session['session'][:38]:38s} {session['turns']:>6} {_pct(session['hit_ratio']):>7} "
+              f"{_pct(session['sidechain_hit_ratio']):>10} {session['drops']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlate prompt-cache hit ratio with injected hook context")
+    parser.add_argument("paths", nargs="*", help="Transcript files or directories (default: current project)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_DROP_THRESHOLD,
+                        help="Hit-ratio drop (0-1) that counts as an invalidation")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Rows per table")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--turns", action="store_true", help="Include per-turn rows (with --json)")
+    args = parser.parse_args()
+
+    try:
+        analyzer = CacheAnalyzer(threshold=args.threshold, keep_turns=args.turns)
+        report = analyzer.analyze(args.paths or None)
+    except Exception as e:
+        print(f"Error analyzing transcripts: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report, args.top)
+
+
+if __name__ == "__main__":
+    main()
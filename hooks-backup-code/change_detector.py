@@ -0,0 +1,131 @@
+"""
+Change Detector Module for Multi-Agent System
+Online change-point detection for per-agent latency and token usage
+
+A two-sided tabular CUSUM on log-values: durations and token counts are
+roughly log-normal, so a "2x slower" shift is the same size whatever the
+agent's typical duration. The first WARMUP_OBSERVATIONS values set the
+baseline mean/std (Welford); after that each update is O(1):
+
+    z      = (log(x) - mean) / std
+    S_up   = max(0, S_up + z - k)      -> alarm "increase" when > h
+    S_down = max(0, S_down - z - k)    -> alarm "decrease" when > h
+
+The baseline keeps absorbing values only while both sums stay below h/2,
+so a real shift cannot be averaged away. After an alarm the post-change
+segment becomes the new baseline. With the defaults a 2x shift alarms
+after ~6 invocations, 1.5x after ~15.
+
+State is a plain dict so agent_metrics can persist it per agent/model.
+"""
+
+import math
+from typing import Dict, Optional
+
+# Constants
+WARMUP_OBSERVATIONS = 20
+CUSUM_SLACK = 0.5           # k: half the shift (in std units) worth detecting
+CUSUM_THRESHOLD = 8.0       # h: ~1 false alarm per 5000 in-control updates
+MIN_LOG_STD = 0.1           # ignore sub-10% jitter on very stable agents
+MIN_VALUE = 1e-3            # floor for log() of zero durations/tokens
+
+
+def new_state() -> Dict:
+    """Initialize detector state"""
+    return {
+        "n": 0, "mean": 0.0, "m2": 0.0,
+        "up": 0.0, "up_n": 0, "up_sum": 0.0,
+        "down": 0.0, "down_n": 0, "down_sum": 0.0,
+        "alarms": 0
+    }
+
+
+class CusumDetector:
+    """Two-sided CUSUM over one metric stream (wraps a state dict in place)."""
+
+    def __init__(self, state: Dict, slack: float = CUSUM_SLACK, threshold: float = CUSUM_THRESHOLD):
+        """
+        Initialize detector.
+
+        Args:
+            state: Detector state from new_state(); updated in place
+            slack: Allowed drift per observation in std units (k)
+            threshold: Alarm threshold in std units (h)
+        """
+        self.s = state
+        self.slack = slack
+        self.threshold = threshold
+
+    def _std(self) -> float:
+        """Baseline std of log-values"""
+        s = self.s
+        variance = s["m2"] / (s["n"] - 1) if s["n"] > 1 else 0.0
+        return max(math.sqrt(variance), MIN_LOG_STD)
+
+    def _absorb(self, value: float):
+        """Welford update of the baseline"""
+        s = self.s
+        s["n"] += 1
+        delta = value - s["mean"]
+        s["mean"] += delta / s["n"]
+        s["m2"] += delta * (value - s["mean"])
+
+    def update(self, value: float) -> Optional[Dict]:
+        """
+        Add an observation
+
+        Args:
+            value: Raw metric (seconds, tokens)
+
+        Returns:
+            None, or an alarm {"direction", "baseline", "current", "ratio",
+            "observations"} with baseline/current as geometric means in the
+            metric's own units
+        """
+        s = self.s
+        x = math.log(max(value, MIN_VALUE))
+
+        if s["n"] < WARMUP_OBSERVATIONS:
+            self._absorb(x)
+            return None
+
+        z = (x - s["mean"]) / self._std()
+
+        s["up"] = max(0.0, s["up"] + z - self.slack)
+        s["down"] = max(0.0, s["down"] - z - self.slack)
+
+        # Track the mean of the segment that pushed each sum up from zero
+        for side in ("up", "down"):
+            if s[side] > 0:
+                s[f"{side}_n"] += 1
+                s[f"{side}_sum"] += x
+            else:
+                s[f"{side}_n"], s[f"{side}_sum"] = 0, 0.0
+
+        for side, direction in (("up", "increase"), ("down", "decrease")):
+            if s[side] > self.threshold:
+                return self._alarm(side, direction)
+
+        if max(s["up"], s["down"]) < self.threshold / 2:
+            self._absorb(x)
+        return None
+
+    def _alarm(self, side: str, direction: str) -> Dict:
+        """Build the alarm and re-baseline on the post-change segment"""
+        s = self.s
+        current = s[f"{side}_sum"] / s[f"{side}_n"]
+        alarm = {
+            "direction": direction,
+            "baseline": math.exp(s["mean"]),
+            "current": math.exp(current),
+            "ratio": math.exp(current - s["mean"]),
+            "observations": s[f"{side}_n"]
+        }
+
+        # New regime: keep the old spread, move the mean
+        variance = self._std() ** 2
+        n = s[f"{side}_n"]
+        alarms = s["alarms"] + 1
+        s.update(new_state())
+        s.update({"n": n, "mean": current, "m2": variance * max(n - 1, 0), "alarms": alarms})
+        return alarm
@@ -9,30 +9,64 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from metrics_stream import append_event
+from monitoring_snapshot import update_cost_snapshot
+
 # Constants
 STATE_DIR = Path(__file__).parent.parent / "state" / "monitoring"
 COST_TRACKING_FILE = STATE_DIR / "cost_tracking.json"
 
 # Model costs (per 1M tokens)
+# cache_read: prompt-cache hits, cache_write: 5-minute cache writes,
+# cache_write_1h: 1-hour cache writes
 MODEL_COSTS = {
+    "opus-4": {
+        "input": 15.0,
+        "output": 75.0,
+        "cache_read": 1.5,
+        "cache_write": 18.75,
+        "cache_write_1h": 30.0
+    },
     "sonnet-4.5": {
         "input": 3.0,
-        "output": 15.0
+        "output": 15.0,
+        "cache_read": 0.3,
+        "cache_write": 3.75,
+        "cache_write_1h": 6.0
     },
     "haiku-4.5": {
         "input": 0.8,
-        "output": 4.0
+        "output": 4.0,
+        "cache_read": 0.08,
+        "cache_write": 1.0,
+        "cache_write_1h": 1.6
     },
     "claude-sonnet-4": {  # Alias
         "input": 3.0,
-        "output": 15.0
+        "output": 15.0,
+        "cache_read": 0.3,
+        "cache_write": 3.75,
+        "cache_write_1h": 6.0
     },
     "claude-haiku-4": {  # Alias
         "input": 0.8,
-        "output": 4.0
+        "output": 4.0,
+        "cache_read": 0.08,
+        "cache_write": 1.0,
+        "cache_write_1h": 1.6
     }
 }
 
+# Cache rates relative to the input rate, for price tables without them
+CACHE_RATE_MULTIPLIERS = {
+    "cache_read": 0.1,
+    "cache_write": 1.25,
+    "cache_write_1h": 2.0
+}
+
+# Model families tracked in the aggregates (first match wins, else sonnet)
+MODEL_FAMILIES = ("opus", "sonnet", "haiku")
+
 # Agent category mapping
 AGENT_CATEGORIES = {
     "backend-development": [
@@ -80,8 +114,11 @@ def save_cost_tracking(data: Dict) -> bool:
     """Save cost tracking data to JSON file"""
     try:
         STATE_DIR.mkdir(parents=True, exist_ok=True)
-        with open(COST_TRACKING_FILE, 'w', encoding='utf-8') as f:
+        tmp_file = COST_TRACKING_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp_file, COST_TRACKING_FILE)
+        update_cost_snapshot(data)
         return True
     except Exception as e:
         print(f"Error saving cost tracking: {e}")
@@ -106,18 +143,7 @@ def _initialize_cost_tracking() -> Dict:
         },
         "daily": {},
         "monthly": {
-            current_month: {
-                "total_cost_usd": 0.0,
-                "sonnet_cost_usd": 0.0,
-                "haiku_cost_usd": 0.0,
-                "sonnet_tokens_input": 0,
-                "sonnet_tokens_output": 0,
-                "haiku_tokens_input": 0,
-                "haiku_tokens_output": 0,
-                "by_agent_category": {},
-                "by_agent": {},
-                "alerts": []
-            }
+            current_month: _empty_period(daily=False)
         },
         "statistics": {
             "total_invocations": 0,
@@ -128,33 +154,106 @@ def _initialize_cost_tracking() -> Dict:
     }
 
 
-def calculate_cost(model: str, tokens_input: int, tokens_output: int) -> float:
+def _empty_period(daily: bool) -> Dict:
+    """Initialize a daily or monthly aggregate"""
+    period = {
+        "total_cost_usd": 0.0,
+        "sonnet_cost_usd": 0.0,
+        "haiku_cost_usd": 0.0,
+        "sonnet_tokens_input": 0,
+        "sonnet_tokens_output": 0,
+        "haiku_tokens_input": 0,
+        "haiku_tokens_output": 0,
+        "by_agent_category": {},
+        "by_agent": {}
+    }
+    period["invocations" if daily else "alerts"] = []
+    return period
+
+
+def get_model_family(model: str) -> str:
+    """
+    Map a model name to its pricing family
+
+    Args:
+        model: Model name (e.g., "claude-sonnet-4-5-20250929", "haiku-4.5")
+
+    Returns:
+        "opus", "sonnet" or "haiku" (unknown models count as sonnet)
+    """
+    model_lower = (model or "").lower()
+    for family in MODEL_FAMILIES:
+        if family in model_lower:
+            return family
+    # Default to sonnet (conservative estimate)
+    return "sonnet"
+
+
+def get_model_costs(model: str, price_table: Optional[Dict] = None) -> Dict:
+    """
+    Resolve per-1M-token rates for a model
+
+    An exact key in price_table wins, then the first entry of the same
+    family, then MODEL_COSTS. Cache rates missing from older stored tables
+    are derived from the input rate.
+
+    Args:
+        model: Model name
+        price_table: Optional override (e.g., data["config"]["model_costs"])
+
+    Returns:
+        Dict with input, output, cache_read, cache_write, cache_write_1h
+    """
+    family = get_model_family(model)
+    costs = None
+
+    for table in (price_table or {}, MODEL_COSTS):
+        costs = table.get(model) or next(
+            (rates for name, rates in table.items() if family in name.lower()), None
+        )
+        if costs:
+            break
+
+    rates = dict(costs)
+    for field, multiplier in CACHE_RATE_MULTIPLIERS.items():
+        rates.setdefault(field, rates["input"] * multiplier)
+    return rates
+
+
+def calculate_cost(
+    model: str,
+    tokens_input: int,
+    tokens_output: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+    cache_write_1h_tokens: int = 0,
+    price_table: Optional[Dict] = None
+) -> float:
     """
     Calculate cost for a model invocation
 
     Args:
         model: Model name (e.g., "sonnet-4.5", "haiku-4.5")
-        tokens_input: Number of input tokens
+        tokens_input: Number of uncached input tokens
         tokens_output: Number of output tokens
+        cache_read_tokens: Input tokens served from the prompt cache
+        cache_write_tokens: Input tokens written to the 5-minute cache
+        cache_write_1h_tokens: Input tokens written to the 1-hour cache
+        price_table: Optional override for MODEL_COSTS
 
     Returns:
         Cost in USD
     """
-    # Normalize model name
-    model_lower = model.lower()
-    if "sonnet" in model_lower:
-        costs = MODEL_COSTS["sonnet-4.5"]
-    elif "haiku" in model_lower:
-        costs = MODEL_COSTS["haiku-4.5"]
-    else:
-        # Default to sonnet (conservative estimate)
-        costs = MODEL_COSTS["sonnet-4.5"]
+    costs = get_model_costs(model, price_table)
 
     # Calculate cost (per 1M tokens, so divide by 1M)
-    input_cost = (tokens_input / 1_000_000) * costs["input"]
-    output_cost = (tokens_output / 1_000_000) * costs["output"]
-
-    return input_cost + output_cost
+    return (
+        tokens_input * costs["input"]
+        + tokens_output * costs["output"]
+        + cache_read_tokens * costs["cache_read"]
+        + cache_write_tokens * costs["cache_write"]
+        + cache_write_1h_tokens * costs["cache_write_1h"]
+    ) / 1_000_000
 
 
 def get_agent_category(agent_name: str) -> str:
@@ -183,128 +282,84 @@ def get_agent_category(agent_name: str) -> str:
     return "other"
 
 
-def track_agent_invocation(
+def add_usage(
+    data: Dict,
+    when: datetime,
     agent_name: str,
     model: str,
+    cost: float,
     tokens_input: int,
     tokens_output: int,
-    duration_seconds: Optional[float] = None
-) -> Tuple[float, Dict]:
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+    invocations: int = 1
+) -> Tuple[Dict, Dict]:
     """
-    Track a single agent invocation
+    Add one priced usage record to the daily and monthly aggregates
 
     Args:
-        agent_name: Full agent name (e.g., "backend-development:backend-architect")
-        model: Model used (e.g., "sonnet-4.5")
-        tokens_input: Input tokens consumed
-        tokens_output: Output tokens generated
-        duration_seconds: Optional duration in seconds
+        data: Cost tracking data (modified in place)
+        when: Time the usage happened (selects the day and month)
+        agent_name: Agent the cost is attributed to
+        model: Model used
+        cost: Cost in USD
+        tokens_input: Uncached input tokens
+        tokens_output: Output tokens
+        cache_read_tokens: Input tokens served from the prompt cache
+        cache_write_tokens: Input tokens written to the prompt cache
+        invocations: Agent invocations this record accounts for (0 for
+                     follow-up requests of an already counted run)
 
     Returns:
-        Tuple of (cost_usd, updated_data)
+        Tuple of (daily, monthly) aggregates that were updated
     """
-    # Load current tracking data
-    data = load_cost_tracking()
-
-    # Calculate cost
-    cost = calculate_cost(model, tokens_input, tokens_output)
-
-    # Get current date and month
-    now = datetime.now()
-    current_date = now.strftime("%Y-%m-%d")
-    current_month = now.strftime("%Y-%m")
-
-    # Determine model category
-    model_category = "sonnet" if "sonnet" in model.lower() else "haiku"
+    model_category = get_model_family(model)
+    agent_category = get_agent_category(agent_name)
 
-    # Initialize month if not exists
-    if current_month not in data["monthly"]:
-        data["monthly"][current_month] = {
-            "total_cost_usd": 0.0,
-            "sonnet_cost_usd": 0.0,
-            "haiku_cost_usd": 0.0,
-            "sonnet_tokens_input": 0,
-            "sonnet_tokens_output": 0,
-            "haiku_tokens_input": 0,
-            "haiku_tokens_output": 0,
-            "by_agent_category": {},
-            "by_agent": {},
-            "alerts": []
-        }
+    monthly = data["monthly"].setdefault(when.strftime("%Y-%m"), _empty_period(daily=False))
+    daily = data["daily"].setdefault(when.strftime("%Y-%m-%d"), _empty_period(daily=True))
+
+    for period in (monthly, daily):
+        period["total_cost_usd"] += cost
+        period[f"{model_category}_cost_usd"] = period.get(f"{model_category}_cost_usd", 0.0) + cost
+        period[f"{model_category}_tokens_input"] = period.get(f"{model_category}_tokens_input", 0) + tokens_input
+        period[f"{model_category}_tokens_output"] = period.get(f"{model_category}_tokens_output", 0) + tokens_output
+        if cache_read_tokens or cache_write_tokens:
+            for field, tokens in (("cache_read", cache_read_tokens), ("cache_write", cache_write_tokens)):
+                key = f"{model_category}_tokens_{field}"
+                period[key] = period.get(key, 0) + tokens
+
+        period["by_agent_category"][agent_category] = period["by_agent_category"].get(agent_category, 0.0) + cost
+
+    # Monthly by agent keeps token detail, daily keeps cost only
+    agent = monthly["by_agent"].setdefault(agent_name, {
+        "cost_usd": 0.0,
+        "invocations": 0,
+        "tokens_input": 0,
+        "tokens_output": 0
+    })
+    agent["cost_usd"] += cost
+    agent["invocations"] += invocations
+    agent["tokens_input"] += tokens_input
+    agent["tokens_output"] += tokens_output
+    if cache_read_tokens or cache_write_tokens:
+        agent["tokens_cache_read"] = agent.get("tokens_cache_read", 0) + cache_read_tokens
+        agent["tokens_cache_write"] = agent.get("tokens_cache_write", 0) + cache_write_tokens
 
-    # Initialize day if not exists
-    if current_date not in data["daily"]:
-        data["daily"][current_date] = {
-            "total_cost_usd": 0.0,
-            "sonnet_cost_usd": 0.0,
-            "haiku_cost_usd": 0.0,
-            "sonnet_tokens_input": 0,
-            "sonnet_tokens_output": 0,
-            "haiku_tokens_input": 0,
-            "haiku_tokens_output": 0,
-            "by_agent_category": {},
-            "by_agent": {},
-            "invocations": []
-        }
+    daily["by_agent"][agent_name] = daily["by_agent"].get(agent_name, 0.0) + cost
 
-    # Get agent category
-    agent_category = get_agent_category(agent_name)
+    return daily, monthly
 
-    # Update monthly totals
-    monthly = data["monthly"][current_month]
-    monthly["total_cost_usd"] += cost
-    monthly[f"{model_category}_cost_usd"] += cost
-    monthly[f"{model_category}_tokens_input"] += tokens_input
-    monthly[f"{model_category}_tokens_output"] += tokens_output
-
-    # Update monthly by category
-    if agent_category not in monthly["by_agent_category"]:
-        monthly["by_agent_category"][agent_category] = 0.0
-    monthly["by_agent_category"][agent_category] += cost
-
-    # Update monthly by agent
-    if agent_name not in monthly["by_agent"]:
-        monthly["by_agent"][agent_name] = {
-            "cost_usd": 0.0,
-            "invocations": 0,
-            "tokens_input": 0,
-            "tokens_output": 0
-        }
-    monthly["by_agent"][agent_name]["cost_usd"] += cost
-    monthly["by_agent"][agent_name]["invocations"] += 1
-    monthly["by_agent"][agent_name]["tokens_input"] += tokens_input
-    monthly["by_agent"][agent_name]["tokens_output"] += tokens_output
-
-    # Update daily totals
-    daily = data["daily"][current_date]
-    daily["total_cost_usd"] += cost
-    daily[f"{model_category}_cost_usd"] += cost
-    daily[f"{model_category}_tokens_input"] += tokens_input
-    daily[f"{model_category}_tokens_output"] += tokens_output
-
-    # Update daily by category
-    if agent_category not in daily["by_agent_category"]:
-        daily["by_agent_category"][agent_category] = 0.0
-    daily["by_agent_category"][agent_category] += cost
-
-    # Update daily by agent
-    if agent_name not in daily["by_agent"]:
-        daily["by_agent"][agent_name] = 0.0
-    daily["by_agent"][agent_name] += cost
 
-    # Add invocation record
-    daily["invocations"].append({
-        "timestamp": now.isoformat(),
-        "agent": agent_name,
-        "model": model,
-        "tokens_input": tokens_input,
-        "tokens_output": tokens_output,
-        "cost_usd": cost,
-        "duration_seconds": duration_seconds
-    })
+def update_statistics(data: Dict, new_invocations: int = 0):
+    """
+    Refresh lifetime statistics after adding usage
 
-    # Update statistics
-    data["statistics"]["total_invocations"] += 1
+    Args:
+        data: Cost tracking data (modified in place)
+        new_invocations: Invocations added since the last refresh
+    """
+    data["statistics"]["total_invocations"] += new_invocations
     total_invocations = data["statistics"]["total_invocations"]
     total_cost = sum(m["total_cost_usd"] for m in data["monthly"].values())
     data["statistics"]["avg_cost_per_invocation"] = total_cost / total_invocations if total_invocations > 0 else 0.0
@@ -318,7 +373,17 @@ def track_agent_invocation(
         data["statistics"]["sonnet_usage_pct"] = (total_sonnet / total_model_cost) * 100
         data["statistics"]["haiku_usage_pct"] = (total_haiku / total_model_cost) * 100
 
-    # Check for budget alerts
+
+def check_budget_alerts(data: Dict, month: str, now: Optional[datetime] = None):
+    """
+    Record a budget alert for a month once its spend crosses the threshold
+
+    Args:
+        data: Cost tracking data (modified in place)
+        month: Month key (YYYY-MM)
+        now: Alert timestamp (defaults to now)
+    """
+    monthly = data["monthly"][month]
     budget = data["config"]["monthly_budget_usd"]
     alert_threshold = data["config"]["alert_threshold_pct"]
     current_spend = monthly["total_cost_usd"]
@@ -326,7 +391,7 @@ def track_agent_invocation(
 
     if spend_pct >= alert_threshold:
         alert = {
-            "timestamp": now.isoformat(),
+            "timestamp": (now or datetime.now()).isoformat(),
             "type": "budget_warning" if spend_pct < 100 else "budget_exceeded",
             "message": f"Monthly spend at {spend_pct:.1f}% of budget (${current_spend:.2f} / ${budget:.2f})",
             "severity": "warning" if spend_pct < 100 else "critical"
@@ -337,15 +402,95 @@ def track_agent_invocation(
         if not existing_alerts:
             monthly["alerts"].append(alert)
 
+
+def track_agent_invocation(
+    agent_name: str,
+    model: str,
+    tokens_input: int,
+    tokens_output: int,
+    duration_seconds: Optional[float] = None,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0
+) -> Tuple[float, Dict]:
+    """
+    Track a single agent invocation
+
+    Args:
+        agent_name: Full agent name (e.g., "backend-development:backend-architect")
+        model: Model used (e.g., "sonnet-4.5")
+        tokens_input: Input tokens consumed
+        tokens_output: Output tokens generated
+        duration_seconds: Optional duration in seconds
+        cache_read_tokens: Input tokens served from the prompt cache
+        cache_write_tokens: Input tokens written to the prompt cache
+
+    Returns:
+        Tuple of (cost_usd, updated_data)
+    """
+    # Load current tracking data
+    data = load_cost_tracking()
+
+    # Calculate cost
+    cost = calculate_cost(
+        model, tokens_input, tokens_output,
+        cache_read_tokens=cache_read_tokens,
+        cache_write_tokens=cache_write_tokens,
+        price_table=data["config"].get("model_costs")
+    )
+
+    now = datetime.now()
+
+    daily, monthly = add_usage(
+        data, now, agent_name, model, cost, tokens_input, tokens_output,
+        cache_read_tokens=cache_read_tokens,
+        cache_write_tokens=cache_write_tokens
+    )
+
+    # Add invocation record
+    daily["invocations"].append({
+        "timestamp": now.isoformat(),
+        "agent": agent_name,
+        "model": model,
+        "tokens_input": tokens_input,
+        "tokens_output": tokens_output,
+        "cost_usd": cost,
+        "duration_seconds": duration_seconds
+    })
+
+    update_statistics(data, new_invocations=1)
+    check_budget_alerts(data, now.strftime("%Y-%m"), now)
+
     # Update metadata
     data["metadata"]["last_updated"] = now.isoformat()
 
     # Save updated data
     save_cost_tracking(data)
 
+    publish_cost(agent_name, model, tokens_input + cache_read_tokens + cache_write_tokens, tokens_output, cost)
+
     return cost, data
 
 
+def publish_cost(agent_name: str, model: str, tokens_input: int, tokens_output: int, cost: float):
+    """
+    Emit a "cost" event to the metrics stream
+
+    Every writer of recorded spend (track_agent_invocation, transcript
+    backfill) publishes through here, so the live consumers (dashboard
+    --watch, metrics exporter) fold the same totals. tokens_input counts
+    cache reads and writes too, as agent_metrics runs do.
+    """
+    append_event(
+        "cost",
+        agent=agent_name,
+        category=get_agent_category(agent_name),
+        model=model,
+        tokens_input=tokens_input,
+        tokens_output=tokens_output,
+        cost_usd=cost
+    )
+
+
 def get_current_month_summary() -> Dict:
     """Get summary of current month's costs"""
     data = load_cost_tracking()
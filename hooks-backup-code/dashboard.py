@@ -5,7 +5,11 @@ Display cost, performance, and optimization insights
 """
 
 import json
+import math
+import os
 import sys
+import time
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List
@@ -21,8 +25,11 @@ try:
         load_agent_metrics,
         get_agent_performance_summary,
         get_category_summary,
+        get_change_alerts,
         get_performance_recommendations
     )
+    from monitoring_snapshot import SNAPSHOT_FILE, get_quick_stats
+    from metrics_stream import StreamTail, RollingCounter
     MONITORING_AVAILABLE = True
 except ImportError:
     MONITORING_AVAILABLE = False
@@ -171,6 +178,20 @@ def display_agent_performance():
             print(f"    - {agent_name}")
             print(f"      Success Rate: {format_percentage(success_rate * 100)} (target: >85%)")
 
+    # Latency / token distribution shifts (CUSUM change points)
+    change_alerts = get_change_alerts(data=metrics)
+    if change_alerts:
+        print(f"\n  Distribution Shifts (last 7 days):")
+        for alert in change_alerts[:5]:
+            if alert["metric"] == "duration_seconds":
+                label = "[SLOWER]" if alert["direction"] == "increase" else "[FASTER]"
+                values = f"{alert['baseline']:.0f}s -> {alert['current']:.0f}s"
+            else:
+                label = "[MORE TOKENS]" if alert["direction"] == "increase" else "[FEWER TOKENS]"
+                values = f"{alert['baseline']:,.0f} -> {alert['current']:,.0f}"
+            print(f"    {label:14s} {alert['agent'][:30]:30s} {alert['model']:12s} "
+                  f"{alert['ratio']:.1f}x  ({values}, since {alert['timestamp'][:10]})")
+
     # Category performance
     print(f"\n  Performance by Category:")
     for category in ["backend-development", "quality-testing", "compounding-engineering"]:
@@ -258,28 +279,251 @@ def display_recommendations():
 
 
 def display_quick_stats():
-    """Display quick stats summary (for session-start hook)"""
-    summary = get_current_month_summary()
-    metrics = load_agent_metrics()
+    """Display quick stats summary (for session-start hook, reads only the snapshot)"""
+    stats = get_quick_stats()
 
     print(f"\n+{'-' * 66}+")
     print(f"| Multi-Agent System - Quick Stats                                |")
     print(f"+{'-' * 66}+")
-    print(f"| Budget: {format_currency(summary['total_cost_usd']):>10} / {format_currency(summary['budget_usd']):>10} ({format_percentage(summary['spend_pct']):>6}) |")
-    print(f"| Agents: {metrics['summary']['total_agents']:>3} active  |  Invocations: {metrics['summary']['total_invocations']:>5}       |")
-    print(f"| Success Rate: {format_percentage(metrics['summary']['avg_success_rate'] * 100):>6}                                   |")
+    print(f"| Budget: {format_currency(stats['total_cost_usd']):>10} / {format_currency(stats['budget_usd']):>10} ({format_percentage(stats['spend_pct']):>6}) |")
+    print(f"| Agents: {stats['total_agents']:>3} active  |  Invocations: {stats['total_invocations']:>5}       |")
+    print(f"| Success Rate: {format_percentage(stats['avg_success_rate'] * 100):>6}                                   |")
     print(f"+{'-' * 66}+")
 
     # Show critical alerts
-    if summary["spend_pct"] >= 80:
-        print(f"  [WARNING] Budget Alert: Approaching monthly limit ({format_percentage(summary['spend_pct'])})")
-
-    if summary.get("alerts"):
-        for alert in summary["alerts"]:
-            if alert["severity"] == "critical":
-                print(f"  [CRITICAL] {alert['message']}")
-            elif alert["severity"] == "warning":
-                print(f"  [WARNING] {alert['message']}")
+    if stats["spend_pct"] >= 80:
+        print(f"  [WARNING] Budget Alert: Approaching monthly limit ({format_percentage(stats['spend_pct'])})")
+
+    for alert in stats["alerts"]:
+        if alert["severity"] == "critical":
+            print(f"  [CRITICAL] {alert['message']}")
+        elif alert["severity"] == "warning":
+            print(f"  [WARNING] {alert['message']}")
+
+
+# Live watch mode
+WATCH_DEFAULT_FPS = 2.0
+WATCH_AGENT_ROWS = 8
+WATCH_ALERT_ROWS = 5
+IN_FLIGHT_TIMEOUT_SECONDS = 1800  # Forget starts that never reported an end
+
+
+class LiveDashboard:
+    """Terminal dashboard that follows the metrics stream.
+
+    State is fixed-size: per-second rolling buckets for rates, one row per
+    agent seen, and bounded alert/in-flight queues, so CPU and memory stay
+    flat however long it runs. Only panels whose text changed are redrawn.
+    """
+
+    # Panel layout: name -> (first screen row, height)
+    PANELS = {
+        "header": (1, 3),
+        "budget": (4, 3),
+        "rates": (7, 4),
+        "agents": (11, WATCH_AGENT_ROWS + 2),
+        "alerts": (13 + WATCH_AGENT_ROWS, WATCH_ALERT_ROWS + 1),
+    }
+
+    def __init__(self, fps: float = WATCH_DEFAULT_FPS):
+        self.frame_interval = 1.0 / max(fps, 0.1)
+        self.tail = StreamTail()
+        self.started = time.time()
+
+        self.invocations_per_min = RollingCounter(60)
+        self.spend_per_min = RollingCounter(60)
+        self.agents = {}
+        self.in_flight = {}
+        self.alerts = deque(maxlen=WATCH_ALERT_ROWS)
+
+        self.quick_stats = None
+        self._snapshot_mtime = None
+        self._drawn = {}
+
+    def _refresh_snapshot(self):
+        """Re-read the budget snapshot only when a writer has touched it"""
+        try:
+            mtime = os.stat(SNAPSHOT_FILE).st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if self.quick_stats is None or mtime != self._snapshot_mtime:
+            self._snapshot_mtime = mtime
+            self.quick_stats = get_quick_stats()
+
+    def apply_event(self, event: Dict):
+        """Fold one stream event into the live state"""
+        event_type = event.get("type")
+        agent_name = event.get("agent", "unknown")
+        ts = event.get("ts", time.time())
+
+        if event_type == "agent_start":
+            self.in_flight.setdefault(agent_name, deque(maxlen=32)).append(ts)
+
+        elif event_type == "agent_end":
+            starts = self.in_flight.get(agent_name)
+            if starts:
+                starts.popleft()
+                if not starts:
+                    del self.in_flight[agent_name]
+
+        elif event_type == "cost":
+            # Recorded spend from cost_tracker.publish_cost (the Task hook's
+            # backfill) - the same events behind the exporter's cost counters
+            self.spend_per_min.add(event.get("cost_usd", 0.0), ts)
+            row = self._agent_row(agent_name)
+            row["cost_usd"] += event.get("cost_usd", 0.0)
+
+        elif event_type == "invocation":
+            self.invocations_per_min.add(1, ts)
+            row = self._agent_row(agent_name)
+            row["invocations"] += 1
+            row["successes"] += 1 if event.get("success") else 0
+            row["total_duration"] += event.get("duration_seconds") or 0.0
+
+            if not event.get("success"):
+                when = datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+                self.alerts.append(f"[FAILED] {when} {agent_name}")
+
+    def _agent_row(self, agent_name: str) -> Dict:
+        """Get (or create) the per-agent table row"""
+        if agent_name not in self.agents:
+            self.agents[agent_name] = {
+                "invocations": 0,
+                "successes": 0,
+                "total_duration": 0.0,
+                "cost_usd": 0.0
+            }
+        return self.agents[agent_name]
+
+    def _expire_in_flight(self, now: float):
+        """Drop starts that never reported an end (crashed or killed runs)"""
+        for agent_name in list(self.in_flight):
+            starts = self.in_flight[agent_name]
+            while starts and now - starts[0] > IN_FLIGHT_TIMEOUT_SECONDS:
+                starts.popleft()
+            if not starts:
+                del self.in_flight[agent_name]
+
+    def render_panels(self, now: float) -> Dict[str, List[str]]:
+        """Build the text for every panel"""
+        stats = self.quick_stats
+        panels = {}
+
+        panels["header"] = [
+            f"+{'=' * 66}+",
+            f"| {'MULTI-AGENT LIVE DASHBOARD  ' + datetime.fromtimestamp(now).strftime('%H:%M:%S'):^64} |",
+            f"+{'=' * 66}+",
+        ]
+
+        budget_bar = draw_bar(stats["total_cost_usd"], stats["budget_usd"], 40)
+        panels["budget"] = [
+            f"  Budget ({stats['month']}): {format_currency(stats['total_cost_usd'])} / "
+            f"{format_currency(stats['budget_usd'])} ({format_percentage(stats['spend_pct'])})",
+            f"    [{budget_bar}]",
+            "",
+        ]
+
+        in_flight_names = ", ".join(
+            f"{name} x{len(starts)}" if len(starts) > 1 else name
+            for name, starts in sorted(self.in_flight.items())
+        )
+        in_flight_count = sum(len(starts) for starts in self.in_flight.values())
+        panels["rates"] = [
+            f"  Invocations/min: {self.invocations_per_min.total(now):>6.0f}",
+            f"  Spend/min:       {format_currency(self.spend_per_min.total(now)):>6}",
+            f"  In flight:       {in_flight_count:>6}  {in_flight_names[:40]}",
+            "",
+        ]
+
+        since = datetime.fromtimestamp(self.started).strftime("%H:%M:%S")
+        rows = sorted(self.agents.items(), key=lambda x: x[1]["invocations"], reverse=True)
+        table = [
+            f"  {'Agent (since ' + since + ')':40s} {'Uses':>5} {'Success':>8} {'Avg s':>7} {'Cost':>8}",
+            f"  {'-' * 62}",
+        ]
+        for agent_name, row in rows[:WATCH_AGENT_ROWS]:
+            uses = row["invocations"]
+            success = format_percentage(row["successes"] / uses * 100) if uses else "-"
+            avg_duration = f"{row['total_duration'] / uses:.1f}" if uses else "-"
+            table.append(
+                f"  {agent_name[:40]:40s} {uses:>5} {success:>8} {avg_duration:>7} {format_currency(row['cost_usd']):>8}"
+            )
+        panels["agents"] = table
+
+        alert_lines = [f"  [{a['severity'].upper()}] {a['message']}" for a in stats["alerts"]]
+        alert_lines.extend(f"  {message}" for message in self.alerts)
+        panels["alerts"] = ["  Alerts:"] + (alert_lines[-WATCH_ALERT_ROWS:] or ["  [OK] None"])
+
+        return panels
+
+    def draw(self, panels: Dict[str, List[str]], out=sys.stdout) -> int:
+        """Redraw only panels whose content changed; returns panels drawn"""
+        drawn = 0
+
+        for name, lines in panels.items():
+            if self._drawn.get(name) == lines:
+                continue
+
+            row, height = self.PANELS[name]
+            padded = (lines + [""] * height)[:height]
+            for offset, line in enumerate(padded):
+                out.write(f"\033[{row + offset};1H{line}\033[K")
+
+            self._drawn[name] = lines
+            drawn += 1
+
+        if drawn:
+            out.flush()
+        return drawn
+
+    def tick(self, now: float = None) -> Dict[str, List[str]]:
+        """Advance one frame: consume new events and rebuild panels"""
+        now = now if now is not None else time.time()
+
+        for event in self.tail.read_new():
+            self.apply_event(event)
+
+        self._expire_in_flight(now)
+        self._refresh_snapshot()
+        return self.render_panels(now)
+
+    def run(self):
+        """Run until interrupted"""
+        sys.stdout.write("\033[2J\033[?25l")  # clear screen, hide cursor
+        try:
+            while True:
+                frame_start = time.time()
+                self.draw(self.tick(frame_start))
+                time.sleep(max(0.0, self.frame_interval - (time.time() - frame_start)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bottom = max(row + height for row, height in self.PANELS.values())
+            sys.stdout.write(f"\033[{bottom};1H\033[?25h\n")
+            sys.stdout.flush()
+
+
+def display_watch(fps: float = WATCH_DEFAULT_FPS):
+    """Live-updating dashboard driven by the metrics stream"""
+    LiveDashboard(fps).run()
+
+
+def parse_fps(argv: list) -> float:
+    """--fps value from the command line, WATCH_DEFAULT_FPS if absent or invalid"""
+    if "--fps" not in argv:
+        return WATCH_DEFAULT_FPS
+    index = argv.index("--fps") + 1
+    value = argv[index] if index < len(argv) else None
+    try:
+        fps = float(value)
+    except (TypeError, ValueError):
+        fps = None
+    if fps is None or not math.isfinite(fps) or fps <= 0:
+        print(f"[WARNING] --fps needs a positive number (got {value!r}), using {WATCH_DEFAULT_FPS}")
+        time.sleep(1)  # keep the warning readable before the watch screen clears
+        return WATCH_DEFAULT_FPS
+    return fps
 
 
 def main():
@@ -304,6 +548,9 @@ def main():
         elif command == "--recommendations":
             display_recommendations()
             return
+        elif command == "--watch":
+            display_watch(parse_fps(sys.argv))
+            return
 
     # Full dashboard
     print("\n" + "=" * 68)
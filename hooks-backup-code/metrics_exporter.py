@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Metrics Exporter - Prometheus/OpenMetrics endpoint for agent cost and performance
+
+Serves counters and a duration histogram labeled by agent, category and model:
+- vextrus_agent_invocations_total
+- vextrus_agent_failures_total
+- vextrus_agent_tokens_input_total / vextrus_agent_tokens_output_total
+- vextrus_agent_cost_usd_total
+- vextrus_agent_duration_seconds (histogram)
+
+Token and cost counters fold "cost" events (recorded spend, published by
+cost_tracker - including the Task hook's transcript backfill); invocation,
+failure and duration series fold agent_metrics' "invocation" events.
+
+Collectors are incremental: each scrape folds in only the metrics stream
+events appended since the previous scrape, then renders the in-memory
+series. Scrape cost is O(new events + series), never a reload of
+cost_tracking.json / agent_metrics.json.
+
+Usage:
+    python metrics_exporter.py [--port 9464] [--host 0.0.0.0]
+"""
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from cost_tracker import get_agent_category
+from metrics_stream import StreamTail
+
+# Constants
+DEFAULT_PORT = 9464
+METRIC_PREFIX = "vextrus_agent"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Duration buckets (seconds) - subagent runs range from seconds to many minutes
+DURATION_BUCKETS = (5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0, 600.0)
+
+INF_LABEL = 'le="+Inf"'
+
+LabelKey = Tuple[str, str, str]  # (agent, category, model)
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value per the OpenMetrics text format"""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    """Render {agent="...",category="...",model="..."} with optional extra pair"""
+    agent, category, model = key
+    labels = (
+        f'agent="{_escape_label(agent)}",'
+        f'category="{_escape_label(category)}",'
+        f'model="{_escape_label(model)}"'
+    )
+    if extra:
+        labels += f",{extra}"
+    return "{" + labels + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value (integers without a trailing .0)"""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-on-render histogram with fixed buckets."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(DURATION_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class AgentMetricsCollector:
+    """Incremental in-memory collector fed from the metrics stream."""
+
+    def __init__(self, tail: StreamTail = None):
+        """
+        Initialize collector.
+
+        Args:
+            tail: Stream reader (defaults to replaying the current stream file)
+        """
+        self.tail = tail or StreamTail(from_start=True)
+        self.lock = threading.Lock()
+
+        self.invocations: Dict[LabelKey, int] = {}
+        self.failures: Dict[LabelKey, int] = {}
+        self.tokens_input: Dict[LabelKey, int] = {}
+        self.tokens_output: Dict[LabelKey, int] = {}
+        self.cost_usd: Dict[LabelKey, float] = {}
+        self.duration: Dict[LabelKey, Histogram] = {}
+
+    def _key(self, event: Dict) -> LabelKey:
+        agent_name = event.get("agent", "unknown")
+        category = event.get("category") or get_agent_category(agent_name)
+        return (agent_name, category, event.get("model") or "unknown")
+
+    def apply_event(self, event: Dict):
+        """Fold one stream event into the counters"""
+        event_type = event.get("type")
+
+        if event_type == "cost":
+            key = self._key(event)
+            self.tokens_input[key] = self.tokens_input.get(key, 0) + event.get("tokens_input", 0)
+            self.tokens_output[key] = self.tokens_output.get(key, 0) + event.get("tokens_output", 0)
+            self.cost_usd[key] = self.cost_usd.get(key, 0.0) + event.get("cost_usd", 0.0)
+
+        elif event_type == "invocation":
+            key = self._key(event)
+            self.invocations[key] = self.invocations.get(key, 0) + 1
+            if not event.get("success", True):
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+            duration = event.get("duration_seconds")
+            if duration is not None:
+                if key not in self.duration:
+                    self.duration[key] = Histogram()
+                self.duration[key].observe(duration)
+
+    def collect(self) -> str:
+        """Ingest new events and render the OpenMetrics exposition"""
+        with self.lock:
+            for event in self.tail.read_new():
+                self.apply_event(event)
+            return self.render()
+
+    def render(self) -> str:
+        """Render current series in OpenMetrics text format"""
+        lines: List[str] = []
+
+        counters = [
+            ("invocations", "Agent invocations", self.invocations),
+            ("failures", "Failed agent invocations", self.failures),
+            ("tokens_input", "Input tokens consumed", self.tokens_input),
+            ("tokens_output", "Output tokens generated", self.tokens_output),
+            ("cost_usd", "Agent cost in US dollars", self.cost_usd),
+        ]
+
+        for name, help_text, series in counters:
+            family = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {family} counter")
+            lines.append(f"# HELP {family} {help_text}.")
+            for key in sorted(series):
+                lines.append(f"{family}_total{_format_labels(key)} {_format_value(series[key])}")
+
+        family = f"{METRIC_PREFIX}_duration_seconds"
+        lines.append(f"# TYPE {family} histogram")
+        lines.append(f"# UNIT {family} seconds")
+        lines.append(f"# HELP {family} Agent invocation duration.")
+        for key in sorted(self.duration):
+            hist = self.duration[key]
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, hist.counts):
+                cumulative += count
+                le_label = f'le="{bound}"'
+                lines.append(f"{family}_bucket{_format_labels(key, le_label)} {cumulative}")
+            lines.append(f"{family}_bucket{_format_labels(key, INF_LABEL)} {hist.count}")
+            lines.append(f"{family}_count{_format_labels(key)} {hist.count}")
+            lines.append(f"{family}_sum{_format_labels(key)} {_format_value(hist.total)}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def make_handler(collector: AgentMetricsCollector):
+    """Build a request handler bound to the collector"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body = collector.collect().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every 15s would flood the console
+
+    return MetricsHandler
+
+
+def serve(host: str = "0.0.0.0", port: int = DEFAULT_PORT):
+    """Serve /metrics until interrupted"""
+    collector = AgentMetricsCollector()
+    server = ThreadingHTTPServer((host, port), make_handler(collector))
+
+    print(f"Agent metrics exporter listening on http://{host}:{port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Agent metrics Prometheus/OpenMetrics exporter')
+    parser.add_argument('--host', default='0.0.0.0', help='Bind address')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Listen port')
+    parser.add_argument('--once', action='store_true', help='Print current exposition and exit')
+
+    args = parser.parse_args()
+
+    if args.once:
+        print(AgentMetricsCollector().collect(), end="")
+        return
+
+    serve(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Metrics Stream Module for Multi-Agent System
+Append-only event log of agent activity for live consumers
+
+Writers append one JSON line per event; readers (dashboard --watch) tail
+the file from their last offset instead of re-parsing the full
+cost_tracking.json / agent_metrics.json files.
+
+Event types:
+- agent_start: Task tool about to run a subagent (PreToolUse)
+- agent_end:   Task tool returned (PostToolUse)
+- cost:        cost_tracker recorded an invocation
+- invocation:  agent_metrics recorded an invocation
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Constants
+STATE_DIR = Path(__file__).parent.parent / "state" / "monitoring"
+STREAM_FILE = STATE_DIR / "metrics_stream.jsonl"
+
+# Rotate once the stream grows past this size (keeps one previous segment)
+MAX_STREAM_BYTES = 5 * 1024 * 1024
+
+
+def append_event(event_type: str, **fields) -> bool:
+    """
+    Append a single event to the metrics stream
+
+    Args:
+        event_type: One of agent_start, agent_end, cost, invocation
+        **fields: Event payload (agent, model, cost_usd, ...)
+
+    Returns:
+        True if the event was written
+    """
+    event = {"type": event_type, "ts": time.time()}
+    event.update(fields)
+
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        _rotate_if_needed()
+        with open(STREAM_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + "\n")
+        return True
+    except Exception as e:
+        print(f"Error appending metrics event: {e}")
+        return False
+
+
+def _rotate_if_needed():
+    """Move an oversized stream aside so the live file stays small"""
+    try:
+        if STREAM_FILE.stat().st_size > MAX_STREAM_BYTES:
+            os.replace(STREAM_FILE, STREAM_FILE.with_suffix(".jsonl.1"))
+    except FileNotFoundError:
+        pass
+
+
+class StreamTail:
+    """Incrementally read new events from the metrics stream."""
+
+    def __init__(self, from_start: bool = False, path: Path = STREAM_FILE):
+        """
+        Initialize stream tail.
+
+        Args:
+            from_start: Replay existing events instead of starting at the end
+            path: Stream file to follow
+        """
+        self.path = path
+        self.offset = 0
+        self._partial = ""
+
+        if not from_start:
+            try:
+                self.offset = self.path.stat().st_size
+            except FileNotFoundError:
+                self.offset = 0
+
+    def read_new(self, max_bytes: int = 1024 * 1024) -> List[Dict]:
+        """
+        Return events appended since the last call.
+
+        Reads at most max_bytes per call so one frame never stalls on a
+        burst of writes; the remainder is picked up on the next call.
+        """
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return []
+
+        # Stream was rotated or truncated - start over on the new file
+        if size < self.offset:
+            self.offset = 0
+            self._partial = ""
+
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            f.seek(self.offset)
+            chunk = f.read(max_bytes)
+            self.offset = f.tell()
+
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()  # incomplete trailing line (if any)
+
+        events = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+        return events
+
+
+class RollingCounter:
+    """Fixed-memory per-second buckets summed over a sliding window."""
+
+    def __init__(self, window_seconds: int = 60):
+        self.window = window_seconds
+        self.buckets = [0.0] * window_seconds
+        self.stamps = [0] * window_seconds
+
+    def add(self, value: float = 1.0, ts: float = None):
+        """Add a value at timestamp ts (defaults to now)"""
+        second = int(ts if ts is not None else time.time())
+        idx = second % self.window
+
+        if self.stamps[idx] != second:
+            self.stamps[idx] = second
+            self.buckets[idx] = 0.0
+
+        self.buckets[idx] += value
+
+    def total(self, now: float = None) -> float:
+        """Sum of values within the window ending at now"""
+        current = int(now if now is not None else time.time())
+        oldest = current - self.window
+
+        return sum(
+            value for value, stamp in zip(self.buckets, self.stamps)
+            if stamp > oldest
+        )
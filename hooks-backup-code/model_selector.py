@@ -8,6 +8,10 @@ Model Selection Strategy:
 - Complexity 31-60: Haiku with Sonnet review (20% of tasks)
 - Complexity 61-100: Sonnet 4.5 only (10% of tasks)
 
+Budget Admission:
+- Spend >= alert threshold or projected burn > budget: degrade one tier
+- Daily or monthly budget exhausted: degrade two tiers (Haiku only)
+
 Cost Comparison (per 1M tokens):
 - Haiku: $0.80 input / $4.00 output
 - Sonnet: $3.00 input / $15.00 output
@@ -18,16 +22,71 @@ Expected Savings:
 - Optimized: 20% Sonnet, 80% Haiku = $250-300/month (40-50% reduction)
 """
 
+import calendar
 import json
+import os
+import re
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 from complexity_scorer import calculate_task_complexity, get_complexity_from_git
 
+# Precomputed per-agent latency stats (optional - latency-aware routing)
+try:
+    from agent_metrics import ROUTING_STATS_FILE, load_routing_stats
+    ROUTING_STATS_AVAILABLE = True
+except ImportError:
+    ROUTING_STATS_AVAILABLE = False
+
+# Live spend counters (optional - budget-aware admission control)
+try:
+    from monitoring_snapshot import get_live_spend
+    LIVE_SPEND_AVAILABLE = True
+except ImportError:
+    LIVE_SPEND_AVAILABLE = False
+
+# Budget pressure degrades routing one tier per level
+DEGRADATION_ORDER = ['sonnet-4.5', 'haiku-with-sonnet-review', 'haiku-4.5']
+BURN_RATE_MIN_ELAPSED = 0.1  # Fraction of day/month before projecting burn
+
+# Concrete models considered by latency routing, cheapest first
+ROUTABLE_MODELS = ['haiku-4.5', 'sonnet-4.5']
+
+LATENCY_TARGET_PATTERN = re.compile(
+    r'p(\d{2})\s*(?:<=?|under|below)\s*(\d+(?:\.\d+)?)\s*(s|sec|secs|seconds|m|min|mins|minutes)?$',
+    re.IGNORECASE
+)
+
+
+def parse_latency_target(target: str) -> Tuple[int, float]:
+    """
+    Parse a latency target such as "p95<60s" or "p95 under 2m".
+
+    Returns:
+        (percentile, seconds)
+
+    Raises:
+        ValueError: If the target cannot be parsed
+    """
+    match = LATENCY_TARGET_PATTERN.match(target.strip())
+    if not match:
+        raise ValueError(f"Invalid latency target: {target!r} (expected e.g. 'p95<60s')")
+
+    percentile = int(match.group(1))
+    seconds = float(match.group(2))
+    if (match.group(3) or 's').lower().startswith('m'):
+        seconds *= 60
+
+    return percentile, seconds
+
 
 class ModelSelector:
     """Intelligent model selection based on task complexity."""
 
+    # Routing stats cache shared across instances: (mtime, stats)
+    _routing_cache: Tuple[Optional[float], Dict] = (None, {})
+
     def __init__(self, config_path: Optional[Path] = None):
         """
         Initialize model selector.
@@ -46,6 +105,10 @@ class ModelSelector:
                 'haiku_max': 30,      # 0-30: Haiku only
                 'sonnet_min': 60      # 61-100: Sonnet only
             },
+            'latency_routing': {
+                'min_samples': 5,          # Per agent/model history needed to trust stats
+                'min_success_rate': 0.85   # Never route to a model that fails more often
+            },
             'cost_limits': {
                 'monthly_budget_usd': 500,
                 'daily_budget_usd': 20,
@@ -94,11 +157,181 @@ class ModelSelector:
 
         return None
 
+    def _get_routing_stats(self) -> Dict:
+        """Return precomputed routing stats, re-reading only when the file changes."""
+        if not ROUTING_STATS_AVAILABLE:
+            return {}
+
+        try:
+            mtime = os.stat(ROUTING_STATS_FILE).st_mtime
+        except OSError:
+            return {}
+
+        cached_mtime, cached_stats = ModelSelector._routing_cache
+        if mtime != cached_mtime:
+            cached_stats = load_routing_stats()
+            ModelSelector._routing_cache = (mtime, cached_stats)
+
+        return cached_stats
+
+    def select_by_latency(self,
+                          agent_name: str,
+                          latency_target: str,
+                          complexity_score: int = 0) -> Optional[Dict]:
+        """
+        Pick the cheapest model expected to meet a latency target for an agent.
+
+        Uses per-agent, per-model duration percentiles and success rates
+        precomputed by agent_metrics. Returns None when history is too thin
+        to decide, so the caller can fall back to complexity thresholds.
+
+        Args:
+            agent_name: Agent that will run the task
+            latency_target: Target such as "p95<60s"
+            complexity_score: Score to echo in the result
+
+        Returns:
+            Selection dict, or None if there is not enough history
+        """
+        percentile, target_seconds = parse_latency_target(latency_target)
+        settings = self.config['latency_routing']
+        agent_stats = self._get_routing_stats().get(agent_name, {})
+        stat_key = f'p{percentile}_duration_seconds'
+
+        candidates = []
+        for rank, model in enumerate(ROUTABLE_MODELS):
+            stats = agent_stats.get(model)
+            if not stats or stats['invocations'] < settings['min_samples'] or stat_key not in stats:
+                continue
+            if stats['success_rate'] < settings['min_success_rate']:
+                continue
+            candidates.append((stats['avg_cost_usd'], rank, model, stats))
+
+        if not candidates:
+            return None
+
+        candidates.sort()
+        meeting_target = [c for c in candidates if c[3][stat_key] <= target_seconds]
+
+        if meeting_target:
+            _, _, model, stats = meeting_target[0]
+            reason = (f'Cheapest model meeting {latency_target} for {agent_name} '
+                      f'(p{percentile} {stats[stat_key]:.0f}s over {stats["invocations"]} runs)')
+            method = 'latency_based'
+        else:
+            _, _, model, stats = min(candidates, key=lambda c: c[3][stat_key])
+            reason = (f'No model meets {latency_target} for {agent_name} - '
+                      f'using fastest (p{percentile} {stats[stat_key]:.0f}s)')
+            method = 'latency_best_effort'
+
+        return {
+            'model': model,
+            'reason': reason,
+            'selection_method': method,
+            'complexity_score': complexity_score,
+            'latency_target': latency_target,
+            'expected_latency_seconds': stats[stat_key],
+            'success_rate': stats['success_rate'],
+            'history_samples': stats['invocations']
+        }
+
+    def check_budget(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Check live spend against cost_limits, including projected burn rate.
+
+        Reads only the O(1) spend counters kept in the monitoring snapshot,
+        never cost_tracking.json. Every cost_tracking save refreshes them,
+        including the post-tool-use hook's per-Task transcript backfill.
+
+        Returns:
+            Dict with pressure level (0 normal, 1 elevated, 2 exhausted),
+            spend figures and a reason
+        """
+        limits = self.config['cost_limits']
+        now = now or datetime.now()
+
+        if not LIVE_SPEND_AVAILABLE:
+            return {'level': 0, 'reason': 'Live spend counters unavailable'}
+
+        spend = get_live_spend()
+        monthly_budget = limits['monthly_budget_usd']
+        daily_budget = limits['daily_budget_usd']
+        alert_pct = limits['alert_threshold_pct']
+
+        monthly_pct = spend['monthly_cost_usd'] / monthly_budget * 100 if monthly_budget else 0.0
+        daily_pct = spend['daily_cost_usd'] / daily_budget * 100 if daily_budget else 0.0
+
+        # Projected burn: extrapolate current spend over the elapsed fraction
+        # of the period. Skip the first hours of a day/month where one
+        # invocation would dominate the projection.
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        month_elapsed = (now.day - 1 + now.hour / 24) / days_in_month
+        day_elapsed = (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+
+        projected_monthly_pct = monthly_pct / month_elapsed if month_elapsed >= BURN_RATE_MIN_ELAPSED else monthly_pct
+        projected_daily_pct = daily_pct / day_elapsed if day_elapsed >= BURN_RATE_MIN_ELAPSED else daily_pct
+
+        budget = {
+            'monthly_cost_usd': spend['monthly_cost_usd'],
+            'daily_cost_usd': spend['daily_cost_usd'],
+            'monthly_pct': monthly_pct,
+            'daily_pct': daily_pct,
+            'projected_monthly_pct': projected_monthly_pct,
+            'projected_daily_pct': projected_daily_pct
+        }
+
+        if monthly_pct >= 100 or daily_pct >= 100:
+            budget['level'] = 2
+            budget['reason'] = f'Budget exhausted (month {monthly_pct:.0f}%, day {daily_pct:.0f}%)'
+        elif monthly_pct >= alert_pct or daily_pct >= alert_pct:
+            budget['level'] = 1
+            budget['reason'] = f'Spend above {alert_pct}% alert threshold (month {monthly_pct:.0f}%, day {daily_pct:.0f}%)'
+        elif projected_monthly_pct >= 100 or projected_daily_pct >= 100:
+            budget['level'] = 1
+            budget['reason'] = (f'Burn rate projects over budget (month {projected_monthly_pct:.0f}%, '
+                                f'day {projected_daily_pct:.0f}%)')
+        else:
+            budget['level'] = 0
+            budget['reason'] = 'Within budget'
+
+        return budget
+
+    def apply_budget_admission(self, selection: Dict, budget: Dict) -> Dict:
+        """
+        Degrade a selection one tier per budget pressure level.
+
+        sonnet-4.5 -> haiku-with-sonnet-review -> haiku-4.5. User and rule
+        overrides (payment, security, ...) are annotated but never degraded.
+        """
+        selection['budget_status'] = budget['reason']
+        model = selection['model']
+
+        if budget['level'] == 0 or selection['selection_method'] in ('user_override', 'rule_override', 'disabled'):
+            return selection
+        if model not in DEGRADATION_ORDER:
+            return selection
+
+        tier = min(DEGRADATION_ORDER.index(model) + budget['level'], len(DEGRADATION_ORDER) - 1)
+        degraded_model = DEGRADATION_ORDER[tier]
+        if degraded_model == model:
+            return selection
+
+        return dict(
+            selection,
+            model=degraded_model,
+            reason=f"{budget['reason']} - degraded from {model}",
+            selection_method='budget_admission',
+            original_model=model,
+            original_reason=selection['reason']
+        )
+
     def select_model(self,
                     complexity_analysis: Dict,
                     task_name: str = "",
                     task_description: str = "",
-                    user_override: Optional[str] = None) -> Dict:
+                    user_override: Optional[str] = None,
+                    agent_name: str = "",
+                    latency_target: Optional[str] = None) -> Dict:
         """
         Select optimal model based on complexity analysis.
 
@@ -107,10 +340,32 @@ class ModelSelector:
             task_name: Task name for override checking
             task_description: Task description for override checking
             user_override: User's manual override (if any)
+            agent_name: Agent that will run the task (for latency routing)
+            latency_target: Optional target such as "p95<60s"; routes on
+                historical agent/model latency, falling back to complexity
+                thresholds when history is thin
 
         Returns:
             Dict with model selection and reasoning
         """
+        selection = self._select_unconstrained(
+            complexity_analysis, task_name, task_description,
+            user_override, agent_name, latency_target
+        )
+
+        if selection['selection_method'] == 'disabled':
+            return selection
+
+        return self.apply_budget_admission(selection, self.check_budget())
+
+    def _select_unconstrained(self,
+                              complexity_analysis: Dict,
+                              task_name: str,
+                              task_description: str,
+                              user_override: Optional[str],
+                              agent_name: str,
+                              latency_target: Optional[str]) -> Dict:
+        """Select a model ignoring budget pressure (see select_model)."""
 
         # Check if model selection is disabled
         if not self.config['enabled'] or not self.config['auto_model_selection']:
@@ -139,6 +394,16 @@ class ModelSelector:
                 'complexity_score': complexity_analysis.get('complexity_score', 0)
             }
 
+        # Latency-aware selection (needs agent history)
+        if latency_target and agent_name:
+            latency_selection = self.select_by_latency(
+                agent_name,
+                latency_target,
+                complexity_analysis.get('complexity_score', 0)
+            )
+            if latency_selection:
+                return latency_selection
+
         # Complexity-based selection
         score = complexity_analysis.get('complexity_score', 50)
         haiku_max = self.config['thresholds']['haiku_max']
@@ -230,7 +495,9 @@ class ModelSelector:
                                          task_name: str = "",
                                          task_description: str = "",
                                          files_changed: Optional[list] = None,
-                                         git_diff: Optional[str] = None) -> Dict:
+                                         git_diff: Optional[str] = None,
+                                         agent_name: str = "",
+                                         latency_target: Optional[str] = None) -> Dict:
         """
         Convenience method to get model recommendation for a task.
 
@@ -239,6 +506,8 @@ class ModelSelector:
             task_description: Task description
             files_changed: List of changed files
             git_diff: Git diff output
+            agent_name: Agent that will run the task (for latency routing)
+            latency_target: Optional latency target such as "p95<60s"
 
         Returns:
             Dict with model recommendation and full analysis
@@ -259,7 +528,9 @@ class ModelSelector:
         selection = self.select_model(
             complexity_analysis,
             task_name=task_name,
-            task_description=task_description
+            task_description=task_description,
+            agent_name=agent_name,
+            latency_target=latency_target
         )
 
         # Combine results
@@ -298,6 +569,10 @@ def display_recommendation(recommendation: Dict):
         if 'cost_estimate' in details:
             print(f"\n[ESTIMATED COST]: {details['cost_estimate']}")
 
+        if 'expected_latency_seconds' in details:
+            print(f"\n[EXPECTED LATENCY]: {details['expected_latency_seconds']:.0f}s "
+                  f"({details['history_samples']} runs, {details['success_rate']:.0%} success)")
+
         if 'quality_notes' in details:
             print(f"\n[QUALITY NOTES]: {details['quality_notes']}")
 
@@ -320,6 +595,8 @@ def main():
     parser.add_argument('--from-git', action='store_true', help='Analyze current git changes')
     parser.add_argument('--test', action='store_true', help='Run test scenarios')
     parser.add_argument('--savings', action='store_true', help='Show cost savings estimate')
+    parser.add_argument('--agent', default='', help='Agent name for latency-aware routing')
+    parser.add_argument('--latency-target', default=None, help='Latency target, e.g. "p95<60s"')
 
     args = parser.parse_args()
 
@@ -405,7 +682,9 @@ def main():
         print("\nAnalyzing current git changes...")
         rec = selector.get_model_recommendation_for_task(
             task_name=args.task_name,
-            task_description=args.task_description
+            task_description=args.task_description,
+            agent_name=args.agent,
+            latency_target=args.latency_target
         )
         display_recommendation(rec)
 
@@ -418,7 +697,9 @@ def main():
 
         rec = selector.get_model_recommendation_for_task(
             task_name=args.task_name,
-            task_description=args.task_description
+            task_description=args.task_description,
+            agent_name=args.agent,
+            latency_target=args.latency_target
         )
         display_recommendation(rec)
 
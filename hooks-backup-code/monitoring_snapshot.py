@@ -0,0 +1,245 @@
+"""
+Monitoring Snapshot Module for Multi-Agent System
+Maintains a tiny precomputed summary for fast session-start display
+
+The cost tracker and agent metrics writers refresh their section of the
+snapshot every time they save, so readers never have to load the full
+cost_tracking.json / agent_metrics.json history. Section updates hold an
+exclusive lock on dashboard_snapshot.lock, so concurrent hooks writing
+different sections never drop each other's changes.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Constants
+STATE_DIR = Path(__file__).parent.parent / "state" / "monitoring"
+SNAPSHOT_FILE = STATE_DIR / "dashboard_snapshot.json"
+LOCK_FILE = STATE_DIR / "dashboard_snapshot.lock"
+
+SNAPSHOT_VERSION = "1.0"
+
+
+def _empty_snapshot() -> Dict:
+    """Initialize snapshot structure"""
+    return {
+        "version": SNAPSHOT_VERSION,
+        "updated": None,
+        "cost": {
+            "month": datetime.now().strftime("%Y-%m"),
+            "day": datetime.now().strftime("%Y-%m-%d"),
+            "daily_cost_usd": 0.0,
+            "total_cost_usd": 0.0,
+            "budget_usd": 500.0,
+            "spend_pct": 0.0,
+            "alerts": []
+        },
+        "agents": {
+            "total_agents": 0,
+            "total_invocations": 0,
+            "avg_success_rate": 0.0
+        }
+    }
+
+
+def load_snapshot() -> Optional[Dict]:
+    """Load snapshot, returning None if it has not been written yet"""
+    try:
+        with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_snapshot(snapshot: Dict) -> bool:
+    """Atomically replace the snapshot file (readers never see partial JSON)"""
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = SNAPSHOT_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_file, SNAPSHOT_FILE)
+        return True
+    except Exception as e:
+        print(f"Error saving monitoring snapshot: {e}")
+        return False
+
+
+@contextmanager
+def _snapshot_lock():
+    """Exclusive lock serializing snapshot read-modify-write across processes"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10s
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _update_section(section: str, values: Dict) -> bool:
+    """Replace one section of the snapshot, keeping the other intact"""
+    try:
+        with _snapshot_lock():
+            snapshot = load_snapshot() or _empty_snapshot()
+            snapshot[section] = values
+            snapshot["updated"] = datetime.now().isoformat()
+            return _write_snapshot(snapshot)
+    except OSError as e:
+        print(f"Error locking monitoring snapshot: {e}")
+        return False
+
+
+def update_cost_snapshot(cost_data: Dict) -> bool:
+    """
+    Refresh the cost section from freshly saved cost tracking data
+
+    Args:
+        cost_data: Full cost tracking structure (already in memory in the writer)
+
+    Returns:
+        True if the snapshot was written
+    """
+    now = datetime.now()
+    current_month = now.strftime("%Y-%m")
+    current_date = now.strftime("%Y-%m-%d")
+    budget = cost_data["config"]["monthly_budget_usd"]
+    monthly = cost_data["monthly"].get(current_month, {})
+    total_cost = monthly.get("total_cost_usd", 0.0)
+    daily = cost_data["daily"].get(current_date, {})
+
+    return _update_section("cost", {
+        "month": current_month,
+        "day": current_date,
+        "daily_cost_usd": daily.get("total_cost_usd", 0.0),
+        "total_cost_usd": total_cost,
+        "budget_usd": budget,
+        "spend_pct": (total_cost / budget) * 100 if budget else 0.0,
+        "alerts": [
+            {"severity": a["severity"], "message": a["message"]}
+            for a in monthly.get("alerts", [])
+            if a.get("severity") in ("warning", "critical")
+        ]
+    })
+
+
+def update_agent_snapshot(metrics_data: Dict) -> bool:
+    """
+    Refresh the agents section from freshly saved agent metrics data
+
+    Args:
+        metrics_data: Full agent metrics structure (already in memory in the writer)
+
+    Returns:
+        True if the snapshot was written
+    """
+    summary = metrics_data["summary"]
+
+    return _update_section("agents", {
+        "total_agents": summary["total_agents"],
+        "total_invocations": summary["total_invocations"],
+        "avg_success_rate": summary["avg_success_rate"]
+    })
+
+
+def get_quick_stats() -> Dict:
+    """
+    Get the six quick-stats numbers from the snapshot
+
+    Cost figures from a previous month are reported as zero spend for the
+    current month (the month rolled over since the last write).
+
+    Returns:
+        Dict with month spend, budget %, agent count, invocations,
+        success rate and active alerts
+    """
+    snapshot = load_snapshot()
+    if snapshot is None:
+        snapshot = rebuild_snapshot()
+
+    cost = snapshot["cost"]
+    agents = snapshot["agents"]
+    current_month = datetime.now().strftime("%Y-%m")
+
+    if cost["month"] != current_month:
+        cost = dict(cost, month=current_month, total_cost_usd=0.0, spend_pct=0.0, alerts=[])
+
+    return {
+        "month": cost["month"],
+        "total_cost_usd": cost["total_cost_usd"],
+        "budget_usd": cost["budget_usd"],
+        "spend_pct": cost["spend_pct"],
+        "alerts": cost["alerts"],
+        "total_agents": agents["total_agents"],
+        "total_invocations": agents["total_invocations"],
+        "avg_success_rate": agents["avg_success_rate"]
+    }
+
+
+def get_live_spend() -> Dict:
+    """
+    Get current daily and monthly spend counters from the snapshot
+
+    O(1): reads only the snapshot, never cost_tracking.json. Counters from a
+    previous day/month are reported as zero (the period rolled over since the
+    last write).
+
+    Returns:
+        Dict with month, day, monthly_cost_usd, daily_cost_usd
+    """
+    snapshot = load_snapshot() or _empty_snapshot()
+    cost = snapshot["cost"]
+    now = datetime.now()
+    current_month = now.strftime("%Y-%m")
+    current_date = now.strftime("%Y-%m-%d")
+
+    return {
+        "month": current_month,
+        "day": current_date,
+        "monthly_cost_usd": cost["total_cost_usd"] if cost.get("month") == current_month else 0.0,
+        "daily_cost_usd": cost.get("daily_cost_usd", 0.0) if cost.get("day") == current_date else 0.0
+    }
+
+
+def rebuild_snapshot() -> Dict:
+    """
+    Rebuild the snapshot from the full monitoring files
+
+    Only needed once for installations that predate the snapshot; after that
+    the writers keep it current.
+    """
+    from cost_tracker import load_cost_tracking
+    from agent_metrics import load_agent_metrics
+
+    update_cost_snapshot(load_cost_tracking())
+    update_agent_snapshot(load_agent_metrics())
+
+    return load_snapshot() or _empty_snapshot()
+
+
+if __name__ == "__main__":
+    # Rebuild and show the snapshot
+    print("Rebuilding monitoring snapshot...")
+    rebuild_snapshot()
+
+    stats = get_quick_stats()
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
@@ -18,15 +18,36 @@ from shared_state import get_project_root, get_task_state
 try:
     from cost_tracker import track_agent_invocation as track_cost
     from agent_metrics import track_agent_performance
+    from metrics_stream import append_event
     MONITORING_AVAILABLE = True
 except ImportError:
     MONITORING_AVAILABLE = False
 
+# Agent result cache (optional - hyphenated filename needs importlib)
+try:
+    import importlib.util
+    _cache_spec = importlib.util.spec_from_file_location(
+        "agent_cache", Path(__file__).parent / "agent-cache.py")
+    agent_cache = importlib.util.module_from_spec(_cache_spec)
+    _cache_spec.loader.exec_module(agent_cache)
+except Exception:
+    agent_cache = None
+
+# Subagent run extraction from the transcript (optional)
+try:
+    from cost_tracker import load_cost_tracking
+    from sidechain_runs import ingest_transcripts
+    from transcript_backfill import backfill_transcripts
+    from transcript_reader import session_transcripts
+except ImportError:
+    ingest_transcripts = None
+
 # In-memory progress tracking (resets per hook execution - intentional)
 # For persistent tracking, use task file Work Log instead
 _progress_counter = 0
 _last_suggestion_time = 0
 SUGGESTION_COOLDOWN = 300  # 5 minutes between suggestions
+TRANSCRIPT_READ_BYTES = 4 * 1024 * 1024  # per transcript file and hook call
 
 # Load input
 try:
@@ -93,6 +114,13 @@ suggestions = []
 if tool_name in ["Edit", "Write", "MultiEdit"]:
     edit_count = track_edit()
 
+    # Drop cached agent results that referenced the edited file
+    if agent_cache is not None and tool_input.get("file_path"):
+        try:
+            agent_cache.invalidate_file(tool_input["file_path"])
+        except Exception:
+            pass
+
     # Validation suggestions (every 10 edits)
     if should_suggest_validation(edit_count):
         suggestions.append(f"\n💡 Progress Check ({edit_count} edits):")
@@ -125,20 +153,37 @@ if tool_name == "Bash":
         suggestions.append(f"\n📁 Working directory: {cwd}")
 
 # Track agent invocations (Task tool)
-# Note: This tracks when agents are invoked, but actual performance metrics
-# would need to be captured when agent completes (future enhancement)
+# Duration, tokens, model and outcome come from the subagent's sidechain
+# records, picked up incrementally from this session's transcript
 if tool_name == "Task" and MONITORING_AVAILABLE:
     try:
         # Extract agent information from tool input
         agent_type = tool_input.get("subagent_type", "unknown")
         description = tool_input.get("description", "")
 
-        # For now, we log that an agent was invoked
-        # Full tracking (tokens, cost, duration) happens when agent completes
-        # This is a placeholder for future integration
+        # Subagent finished - clears it from the in-flight view
+        append_event("agent_end", agent=agent_type)
+
         suggestions.append(f"\n📊 Agent invoked: {agent_type}")
         suggestions.append(f"   Description: {description}")
-        suggestions.append("   Note: Full metrics tracked on completion")
+
+        # Record spend and finished runs (only newly appended records are
+        # read); a run closes once its Task result is in the transcript, so
+        # this call usually records the previous one. Only this session's
+        # file and its subagents' agent-*.jsonl are read, a bounded slice per
+        # call; other sessions' history is left to the CLIs
+        transcript_path = input_data.get("transcript_path")
+        paths = session_transcripts(transcript_path) if ingest_transcripts and transcript_path else []
+        if paths:
+            cost_data = load_cost_tracking()
+            backfill_transcripts(paths, data=cost_data, publish=True, max_bytes=TRANSCRIPT_READ_BYTES)
+            price_table = cost_data["config"].get("model_costs")
+            for run in ingest_transcripts(paths, publish=True, price_table=price_table,
+                                          max_bytes=TRANSCRIPT_READ_BYTES):
+                suggestions.append(
+                    f"   Metrics: {run['duration_seconds']:.0f}s, "
+                    f"{run['tokens_input'] + run['tokens_output']:,} tokens, ${run['cost_usd']:.4f}"
+                )
 
     except Exception as e:
         # Don't fail the hook if monitoring fails
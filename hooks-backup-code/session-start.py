@@ -14,6 +14,7 @@ from pathlib import Path
 from shared_state import get_project_root, get_task_state
 
 # Import monitoring (optional)
+# Quick stats read only the precomputed snapshot, never the full history files
 try:
     from dashboard import display_quick_stats
     MONITORING_AVAILABLE = True
@@ -29,6 +29,15 @@ except:
 
 PROJECT_ROOT = get_project_root()
 
+# Subagent about to start - record it for the live dashboard (never blocks)
+if tool_name == "Task":
+    try:
+        from metrics_stream import append_event
+        append_event("agent_start", agent=tool_input.get("subagent_type", "unknown"))
+    except Exception:
+        pass
+    sys.exit(0)
+
 # MCP tools should never be warned about
 MCP_TOOL_PREFIXES = [
     "mcp__", "mcp_", "context7", "brave", "brightdata", "consult7", "serena",
@@ -0,0 +1,281 @@
+"""
+Sidechain Run Extractor for Multi-Agent System
+Reconstructs subagent runs from transcripts and feeds agent_metrics
+
+Every Task call writes its subagent's exchange as isSidechain records.
+A run spans its first to last sidechain timestamp; its usage is the sum
+of its (deduplicated) API messages, its model the one that served most
+requests, and its outcome the is_error flag of the Task tool_result that
+closes it on the main chain. Runs that never get a result and have been
+idle for RUN_IDLE_SECONDS are closed as interrupted.
+
+Processing is incremental: per-file offsets, the sidechain resolver and
+still-open runs live in agent_metrics.json under "transcript_ingest" and
+are saved in the same write as the metrics, so re-running never counts a
+run twice and each pass only touches newly appended records.
+
+Usage:
+    python sidechain_runs.py                       # current project's transcripts
+    python sidechain_runs.py ~/.claude/projects/<slug> session.jsonl
+    python sidechain_runs.py --dry-run             # list completed runs only
+"""
+
+import argparse
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from agent_metrics import load_agent_metrics, track_agent_performance_batch
+from cost_tracker import calculate_cost, load_cost_tracking
+from transcript_reader import (
+    SidechainResolver,
+    UsageDeduper,
+    find_transcripts,
+    parse_timestamp,
+    read_records,
+    usage_of
+)
+
+# Constants
+RUN_IDLE_SECONDS = 3600          # close result-less runs after this much silence
+MAX_PENDING_TASKS = 512          # Task calls / results awaiting their run
+INTERRUPTED_ERROR = "No Task result recorded (interrupted or crashed)"
+
+
+def _wanted(line: bytes) -> bool:
+    """Cheap pre-filter: sidechain records, Task calls and tool results"""
+    return (b'"isSidechain":true' in line or b'"isSidechain": true' in line
+            or b'"Task"' in line or b'"tool_result"' in line)
+
+
+def _task_ids(record: Dict) -> List[str]:
+    """tool_use ids of Task calls in a main-chain assistant record"""
+    content = (record.get("message") or {}).get("content")
+    if record.get("type") != "assistant" or not isinstance(content, list):
+        return []
+    return [
+        b["id"] for b in content
+        if isinstance(b, dict) and b.get("type") == "tool_use" and b.get("name") == "Task" and b.get("id")
+    ]
+
+
+def _tool_results(record: Dict) -> List[Dict]:
+    """tool_result blocks of a main-chain user record"""
+    content = (record.get("message") or {}).get("content")
+    if record.get("type") != "user" or not isinstance(content, list):
+        return []
+    return [b for b in content if isinstance(b, dict) and b.get("type") == "tool_result"]
+
+
+def _result_error(block: Dict) -> Optional[str]:
+    """Error text of a failed tool_result (None when it succeeded)"""
+    if not block.get("is_error"):
+        return None
+    content = block.get("content")
+    if isinstance(content, list):
+        content = " ".join(c.get("text", "") for c in content if isinstance(c, dict))
+    return (content or "Task failed").strip()[:200]
+
+
+class RunExtractor:
+    """Incremental subagent run reconstruction."""
+
+    def __init__(self, state: Optional[Dict] = None, price_table: Optional[Dict] = None):
+        """
+        Initialize extractor.
+
+        Args:
+            state: Saved ledger ({"files", "resolver", "tasks", "open_runs", "results"})
+            price_table: Model costs override (cost_tracking config)
+        """
+        state = state or {}
+        self.files = state.get("files", {})
+        self.resolver = SidechainResolver(state.get("resolver"))
+        self.tasks = OrderedDict(state.get("tasks", {}))
+        self.open_runs = OrderedDict(state.get("open_runs", {}))
+        self.results = OrderedDict(state.get("results", {}))
+        self.price_table = price_table
+        self.completed: List[Dict] = []
+
+    def process(self, paths: Optional[Iterable] = None, max_bytes: Optional[int] = None):
+        """Read new records from each transcript (up to max_bytes per file) and update runs"""
+        for path in find_transcripts(paths):
+            entry = self.files.setdefault(str(path.resolve()), {})
+            deduper = UsageDeduper(entry.get("seen"))
+            for record in read_records(path, entry, _wanted, max_bytes=max_bytes):
+                self._feed(record, deduper, path.stem)
+            entry["seen"] = deduper.state()
+
+        self._close_finished()
+
+    def _feed(self, record: Dict, deduper: UsageDeduper, fallback_session: str):
+        """Apply one record to its run (or record a Task outcome)"""
+        run_ref = self.resolver.observe(record)
+
+        if run_ref is None:
+            for tool_use_id in _task_ids(record):
+                self.tasks[tool_use_id] = record.get("timestamp")
+            for block in _tool_results(record):
+                tool_use_id = block.get("tool_use_id")
+                if tool_use_id in self.tasks:
+                    del self.tasks[tool_use_id]
+                    self.results[tool_use_id] = {
+                        "error": _result_error(block),
+                        "timestamp": record.get("timestamp")
+                    }
+            for pending in (self.tasks, self.results):
+                while len(pending) > MAX_PENDING_TASKS:
+                    pending.popitem(last=False)
+            return
+
+        run = self.open_runs.get(run_ref["chain_id"])
+        if run is None:
+            run = self.open_runs[run_ref["chain_id"]] = {
+                "agent": run_ref["agent"],
+                "tool_use_id": run_ref["tool_use_id"],
+                "session": record.get("sessionId") or fallback_session,
+                "start": record.get("timestamp"),
+                "end": record.get("timestamp"),
+                "requests": 0,
+                "tokens_input": 0,
+                "tokens_output": 0,
+                "cache_read": 0,
+                "cache_write": 0,
+                "cost_usd": 0.0,
+                "models": {}
+            }
+
+        timestamp = record.get("timestamp")
+        if timestamp:
+            run["start"] = min(run["start"] or timestamp, timestamp)
+            run["end"] = max(run["end"] or timestamp, timestamp)
+
+        usage = usage_of(record)
+        if usage is None:
+            return
+        usage = deduper.delta(usage)
+        if usage is None:
+            return
+
+        run["requests"] += usage["first"]
+        run["tokens_input"] += usage["input"]
+        run["tokens_output"] += usage["output"]
+        run["cache_read"] += usage["cache_read"]
+        run["cache_write"] += usage["cache_write"] + usage["cache_write_1h"]
+        run["cost_usd"] += calculate_cost(
+            usage["model"], usage["input"], usage["output"],
+            cache_read_tokens=usage["cache_read"],
+            cache_write_tokens=usage["cache_write"],
+            cache_write_1h_tokens=usage["cache_write_1h"],
+            price_table=self.price_table
+        )
+        run["models"][usage["model"]] = run["models"].get(usage["model"], 0) + usage["first"]
+
+    def _close_finished(self):
+        """Move runs with a Task result (or long idle) to completed"""
+        now = datetime.now(timezone.utc)
+
+        for chain_id in list(self.open_runs):
+            run = self.open_runs[chain_id]
+            result = self.results.pop(run["tool_use_id"], None) if run["tool_use_id"] else None
+
+            if result is None:
+                end = parse_timestamp(run["end"])
+                if end is None or (now - end).total_seconds() < RUN_IDLE_SECONDS:
+                    continue
+                result = {"error": INTERRUPTED_ERROR}
+                self.tasks.pop(run["tool_use_id"], None)
+
+            del self.open_runs[chain_id]
+            if run["requests"]:
+                self.completed.append(self._to_invocation(chain_id, run, result))
+
+    def _to_invocation(self, chain_id: str, run: Dict, result: Dict) -> Dict:
+        """Convert a finished run into track_agent_performance arguments"""
+        start, end = parse_timestamp(run["start"]), parse_timestamp(run["end"])
+        duration = (end - start).total_seconds() if start and end else 0.0
+
+        return {
+            "agent_name": run["agent"],
+            "success": result["error"] is None,
+            "error_message": result["error"],
+            "duration_seconds": duration,
+            "cost_usd": run["cost_usd"],
+            "tokens_input": run["tokens_input"] + run["cache_read"] + run["cache_write"],
+            "tokens_output": run["tokens_output"],
+            "model": max(run["models"], key=run["models"].get),
+            "timestamp": end,
+            "session": run["session"],
+            "chain_id": chain_id,
+            "requests": run["requests"]
+        }
+
+    def state(self) -> Dict:
+        """Serializable ledger"""
+        return {
+            "files": self.files,
+            "resolver": self.resolver.state(),
+            "tasks": dict(self.tasks),
+            "open_runs": dict(self.open_runs),
+            "results": dict(self.results)
+        }
+
+
+def ingest_transcripts(
+    paths: Optional[Iterable] = None,
+    save: bool = True,
+    publish: bool = False,
+    price_table: Optional[Dict] = None,
+    max_bytes: Optional[int] = None
+) -> List[Dict]:
+    """
+    Extract newly completed subagent runs and record them in agent_metrics
+
+    Args:
+        paths: Transcript files/directories (default: current project)
+        save: Write runs and the ledger to agent_metrics.json
+        publish: Also emit "invocation" events to the live metrics stream
+        price_table: Model costs override (default: cost_tracker.MODEL_COSTS)
+        max_bytes: Per-file read cap for this pass (see read_records)
+
+    Returns:
+        Completed runs (track_agent_performance arguments)
+    """
+    data = load_agent_metrics()
+
+    extractor = RunExtractor(data.get("transcript_ingest"), price_table)
+    extractor.process(paths, max_bytes=max_bytes)
+
+    if save:
+        data["transcript_ingest"] = extractor.state()
+        data["transcript_ingest"]["last_run"] = datetime.now().isoformat()
+        track_agent_performance_batch(extractor.completed, data=data, publish=publish)
+
+    return extractor.completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed subagent runs from transcripts into agent metrics")
+    parser.add_argument("paths", nargs="*", help="Transcript files or directories (default: current project)")
+    parser.add_argument("--dry-run", action="store_true", help="List completed runs without saving")
+    args = parser.parse_args()
+
+    try:
+        price_table = load_cost_tracking()["config"].get("model_costs")
+        runs = ingest_transcripts(args.paths or None, save=not args.dry_run, price_table=price_table)
+    except Exception as e:
+        print(f"Error extracting subagent runs: {e}")
+        sys.exit(1)
+
+    prefix = "[DRY-RUN] " if args.dry_run else ""
+    print(f"{prefix}[OK] {len(runs)} completed subagent runs")
+    for run in runs:
+        status = "[OK]" if run["success"] else "[FAIL]"
+        print(f"  {status:6s} {run['agent_name']:40s} "
+              f"{run['duration_seconds']:7.1f}s  {run['tokens_input'] + run['tokens_output']:>9,} tok  "
+              f"${run['cost_usd']:.4f}  {run['model']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for dashboard.py (--watch)
+
+Replays the metrics stream written by the post-tool-use hook (in the
+sandbox from test_metrics_exporter) into LiveDashboard. Covers:
+- Spend/min and the per-agent cost column move for hook-recorded runs
+- Dashboard and exporter fold the same cost events to the same totals
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dashboard import LiveDashboard  # noqa: E402
+from test_metrics_exporter import HookSandbox  # noqa: E402
+from test_sidechain_runs import TranscriptBuilder, _recent  # noqa: E402
+
+
+def test_watch_spend_from_hook_runs():
+    """Test a hook-recorded run moves spend/min and agrees with the exporter."""
+    print("\n" + "=" * 60)
+    print("TEST: Live Spend From Hook Runs")
+    print("=" * 60)
+
+    sandbox = HookSandbox()
+    try:
+        TranscriptBuilder(_recent()).task("backend-architect", turns=2).write(sandbox.transcript)
+        sandbox.post_tool_use("backend-architect")
+
+        dashboard = LiveDashboard()
+        for event in sandbox.events("cost") + sandbox.events("invocation"):
+            dashboard.apply_event(event)
+
+        samples = sandbox.scrape()
+        exported = {agent: value for (metric, agent), value in samples.items()
+                    if metric == "vextrus_agent_cost_usd_total"}
+        spend = dashboard.spend_per_min.total(time.time())
+
+        assert spend > 0, "spend/min should move for a hook-recorded run"
+        assert abs(spend - sum(exported.values())) < 1e-9, f"dashboard {spend} vs exporter {exported}"
+        row = dashboard.agents["backend-architect"]
+        assert row["invocations"] == 1, row
+        assert abs(row["cost_usd"] - exported["backend-architect"]) < 1e-9, f"{row} vs {exported}"
+
+        print(f"[OK] Spend/min ${spend:.6f} matches the exporter's cost counters")
+    finally:
+        sandbox.cleanup()
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("LIVE DASHBOARD - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_watch_spend_from_hook_runs()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
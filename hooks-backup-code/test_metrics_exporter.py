@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for metrics_exporter.py
+
+Runs the post-tool-use hook on a synthetic session transcript inside a
+throwaway copy of the hooks directory (its state/ lands next to the copy),
+then scrapes the stream it wrote. Covers:
+- Token and cost counters are fed by the hook path, not only by
+  track_agent_invocation
+- Cost counters and invocation series agree with the ingested run
+- A repeated hook call does not count the run again
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics_exporter import AgentMetricsCollector  # noqa: E402
+from metrics_stream import StreamTail  # noqa: E402
+from test_sidechain_runs import SESSION, TranscriptBuilder, _recent  # noqa: E402
+
+HOOKS_DIR = Path(__file__).parent
+SAMPLE = re.compile(r'^(\w+)\{agent="([^"]*)",category="[^"]*",model="[^"]*"\} (\S+)$')
+
+
+class HookSandbox:
+    """Copy of the hooks directory with its own state/ and transcripts."""
+
+    def __init__(self):
+        self.root = Path(tempfile.mkdtemp(prefix="hook-sandbox-"))
+        self.hooks = self.root / "hooks"
+        shutil.copytree(HOOKS_DIR, self.hooks, ignore=shutil.ignore_patterns("__pycache__", "test_*"))
+        self.state = self.root / "state" / "monitoring"
+        self.transcript = self.root / "transcripts" / f"{SESSION}.jsonl"
+        self.transcript.parent.mkdir()
+
+    def post_tool_use(self, agent: str):
+        """Run the hook for a finished Task call"""
+        payload = {"tool_name": "Task", "tool_input": {"subagent_type": agent, "description": "test"},
+                   "transcript_path": str(self.transcript), "cwd": str(self.root)}
+        env = dict(os.environ, CLAUDE_PROJECT_DIR=str(self.root))
+        result = subprocess.run([sys.executable, "post-tool-use.py"], input=json.dumps(payload), env=env,
+                                cwd=self.hooks, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    def events(self, event_type: str):
+        with open(self.state / "metrics_stream.jsonl", encoding="utf-8") as f:
+            return [e for e in map(json.loads, f) if e["type"] == event_type]
+
+    def scrape(self) -> dict:
+        """Exporter samples as {(metric, agent): value}"""
+        text = AgentMetricsCollector(StreamTail(from_start=True, path=self.state / "metrics_stream.jsonl")).collect()
+        samples = {}
+        for line in text.splitlines():
+            match = SAMPLE.match(line)
+            if match:
+                samples[(match.group(1), match.group(2))] = float(match.group(3))
+        return samples
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def test_hook_feeds_cost_counters():
+    """Test a Task run ingested by the hook shows up in the token and cost counters."""
+    print("\n" + "=" * 60)
+    print("TEST: Hook Path Feeds Cost Counters")
+    print("=" * 60)
+
+    sandbox = HookSandbox()
+    try:
+        TranscriptBuilder(_recent()).task("backend-architect", turns=2).write(sandbox.transcript)
+        output = sandbox.post_tool_use("backend-architect")
+        assert "Metrics:" in output, f"run reported by the hook: {output}"
+
+        samples = sandbox.scrape()
+        run = sandbox.events("invocation")[0]
+        assert samples[("vextrus_agent_invocations_total", "backend-architect")] == 1, samples
+        assert samples[("vextrus_agent_tokens_input_total", "backend-architect")] == 20, samples
+        assert samples[("vextrus_agent_tokens_output_total", "backend-architect")] == 20, samples
+        cost = samples[("vextrus_agent_cost_usd_total", "backend-architect")]
+        assert cost > 0 and abs(cost - run["cost_usd"]) < 1e-9, f"counter {cost} vs run {run['cost_usd']}"
+        assert samples[("vextrus_agent_tokens_input_total", "main-session")] == 50, "main chain spend too"
+
+        print(f"[OK] backend-architect: 20 in / 20 out tokens, ${cost:.6f}")
+    finally:
+        sandbox.cleanup()
+
+
+def test_repeat_hook_adds_nothing():
+    """Test a second hook call over the same transcript leaves the counters alone."""
+    print("\n" + "=" * 60)
+    print("TEST: Repeated Hook Call")
+    print("=" * 60)
+
+    sandbox = HookSandbox()
+    try:
+        TranscriptBuilder(_recent()).task("backend-architect", turns=2).write(sandbox.transcript)
+        sandbox.post_tool_use("backend-architect")
+        before = sandbox.scrape()
+        sandbox.post_tool_use("backend-architect")
+
+        assert sandbox.scrape() == before, "nothing new in the transcript"
+        assert len(sandbox.events("cost")) == 2, "one cost event per agent and model"
+
+        print("[OK] Counters unchanged after the second call")
+    finally:
+        sandbox.cleanup()
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("METRICS EXPORTER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_hook_feeds_cost_counters()
+        test_repeat_hook_adds_nothing()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for model_selector.py budget admission
+
+Records spend through the post-tool-use hook (in the sandbox from
+test_metrics_exporter) and points the live spend counters at the
+sandbox's snapshot. Covers:
+- The hook path moves get_live_spend() (no manual backfill needed)
+- select_model degrades one tier above the alert threshold and two once
+  the budget is exhausted; rule overrides are never degraded
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import monitoring_snapshot  # noqa: E402
+from model_selector import ModelSelector  # noqa: E402
+from test_metrics_exporter import HookSandbox  # noqa: E402
+from test_sidechain_runs import TranscriptBuilder  # noqa: E402
+
+COMPLEX_TASK = {"complexity_score": 85}
+
+
+def _select(daily_budget_usd: float, task_name: str = "invoice-aggregate") -> dict:
+    selector = ModelSelector()
+    selector.config["cost_limits"] = {"monthly_budget_usd": 500, "daily_budget_usd": daily_budget_usd,
+                                      "alert_threshold_pct": 80}
+    return selector.select_model(COMPLEX_TASK, task_name=task_name)
+
+
+def test_select_model_degrades_with_hook_spend():
+    """Test spend recorded by the hook pushes select_model down the tiers."""
+    print("\n" + "=" * 60)
+    print("TEST: Budget Admission From Hook Spend")
+    print("=" * 60)
+
+    sandbox = HookSandbox()
+    saved = monitoring_snapshot.SNAPSHOT_FILE
+    monitoring_snapshot.SNAPSHOT_FILE = sandbox.state / "dashboard_snapshot.json"
+    try:
+        assert monitoring_snapshot.get_live_spend()["daily_cost_usd"] == 0.0, "no spend yet"
+        assert _select(daily_budget_usd=20)["model"] == "sonnet-4.5", "within budget: no degradation"
+
+        start = datetime.now(timezone.utc) - timedelta(seconds=60)
+        TranscriptBuilder(start).task("backend-architect", turns=2).write(sandbox.transcript)
+        sandbox.post_tool_use("backend-architect")
+
+        spent = monitoring_snapshot.get_live_spend()["daily_cost_usd"]
+        assert spent > 0, "hook-recorded spend should reach the live counters"
+
+        elevated = _select(daily_budget_usd=spent / 0.9)
+        assert elevated["model"] == "haiku-with-sonnet-review", elevated
+        assert elevated["selection_method"] == "budget_admission" and elevated["original_model"] == "sonnet-4.5"
+
+        exhausted = _select(daily_budget_usd=spent / 2)
+        assert exhausted["model"] == "haiku-4.5", exhausted
+
+        override = _select(daily_budget_usd=spent / 2, task_name="payment-refunds")
+        assert override["model"] == "sonnet-4.5" and override["selection_method"] == "rule_override", override
+
+        print(f"[OK] ${spent:.6f} spent: 90% -> haiku-with-sonnet-review, 200% -> haiku-4.5")
+    finally:
+        monitoring_snapshot.SNAPSHOT_FILE = saved
+        sandbox.cleanup()
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("MODEL SELECTOR - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_select_model_degrades_with_hook_spend()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Test script for sidechain_runs.py
+
+Builds synthetic Claude Code transcripts and runs RunExtractor over them
+directly (agent_metrics.json is never touched). Covers:
+- Run boundaries: back-to-back Task calls become separate runs, each
+  closed by its own Task result (is_error -> failed run)
+- Result-less runs stay open, then close as interrupted once idle
+- Re-ingesting from the saved ledger adds nothing; appended runs do
+- The per-call read cap resumes where it stopped
+- session_transcripts() picks the session file and its own agent files
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sidechain_runs import INTERRUPTED_ERROR, RUN_IDLE_SECONDS, RunExtractor  # noqa: E402
+from transcript_reader import session_transcripts  # noqa: E402
+
+SESSION = "session-1"
+MODEL = "claude-sonnet-4-5-20250929"
+
+
+class TranscriptBuilder:
+    """Main chain plus the sidechains of the Task calls it makes."""
+
+    def __init__(self, start: datetime, session: str = SESSION):
+        self.clock = start
+        self.session = session
+        self.records = []
+        self.last_main = None
+        self.count = 0
+
+    def _record(self, kind, content, parent, sidechain=False, usage_tokens=None, extra=None):
+        self.count += 1
+        self.clock += timedelta(seconds=2)
+        uuid = f"{self.session}-r{self.count}"
+        message = {"role": kind, "content": content}
+        if usage_tokens:
+            message.update({"id": f"msg_{uuid}", "model": MODEL, "usage": {
+                "input_tokens": usage_tokens, "output_tokens": usage_tokens,
+                "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}})
+        record = {"uuid": uuid, "parentUuid": parent, "isSidechain": sidechain, "type": kind,
+                  "sessionId": self.session, "message": message,
+                  "timestamp": self.clock.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+        record.update(extra or {})
+        self.records.append(record)
+        return uuid
+
+    def task(self, agent, turns, error=None):
+        """One Task call, its sidechain, and (unless error is ...) its result"""
+        tool_use_id = f"toolu_{self.session}_{self.count}"
+        prompt = f"Work item {self.count} for {agent}"
+        self.last_main = self._record("assistant", [{"type": "tool_use", "id": tool_use_id, "name": "Task",
+                                                     "input": {"subagent_type": agent, "prompt": prompt}}],
+                                      self.last_main, usage_tokens=50)
+        parent = self._record("user", prompt, None, sidechain=True)
+        for turn in range(turns):
+            parent = self._record("assistant", [{"type": "tool_use", "id": f"{tool_use_id}_{turn}",
+                                                 "name": "Read", "input": {}}],
+                                  parent, sidechain=True, usage_tokens=10)
+            parent = self._record("user", [{"type": "tool_result", "tool_use_id": f"{tool_use_id}_{turn}",
+                                            "content": "ok"}], parent, sidechain=True)
+        if error is not ...:
+            result = {"type": "tool_result", "tool_use_id": tool_use_id, "content": error or "done"}
+            if error:
+                result["is_error"] = True
+            self.last_main = self._record("user", [result], self.last_main)
+        return self
+
+    def write(self, path: Path, mode="w"):
+        with open(path, mode, encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.records = []
+        return path
+
+
+def _recent() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(minutes=5)
+
+
+def _reload(extractor: RunExtractor) -> RunExtractor:
+    """Extractor resumed from its ledger after a JSON round trip"""
+    return RunExtractor(json.loads(json.dumps(extractor.state())))
+
+
+def test_run_boundaries():
+    """Test back-to-back Task calls become separate runs with their own outcome."""
+    print("\n" + "=" * 60)
+    print("TEST: Run Boundaries")
+    print("=" * 60)
+
+    directory = Path(tempfile.mkdtemp(prefix="sidechain-"))
+    try:
+        path = TranscriptBuilder(_recent()) \
+            .task("backend-architect", turns=3) \
+            .task("security-sentinel", turns=1, error="Agent crashed") \
+            .write(directory / f"{SESSION}.jsonl")
+        extractor = RunExtractor()
+        extractor.process([path])
+
+        runs = {run["agent_name"]: run for run in extractor.completed}
+        assert set(runs) == {"backend-architect", "security-sentinel"}, f"two runs: {list(runs)}"
+        first, second = runs["backend-architect"], runs["security-sentinel"]
+        assert first["requests"] == 3 and second["requests"] == 1, "requests stay within their run"
+        assert first["tokens_input"] == 30 and first["tokens_output"] == 30, first
+        assert first["duration_seconds"] == 12.0, f"root to last sidechain record: {first['duration_seconds']}"
+        assert first["success"] and first["error_message"] is None, first
+        assert not second["success"] and second["error_message"] == "Agent crashed", second
+        assert first["cost_usd"] > 0 and first["model"] == MODEL, first
+        assert not extractor.open_runs, "both runs closed by their results"
+
+        print(f"[OK] 2 Task calls -> 2 runs (3 and 1 requests, failure kept apart)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_interrupted_run():
+    """Test a result-less run stays open until idle, then closes as interrupted."""
+    print("\n" + "=" * 60)
+    print("TEST: Interrupted Run")
+    print("=" * 60)
+
+    directory = Path(tempfile.mkdtemp(prefix="sidechain-"))
+    try:
+        recent = TranscriptBuilder(_recent()).task("frontend-specialist", turns=2, error=...) \
+            .write(directory / f"{SESSION}.jsonl")
+        extractor = RunExtractor()
+        extractor.process([recent])
+        assert not extractor.completed and len(extractor.open_runs) == 1, "no result yet: run stays open"
+
+        stale = datetime.now(timezone.utc) - timedelta(seconds=RUN_IDLE_SECONDS + 600)
+        old = TranscriptBuilder(stale, session="session-0").task("database-optimizer", turns=2, error=...) \
+            .write(directory / "session-0.jsonl")
+        extractor = _reload(extractor)
+        extractor.process([old, recent])
+
+        assert [run["agent_name"] for run in extractor.completed] == ["database-optimizer"], extractor.completed
+        run = extractor.completed[0]
+        assert not run["success"] and run["error_message"] == INTERRUPTED_ERROR, run
+        assert len(extractor.open_runs) == 1, "the recent run is still open"
+
+        print(f"[OK] Idle > {RUN_IDLE_SECONDS}s closed as interrupted, recent run kept open")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_reingest_is_idempotent():
+    """Test a resumed pass adds nothing until new runs are appended."""
+    print("\n" + "=" * 60)
+    print("TEST: Idempotent Re-Ingest")
+    print("=" * 60)
+
+    directory = Path(tempfile.mkdtemp(prefix="sidechain-"))
+    try:
+        builder = TranscriptBuilder(_recent()).task("backend-architect", turns=2)
+        path = builder.write(directory / f"{SESSION}.jsonl")
+        extractor = RunExtractor()
+        extractor.process([path])
+        assert len(extractor.completed) == 1, extractor.completed
+
+        extractor = _reload(extractor)
+        extractor.process([path])
+        assert not extractor.completed, f"nothing new: {extractor.completed}"
+
+        builder.task("api-integration-tester", turns=1).write(path, mode="a")
+        extractor = _reload(extractor)
+        extractor.process([path])
+        assert [run["agent_name"] for run in extractor.completed] == ["api-integration-tester"], \
+            extractor.completed
+
+        print("[OK] Second pass empty; appended run counted once")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_read_cap_resumes():
+    """Test max_bytes slices reach the same runs as one uncapped pass."""
+    print("\n" + "=" * 60)
+    print("TEST: Read Cap")
+    print("=" * 60)
+
+    directory = Path(tempfile.mkdtemp(prefix="sidechain-"))
+    try:
+        builder = TranscriptBuilder(_recent())
+        for agent in ("backend-architect", "security-sentinel", "frontend-specialist"):
+            builder.task(agent, turns=2)
+        path = builder.write(directory / f"{SESSION}.jsonl")
+
+        extractor, runs, passes = RunExtractor(), [], 0
+        while passes < 50:
+            extractor = _reload(extractor)
+            extractor.process([path], max_bytes=2048)
+            runs.extend(extractor.completed)
+            passes += 1
+            if extractor.files[str(path.resolve())]["offset"] == path.stat().st_size:
+                break
+
+        assert passes > 1, "the cap should split the file"
+        assert [run["agent_name"] for run in runs] == \
+            ["backend-architect", "security-sentinel", "frontend-specialist"], runs
+        assert all(run["requests"] == 2 for run in runs), "no run split across slices"
+
+        print(f"[OK] {passes} capped passes -> the same 3 runs")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_session_transcripts():
+    """Test the hook reads its session file and only that session's agent files."""
+    print("\n" + "=" * 60)
+    print("TEST: Session Transcripts")
+    print("=" * 60)
+
+    directory = Path(tempfile.mkdtemp(prefix="sidechain-"))
+    try:
+        session = TranscriptBuilder(_recent()).task("backend-architect", turns=1) \
+            .write(directory / f"{SESSION}.jsonl")
+        TranscriptBuilder(_recent(), session="session-2").task("backend-architect", turns=1) \
+            .write(directory / "session-2.jsonl")
+        own = directory / "agent-aaaa1111.jsonl"
+        own.write_text(json.dumps({"sessionId": SESSION, "agentId": "aaaa1111"}) + "\n", encoding="utf-8")
+        other = directory / "agent-bbbb2222.jsonl"
+        other.write_text(json.dumps({"sessionId": "session-2", "agentId": "bbbb2222"}) + "\n", encoding="utf-8")
+        nested = directory / SESSION / "subagents"
+        nested.mkdir(parents=True)
+        (nested / "agent-cccc3333.jsonl").write_text(json.dumps({"sessionId": SESSION}) + "\n", encoding="utf-8")
+        stale = directory / "agent-dddd4444.jsonl"
+        stale.write_text(json.dumps({"sessionId": SESSION}) + "\n", encoding="utf-8")
+        old = (_recent() - timedelta(days=1)).timestamp()
+        os.utime(stale, (old, old))
+
+        names = [p.name for p in session_transcripts(session)]
+        assert names == [f"{SESSION}.jsonl", "agent-aaaa1111.jsonl", "agent-cccc3333.jsonl"], names
+        assert session_transcripts(directory / "missing.jsonl") == [], "missing file: nothing to read"
+
+        print(f"[OK] {len(names)} files: session + own agent transcripts")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("SIDECHAIN RUNS - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_run_boundaries()
+        test_interrupted_run()
+        test_reingest_is_idempotent()
+        test_read_cap_resumes()
+        test_session_transcripts()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
@@ -0,0 +1,244 @@
+"""
+Transcript Cost Backfill for Multi-Agent System
+Prices every usage record in Claude Code transcripts into cost_tracking.json
+
+Streams transcript JSONL files from the offset reached last time, prices
+each API message (input, output, cache read and cache write tokens) with
+the configured price table, and adds it to the daily/monthly aggregates
+under the record's own timestamp. Main-chain usage is attributed to
+"main-session"; sidechain usage to the subagent type of the Task call
+that spawned it. Per-session totals (with a per-sidechain breakdown) are
+kept in data["sessions"].
+
+Offsets live in data["backfill"] and are saved in the same atomic write
+as the costs, so an interrupted run never counts a record twice. The
+post-tool-use hook runs the same backfill over its own session, so the
+CLI only has to pick up what no hook has seen.
+
+Usage:
+    python transcript_backfill.py                    # current project's transcripts
+    python transcript_backfill.py ~/.claude/projects/<slug> session.jsonl
+    python transcript_backfill.py --dry-run          # price without saving
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from cost_tracker import (
+    add_usage,
+    calculate_cost,
+    check_budget_alerts,
+    load_cost_tracking,
+    publish_cost,
+    save_cost_tracking,
+    update_statistics
+)
+from transcript_reader import (
+    SidechainResolver,
+    UsageDeduper,
+    find_transcripts,
+    parse_timestamp,
+    read_records,
+    usage_of
+)
+
+# Constants
+MAIN_AGENT = "main-session"
+
+# Lines worth parsing: assistant records (usage), roots, and every sidechain
+# record - the resolver follows parentUuid links, so skipping a sidechain's
+# tool-result turns would split one run into several
+RECORD_NEEDLES = (
+    b'"usage"', b'"parentUuid":null', b'"parentUuid": null',
+    b'"isSidechain":true', b'"isSidechain": true'
+)
+
+
+def _session_entry(data: Dict, session_id: str, when: datetime) -> Dict:
+    """Get or create the per-session cost record"""
+    session = data.setdefault("sessions", {}).get(session_id)
+    if session is None:
+        session = data["sessions"][session_id] = {
+            "first_seen": when.isoformat(),
+            "last_seen": when.isoformat(),
+            "cost_usd": 0.0,
+            "main_cost_usd": 0.0,
+            "sidechain_cost_usd": 0.0,
+            "requests": 0,
+            "main_requests": 0,
+            "tokens_input": 0,
+            "tokens_output": 0,
+            "tokens_cache_read": 0,
+            "tokens_cache_write": 0,
+            "by_model": {},
+            "sidechains": {}
+        }
+    return session
+
+
+def _add_to_session(session: Dict, when: datetime, usage: Dict, cost: float, run: Optional[Dict]):
+    """Attribute one priced message to its session (and sidechain run)"""
+    cache_write = usage["cache_write"] + usage["cache_write_1h"]
+
+    session["last_seen"] = max(session["last_seen"], when.isoformat())
+    session["cost_usd"] += cost
+    session["sidechain_cost_usd" if run else "main_cost_usd"] += cost
+    session["requests"] += usage["first"]
+    if not run:
+        session["main_requests"] += usage["first"]
+    session["tokens_input"] += usage["input"]
+    session["tokens_output"] += usage["output"]
+    session["tokens_cache_read"] += usage["cache_read"]
+    session["tokens_cache_write"] += cache_write
+    session["by_model"][usage["model"]] = session["by_model"].get(usage["model"], 0.0) + cost
+
+    if run:
+        sidechain = session["sidechains"].setdefault(run["chain_id"], {
+            "agent": run["agent"],
+            "cost_usd": 0.0,
+            "requests": 0,
+            "tokens_input": 0,
+            "tokens_output": 0,
+            "tokens_cache_read": 0,
+            "tokens_cache_write": 0
+        })
+        sidechain["cost_usd"] += cost
+        sidechain["requests"] += usage["first"]
+        sidechain["tokens_input"] += usage["input"]
+        sidechain["tokens_output"] += usage["output"]
+        sidechain["tokens_cache_read"] += usage["cache_read"]
+        sidechain["tokens_cache_write"] += cache_write
+
+
+def backfill_transcripts(
+    paths: Optional[Iterable] = None,
+    data: Optional[Dict] = None,
+    save: bool = True,
+    publish: bool = False,
+    max_bytes: Optional[int] = None
+) -> Dict:
+    """
+    Ingest new transcript records into cost tracking
+
+    Args:
+        paths: Transcript files/directories (default: current project)
+        data: Cost tracking data (default: load from disk)
+        save: Persist data and offsets when done
+        publish: After saving, emit one "cost" event per agent and model
+        max_bytes: Per-file read cap for this pass (see read_records)
+
+    Returns:
+        Summary dict (files, messages, cost_usd, sessions, by_agent)
+    """
+    if data is None:
+        data = load_cost_tracking()
+
+    ledger = data.setdefault("backfill", {"files": {}, "resolver": {}})
+    price_table = data["config"].get("model_costs")
+    resolver = SidechainResolver(ledger.get("resolver"))
+
+    summary = {"files": 0, "messages": 0, "invocations": 0, "cost_usd": 0.0, "sessions": set(), "by_agent": {}}
+    months = set()
+    published = {}  # (agent, model) -> [tokens_input, tokens_output, cost]
+
+    for path in find_transcripts(paths):
+        entry = ledger["files"].setdefault(str(path.resolve()), {})
+        deduper = UsageDeduper(entry.get("seen"))
+        start = entry.get("offset", 0)
+
+        for record in read_records(path, entry, RECORD_NEEDLES, max_bytes=max_bytes):
+            run = resolver.observe(record)
+            usage = usage_of(record)
+            if usage is None:
+                continue
+            usage = deduper.delta(usage)
+            if usage is None:
+                continue
+
+            when = parse_timestamp(record.get("timestamp")) or datetime.now()
+            session_id = record.get("sessionId") or path.stem
+            session = data.get("sessions", {}).get(session_id)
+
+            # One invocation per session (main chain) and per subagent run
+            if run:
+                agent_name = run["agent"]
+                is_new = session is None or run["chain_id"] not in session["sidechains"]
+            else:
+                agent_name = MAIN_AGENT
+                is_new = session is None or session["main_requests"] == 0
+
+            cost = calculate_cost(
+                usage["model"], usage["input"], usage["output"],
+                cache_read_tokens=usage["cache_read"],
+                cache_write_tokens=usage["cache_write"],
+                cache_write_1h_tokens=usage["cache_write_1h"],
+                price_table=price_table
+            )
+
+            add_usage(
+                data, when, agent_name, usage["model"], cost,
+                usage["input"], usage["output"],
+                cache_read_tokens=usage["cache_read"],
+                cache_write_tokens=usage["cache_write"] + usage["cache_write_1h"],
+                invocations=int(is_new)
+            )
+            _add_to_session(_session_entry(data, session_id, when), when, usage, cost, run)
+
+            months.add(when.strftime("%Y-%m"))
+            summary["messages"] += usage["first"]
+            summary["invocations"] += int(is_new)
+            summary["cost_usd"] += cost
+            summary["sessions"].add(session_id)
+            summary["by_agent"][agent_name] = summary["by_agent"].get(agent_name, 0.0) + cost
+
+            totals = published.setdefault((agent_name, usage["model"]), [0, 0, 0.0])
+            totals[0] += usage["input"] + usage["cache_read"] + usage["cache_write"] + usage["cache_write_1h"]
+            totals[1] += usage["output"]
+            totals[2] += cost
+
+        entry["seen"] = deduper.state()
+        if entry.get("offset", 0) != start:
+            summary["files"] += 1
+
+    ledger["resolver"] = resolver.state()
+    ledger["last_run"] = datetime.now().isoformat()
+
+    if summary["messages"]:
+        update_statistics(data, new_invocations=summary["invocations"])
+        for month in sorted(months):
+            check_budget_alerts(data, month)
+        data["metadata"]["last_updated"] = datetime.now().isoformat()
+
+    if save:
+        save_cost_tracking(data)
+        if publish:
+            for (agent_name, model), (tokens_input, tokens_output, cost) in published.items():
+                publish_cost(agent_name, model, tokens_input, tokens_output, cost)
+
+    summary["sessions"] = len(summary["sessions"])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill costs from Claude Code transcripts")
+    parser.add_argument("paths", nargs="*", help="Transcript files or directories (default: current project)")
+    parser.add_argument("--dry-run", action="store_true", help="Price new records without saving")
+    args = parser.parse_args()
+
+    try:
+        summary = backfill_transcripts(args.paths or None, save=not args.dry_run)
+    except Exception as e:
+        print(f"Error backfilling transcripts: {e}")
+        sys.exit(1)
+
+    prefix = "[DRY-RUN] " if args.dry_run else ""
+    print(f"{prefix}[OK] {summary['messages']} messages from {summary['files']} files, "
+          f"{summary['sessions']} sessions: ${summary['cost_usd']:.4f}")
+    for agent, cost in sorted(summary["by_agent"].items(), key=lambda kv: -kv[1]):
+        print(f"  {agent:40s} ${cost:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""
+Transcript Reader Module for Multi-Agent System
+Incremental, streaming access to Claude Code session transcripts
+
+Claude Code appends one JSON record per line to
+~/.claude/projects/<project-slug>/<session-id>.jsonl. Every assistant
+record carries message.usage; subagent (Task) exchanges are written as
+isSidechain records. Consumers (transcript_backfill, cache_analyzer,
+sidechain_runs) share the pieces here:
+
+- find_transcripts():  resolve files/dirs to transcript paths
+- session_transcripts(): one session's file plus its subagents' files
+- read_records():      yield complete records after a stored byte offset
+- UsageDeduper:        count each API message once (streamed content
+                       blocks repeat the same message.id and usage)
+- SidechainResolver:   map sidechain records to the Task call (agent
+                       type, tool_use_id) that spawned them
+
+Offsets and resolver state are plain dicts so each consumer can persist
+them inside its own state file and save data + offsets in one write.
+"""
+
+import json
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Constants
+TRANSCRIPTS_ROOT = Path.home() / ".claude" / "projects"
+
+# Models Claude Code uses for locally generated (unbilled) messages
+SYNTHETIC_MODELS = {"<synthetic>"}
+
+# Usage fields in the order they are stored in dedup state
+USAGE_FIELDS = ("input", "output", "cache_read", "cache_write", "cache_write_1h")
+
+# Bounds on state carried between runs
+MAX_SEEN_MESSAGES = 512
+MAX_PENDING_TASKS = 256
+MAX_TRACKED_NODES = 4096
+MAX_TRACKED_CHAINS = 1024
+
+# Bytes read from the head of a file to find its session / start time
+HEAD_BYTES = 64 * 1024
+HEAD_LINES = 20
+
+# Agent name used when a sidechain cannot be matched to its Task call
+UNKNOWN_SUBAGENT = "subagent"
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+def project_slug(project_dir: Path) -> str:
+    """Claude Code's directory name for a project (non-alphanumerics -> '-')"""
+    return re.sub(r"[^A-Za-z0-9]", "-", str(Path(project_dir).resolve()))
+
+
+def default_transcript_dir() -> Path:
+    """Transcript directory for the current project (CLAUDE_PROJECT_DIR or cwd)"""
+    project_dir = os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    return TRANSCRIPTS_ROOT / project_slug(Path(project_dir))
+
+
+def find_transcripts(paths: Optional[Iterable] = None) -> List[Path]:
+    """
+    Resolve files and directories to transcript files
+
+    Session files sort before per-agent files (agent-*.jsonl) so Task
+    calls are seen before the sidechains they spawn.
+
+    Args:
+        paths: Files or directories; defaults to the current project's
+               transcript directory
+
+    Returns:
+        Sorted list of .jsonl paths
+    """
+    if not paths:
+        paths = [default_transcript_dir()]
+
+    found = set()
+    for raw in paths:
+        path = Path(raw).expanduser()
+        if path.is_dir():
+            found.update(p for p in path.rglob("*.jsonl") if p.is_file())
+        elif path.is_file():
+            found.add(path)
+
+    return sorted(found, key=lambda p: (p.name.startswith("agent-"), str(p)))
+
+
+def _head_records(path: Path, lines: int = HEAD_LINES) -> Iterator[Dict]:
+    """First few records of a file (oversized lines are skipped)"""
+    try:
+        with open(path, "rb") as f:
+            for _ in range(lines):
+                line = f.readline(HEAD_BYTES)
+                if not line:
+                    return
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+    except OSError:
+        return
+
+
+def session_transcripts(transcript_path: Union[str, Path]) -> List[Path]:
+    """
+    A session's transcript plus the agent-*.jsonl files of its subagents
+
+    Subagent transcripts sit next to the session file (or under a
+    <session-id>/ directory beside it) and carry the parent's sessionId.
+    Only agent files modified since the session started are opened to
+    check it, so the cost stays flat as the project directory grows.
+
+    Args:
+        transcript_path: The session's <session-id>.jsonl
+
+    Returns:
+        Paths in find_transcripts() order (session file first)
+    """
+    path = Path(transcript_path).expanduser()
+    if not path.is_file():
+        return []
+
+    session_id = path.stem
+    started = next(
+        (ts for ts in (parse_timestamp(r.get("timestamp")) for r in _head_records(path)) if ts), None)
+
+    candidates = set(path.parent.glob("agent-*.jsonl"))
+    nested = path.parent / session_id
+    if nested.is_dir():
+        candidates.update(nested.rglob("agent-*.jsonl"))
+
+    found = [path]
+    for candidate in sorted(candidates):
+        try:
+            if started and candidate.stat().st_mtime < started.timestamp():
+                continue
+        except OSError:
+            continue
+        head = next(_head_records(candidate, lines=1), {})
+        if head.get("sessionId") == session_id:
+            found.append(candidate)
+
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Incremental reading
+# ---------------------------------------------------------------------------
+
+def read_records(
+    path: Path,
+    entry: Dict,
+    needles: Optional[Union[Tuple[bytes, ...], Callable[[bytes], bool]]] = None,
+    max_bytes: Optional[int] = None
+) -> Iterator[Dict]:
+    """
+    Yield records appended to a transcript since entry["offset"]
+
+    Only complete (newline-terminated) lines are consumed; entry["offset"]
+    is advanced past each one, so a line being written while we read is
+    picked up next time. A replaced or truncated file is re-read from 0.
+
+    Args:
+        path: Transcript file
+        entry: Per-file ledger entry ({"offset", "ino", ...}); updated in place
+        needles: Parse only lines containing one of these byte strings, or
+                 a predicate on the raw line (skips json.loads on the large
+                 tool-result lines most consumers never look at)
+        max_bytes: Stop after consuming this many bytes; the rest is read
+                   on a later call (bounds hook latency on long files)
+
+    Yields:
+        Parsed JSON records
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return
+
+    if entry.get("ino") != stat.st_ino or stat.st_size < entry.get("offset", 0):
+        entry.clear()
+        entry.update({"offset": 0, "ino": stat.st_ino})
+
+    if stat.st_size == entry["offset"]:
+        return
+
+    wanted = needles
+    if needles and not callable(needles):
+        wanted = lambda line: any(n in line for n in needles)
+
+    stop = entry["offset"] + max_bytes if max_bytes else None
+
+    with open(path, "rb") as f:
+        f.seek(entry["offset"])
+        for line in f:
+            if not line.endswith(b"\n") or (stop is not None and entry["offset"] >= stop):
+                break
+            entry["offset"] += len(line)
+
+            if wanted and not wanted(line):
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+    entry["size"] = stat.st_size
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a transcript timestamp (ISO 8601, UTC 'Z') into local time"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone()
+    except (TypeError, ValueError):
+        return None
+
+
+def message_text(record: Dict) -> str:
+    """Concatenated text content of a user/assistant record"""
+    content = (record.get("message") or {}).get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    return ""
+
+
+# ---------------------------------------------------------------------------
+# Usage
+# ---------------------------------------------------------------------------
+
+def usage_of(record: Dict) -> Optional[Dict]:
+    """
+    Normalized token usage of an assistant record
+
+    Returns:
+        {"message_id", "model", "input", "output", "cache_read",
+         "cache_write", "cache_write_1h"} or None for records without
+        billable usage
+    """
+    if record.get("type") != "assistant":
+        return None
+    message = record.get("message") or {}
+    usage = message.get("usage")
+    model = message.get("model") or ""
+    if not isinstance(usage, dict) or model in SYNTHETIC_MODELS:
+        return None
+
+    cache_write = usage.get("cache_creation_input_tokens") or 0
+    breakdown = usage.get("cache_creation") or {}
+    cache_write_1h = min(breakdown.get("ephemeral_1h_input_tokens") or 0, cache_write)
+
+    return {
+        "message_id": message.get("id") or record.get("requestId") or record.get("uuid"),
+        "model": model,
+        "input": usage.get("input_tokens") or 0,
+        "output": usage.get("output_tokens") or 0,
+        "cache_read": usage.get("cache_read_input_tokens") or 0,
+        "cache_write": cache_write - cache_write_1h,
+        "cache_write_1h": cache_write_1h,
+    }
+
+
+class UsageDeduper:
+    """Turn repeated per-block usage records into per-message increments."""
+
+    def __init__(self, state: Optional[Dict] = None):
+        """
+        Initialize deduper.
+
+        Args:
+            state: Previously saved state (message_id -> counted usage list)
+        """
+        self.seen = OrderedDict(state or {})
+
+    def delta(self, usage: Dict) -> Optional[Dict]:
+        """
+        Usage not yet counted for this message
+
+        A message split into several content-block records reports the
+        same (or growing) usage on each; only the increase over what was
+        already counted is returned, so summing deltas prices the message
+        exactly once even across resumed runs.
+
+        Returns:
+            Usage dict with incremental counts and "first" (True the first
+            time the message is counted), or None if nothing is new
+        """
+        message_id = usage["message_id"]
+        counted = self.seen.pop(message_id, None)
+        first = counted is None
+        counted = counted or [0] * len(USAGE_FIELDS)
+        current = [max(usage[f], c) for f, c in zip(USAGE_FIELDS, counted)]
+
+        self.seen[message_id] = current
+        while len(self.seen) > MAX_SEEN_MESSAGES:
+            self.seen.popitem(last=False)
+
+        increments = [now - before for now, before in zip(current, counted)]
+        if not any(increments):
+            return None
+
+        result = dict(usage, first=first)
+        result.update(zip(USAGE_FIELDS, increments))
+        return result
+
+    def state(self) -> Dict:
+        """Serializable state for the ledger"""
+        return dict(self.seen)
+
+
+# ---------------------------------------------------------------------------
+# Sidechain attribution
+# ---------------------------------------------------------------------------
+
+def _prompt_key(text: str) -> str:
+    """Key used to match a sidechain's first message to its Task prompt"""
+    return " ".join(text.split())[:512]
+
+
+class SidechainResolver:
+    """
+    Map sidechain records to the subagent run they belong to.
+
+    The main chain's Task tool_use carries subagent_type and prompt; the
+    sidechain starts with a root user record (parentUuid null) whose text
+    is that prompt, and every later sidechain record points at its parent.
+    A run is identified by the record's agentId when present, otherwise by
+    the uuid of its root record.
+    """
+
+    def __init__(self, state: Optional[Dict] = None):
+        """
+        Initialize resolver.
+
+        Args:
+            state: Previously saved state from state()
+        """
+        state = state or {}
+        self.pending = OrderedDict(state.get("pending", {}))
+        self.nodes = OrderedDict(state.get("nodes", {}))
+        self.chains = OrderedDict(state.get("chains", {}))
+
+    def observe(self, record: Dict) -> Optional[Dict]:
+        """
+        Track a record and resolve its subagent run
+
+        Args:
+            record: Transcript record (any type)
+
+        Returns:
+            None for main-chain records, else {"chain_id", "agent",
+            "tool_use_id", "root"} for the run the record belongs to
+        """
+        if not record.get("isSidechain"):
+            if record.get("type") == "assistant":
+                self._remember_tasks(record)
+            return None
+
+        uuid = record.get("uuid")
+        parent = record.get("parentUuid")
+        root = parent is None
+
+        chain_id = self.nodes.get(parent) if parent else None
+        if not chain_id:
+            chain_id = record.get("agentId") or (uuid if root else parent) or "unknown"
+
+        if chain_id not in self.chains:
+            match = self.pending.pop(_prompt_key(message_text(record)), None) if root else None
+            self.chains[chain_id] = match or [UNKNOWN_SUBAGENT, None]
+            _trim(self.chains, MAX_TRACKED_CHAINS)
+        else:
+            self.chains.move_to_end(chain_id)
+            root = False
+
+        if uuid:
+            self.nodes[uuid] = chain_id
+            _trim(self.nodes, MAX_TRACKED_NODES)
+
+        agent, tool_use_id = self.chains[chain_id]
+        return {"chain_id": chain_id, "agent": agent, "tool_use_id": tool_use_id, "root": root}
+
+    def _remember_tasks(self, record: Dict):
+        """Queue Task tool_use calls until their sidechain starts"""
+        content = (record.get("message") or {}).get("content")
+        if not isinstance(content, list):
+            return
+        for block in content:
+            if not isinstance(block, dict) or block.get("type") != "tool_use" or block.get("name") != "Task":
+                continue
+            tool_input = block.get("input") or {}
+            prompt = tool_input.get("prompt")
+            if prompt:
+                agent = tool_input.get("subagent_type") or UNKNOWN_SUBAGENT
+                self.pending[_prompt_key(prompt)] = [agent, block.get("id")]
+                _trim(self.pending, MAX_PENDING_TASKS)
+
+    def state(self) -> Dict:
+        """Serializable state for the ledger"""
+        return {
+            "pending": dict(self.pending),
+            "nodes": dict(self.nodes),
+            "chains": dict(self.chains),
+        }
+
+
+def _trim(mapping: OrderedDict, limit: int):
+    """Drop oldest entries beyond limit"""
+    while len(mapping) > limit:
+        mapping.popitem(last=False)
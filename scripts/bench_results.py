@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Benchmark results store and regression comparator for k6 / artillery runs
+Ingests k6 `--out json` NDJSON and artillery `--output` JSON reports into
+compact per-run histograms and compares a candidate run against a baseline
+
+Ingestion streams the NDJSON line by line (plain or .gz), so multi-GB k6
+outputs are reduced to per-metric summaries without loading them:
+- trend metrics (http_req_duration, custom latencies): log-bucketed
+  histograms with ~2% relative precision, keyed per `name` tag
+- rate metrics (http_req_failed, checks, custom rates): hits / total
+- counter and gauge metrics: sums, last / max values
+
+Artillery reports only carry percentile summaries; each 10s intermediate
+period is expanded into an approximate histogram and merged. Artillery names
+are mapped onto k6's (http.response_time -> http_req_duration, per-endpoint
+summaries -> http_req_duration{name:URL}, errors and 4xx/5xx -> http_req_failed).
+
+A regression is flagged when:
+- a percentile's order-statistic confidence interval in the candidate lies
+  entirely above the baseline's and the shift exceeds --min-effect
+- a failure rate rises with a one-sided two-proportion z-test p < --alpha
+  (for `checks`, where higher is better, a drop is the regression)
+
+Runs are stored gzip-compressed under state/bench-results/.
+
+Usage:
+    k6 run --out json=db.ndjson benchmarks/k6-database.js
+    python scripts/bench_results.py ingest db.ndjson --label k6-database
+    python scripts/bench_results.py list
+    python scripts/bench_results.py compare k6-database~1 k6-database
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Constants
+STATE_DIR = Path(__file__).parent.parent / "state" / "bench-results"
+INDEX_FILE_NAME = "index.json"
+
+HISTOGRAM_GROWTH = 1.02    # bucket width factor (~2% relative error)
+HISTOGRAM_MIN_VALUE = 0.001
+MAX_SERIES_PER_METRIC = 200
+OTHER_SERIES = "name:(other)"
+
+DEFAULT_PERCENTILES = [95, 99]
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_EFFECT = 0.05  # relative percentile shift worth reporting
+DEFAULT_MIN_RATE_DELTA = 0.001
+HIGHER_IS_BETTER = {"checks"}
+
+ARTILLERY_ENDPOINT_PREFIX = "plugins.metrics-by-endpoint.response_time."
+ARTILLERY_QUANTILES = [("min", 0.0), ("p50", 0.5), ("p75", 0.75), ("p90", 0.9),
+                       ("p95", 0.95), ("p99", 0.99), ("p999", 0.999), ("max", 1.0)]
+QUANTILE_SUBSTEPS = 8      # synthetic points per quantile interval
+
+
+# ---------------------------------------------------------------------------
+# Histograms
+# ---------------------------------------------------------------------------
+
+class Histogram:
+    """Sparse log-bucketed histogram (mergeable, bounded by value range)."""
+
+    _log_growth = math.log(HISTOGRAM_GROWTH)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float, count: int = 1):
+        if count <= 0:
+            return
+        index = 0 if value <= HISTOGRAM_MIN_VALUE else \
+            math.ceil(math.log(value / HISTOGRAM_MIN_VALUE) / self._log_growth)
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for attr, pick in (("min", min), ("max", max)):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                mine = getattr(self, attr)
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+
+    def add_quantiles(self, points: List[Tuple[float, float]], count: int):
+        """Approximate `count` samples from (quantile, value) points, linear in between"""
+        points = sorted((q, v) for q, v in points if v is not None)
+        if count <= 0 or not points:
+            return
+        if len(points) == 1:
+            self.add(points[0][1], count)
+            return
+        added = 0
+        for (q1, v1), (q2, v2) in zip(points, points[1:]):
+            share = (q2 - q1) * count
+            for step in range(QUANTILE_SUBSTEPS):
+                target = int(round(q1 * count + share * (step + 1) / QUANTILE_SUBSTEPS))
+                n = min(target, count) - added
+                if n > 0:
+                    self.add(v1 + (v2 - v1) * (step + 0.5) / QUANTILE_SUBSTEPS, n)
+                    added += n
+        if added < count:
+            self.add(points[-1][1], count - added)
+
+    def value_at_rank(self, rank: int) -> Optional[float]:
+        """Representative value of the rank-th smallest sample (1-based)"""
+        if not self.count:
+            return None
+        rank = max(1, min(self.count, rank))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index == 0:
+                    value = HISTOGRAM_MIN_VALUE
+                else:
+                    value = HISTOGRAM_MIN_VALUE * HISTOGRAM_GROWTH ** (index - 0.5)
+                return round(min(max(value, self.min), self.max), 3)
+        return self.max
+
+    def percentile(self, pct: float) -> Optional[float]:
+        return self.value_at_rank(int(math.ceil(pct / 100.0 * self.count)))
+
+    def percentile_interval(self, pct: float, z: float) -> Tuple[Optional[float], Optional[float]]:
+        """Distribution-free confidence interval for a percentile (binomial order statistics)"""
+        if not self.count:
+            return None, None
+        q = pct / 100.0
+        center = q * self.count
+        spread = z * math.sqrt(self.count * q * (1 - q))
+        return (self.value_at_rank(int(math.floor(center - spread))),
+                self.value_at_rank(int(math.ceil(center + spread)) + 1))
+
+    def to_dict(self) -> Dict:
+        return {"n": self.count, "sum": round(self.total, 3),
+                "min": None if self.min is None else round(self.min, 3),
+                "max": None if self.max is None else round(self.max, 3),
+                "b": {str(k): v for k, v in sorted(self.buckets.items())}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Histogram":
+        histogram = cls()
+        histogram.count = data["n"]
+        histogram.total = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        histogram.buckets = {int(k): v for k, v in data["b"].items()}
+        return histogram
+
+
+# ---------------------------------------------------------------------------
+# Run aggregation
+# ---------------------------------------------------------------------------
+
+class RunAggregate:
+    """Per-metric, per-series accumulators for one benchmark run."""
+
+    def __init__(self):
+        self.types: Dict[str, str] = {}
+        self.series: Dict[str, Dict[str, object]] = {}
+        self.started: Optional[str] = None
+        self.ended: Optional[str] = None
+        self.points = 0
+        self._routes: Dict[Tuple[str, Optional[str]], Tuple[str, list]] = {}
+
+    def _route(self, metric: str, name: Optional[str]) -> Tuple[str, list]:
+        """Accumulators a (metric, name tag) point feeds: the aggregate plus its series"""
+        route = self._routes.get((metric, name))
+        if route is None:
+            keys = [""]
+            if name:
+                known = self.series.get(metric, {})
+                key = f"name:{name}"
+                keys.append(key if key in known or len(known) < MAX_SERIES_PER_METRIC else OTHER_SERIES)
+            route = (self.types.setdefault(metric, "trend"), [self._accumulator(metric, k) for k in keys])
+            self._routes[(metric, name)] = route
+        return route
+
+    def _accumulator(self, metric: str, key: str):
+        per_metric = self.series.setdefault(metric, {})
+        if key not in per_metric:
+            kind = self.types.get(metric, "trend")
+            if kind == "trend":
+                per_metric[key] = Histogram()
+            elif kind == "rate":
+                per_metric[key] = {"total": 0, "hits": 0}
+            elif kind == "gauge":
+                per_metric[key] = {"last": None, "max": None, "min": None}
+            else:
+                per_metric[key] = {"count": 0, "sum": 0.0}
+        return per_metric[key]
+
+    def add_point(self, metric: str, value: float, tags: Optional[Dict] = None,
+                  timestamp: Optional[str] = None):
+        self.points += 1
+        if timestamp:
+            if self.started is None or timestamp < self.started:
+                self.started = timestamp
+            if self.ended is None or timestamp > self.ended:
+                self.ended = timestamp
+        kind, accumulators = self._route(metric, tags.get("name") if tags else None)
+        for acc in accumulators:
+            if kind == "trend":
+                acc.add(value)
+            elif kind == "rate":
+                acc["total"] += 1
+                if value:
+                    acc["hits"] += 1
+            elif kind == "gauge":
+                acc["last"] = value
+                acc["max"] = value if acc["max"] is None else max(acc["max"], value)
+                acc["min"] = value if acc["min"] is None else min(acc["min"], value)
+            else:
+                acc["count"] += 1
+                acc["sum"] += value
+
+    def to_dict(self) -> Dict:
+        metrics = {}
+        for metric, per_series in self.series.items():
+            metrics[metric] = {
+                "type": self.types.get(metric, "trend"),
+                "series": {key: acc.to_dict() if isinstance(acc, Histogram) else acc
+                           for key, acc in per_series.items()},
+            }
+        return {"started": self.started, "ended": self.ended, "points": self.points, "metrics": metrics}
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_k6_points(path: Path) -> Iterator[Dict]:
+    """Stream the records of a k6 NDJSON output (malformed lines are skipped)"""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if not line.startswith(b"{"):
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # truncated last line of an interrupted run
+
+
+def ingest_k6(path: Path) -> Dict:
+    """Reduce a k6 `--out json` file to per-metric summaries in one streaming pass"""
+    run = RunAggregate()
+    for record in iter_k6_points(path):
+        kind = record.get("type")
+        data = record.get("data") or {}
+        if kind == "Metric":
+            run.types[record.get("metric") or data.get("name")] = data.get("type", "trend")
+        elif kind == "Point":
+            value = data.get("value")
+            if value is not None:
+                run.add_point(record.get("metric"), value, data.get("tags"), data.get("time"))
+    return run.to_dict()
+
+
+def _artillery_periods(report: Dict) -> List[Dict]:
+    periods = report.get("intermediate") or []
+    return periods if periods else [report.get("aggregate") or {}]
+
+
+def _artillery_quantile_points(summary: Dict) -> List[Tuple[float, float]]:
+    return [(q, summary.get(key, summary.get("median") if key == "p50" else None))
+            for key, q in ARTILLERY_QUANTILES]
+
+
+def ingest_artillery(path: Path) -> Dict:
+    """Reduce an artillery JSON report (v2 counters/summaries) to the same shape as k6"""
+    with _open_text(path) as f:
+        report = json.load(f)
+
+    run = RunAggregate()
+    run.types.update(http_req_duration="trend", http_req_failed="rate", http_reqs="counter")
+    for period in _artillery_periods(report):
+        for name, summary in (period.get("summaries") or {}).items():
+            if name == "http.response_time":
+                key = ""
+            elif name.startswith(ARTILLERY_ENDPOINT_PREFIX):
+                key = f"name:{name[len(ARTILLERY_ENDPOINT_PREFIX):]}"
+            else:
+                continue
+            histogram = run._accumulator("http_req_duration", key)
+            histogram.add_quantiles(_artillery_quantile_points(summary), int(summary.get("count", 0)))
+
+        counters = period.get("counters") or {}
+        requests = int(counters.get("http.requests", 0))
+        run.points += requests
+        failed = sum(int(v) for k, v in counters.items()
+                     if k.startswith("errors.") or (k.startswith("http.codes.") and k[11:12] in "45"))
+        failures = run._accumulator("http_req_failed", "")
+        failures["total"] += max(requests, failed)
+        failures["hits"] += failed
+        run._accumulator("http_reqs", "")["count"] += requests
+        run._accumulator("http_reqs", "")["sum"] += requests
+
+        stamp = period.get("firstMetricAt") or period.get("period")
+        if stamp:
+            stamp = datetime.fromtimestamp(int(stamp) / 1000).isoformat()
+            run.started = min(filter(None, [run.started, stamp]))
+            run.ended = max(filter(None, [run.ended, stamp]))
+    return run.to_dict()
+
+
+def detect_format(path: Path) -> str:
+    """'k6' for NDJSON metric streams, 'artillery' for JSON reports"""
+    with _open_text(path) as f:
+        head = f.read(4096)
+    first = head.lstrip()
+    if first.startswith("{") and '"type"' in first.split("\n", 1)[0] and '"metric"' in head:
+        return "k6"
+    if '"aggregate"' in head or '"intermediate"' in head:
+        return "artillery"
+    raise ValueError(f"Unrecognised benchmark output: {path}")
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class ResultsStore:
+    """gzip'd run files plus a small index under state/bench-results/."""
+
+    def __init__(self, state_dir: Path = STATE_DIR):
+        self.state_dir = Path(state_dir)
+        self.index_file = self.state_dir / INDEX_FILE_NAME
+
+    def load_index(self) -> List[Dict]:
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_index(self, index: List[Dict]):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.index_file)
+
+    def ingest(self, path: Path, label: Optional[str] = None, fmt: Optional[str] = None) -> Dict:
+        """Ingest one k6/artillery output and store it; returns the index entry"""
+        fmt = fmt or detect_format(path)
+        t0 = time.perf_counter()
+        run = ingest_k6(path) if fmt == "k6" else ingest_artillery(path)
+        index = self.load_index()
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S-") + f"{len(index) + 1:04d}"
+        entry = {
+            "run_id": run_id,
+            "label": label or path.stem.split(".")[0],
+            "source": fmt,
+            "file": str(path),
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+            "started": run["started"],
+            "ended": run["ended"],
+            "points": run["points"],
+            "metrics": sorted(run["metrics"]),
+            "ingest_seconds": round(time.perf_counter() - t0, 3),
+        }
+        run.update(run_id=run_id, label=entry["label"], source=fmt)
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        target = self.state_dir / f"{run_id}.json.gz"
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(run, f, separators=(",", ":"))
+        os.replace(tmp, target)
+
+        index.append(entry)
+        self._save_index(index)
+        return entry
+
+    def resolve(self, reference: str) -> Dict:
+        """
+        Find a run by id (or unique id prefix), "latest", or label.
+
+        "label" is the newest run with that label, "label~N" the Nth before it
+        (likewise "latest~N").
+        """
+        index = self.load_index()
+        name, _, back = reference.partition("~")
+        offset = int(back) if back else 0
+        if name == "latest":
+            candidates = index
+        else:
+            candidates = [e for e in index if e["label"] == name]
+            if not candidates:
+                candidates = [e for e in index if e["run_id"].startswith(name)]
+                if len(candidates) > 1:
+                    raise ValueError(f"Ambiguous run reference: {reference}")
+        if offset >= len(candidates):
+            raise ValueError(f"No run matches {reference!r}")
+        return candidates[-1 - offset]
+
+    def load(self, reference: str) -> Dict:
+        entry = self.resolve(reference)
+        with gzip.open(self.state_dir / f"{entry['run_id']}.json.gz", "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def prune(self, keep: int) -> int:
+        """Keep the newest `keep` runs per label; returns the number removed"""
+        index = self.load_index()
+        kept, removed, per_label = [], 0, {}
+        for entry in reversed(index):
+            per_label[entry["label"]] = per_label.get(entry["label"], 0) + 1
+            if per_label[entry["label"]] > keep:
+                (self.state_dir / f"{entry['run_id']}.json.gz").unlink(missing_ok=True)
+                removed += 1
+            else:
+                kept.append(entry)
+        self._save_index(list(reversed(kept)))
+        return removed
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def _normal_sf(z: float) -> float:
+    """Upper-tail probability of the standard normal"""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _z_for(alpha: float) -> float:
+    """Two-sided critical value for a (1 - alpha) interval (bisection on the normal tail)"""
+    low, high = 0.0, 10.0
+    for _ in range(60):
+        mid = (low + high) / 2
+        if 2 * _normal_sf(mid) > alpha:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def compare_runs(baseline: Dict, candidate: Dict, percentiles: List[float] = None,
+                 alpha: float = DEFAULT_ALPHA, min_effect: float = DEFAULT_MIN_EFFECT,
+                 min_rate_delta: float = DEFAULT_MIN_RATE_DELTA,
+                 metrics: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Compare every trend percentile and rate present in both runs.
+
+    Returns:
+        One row per (metric, series, statistic) with baseline/candidate values,
+        relative change, p-value or intervals and a verdict
+        ("regression", "improvement" or "unchanged")
+    """
+    percentiles = percentiles or DEFAULT_PERCENTILES
+    z = _z_for(alpha)
+    rows = []
+    for metric, base_metric in sorted(baseline["metrics"].items()):
+        cand_metric = candidate["metrics"].get(metric)
+        if cand_metric is None or (metrics and metric not in metrics):
+            continue
+        kind = base_metric["type"]
+        for key in sorted(set(base_metric["series"]) & set(cand_metric["series"])):
+            label = f"{metric}{{{key}}}" if key else metric
+            if kind == "trend":
+                base = Histogram.from_dict(base_metric["series"][key])
+                cand = Histogram.from_dict(cand_metric["series"][key])
+                for pct in percentiles:
+                    rows.append(_compare_percentile(label, base, cand, pct, z, min_effect))
+            elif kind == "rate":
+                rows.append(_compare_rate(label, metric, base_metric["series"][key],
+                                          cand_metric["series"][key], alpha, min_rate_delta))
+    return rows
+
+
+def _compare_percentile(label: str, base: Histogram, cand: Histogram, pct: float, z: float,
+                        min_effect: float) -> Dict:
+    b_value, c_value = base.percentile(pct), cand.percentile(pct)
+    b_low, b_high = base.percentile_interval(pct, z)
+    c_low, c_high = cand.percentile_interval(pct, z)
+    change = (c_value - b_value) / b_value if b_value else None
+    verdict = "unchanged"
+    if change is not None and abs(change) >= min_effect:
+        if c_low is not None and b_high is not None and c_low > b_high:
+            verdict = "regression"
+        elif c_high is not None and b_low is not None and c_high < b_low:
+            verdict = "improvement"
+    return {"metric": label, "stat": f"p{pct:g}", "baseline": b_value, "candidate": c_value,
+            "change": round(change, 4) if change is not None else None,
+            "baseline_ci": [b_low, b_high], "candidate_ci": [c_low, c_high],
+            "samples": [base.count, cand.count], "verdict": verdict}
+
+
+def _compare_rate(label: str, metric: str, base: Dict, cand: Dict, alpha: float,
+                  min_delta: float) -> Dict:
+    n1, n2 = base["total"], cand["total"]
+    p1 = base["hits"] / n1 if n1 else 0.0
+    p2 = cand["hits"] / n2 if n2 else 0.0
+    worse = (p1 - p2) if metric in HIGHER_IS_BETTER else (p2 - p1)
+    p_value = None
+    verdict = "unchanged"
+    if n1 and n2:
+        pooled = (base["hits"] + cand["hits"]) / (n1 + n2)
+        se = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+        if se > 0:
+            p_value = _normal_sf(worse / se)
+            if p_value < alpha and worse >= min_delta:
+                verdict = "regression"
+            elif 1 - p_value < alpha and -worse >= min_delta:
+                verdict = "improvement"
+    return {"metric": label, "stat": "rate", "baseline": round(p1, 5), "candidate": round(p2, 5),
+            "change": round(p2 - p1, 5), "p_value": round(p_value, 5) if p_value is not None else None,
+            "samples": [n1, n2], "verdict": verdict}
+
+
+def print_comparison(baseline: Dict, candidate: Dict, rows: List[Dict], show_all: bool = False):
+    print(f"Baseline:  {baseline['run_id']} ({baseline['label']}, {baseline['source']})")
+    print(f"Candidate: {candidate['run_id']} ({candidate['label']}, {candidate['source']})\n")
+    print(f"{'METRIC':<52}{'STAT':>6}{'BASELINE':>11}{'CANDIDATE':>11}{'CHANGE':>10}  VERDICT")
+    shown = 0
+    for row in rows:
+        if not show_all and row["verdict"] == "unchanged":
+            continue
+        shown += 1
+        if row["stat"] == "rate":
+            change = f"{row['change'] * 100:+.2f}pt"
+        else:
+            change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        mark = {"regression": "❌ regression", "improvement": "✅ improvement"}.get(row["verdict"], "~")
+        print(f"{row['metric'][:51]:<52}{row['stat']:>6}{row['baseline']!s:>11}"
+              f"{row['candidate']!s:>11}{change:>10}  {mark}")
+    if not shown:
+        print("  (no significant changes)")
+    regressions = sum(1 for row in rows if row["verdict"] == "regression")
+    print(f"\n{len(rows)} comparisons, {regressions} significant regressions")
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Store and compare k6/artillery benchmark results')
+    parser.add_argument('--state-dir', type=Path, default=STATE_DIR, help='Results store directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help='Ingest k6 NDJSON or artillery JSON output')
+    ingest.add_argument('files', nargs='+', type=Path)
+    ingest.add_argument('--label', help='Run label (default: file stem)')
+    ingest.add_argument('--format', choices=['k6', 'artillery'], help='Skip format detection')
+
+    sub.add_parser('list', help='List stored runs')
+
+    show = sub.add_parser('show', help='Summarize one run')
+    show.add_argument('run', help='Run id, label, label~N or latest')
+
+    compare = sub.add_parser('compare', help='Flag regressions of a candidate against a baseline')
+    compare.add_argument('baseline')
+    compare.add_argument('candidate')
+    compare.add_argument('--percentiles', default='95,99', help='Comma-separated percentiles')
+    compare.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='Significance level')
+    compare.add_argument('--min-effect', type=float, default=DEFAULT_MIN_EFFECT,
+                         help='Minimum relative percentile shift to flag')
+    compare.add_argument('--metric', action='append', help='Only compare these metrics')
+    compare.add_argument('--all', action='store_true', help='Show unchanged rows too')
+    compare.add_argument('--json', action='store_true', help='Print comparison rows as JSON')
+
+    prune = sub.add_parser('prune', help='Keep only the newest runs per label')
+    prune.add_argument('--keep', type=int, default=20)
+
+    args = parser.parse_args()
+    store = ResultsStore(args.state_dir)
+
+    try:
+        if args.command == 'ingest':
+            for path in args.files:
+                entry = store.ingest(path, args.label, args.format)
+                print(f"✅ {path} -> {entry['run_id']} ({entry['label']}, {entry['source']}, "
+                      f"{entry['points']} points, {len(entry['metrics'])} metrics, "
+                      f"{entry['ingest_seconds']}s)")
+        elif args.command == 'list':
+            for entry in store.load_index():
+                print(f"{entry['run_id']}  {entry['label']:<24}{entry['source']:<10}"
+                      f"{entry['points']:>10} points  {entry.get('started') or '-'}")
+        elif args.command == 'show':
+            run = store.load(args.run)
+            print(f"{run['run_id']} ({run['label']}, {run['source']}) {run['started']} -> {run['ended']}")
+            for metric, data in sorted(run["metrics"].items()):
+                for key, acc in sorted(data["series"].items()):
+                    label = f"{metric}{{{key}}}" if key else metric
+                    if data["type"] == "trend":
+                        h = Histogram.from_dict(acc)
+                        detail = (f"n={h.count} avg={h.total / h.count:.2f} p50={h.percentile(50)} "
+                                  f"p95={h.percentile(95)} p99={h.percentile(99)} max={h.max}")
+                    elif data["type"] == "rate":
+                        detail = f"rate={acc['hits'] / acc['total'] if acc['total'] else 0:.4f} n={acc['total']}"
+                    else:
+                        detail = ", ".join(f"{k}={v}" for k, v in acc.items())
+                    print(f"  {label:<60} {detail}")
+        elif args.command == 'compare':
+            baseline, candidate = store.load(args.baseline), store.load(args.candidate)
+            rows = compare_runs(baseline, candidate, [float(p) for p in args.percentiles.split(",")],
+                                args.alpha, args.min_effect, metrics=args.metric)
+            if args.json:
+                print(json.dumps(rows, indent=2))
+            else:
+                print_comparison(baseline, candidate, rows, args.all)
+            if any(row["verdict"] == "regression" for row in rows):
+                sys.exit(1)
+        elif args.command == 'prune':
+            print(f"Removed {store.prune(args.keep)} runs")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
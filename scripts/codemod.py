@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Parallel idempotent codemod runner for services/* and shared/*
+Replaces the one-off rewrite scripts (apply-apollo-sandbox-pattern.py,
+update-csrf-prevention.py, fix-package-names.py) that loop serially over a
+hand-maintained service list
+
+Transforms are registered with @transform and declare which files they
+target relative to each package (e.g. "src/main.ts", "package.json") plus an
+optional package predicate. Targets are discovered under services/* and
+shared/*, and every file is rewritten by all applicable transforms in one
+pass inside a process pool.
+
+A ledger (state/codemod/ledger.json) records, per transform version and
+file, the stat signature and SHA256 the file had after the transform last
+ran clean. On reruns those files are skipped on stat() alone, so repeating a
+rollout only touches files that changed since. Bumping a transform's version
+re-runs it everywhere.
+
+Usage:
+    python scripts/codemod.py --list
+    python scripts/codemod.py --dry-run                     # unified diff, no writes
+    python scripts/codemod.py -t csrf-prevention            # one transform
+    python scripts/codemod.py -t package-names -p finance -p hr
+    python scripts/codemod.py --force                       # ignore the ledger
+"""
+
+import argparse
+import difflib
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from compose_inventory import PROJECT_ROOT
+
+# Constants
+PACKAGE_ROOTS = ["services", "shared"]
+SKIP_DIRS = {"node_modules", "dist", "build", "coverage", ".turbo"}
+STATE_DIR = PROJECT_ROOT / "state" / "codemod"
+LEDGER_FILE = STATE_DIR / "ledger.json"
+
+# Below this many files a pool costs more than it saves
+MIN_PARALLEL_FILES = 16
+
+
+# ---------------------------------------------------------------------------
+# Transform registry
+# ---------------------------------------------------------------------------
+
+class Transform:
+    """A registered rewrite: fn(text, path) -> new text (return text unchanged when done)"""
+
+    def __init__(self, name: str, fn: Callable[[str, Path], str], targets: List[str],
+                 version: int, when: Optional[Callable[[Path], bool]], description: str):
+        self.name = name
+        self.fn = fn
+        self.targets = targets
+        self.version = version
+        self.when = when
+        self.description = description
+
+    @property
+    def ledger_key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+
+TRANSFORMS: Dict[str, Transform] = OrderedDict()
+
+
+def transform(name: str, targets: List[str], version: int = 1,
+              when: Optional[Callable[[Path], bool]] = None, description: str = ""):
+    """
+    Register a transform
+
+    Args:
+        name: Transform name used on the command line
+        targets: Glob patterns relative to each package directory
+        version: Bump when the rewrite changes, so the ledger re-runs it
+        when: Optional predicate on the package directory
+        description: One-line summary for --list
+    """
+    def register(fn):
+        TRANSFORMS[name] = Transform(name, fn, targets, version, when, description or fn.__doc__ or "")
+        return fn
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Built-in transforms
+# ---------------------------------------------------------------------------
+
+def is_graphql_package(package: Path) -> bool:
+    """Package whose root module wires up GraphQLModule"""
+    try:
+        return "GraphQLModule" in (package / "src" / "app.module.ts").read_text(encoding="utf-8")
+    except OSError:
+        return False
+
+
+EXPRESS_IMPORT = "import * as express from 'express';"
+EXPRESS_MIDDLEWARE = '''
+
+  // Explicitly add Express body parsing middleware
+  // Required for Apollo Sandbox landing page to work properly
+  const httpAdapter = app.getHttpAdapter();
+  if (httpAdapter.getType() === 'express') {
+    const expressApp = httpAdapter.getInstance();
+    expressApp.use(express.json());
+    expressApp.use(express.urlencoded({ extended: true }));
+  }'''
+IMPORT_PATTERN = re.compile(r"(import .+ from .+;)\n")
+APP_CREATE_PATTERN = re.compile(r"(const app = await NestFactory\.create\(AppModule\);)")
+
+
+@transform("apollo-express-middleware", ["src/main.ts"], when=is_graphql_package,
+           description="Express body parsing in main.ts for the Apollo Sandbox landing page")
+def apollo_express_middleware(text: str, path: Path) -> str:
+    if "express.json()" in text or not APP_CREATE_PATTERN.search(text):
+        return text
+    if EXPRESS_IMPORT not in text:
+        imports = list(IMPORT_PATTERN.finditer(text))
+        if imports:
+            pos = imports[-1].end()
+            text = text[:pos] + "\n" + EXPRESS_IMPORT + "\n" + text[pos:]
+    return APP_CREATE_PATTERN.sub(lambda m: m.group(1) + EXPRESS_MIDDLEWARE, text, count=1)
+
+
+@transform("apollo-express-dependency", ["package.json"], when=is_graphql_package,
+           description="express dependency (after class-validator) for the Apollo Sandbox pattern")
+def apollo_express_dependency(text: str, path: Path) -> str:
+    pkg = json.loads(text, object_pairs_hook=OrderedDict)
+    deps = pkg.get("dependencies", OrderedDict())
+    if "express" in deps:
+        return text
+
+    new_deps = OrderedDict()
+    for key, value in deps.items():
+        new_deps[key] = value
+        if key == "class-validator":
+            new_deps["express"] = "^4.18.2"
+    new_deps.setdefault("express", "^4.18.2")
+    pkg["dependencies"] = new_deps
+    return json.dumps(pkg, indent=2, ensure_ascii=False) + "\n"
+
+
+CSRF_PATTERN = re.compile(
+    r"^([ \t]*)(plugins:\s*\[ApolloServerPluginLandingPageLocalDefault\(\)\],)[ \t]*\n", re.MULTILINE)
+
+
+@transform("csrf-prevention", ["src/app.module.ts"], when=is_graphql_package,
+           description="csrfPrevention: false next to inline Apollo landing-page plugins")
+def csrf_prevention(text: str, path: Path) -> str:
+    if "csrfPrevention" in text:
+        return text
+    return CSRF_PATTERN.sub(r"\1\2\n\1csrfPrevention: false, // Required for Apollo Sandbox\n", text)
+
+
+PACKAGE_RENAMES = {
+    '"@vextrus/shared-kernel"': '"@vextrus/kernel"',
+    '"@vextrus/shared-contracts"': '"@vextrus/contracts"',
+    '"@vextrus/shared-utils"': '"@vextrus/utils"',
+}
+
+
+@transform("package-names", ["package.json"],
+           description="Rename @vextrus/shared-* references to the published package names")
+def package_names(text: str, path: Path) -> str:
+    for old, new in PACKAGE_RENAMES.items():
+        text = text.replace(old, new)
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Ledger
+# ---------------------------------------------------------------------------
+
+def load_ledger() -> Dict[str, Dict[str, List]]:
+    """transform@version -> {relative path: [mtime_ns, size, sha256]}"""
+    try:
+        with open(LEDGER_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_ledger(ledger: Dict) -> None:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = LEDGER_FILE.with_name(f".ledger.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(ledger, f, indent=1, sort_keys=True)
+    os.replace(tmp, LEDGER_FILE)
+
+
+def _signature(path: Path) -> List[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+def discover_packages(selected: Optional[List[str]] = None) -> List[Path]:
+    """Package directories under services/ and shared/, optionally filtered by name glob"""
+    packages = []
+    for root in PACKAGE_ROOTS:
+        base = PROJECT_ROOT / root
+        if not base.is_dir():
+            continue
+        for package in sorted(p for p in base.iterdir() if p.is_dir()):
+            if selected and not any(
+                    fnmatch.fnmatch(package.name, pat) or fnmatch.fnmatch(f"{root}/{package.name}", pat)
+                    for pat in selected):
+                continue
+            packages.append(package)
+    return packages
+
+
+def _glob(package: Path, pattern: str) -> List[Path]:
+    return [p for p in package.glob(pattern)
+            if p.is_file() and not SKIP_DIRS.intersection(p.relative_to(package).parts)]
+
+
+def plan(transforms: List[Transform], packages: List[Path], ledger: Dict,
+         force: bool = False) -> Tuple[Dict[Path, List[str]], int]:
+    """
+    Map each target file to the transforms that still need to run on it
+
+    Returns:
+        (file -> transform names, number of (file, transform) pairs skipped via ledger)
+    """
+    work: Dict[Path, List[str]] = OrderedDict()
+    skipped = 0
+    for package in packages:
+        for t in transforms:
+            if t.when is not None and not t.when(package):
+                continue
+            seen = ledger.get(t.ledger_key, {})
+            for path in [p for pattern in t.targets for p in _glob(package, pattern)]:
+                rel = path.relative_to(PROJECT_ROOT).as_posix()
+                recorded = seen.get(rel)
+                if not force and recorded is not None and recorded[:2] == _signature(path):
+                    skipped += 1
+                    continue
+                work.setdefault(path, []).append(t.name)
+    return work, skipped
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def apply_file(path: str, names: List[str], dry_run: bool) -> Dict:
+    """
+    Run transforms over one file (executes in a worker process)
+
+    Returns:
+        {path, changed, applied, diff, signature, sha256, error}
+    """
+    result = {"path": path, "changed": False, "applied": [], "diff": None,
+              "signature": None, "sha256": None, "error": None}
+    target = Path(path)
+    try:
+        original = target.read_text(encoding="utf-8")
+        text = original
+        for name in names:
+            updated = TRANSFORMS[name].fn(text, target)
+            if updated != text:
+                result["applied"].append(name)
+                text = updated
+
+        if text != original:
+            result["changed"] = True
+            rel = target.relative_to(PROJECT_ROOT).as_posix()
+            if dry_run:
+                result["diff"] = "".join(difflib.unified_diff(
+                    original.splitlines(keepends=True), text.splitlines(keepends=True),
+                    fromfile=f"a/{rel}", tofile=f"b/{rel}"))
+                return result
+            tmp = target.with_name(f".{target.name}.codemod.tmp")
+            with open(tmp, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            os.chmod(tmp, target.stat().st_mode & 0o7777)
+            os.replace(tmp, target)
+
+        result["signature"] = _signature(target)
+        result["sha256"] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _apply_batch(batch: List[Tuple[str, List[str], bool]]) -> List[Dict]:
+    return [apply_file(*task) for task in batch]
+
+
+def run(transforms: List[Transform], packages: List[Path], dry_run: bool = False,
+        force: bool = False, jobs: int = 0) -> Dict:
+    """
+    Apply transforms to all target files and update the ledger
+
+    Args:
+        transforms: Transforms to run
+        packages: Package directories to scan
+        dry_run: Produce diffs instead of writing files (the ledger is left untouched)
+        force: Ignore ledger records
+        jobs: Worker processes (0 = CPU count)
+
+    Returns:
+        Summary with per-file results
+    """
+    start = time.perf_counter()
+    ledger = load_ledger()
+    work, skipped = plan(transforms, packages, ledger, force)
+    tasks = [(str(path), names, dry_run) for path, names in work.items()]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) >= MIN_PARALLEL_FILES:
+        # One batch per worker-slot multiple keeps IPC overhead per file low
+        size = max(1, len(tasks) // (jobs * 4))
+        batches = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = [r for batch in pool.map(_apply_batch, batches) for r in batch]
+    else:
+        results = _apply_batch(tasks)
+
+    if not dry_run:
+        # Only record files that are now clean
+        for r in results:
+            if r["error"]:
+                continue
+            rel = Path(r["path"]).relative_to(PROJECT_ROOT).as_posix()
+            for name in work[Path(r["path"])]:
+                ledger.setdefault(TRANSFORMS[name].ledger_key, {})[rel] = r["signature"] + [r["sha256"]]
+        save_ledger(ledger)
+
+    return {
+        "files_scanned": len(tasks),
+        "pairs_skipped": skipped,
+        "changed": [r for r in results if r["changed"]],
+        "errors": [r for r in results if r["error"]],
+        "elapsed_s": time.perf_counter() - start,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel idempotent codemods over services/* and shared/*")
+    parser.add_argument("-t", "--transform", action="append",
+                        help="Transform to run (repeatable, default: all)")
+    parser.add_argument("-p", "--package", action="append",
+                        help="Package name or glob, e.g. finance or 'shared/*' (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Print a unified diff instead of writing")
+    parser.add_argument("--force", action="store_true", help="Ignore the ledger and re-check every file")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes (default: CPU count)")
+    parser.add_argument("--list", action="store_true", help="List registered transforms")
+    args = parser.parse_args()
+
+    if args.list:
+        for t in TRANSFORMS.values():
+            scope = " (GraphQL packages)" if t.when is is_graphql_package else ""
+            print(f"  {t.name:<28} v{t.version}  {', '.join(t.targets)}{scope}")
+            print(f"  {'':<28}     {t.description}")
+        return
+
+    names = args.transform or list(TRANSFORMS)
+    unknown = [n for n in names if n not in TRANSFORMS]
+    if unknown:
+        print(f"Error: unknown transform(s): {', '.join(unknown)} (see --list)")
+        sys.exit(2)
+
+    packages = discover_packages(args.package)
+    if not packages:
+        print("Error: no packages matched")
+        sys.exit(2)
+
+    summary = run([TRANSFORMS[n] for n in names], packages, args.dry_run, args.force, args.jobs)
+
+    if args.dry_run:
+        for r in summary["changed"]:
+            sys.stdout.write(r["diff"])
+
+    out = sys.stderr if args.dry_run else sys.stdout
+    for r in summary["changed"]:
+        rel = Path(r["path"]).relative_to(PROJECT_ROOT).as_posix()
+        verb = "Would update" if args.dry_run else "Updated"
+        print(f"[OK] {verb} {rel} ({', '.join(r['applied'])})", file=out)
+    for r in summary["errors"]:
+        rel = Path(r["path"]).relative_to(PROJECT_ROOT).as_posix()
+        print(f"[ERROR] {rel}: {r['error']}", file=out)
+    print(f"\n{len(summary['changed'])} changed, {summary['files_scanned']} files checked, "
+          f"{summary['pairs_skipped']} unchanged (ledger), {len(summary['errors'])} errors "
+          f"in {summary['elapsed_s']:.2f}s across {len(packages)} packages", file=out)
+
+    if summary["errors"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
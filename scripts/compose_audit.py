@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Compose resource and healthcheck auditor
+Builds a structured resource model from the docker-compose files (parsed
+once via compose_inventory) and reports what bites in production:
+
+- services without memory / CPU limits, reservations above limits
+- heap settings that do not fit the container: NODE_OPTIONS
+  --max-old-space-size and JVM -Xmx (JAVA_OPTS, ES_JAVA_OPTS,
+  KAFKA_HEAP_OPTS, ...) from the compose environment or, failing that,
+  the ENV instructions of the Dockerfile stage the service builds
+  (build.target, else the last stage, and the stages it is built FROM)
+- aggressive healthchecks (short interval, timeout >= interval, no
+  start_period on services built from this repo)
+- total limits and reservations (x replicas) versus host capacity
+
+Exit code is 1 when any finding has severity "error", so the audit can gate CI.
+
+Usage:
+    python scripts/compose_audit.py
+    python scripts/compose_audit.py --files docker-compose.yml docker-compose.prod.yml
+    python scripts/compose_audit.py --host-cpus 8 --host-memory 32g --json
+"""
+
+import argparse
+import json
+import os
+import re
+import shlex
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from compose_inventory import COMPOSE_FILES, PROJECT_ROOT, environment_dict, load_services
+
+# Constants
+MIB = 1024 * 1024
+UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": MIB, "mb": MIB,
+         "g": 1024 * MIB, "gb": 1024 * MIB}
+
+# Docker's healthcheck defaults when a field is omitted
+HEALTHCHECK_DEFAULTS = {"interval": 30.0, "timeout": 30.0, "retries": 3, "start_period": 0.0}
+
+MIN_HEALTHCHECK_INTERVAL_S = 10.0
+# Services built from this repo need this long before failing retries mark them unhealthy
+MIN_APP_GRACE_S = 60.0
+# Heap beyond this share of the limit leaves too little for stacks, buffers and native memory
+HEAP_LIMIT_WARN_RATIO = 0.75
+
+HEAP_ENV_VARS = ["JAVA_OPTS", "JAVA_TOOL_OPTIONS", "ES_JAVA_OPTS", "KAFKA_HEAP_OPTS",
+                 "_JAVA_OPTIONS", "JVM_OPTS", "HEAP_OPTS"]
+NODE_HEAP_PATTERN = re.compile(r"--max[-_]old[-_]space[-_]size[=\s]+(\d+)")
+JVM_XMX_PATTERN = re.compile(r"-Xmx(\d+)([kKmMgG]?)")
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(us|ms|s|m|h)")
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*$")
+
+
+# ---------------------------------------------------------------------------
+# Value parsing
+# ---------------------------------------------------------------------------
+
+def parse_memory(value) -> Optional[int]:
+    """'1024M', '1g', '512mb', 1073741824 -> bytes"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    m = SIZE_PATTERN.match(str(value))
+    if not m or m.group(2).lower() not in UNITS:
+        return None
+    return int(float(m.group(1)) * UNITS[m.group(2).lower()])
+
+
+def parse_cpus(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_duration(value) -> Optional[float]:
+    """Compose duration ('1m30s', '500ms', '10s') -> seconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    parts = DURATION_PART.findall(text)
+    if not parts or "".join(n + u for n, u in parts) != text:
+        return None
+    scale = {"us": 1e-6, "ms": 1e-3, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * scale[u] for n, u in parts)
+
+
+def format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "-"
+    if value >= 1024 * MIB and value % (1024 * MIB) == 0:
+        return f"{value // (1024 * MIB)}G"
+    return f"{value / MIB:.0f}M"
+
+
+def format_seconds(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:g}s"
+
+
+# ---------------------------------------------------------------------------
+# Dockerfile ENV
+# ---------------------------------------------------------------------------
+
+_dockerfile_cache: Dict[str, List[Dict]] = {}
+
+FROM_PATTERN = re.compile(r"^FROM\s+(?:--\S+\s+)*(\S+)(?:\s+AS\s+(\S+))?\s*$", re.IGNORECASE)
+
+
+def dockerfile_stages(path: Path) -> List[Dict]:
+    """Build stages in order: {"name", "base", "env"} (ENV: last assignment wins; ${VAR} left as-is)"""
+    key = str(path)
+    if key in _dockerfile_cache:
+        return _dockerfile_cache[key]
+
+    stages: List[Dict] = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        _dockerfile_cache[key] = stages
+        return stages
+
+    instruction = ""
+    for line in lines + [""]:
+        stripped = line.strip()
+        if instruction and stripped.startswith("#"):
+            continue  # comment inside a continuation
+        instruction += " " + stripped.rstrip("\\") if instruction else stripped.rstrip("\\")
+        if stripped.endswith("\\"):
+            continue
+        m = FROM_PATTERN.match(instruction)
+        if m:
+            stages.append({"name": (m.group(2) or "").lower(), "base": m.group(1).lower(), "env": {}})
+        elif instruction[:4].upper() == "ENV " and stages:
+            env = stages[-1]["env"]
+            body = instruction[4:].strip()
+            try:
+                tokens = shlex.split(body)
+            except ValueError:
+                tokens = []
+            if tokens and "=" not in tokens[0]:
+                env[tokens[0]] = " ".join(tokens[1:])  # legacy "ENV KEY value"
+            else:
+                for token in tokens:
+                    name, _, value = token.partition("=")
+                    env[name] = value
+        instruction = ""
+
+    _dockerfile_cache[key] = stages
+    return stages
+
+
+def dockerfile_env(path: Path, target: Optional[str] = None) -> Dict[str, str]:
+    """
+    ENV of the image a build produces: the target stage (the last stage when
+    no target is given) plus the stages it is built FROM, base first
+    """
+    stages = dockerfile_stages(path)
+    if not stages:
+        return {}
+
+    by_name = {stage["name"]: i for i, stage in enumerate(stages) if stage["name"]}
+    index = by_name.get(target.lower(), len(stages) - 1) if target else len(stages) - 1
+
+    chain = []
+    while index is not None and index not in chain:
+        chain.append(index)
+        base = by_name.get(stages[index]["base"])
+        index = base if base is not None and base < index else None
+
+    env: Dict[str, str] = {}
+    for i in reversed(chain):
+        env.update(stages[i]["env"])
+    return env
+
+
+def dockerfile_path(definition: Dict, root: Path) -> Optional[Path]:
+    build = definition.get("build")
+    if not build:
+        return None
+    if isinstance(build, str):
+        return root / build / "Dockerfile"
+    context = root / str(build.get("context", "."))
+    return context / str(build.get("dockerfile", "Dockerfile"))
+
+
+# ---------------------------------------------------------------------------
+# Resource model
+# ---------------------------------------------------------------------------
+
+def heap_settings(env: Dict[str, str]) -> Dict[str, Optional[int]]:
+    """Node old-space and JVM -Xmx ceilings (bytes) from an environment"""
+    node = None
+    m = NODE_HEAP_PATTERN.search(env.get("NODE_OPTIONS", ""))
+    if m:
+        node = int(m.group(1)) * MIB
+
+    jvm = None
+    for name in HEAP_ENV_VARS:
+        for size, unit in JVM_XMX_PATTERN.findall(env.get(name, "")):
+            jvm = int(size) * UNITS[unit.lower()]  # last -Xmx wins, as in the JVM
+    return {"node_heap": node, "jvm_heap": jvm}
+
+
+def healthcheck_timings(definition: Dict) -> Optional[Dict]:
+    healthcheck = definition.get("healthcheck")
+    if not healthcheck or healthcheck.get("disable"):
+        return None
+    timings = {}
+    for field, default in HEALTHCHECK_DEFAULTS.items():
+        raw = healthcheck.get(field)
+        if field == "retries":
+            timings[field] = int(raw) if raw is not None else default
+        else:
+            parsed = parse_duration(raw)
+            timings[field] = parsed if parsed is not None else default
+    # Worst-case time from start until the container is reported unhealthy
+    timings["grace"] = timings["start_period"] + timings["interval"] * timings["retries"]
+    return timings
+
+
+def service_model(name: str, definition: Dict, root: Path = PROJECT_ROOT) -> Dict:
+    """Structured resource record for one merged service definition"""
+    deploy = definition.get("deploy") or {}
+    resources = deploy.get("resources") or {}
+    limits = resources.get("limits") or {}
+    reservations = resources.get("reservations") or {}
+
+    env = environment_dict(definition)
+    heap = heap_settings(env)
+    heap_source = "compose" if any(heap.values()) else None
+    dockerfile = dockerfile_path(definition, root)
+    if not any(heap.values()) and dockerfile is not None:
+        target = definition["build"].get("target") if isinstance(definition["build"], dict) else None
+        heap = heap_settings(dockerfile_env(dockerfile, target))
+        if any(heap.values()):
+            heap_source = str(dockerfile.relative_to(root)) if dockerfile.is_relative_to(root) else str(dockerfile)
+
+    return {
+        "name": name,
+        "sources": definition.get("_sources", []),
+        "built": bool(definition.get("build")),
+        "replicas": int(deploy.get("replicas", 1) or 1),
+        # Legacy v2 keys (mem_limit, cpus, mem_reservation) still honoured by compose
+        "cpu_limit": parse_cpus(limits.get("cpus", definition.get("cpus"))),
+        "memory_limit": parse_memory(limits.get("memory", definition.get("mem_limit"))),
+        "cpu_reservation": parse_cpus(reservations.get("cpus")),
+        "memory_reservation": parse_memory(reservations.get("memory", definition.get("mem_reservation"))),
+        "node_heap": heap["node_heap"],
+        "jvm_heap": heap["jvm_heap"],
+        "heap_source": heap_source,
+        "healthcheck": healthcheck_timings(definition),
+    }
+
+
+def build_model(root: Path = PROJECT_ROOT, files: List[str] = None) -> Dict[str, Dict]:
+    """Service name -> resource record, from the merged compose files"""
+    return {name: service_model(name, definition, root)
+            for name, definition in load_services(root, files).items()}
+
+
+# ---------------------------------------------------------------------------
+# Audit
+# ---------------------------------------------------------------------------
+
+def _finding(severity: str, service: str, message: str) -> Dict:
+    return {"severity": severity, "service": service, "message": message}
+
+
+def audit_service(s: Dict) -> List[Dict]:
+    """Findings for one service record"""
+    findings = []
+    name = s["name"]
+
+    missing = [label for label, field in (("memory", "memory_limit"), ("CPU", "cpu_limit")) if s[field] is None]
+    if missing:
+        findings.append(_finding("warning", name, f"no {' or '.join(missing)} limit"))
+    if s["memory_limit"] and s["memory_reservation"] and s["memory_reservation"] > s["memory_limit"]:
+        findings.append(_finding("error", name, f"memory reservation {format_bytes(s['memory_reservation'])} "
+                                                f"exceeds limit {format_bytes(s['memory_limit'])}"))
+    if s["cpu_limit"] and s["cpu_reservation"] and s["cpu_reservation"] > s["cpu_limit"]:
+        findings.append(_finding("error", name, f"CPU reservation {s['cpu_reservation']:g} "
+                                                f"exceeds limit {s['cpu_limit']:g}"))
+
+    for kind, label in (("node_heap", "NODE_OPTIONS --max-old-space-size"), ("jvm_heap", "JVM -Xmx")):
+        heap = s[kind]
+        if heap is None or s["memory_limit"] is None:
+            continue
+        where = f" ({s['heap_source']})" if s["heap_source"] != "compose" else ""
+        ratio = heap / s["memory_limit"]
+        if ratio > 1:
+            findings.append(_finding("error", name, f"{label} {format_bytes(heap)}{where} exceeds memory "
+                                                    f"limit {format_bytes(s['memory_limit'])} - OOM-kill before GC"))
+        elif ratio > HEAP_LIMIT_WARN_RATIO:
+            findings.append(_finding("warning", name, f"{label} {format_bytes(heap)}{where} is {ratio:.0%} of "
+                                                      f"memory limit {format_bytes(s['memory_limit'])}"))
+
+    hc = s["healthcheck"]
+    if hc is None:
+        if s["built"]:
+            findings.append(_finding("info", name, "no healthcheck"))
+        return findings
+    if hc["interval"] < MIN_HEALTHCHECK_INTERVAL_S:
+        findings.append(_finding("warning", name, f"healthcheck interval {format_seconds(hc['interval'])} "
+                                                  f"< {MIN_HEALTHCHECK_INTERVAL_S:g}s"))
+    if hc["timeout"] >= hc["interval"]:
+        findings.append(_finding("warning", name, f"healthcheck timeout {format_seconds(hc['timeout'])} "
+                                                  f">= interval {format_seconds(hc['interval'])}"))
+    if s["built"] and hc["start_period"] == 0 and hc["grace"] < MIN_APP_GRACE_S:
+        findings.append(_finding("warning", name, f"no start_period; unhealthy after {format_seconds(hc['grace'])} "
+                                                  f"of startup"))
+    return findings
+
+
+def host_capacity() -> Dict[str, Optional[float]]:
+    """CPU count and physical memory of this machine (memory None if unknown)"""
+    memory = None
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        pass
+    return {"cpus": float(os.cpu_count() or 1), "memory": memory}
+
+
+def totals(model: Dict[str, Dict]) -> Dict:
+    """Summed limits/reservations (x replicas) and how many services are unbounded"""
+    result = {"cpu_limit": 0.0, "memory_limit": 0, "cpu_reservation": 0.0, "memory_reservation": 0,
+              "unbounded_cpu": [], "unbounded_memory": []}
+    for s in model.values():
+        replicas = s["replicas"]
+        for field in ("cpu_limit", "memory_limit", "cpu_reservation", "memory_reservation"):
+            if s[field]:
+                result[field] += s[field] * replicas
+        if s["cpu_limit"] is None:
+            result["unbounded_cpu"].append(s["name"])
+        if s["memory_limit"] is None:
+            result["unbounded_memory"].append(s["name"])
+    return result
+
+
+def audit(model: Dict[str, Dict], host: Dict) -> Dict:
+    """Run all checks; returns findings and totals versus host capacity"""
+    findings = [f for s in model.values() for f in audit_service(s)]
+    total = totals(model)
+
+    if host.get("memory"):
+        if total["memory_reservation"] > host["memory"]:
+            findings.append(_finding("error", "*", f"memory reservations {format_bytes(total['memory_reservation'])} "
+                                                   f"exceed host memory {format_bytes(host['memory'])}"))
+        if total["memory_limit"] > host["memory"]:
+            findings.append(_finding("warning", "*", f"memory limits {format_bytes(total['memory_limit'])} "
+                                                     f"overcommit host memory {format_bytes(host['memory'])} "
+                                                     f"({total['memory_limit'] / host['memory']:.1f}x)"))
+    if host.get("cpus"):
+        if total["cpu_reservation"] > host["cpus"]:
+            findings.append(_finding("error", "*", f"CPU reservations {total['cpu_reservation']:g} "
+                                                   f"exceed host CPUs {host['cpus']:g}"))
+        if total["cpu_limit"] > host["cpus"]:
+            findings.append(_finding("info", "*", f"CPU limits {total['cpu_limit']:g} overcommit "
+                                                  f"host CPUs {host['cpus']:g}"))
+    return {"findings": findings, "totals": total, "host": host}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+SEVERITY_ORDER = {"error": 0, "warning": 1, "info": 2}
+SEVERITY_TAGS = {"error": "[ERROR]", "warning": "[WARN] ", "info": "[INFO] "}
+
+
+def print_report(model: Dict[str, Dict], result: Dict) -> None:
+    print(f"{'SERVICE':<24}{'REPL':>5}{'CPU LIM':>9}{'MEM LIM':>9}{'CPU RES':>9}{'MEM RES':>9}"
+          f"{'HEAP':>8}  {'HEALTHCHECK (interval/timeout/retries/start)'}")
+    for s in sorted(model.values(), key=lambda r: r["name"]):
+        heap = s["node_heap"] or s["jvm_heap"]
+        hc = s["healthcheck"]
+        hc_text = (f"{format_seconds(hc['interval'])}/{format_seconds(hc['timeout'])}/"
+                   f"{hc['retries']}/{format_seconds(hc['start_period'])}") if hc else "-"
+        cpu_lim = f"{s['cpu_limit']:g}" if s["cpu_limit"] else "-"
+        cpu_res = f"{s['cpu_reservation']:g}" if s["cpu_reservation"] else "-"
+        print(f"{s['name']:<24}{s['replicas']:>5}{cpu_lim:>9}{format_bytes(s['memory_limit']):>9}"
+              f"{cpu_res:>9}{format_bytes(s['memory_reservation']):>9}{format_bytes(heap):>8}  {hc_text}")
+
+    total, host = result["totals"], result["host"]
+    print(f"\nRequested: limits {total['cpu_limit']:g} CPU / {format_bytes(total['memory_limit'])}, "
+          f"reservations {total['cpu_reservation']:g} CPU / {format_bytes(total['memory_reservation'])}")
+    print(f"Host:      {host['cpus']:g} CPU / {format_bytes(host['memory'])}")
+    print(f"Unbounded: {len(total['unbounded_memory'])}/{len(model)} services without a memory limit, "
+          f"{len(total['unbounded_cpu'])} without a CPU limit")
+
+    findings = sorted(result["findings"], key=lambda f: (SEVERITY_ORDER[f["severity"]], f["service"]))
+    if findings:
+        print()
+    for f in findings:
+        print(f"{SEVERITY_TAGS[f['severity']]} {f['service']}: {f['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit compose resource limits, heap sizing and healthchecks")
+    parser.add_argument("--files", nargs="+", default=COMPOSE_FILES,
+                        help=f"Compose files merged in order (default: {' '.join(COMPOSE_FILES)})")
+    parser.add_argument("--host-cpus", type=float, help="Host CPU count (default: this machine)")
+    parser.add_argument("--host-memory", help="Host memory, e.g. 32g (default: this machine)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    host = host_capacity()
+    if args.host_cpus:
+        host["cpus"] = args.host_cpus
+    if args.host_memory:
+        host["memory"] = parse_memory(args.host_memory)
+        if host["memory"] is None:
+            print(f"Error: invalid --host-memory '{args.host_memory}'")
+            sys.exit(2)
+
+    model = build_model(PROJECT_ROOT, args.files)
+    if not model:
+        print(f"Error: no services found in {', '.join(args.files)}")
+        sys.exit(2)
+    result = audit(model, host)
+
+    if args.json:
+        print(json.dumps({"services": list(model.values()), **result}, indent=2))
+    else:
+        print_report(model, result)
+
+    sys.exit(1 if any(f["severity"] == "error" for f in result["findings"]) else 0)
+
+
+if __name__ == '__main__':
+    main()
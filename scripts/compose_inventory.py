@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Service inventory discovered from the docker-compose files
+Parses docker-compose.yml, docker-compose.prod.yml and docker-compose.monitoring.yml
+
+Derives, per service: published host port, container port, healthcheck
+URL path, depends_on and the raw service definition (used by the health
+prober, monitor and startup tooling instead of hard-coded service lists).
+
+Parsing uses a small line-based YAML-subset reader that covers what the
+compose files use (block maps, block/flow sequences, quoted scalars,
+comments), so no YAML library is required. Parsed files are cached on
+(mtime, size) - repeated discovery within one process is free until a
+compose file changes.
+
+Usage:
+    python scripts/compose_inventory.py [--all] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+COMPOSE_FILES = [
+    "docker-compose.yml",
+    "docker-compose.prod.yml",
+    "docker-compose.monitoring.yml",
+]
+
+# Images whose published port speaks a known non-HTTP protocol
+PROTOCOL_IMAGES = {
+    "postgres": "postgres",
+    "redis": "redis",
+    "confluentinc/cp-kafka": "kafka",
+    "bitnami/kafka": "kafka",
+}
+
+ACRONYMS = {"api", "crm", "hr", "scm"}
+
+KEY_PATTERN = re.compile(r'^("[^"]*"|\'[^\']*\'|[^\s"\'#][^:#]*?):(?:\s+|$)')
+URL_PATTERN = re.compile(r'https?://[^/\s:"\']+(?::(\d+))?(/[^\s"\'\)]*)?')
+
+_parse_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+
+# ---------------------------------------------------------------------------
+# YAML subset reader
+# ---------------------------------------------------------------------------
+
+def _strip_comment(line: str) -> str:
+    """Drop a trailing # comment that is not inside quotes"""
+    quote = None
+    escaped = False
+    for i, ch in enumerate(line):
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\" and quote == '"':
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "#" and (i == 0 or line[i - 1] in " \t"):
+            return line[:i].rstrip()
+    return line.rstrip()
+
+
+def _split_flow(body: str) -> List[str]:
+    """Split a flow collection body on top-level commas"""
+    parts, depth, quote, current = [], 0, None, ""
+    escaped = False
+    for ch in body:
+        if quote:
+            current += ch
+            if escaped:
+                escaped = False
+            elif ch == "\\" and quote == '"':
+                escaped = True
+            elif ch == quote:
+                quote = None
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def parse_scalar(text: str) -> Any:
+    """Convert a scalar or flow collection to a Python value"""
+    text = text.strip()
+    if not text:
+        return None
+    if text[0] == "[" and text[-1] == "]":
+        return [parse_scalar(part) for part in _split_flow(text[1:-1])]
+    if text[0] == "{" and text[-1] == "}":
+        result = {}
+        for part in _split_flow(text[1:-1]):
+            key, _, value = part.partition(":")
+            result[parse_scalar(key)] = parse_scalar(value)
+        return result
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1].replace("''", "'")
+    if text in ("null", "~"):
+        return None
+    if text in ("true", "True"):
+        return True
+    if text in ("false", "False"):
+        return False
+    if re.fullmatch(r"-?\d+", text):
+        return int(text)
+    return text
+
+
+class _Reader:
+    """Recursive-descent reader over (indent, text) lines."""
+
+    def __init__(self, text: str):
+        self.lines: List[Tuple[int, str]] = []
+        for raw in text.splitlines():
+            stripped = _strip_comment(raw)
+            if not stripped.strip() or stripped.strip() == "---":
+                continue
+            indent = len(stripped) - len(stripped.lstrip(" "))
+            self.lines.append((indent, stripped.strip()))
+        self.pos = 0
+
+    def _peek(self) -> Optional[Tuple[int, str]]:
+        return self.lines[self.pos] if self.pos < len(self.lines) else None
+
+    def parse(self) -> Any:
+        first = self._peek()
+        if first is None:
+            return {}
+        return self._node(first[0])
+
+    def _node(self, indent: int) -> Any:
+        line = self._peek()
+        if line[1] == "-" or line[1].startswith("- "):
+            return self._sequence(indent)
+        return self._mapping(indent)
+
+    def _block_scalar(self, parent_indent: int, folded: bool) -> str:
+        chunks = []
+        while self._peek() and self._peek()[0] > parent_indent:
+            chunks.append(self._peek()[1])
+            self.pos += 1
+        return (" " if folded else "\n").join(chunks)
+
+    def _value_after_key(self, indent: int, rest: str) -> Any:
+        if rest in ("|", "|-", "|+", ">", ">-", ">+"):
+            self.pos += 1
+            return self._block_scalar(indent, rest.startswith(">"))
+        if rest:
+            self.pos += 1
+            return parse_scalar(rest)
+
+        self.pos += 1
+        nxt = self._peek()
+        if nxt is None:
+            return None
+        # Compose files often put "- item" at the same indent as the key
+        if nxt[0] > indent or (nxt[0] == indent and (nxt[1] == "-" or nxt[1].startswith("- "))):
+            return self._node(nxt[0])
+        return None
+
+    def _mapping(self, indent: int) -> Dict:
+        result = {}
+        while True:
+            line = self._peek()
+            if line is None or line[0] != indent or line[1] == "-" or line[1].startswith("- "):
+                break
+            match = KEY_PATTERN.match(line[1])
+            if not match:
+                self.pos += 1  # not a key - skip rather than fail the whole file
+                continue
+            key = parse_scalar(match.group(1))
+            result[key] = self._value_after_key(indent, line[1][match.end():].strip())
+        return result
+
+    def _sequence(self, indent: int) -> List:
+        result = []
+        while True:
+            line = self._peek()
+            if line is None or line[0] != indent or not (line[1] == "-" or line[1].startswith("- ")):
+                break
+            item = line[1][1:].strip()
+            if not item:
+                self.pos += 1
+                nxt = self._peek()
+                result.append(self._node(nxt[0]) if nxt and nxt[0] > indent else None)
+            elif KEY_PATTERN.match(item) and not item.startswith(("'", '"', "[", "{")):
+                # "- key: value" opens a mapping whose keys sit two columns in
+                self.lines[self.pos] = (indent + 2, item)
+                result.append(self._mapping(indent + 2))
+            else:
+                result.append(parse_scalar(item))
+                self.pos += 1
+        return result
+
+
+def parse_yaml_subset(text: str) -> Any:
+    """Parse the YAML subset used by the compose files"""
+    return _Reader(text).parse()
+
+
+def load_compose_file(path: Path) -> Dict:
+    """Parse one compose file, cached on (mtime, size)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _parse_cache.get(str(path))
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = parse_yaml_subset(f.read()) or {}
+    _parse_cache[str(path)] = (signature, data)
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Service inventory
+# ---------------------------------------------------------------------------
+
+def _deep_merge(base: Dict, override: Dict) -> Dict:
+    """Compose-style override: maps merge, scalars and lists replace"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_services(root: Path = PROJECT_ROOT, files: List[str] = None) -> Dict[str, Dict]:
+    """
+    Merged service definitions from all compose files.
+
+    Returns:
+        Dict of service name -> definition, with "_sources" listing the files
+    """
+    services: Dict[str, Dict] = {}
+    for name in files or COMPOSE_FILES:
+        data = load_compose_file(Path(root) / name)
+        for service_name, definition in (data.get("services") or {}).items():
+            definition = definition or {}
+            if service_name in services:
+                merged = _deep_merge(services[service_name], definition)
+                merged["_sources"] = services[service_name]["_sources"] + [name]
+            else:
+                merged = dict(definition, _sources=[name])
+            services[service_name] = merged
+    return services
+
+
+def parse_port(entry: Any) -> Optional[Tuple[int, int]]:
+    """
+    Published TCP (host, container) ports from one compose ports entry.
+
+    Handles "3001:3001", "127.0.0.1:3001:3001", "9000", "5775:5775/udp"
+    (ignored) and the long {published, target} syntax.
+    """
+    if isinstance(entry, dict):
+        if entry.get("protocol", "tcp") != "tcp" or entry.get("published") is None:
+            return None
+        return int(entry["published"]), int(entry.get("target", entry["published"]))
+
+    text = str(entry)
+    if "/" in text:
+        text, _, protocol = text.partition("/")
+        if protocol != "tcp":
+            return None
+    parts = text.split(":")
+    if len(parts) == 1:
+        return None  # container-only port - not published on a fixed host port
+    try:
+        host_port, container_port = parts[-2], parts[-1]
+        if "-" in host_port:
+            return None  # port ranges are not probed
+        return int(host_port), int(container_port)
+    except ValueError:
+        return None
+
+
+def environment_dict(definition: Dict) -> Dict[str, str]:
+    """Environment as a dict, whether written as a map or a KEY=VALUE list"""
+    env = definition.get("environment") or {}
+    if isinstance(env, list):
+        result = {}
+        for item in env:
+            key, _, value = str(item).partition("=")
+            result[key] = value
+        return result
+    return {str(k): "" if v is None else str(v) for k, v in env.items()}
+
+
+def depends_on_list(definition: Dict) -> List[str]:
+    """depends_on names, whether written as a list or a condition map"""
+    depends = definition.get("depends_on") or []
+    if isinstance(depends, dict):
+        return list(depends.keys())
+    return [str(d) for d in depends]
+
+
+def healthcheck_url(definition: Dict) -> Optional[Tuple[Optional[int], str]]:
+    """(port, path) of the HTTP URL in the healthcheck test, if any"""
+    healthcheck = definition.get("healthcheck") or {}
+    if healthcheck.get("disable"):
+        return None
+    test = healthcheck.get("test")
+    text = " ".join(str(t) for t in test) if isinstance(test, list) else str(test or "")
+    match = URL_PATTERN.search(text)
+    if not match:
+        return None
+    port = int(match.group(1)) if match.group(1) else None
+    return port, match.group(2) or "/"
+
+
+def _protocol_for(definition: Dict, health: Optional[Tuple]) -> str:
+    if definition.get("build") or health:
+        return "http"
+    image = str(definition.get("image", "")).split(":")[0]
+    for prefix, protocol in PROTOCOL_IMAGES.items():
+        if image == prefix or image.startswith(prefix + "/") or image.endswith("/" + prefix):
+            return protocol
+    return "tcp"
+
+
+def describe_service(name: str, definition: Dict) -> Dict:
+    """Inventory record for one compose service"""
+    published = [p for p in (parse_port(e) for e in definition.get("ports") or []) if p]
+    health = healthcheck_url(definition)
+
+    # Prefer the mapping for the port the app listens on
+    build_args = (definition.get("build") or {}).get("args") if isinstance(definition.get("build"), dict) else None
+    env = environment_dict(definition)
+    app_port = (build_args or {}).get("SERVICE_PORT") or env.get("APP_PORT") or env.get("PORT")
+    wanted = [int(app_port)] if str(app_port or "").isdigit() else []
+    if health and health[0]:
+        wanted.append(health[0])
+
+    chosen = next((p for p in published if p[1] in wanted), published[0] if published else None)
+
+    return {
+        "name": name,
+        "port": chosen[0] if chosen else None,
+        "container_port": chosen[1] if chosen else None,
+        "published": bool(chosen),
+        "protocol": _protocol_for(definition, health),
+        "health_path": health[1] if health else None,
+        "container_name": definition.get("container_name", name),
+        "depends_on": depends_on_list(definition),
+        "healthcheck": definition.get("healthcheck"),
+        "sources": definition.get("_sources", []),
+        "definition": definition,
+    }
+
+
+def discover_services(root: Path = PROJECT_ROOT, files: List[str] = None) -> Dict[str, Dict]:
+    """
+    Inventory of every compose service.
+
+    Returns:
+        Dict of service name -> inventory record (see describe_service)
+    """
+    return {name: describe_service(name, definition)
+            for name, definition in load_services(root, files).items()}
+
+
+def application_services(root: Path = PROJECT_ROOT, files: List[str] = None) -> Dict[str, Dict]:
+    """Services built from this repo (the ones exposing NestJS/Next health endpoints)"""
+    return {name: record for name, record in discover_services(root, files).items()
+            if record["definition"].get("build")}
+
+
+def display_name(service_name: str) -> str:
+    """'master-data' -> 'Master Data', 'api-gateway' -> 'API Gateway'"""
+    return " ".join(part.upper() if part in ACRONYMS else part.capitalize()
+                    for part in re.split(r"[-_]", service_name))
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Service inventory from docker-compose files')
+    parser.add_argument('--all', action='store_true', help='Include infrastructure (non-HTTP) services')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    args = parser.parse_args()
+
+    services = discover_services()
+    rows = [s for s in services.values() if args.all or s["protocol"] == "http"]
+
+    if args.json:
+        print(json.dumps([{k: v for k, v in s.items() if k != "definition"} for s in rows], indent=2))
+        return
+
+    print(f"{'SERVICE':<24}{'PORT':>7}  {'PROTOCOL':<10}{'HEALTH PATH':<22}SOURCES")
+    for s in sorted(rows, key=lambda r: (r["port"] is None, r["port"] or 0)):
+        port = str(s["port"]) if s["published"] else "-"
+        print(f"{s['name']:<24}{port:>7}  {s['protocol']:<10}{s['health_path'] or '-':<22}"
+              f"{', '.join(s['sources'])}")
+
+
+if __name__ == '__main__':
+    main()
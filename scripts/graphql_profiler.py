@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+GraphQL federation latency profiler for Vextrus ERP
+Replays the repo's test-*.json GraphQL fixtures against the API gateway
+
+For every fixture the profiler sends warmup + N requests at a fixed
+concurrency over pooled keep-alive connections and records the latency
+distribution and error rate. When responses carry Apollo tracing data
+(extensions.tracing, as produced by the apollo-tracing format) it also
+aggregates per-resolver timings, and attributes root-field time to the
+subgraph that owns the field (root fields are discovered by introspecting
+each subgraph published in the compose files).
+
+Auth: --token, --token-file (e.g. jwt-token.txt) or --login FIXTURE (runs
+a login mutation fixture first and injects its accessToken).
+
+Usage:
+    python scripts/graphql_profiler.py --iterations 50 --concurrency 8
+    python scripts/graphql_profiler.py --url http://localhost:4000/graphql \\
+        --login test-login-for-permissions.json --subgraphs --json profile.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from compose_inventory import PROJECT_ROOT, application_services
+from health_prober import AsyncHealthProber
+
+# Constants
+DEFAULT_URL = "http://localhost:4000/graphql"
+DEFAULT_FIXTURE_GLOB = "test-*.json"
+DEFAULT_TENANT = "default"
+PERCENTILES = [50, 90, 95, 99]
+TOP_RESOLVERS = 15
+
+# Services that are not federation subgraphs
+NON_SUBGRAPHS = {"api-gateway", "web"}
+
+ROOT_FIELDS_QUERY = "{ __schema { queryType { fields { name } } mutationType { fields { name } } } }"
+OPERATION_PATTERN = re.compile(r"^\s*(query|mutation|subscription)?\s*([A-Za-z_]\w*)?")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (smallest value with at least pct% of samples at or below it)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)], 3)
+
+
+def distribution(values: List[float]) -> Dict:
+    """Count, mean, max and the standard percentiles of a sample"""
+    result = {"count": len(values),
+              "mean": round(sum(values) / len(values), 3) if values else None,
+              "max": round(max(values), 3) if values else None}
+    for pct in PERCENTILES:
+        result[f"p{pct}"] = percentile(values, pct)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Fixtures and auth
+# ---------------------------------------------------------------------------
+
+def operation_type(query: str) -> str:
+    """query / mutation / subscription ("{ ... }" shorthand is a query)"""
+    match = OPERATION_PATTERN.match(query)
+    return (match.group(1) if match and match.group(1) else "query")
+
+
+def load_fixtures(root: Path, pattern: str = DEFAULT_FIXTURE_GLOB,
+                  include_mutations: bool = False) -> List[Dict]:
+    """GraphQL request fixtures ({query, variables?}) matching the glob"""
+    fixtures = []
+    for path in sorted(Path(root).glob(pattern)):
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                payload = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if not isinstance(payload, dict) or not isinstance(payload.get("query"), str):
+            continue
+
+        kind = operation_type(payload["query"])
+        if kind == "subscription" or (kind == "mutation" and not include_mutations):
+            continue
+        fixtures.append({"name": path.stem, "type": kind, "payload": payload})
+    return fixtures
+
+
+def read_token_file(path: Path) -> Optional[str]:
+    """Bearer token from a file holding either the raw JWT or an Authorization header line"""
+    try:
+        text = Path(path).read_text(encoding='utf-8-sig').strip()
+    except FileNotFoundError:
+        return None
+    text = re.sub(r"^Authorization:\s*", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"^Bearer\s+", "", text, flags=re.IGNORECASE)
+    return text.split()[0] if text else None
+
+
+def _find_access_token(data) -> Optional[str]:
+    """First accessToken anywhere in a response payload"""
+    if isinstance(data, dict):
+        if isinstance(data.get("accessToken"), str):
+            return data["accessToken"]
+        for value in data.values():
+            token = _find_access_token(value)
+            if token:
+                return token
+    elif isinstance(data, list):
+        for value in data:
+            token = _find_access_token(value)
+            if token:
+                return token
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Profiler
+# ---------------------------------------------------------------------------
+
+class GraphQLProfiler:
+    """Replay fixtures and aggregate latency, resolver and subgraph timings."""
+
+    def __init__(self, url: str = DEFAULT_URL, concurrency: int = 8, timeout: float = 30.0,
+                 token: Optional[str] = None, tenant: str = DEFAULT_TENANT):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.path = parts.path or "/graphql"
+        self.concurrency = concurrency
+        self.token = token
+        self.tenant = tenant
+        self.prober = AsyncHealthProber(concurrency=concurrency, timeout=timeout,
+                                        per_host_connections=concurrency)
+        self.root_field_owner: Dict[str, str] = {}
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json", "X-Tenant-ID": self.tenant}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    async def execute(self, payload: Dict, host: str = None, port: int = None,
+                      path: str = None) -> Tuple[Dict, Optional[Dict]]:
+        """Send one GraphQL request; returns (transport result, parsed body or None)"""
+        body = json.dumps(payload).encode("utf-8")
+        result = await self.prober.fetch(host or self.host, port or self.port, "POST",
+                                         path or self.path, self._headers(), body)
+        parsed = None
+        if result["status"] == "ok" and result["body"]:
+            try:
+                parsed = json.loads(result["body"])
+            except ValueError:
+                parsed = None
+        return result, parsed
+
+    async def login(self, fixture_path: Path) -> bool:
+        """Run a login mutation fixture and keep its accessToken"""
+        with open(fixture_path, 'r', encoding='utf-8-sig') as f:
+            payload = json.load(f)
+        _, parsed = await self.execute(payload)
+        token = _find_access_token((parsed or {}).get("data"))
+        if token:
+            self.token = token
+        return bool(token)
+
+    async def discover_subgraphs(self, host: str = None) -> Dict[str, str]:
+        """Map root field -> subgraph by introspecting each compose-published service"""
+        services = [(name, record["port"]) for name, record in application_services().items()
+                    if record["published"] and name not in NON_SUBGRAPHS]
+
+        async def introspect(name: str, port: int):
+            _, parsed = await self.execute({"query": ROOT_FIELDS_QUERY}, host or self.host, port, "/graphql")
+            schema = ((parsed or {}).get("data") or {}).get("__schema") or {}
+            fields = []
+            for root in ("queryType", "mutationType"):
+                fields += [f["name"] for f in ((schema.get(root) or {}).get("fields") or [])]
+            return name, fields
+
+        for name, fields in await asyncio.gather(*(introspect(n, p) for n, p in services)):
+            for field in fields:
+                self.root_field_owner.setdefault(field, name)
+        return self.root_field_owner
+
+    async def profile(self, fixtures: List[Dict], iterations: int = 20, warmup: int = 2) -> Dict:
+        """Replay every fixture warmup + iterations times at the configured concurrency"""
+        samples = {f["name"]: {"latency": [], "errors": 0, "error_samples": []} for f in fixtures}
+        resolvers: Dict[str, List[float]] = {}
+        subgraphs: Dict[str, List[float]] = {}
+
+        for fixture in fixtures:
+            for _ in range(warmup):
+                await self.execute(fixture["payload"])
+
+        async def one(fixture: Dict):
+            result, parsed = await self.execute(fixture["payload"])
+            sample = samples[fixture["name"]]
+            sample["latency"].append(result["timings"]["total_ms"])
+
+            error = None
+            if result["status"] != "ok":
+                error = result["status"]
+            elif result["code"] != 200:
+                error = f"HTTP {result['code']}"
+            elif parsed is None:
+                error = "invalid JSON"
+            elif parsed.get("errors"):
+                error = str(parsed["errors"][0].get("message", "GraphQL error"))[:120]
+            if error:
+                sample["errors"] += 1
+                if len(sample["error_samples"]) < 3 and error not in sample["error_samples"]:
+                    sample["error_samples"].append(error)
+
+            self._fold_tracing((parsed or {}).get("extensions") or {}, resolvers, subgraphs)
+
+        # Interleave fixtures so concurrency mixes queries like real traffic
+        jobs = [fixture for _ in range(iterations) for fixture in fixtures]
+        await asyncio.gather(*(one(fixture) for fixture in jobs))
+
+        return {
+            "target": f"http://{self.host}:{self.port}{self.path}",
+            "concurrency": self.concurrency,
+            "iterations": iterations,
+            "queries": {
+                name: dict(distribution(s["latency"]), errors=s["errors"],
+                           error_rate=round(s["errors"] / len(s["latency"]), 4) if s["latency"] else 0.0,
+                           error_samples=s["error_samples"])
+                for name, s in samples.items()
+            },
+            "resolvers": {key: distribution(values) for key, values in resolvers.items()},
+            "subgraphs": {key: distribution(values) for key, values in subgraphs.items()},
+        }
+
+    def _fold_tracing(self, extensions: Dict, resolvers: Dict[str, List[float]],
+                      subgraphs: Dict[str, List[float]]):
+        """Aggregate Apollo tracing resolver durations (nanoseconds -> ms)"""
+        tracing = extensions.get("tracing") or {}
+        for resolver in ((tracing.get("execution") or {}).get("resolvers") or []):
+            duration = resolver.get("duration")
+            if duration is None:
+                continue
+            ms = duration / 1e6
+            key = f"{resolver.get('parentType', '?')}.{resolver.get('fieldName', '?')}"
+            resolvers.setdefault(key, []).append(ms)
+
+            path = resolver.get("path") or []
+            if len(path) == 1:
+                owner = self.root_field_owner.get(resolver.get("fieldName"), "unattributed")
+                subgraphs.setdefault(owner, []).append(ms)
+
+    def close(self):
+        self.prober.close()
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def print_report(report: Dict):
+    """Per-query latency table, slowest resolvers and per-subgraph timings"""
+    print("\n" + "=" * 90)
+    print(f"GRAPHQL LATENCY PROFILE - {report['target']} "
+          f"(concurrency {report['concurrency']}, {report['iterations']} iterations)")
+    print("=" * 90)
+    print(f"  {'QUERY':<38}{'N':>5}{'ERR%':>7}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, q in sorted(report["queries"].items(), key=lambda item: -(item[1]["p95"] or 0)):
+        print(f"  {name:<38}{q['count']:>5}{q['error_rate'] * 100:>6.1f}%{_fmt(q['p50']):>9}"
+              f"{_fmt(q['p90']):>9}{_fmt(q['p95']):>9}{_fmt(q['p99']):>9}{_fmt(q['max']):>9}")
+        for error in q["error_samples"]:
+            print(f"      ! {error}")
+
+    if report["subgraphs"]:
+        print("\nSUBGRAPH TIME (root fields, ms):")
+        for name, d in sorted(report["subgraphs"].items(), key=lambda item: -(item[1]["p95"] or 0)):
+            print(f"  {name:<30} n={d['count']:<6} p50 {_fmt(d['p50']):>8}  p95 {_fmt(d['p95']):>8}  "
+                  f"max {_fmt(d['max']):>8}")
+
+    if report["resolvers"]:
+        print(f"\nSLOWEST RESOLVERS (top {TOP_RESOLVERS} by p95, ms):")
+        ranked = sorted(report["resolvers"].items(), key=lambda item: -(item[1]["p95"] or 0))
+        for key, d in ranked[:TOP_RESOLVERS]:
+            print(f"  {key:<46} n={d['count']:<6} p50 {_fmt(d['p50']):>8}  p95 {_fmt(d['p95']):>8}")
+    else:
+        print("\n(no tracing data in responses - enable Apollo tracing to get resolver timings)")
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Replay GraphQL fixtures and profile federation latency')
+    parser.add_argument('--url', default=DEFAULT_URL, help='GraphQL endpoint (API gateway)')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURE_GLOB, help='Fixture glob relative to the repo root')
+    parser.add_argument('--include-mutations', action='store_true', help='Replay mutation fixtures too')
+    parser.add_argument('--iterations', type=int, default=20, help='Requests per fixture')
+    parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per fixture')
+    parser.add_argument('--concurrency', type=int, default=8, help='In-flight requests')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request deadline (seconds)')
+    parser.add_argument('--token', help='Bearer token to inject')
+    parser.add_argument('--token-file', help='File with a JWT or an "Authorization: Bearer" line')
+    parser.add_argument('--login', help='Login mutation fixture whose accessToken is injected')
+    parser.add_argument('--tenant', default=DEFAULT_TENANT, help='X-Tenant-ID header')
+    parser.add_argument('--subgraphs', action='store_true',
+                        help='Introspect compose services to attribute root fields to subgraphs')
+    parser.add_argument('--json', help='Write the profile as JSON to this file')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(PROJECT_ROOT, args.fixtures, args.include_mutations)
+    if not fixtures:
+        print(f"No GraphQL fixtures match {args.fixtures}")
+        sys.exit(1)
+
+    token = args.token or (read_token_file(Path(args.token_file)) if args.token_file else None)
+
+    async def run():
+        profiler = GraphQLProfiler(args.url, args.concurrency, args.timeout, token, args.tenant)
+        try:
+            if args.login and not await profiler.login(PROJECT_ROOT / args.login):
+                print(f"[WARNING] Login with {args.login} returned no accessToken - continuing unauthenticated")
+            if args.subgraphs:
+                owners = await profiler.discover_subgraphs()
+                print(f"Discovered {len(owners)} root fields across {len(set(owners.values()))} subgraphs")
+            return await profiler.profile(fixtures, args.iterations, args.warmup)
+        finally:
+            profiler.close()
+
+    print(f"Replaying {len(fixtures)} fixtures: {', '.join(f['name'] for f in fixtures)}")
+    report = asyncio.run(run())
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nProfile saved to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
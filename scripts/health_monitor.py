@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Continuous health monitor for Vextrus ERP services
+Probes /health/live and /health/ready on an interval and tracks latency and SLOs
+
+Per (service, path) target the monitor keeps fixed-memory rolling windows
+(1m / 15m / 1h / 24h). Each window is a ring of time slots holding a probe
+count, failure/slow counts and a latency histogram, so memory does not grow
+with uptime. From the windows it derives availability, p50/p95/p99 latency,
+SLO burn rates and a "slower than baseline" flag.
+
+Persistence:
+- segments/YYYY-MM-DD.jsonl: one compact line per target per minute
+  (histogram + counts), replayed on restart to refill the windows
+- status.json: latest window summaries, atomically replaced every sweep
+
+Usage:
+    python test-health-endpoints.py --monitor [--interval 10]
+    python scripts/health_monitor.py --status
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from health_prober import AsyncHealthProber
+
+# Constants
+STATE_DIR = Path(__file__).parent.parent / "state" / "health-monitor"
+SEGMENTS_DIR_NAME = "segments"
+STATUS_FILE_NAME = "status.json"
+
+MONITOR_PATHS = ["/health/live", "/health/ready"]
+DEFAULT_INTERVAL = 10.0
+SEGMENT_RETENTION_DAYS = 14
+
+# Upper bounds (ms) of the latency histogram buckets; one extra overflow bucket
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# name -> (span seconds, slot seconds)
+WINDOWS = {
+    "1m": (60, 5),
+    "15m": (900, 60),
+    "1h": (3600, 60),
+    "24h": (86400, 900),
+}
+
+# SLO: a probe is good when it returned 200 within the latency objective
+SLO_AVAILABILITY = 0.995
+SLO_LATENCY_MS = 500
+
+# Multi-window burn-rate alerts: (long window, short window, threshold)
+BURN_ALERTS = {
+    "page": ("1h", "1m", 14.4),
+    "ticket": ("24h", "15m", 3.0),
+}
+
+# Flag a target as slower when recent p95 exceeds the 24h p95 by this factor
+SLOWDOWN_FACTOR = 1.5
+SLOWDOWN_MIN_SAMPLES = 20
+
+
+def bucket_index(latency_ms: float) -> int:
+    """Histogram bucket for a latency (last index is the overflow bucket)"""
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS_MS)
+
+
+def histogram_percentile(counts: List[int], percentile: float) -> Optional[float]:
+    """Estimate a percentile from bucket counts (linear within the bucket)"""
+    total = sum(counts)
+    if total == 0:
+        return None
+
+    rank = total * percentile / 100.0
+    seen = 0
+    lower = 0.0
+    for i, count in enumerate(counts):
+        upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else LATENCY_BUCKETS_MS[-1] * 2
+        if count and seen + count >= rank:
+            return round(lower + (upper - lower) * (rank - seen) / count, 1)
+        seen += count
+        lower = upper
+    return float(LATENCY_BUCKETS_MS[-1] * 2)
+
+
+class RollingWindow:
+    """Ring of time slots covering a fixed span; O(slots) memory."""
+
+    def __init__(self, span: int, slot: int):
+        self.slot = slot
+        self.size = span // slot
+        self.stamps = [-1] * self.size
+        self.totals = [0] * self.size
+        self.failures = [0] * self.size
+        self.slow = [0] * self.size
+        self.hists = [[0] * (len(LATENCY_BUCKETS_MS) + 1) for _ in range(self.size)]
+
+    def _slot_for(self, ts: float) -> int:
+        stamp = int(ts // self.slot)
+        idx = stamp % self.size
+        if self.stamps[idx] != stamp:
+            self.stamps[idx] = stamp
+            self.totals[idx] = 0
+            self.failures[idx] = 0
+            self.slow[idx] = 0
+            self.hists[idx] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        return idx
+
+    def add(self, ts: float, ok: bool, latency_ms: Optional[float]):
+        """Record one probe"""
+        idx = self._slot_for(ts)
+        self.totals[idx] += 1
+        if not ok:
+            self.failures[idx] += 1
+        elif latency_ms is not None:
+            self.hists[idx][bucket_index(latency_ms)] += 1
+            if latency_ms > SLO_LATENCY_MS:
+                self.slow[idx] += 1
+
+    def merge(self, ts: float, total: int, failures: int, slow: int, hist: List[int]):
+        """Fold a pre-aggregated minute (from a segment file) into the window"""
+        idx = self._slot_for(ts)
+        self.totals[idx] += total
+        self.failures[idx] += failures
+        self.slow[idx] += slow
+        self.hists[idx] = [a + b for a, b in zip(self.hists[idx], hist)]
+
+    def summary(self, now: float) -> Dict:
+        """Aggregate the live slots of the window"""
+        newest = int(now // self.slot)
+        oldest = newest - self.size
+        total = failures = slow = 0
+        hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+        for idx, stamp in enumerate(self.stamps):
+            if oldest < stamp <= newest:
+                total += self.totals[idx]
+                failures += self.failures[idx]
+                slow += self.slow[idx]
+                for i, count in enumerate(self.hists[idx]):
+                    hist[i] += count
+
+        bad = failures + slow
+        bad_ratio = bad / total if total else 0.0
+        return {
+            "probes": total,
+            "failures": failures,
+            "slow": slow,
+            "availability": round(1 - failures / total, 5) if total else None,
+            "p50_ms": histogram_percentile(hist, 50),
+            "p95_ms": histogram_percentile(hist, 95),
+            "p99_ms": histogram_percentile(hist, 99),
+            "burn_rate": round(bad_ratio / (1 - SLO_AVAILABILITY), 2) if total else 0.0,
+        }
+
+
+class TargetMonitor:
+    """Rolling windows plus the current minute's segment for one (service, path)."""
+
+    def __init__(self, service: str, port: int, path: str):
+        self.service = service
+        self.port = port
+        self.path = path
+        self.windows = {name: RollingWindow(span, slot) for name, (span, slot) in WINDOWS.items()}
+        self.last_result: Optional[Dict] = None
+        self._segment_minute: Optional[int] = None
+        self._segment = self._empty_segment()
+
+    @staticmethod
+    def _empty_segment() -> Dict:
+        return {"n": 0, "fail": 0, "slow": 0, "max": 0.0, "h": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+
+    def record(self, ts: float, result: Dict) -> Optional[Dict]:
+        """
+        Record one probe result.
+
+        Returns:
+            The completed previous minute's segment record when the minute rolls over
+        """
+        ok = result["status"] == "success"
+        latency_ms = result.get("timings", {}).get("total_ms")
+
+        completed = None
+        minute = int(ts // 60)
+        if self._segment_minute is not None and minute != self._segment_minute:
+            completed = self.flush_segment()
+        self._segment_minute = minute
+
+        for window in self.windows.values():
+            window.add(ts, ok, latency_ms)
+
+        seg = self._segment
+        seg["n"] += 1
+        if not ok:
+            seg["fail"] += 1
+        elif latency_ms is not None:
+            seg["h"][bucket_index(latency_ms)] += 1
+            seg["max"] = max(seg["max"], round(latency_ms, 1))
+            if latency_ms > SLO_LATENCY_MS:
+                seg["slow"] += 1
+
+        self.last_result = {"status": result["status"], "code": result.get("code", 0), "latency_ms": latency_ms}
+        return completed
+
+    def flush_segment(self) -> Optional[Dict]:
+        """Close the current minute and return it as a compact segment record"""
+        if self._segment_minute is None or self._segment["n"] == 0:
+            return None
+        record = {"t": self._segment_minute * 60, "s": self.service, "p": self.path}
+        record.update(self._segment)
+        self._segment = self._empty_segment()
+        return record
+
+    def restore(self, record: Dict):
+        """Refill the windows from a persisted segment record"""
+        for window in self.windows.values():
+            window.merge(record["t"], record["n"], record["fail"], record["slow"], record["h"])
+
+    def summary(self, now: float) -> Dict:
+        windows = {name: window.summary(now) for name, window in self.windows.items()}
+
+        alerts = []
+        for severity, (long_name, short_name, threshold) in BURN_ALERTS.items():
+            if (windows[long_name]["burn_rate"] >= threshold and
+                    windows[short_name]["burn_rate"] >= threshold):
+                alerts.append({
+                    "severity": severity,
+                    "message": f"SLO burn rate {windows[long_name]['burn_rate']}x over {long_name} "
+                               f"(threshold {threshold}x)"
+                })
+
+        recent, baseline = windows["15m"], windows["24h"]
+        slower = (
+            recent["probes"] >= SLOWDOWN_MIN_SAMPLES and
+            baseline["probes"] >= SLOWDOWN_MIN_SAMPLES and
+            recent["p95_ms"] is not None and baseline["p95_ms"] and
+            recent["p95_ms"] > baseline["p95_ms"] * SLOWDOWN_FACTOR
+        )
+        if slower:
+            alerts.append({
+                "severity": "warning",
+                "message": f"p95 {recent['p95_ms']}ms over 15m vs {baseline['p95_ms']}ms 24h baseline"
+            })
+
+        return {
+            "service": self.service,
+            "port": self.port,
+            "path": self.path,
+            "last": self.last_result,
+            "windows": windows,
+            "slower": slower,
+            "alerts": alerts,
+        }
+
+
+class SegmentStore:
+    """Daily append-only segment files with fixed retention."""
+
+    def __init__(self, state_dir: Path):
+        self.dir = state_dir / SEGMENTS_DIR_NAME
+
+    def _file_for(self, ts: float) -> Path:
+        return self.dir / f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d')}.jsonl"
+
+    def append(self, records: List[Dict]):
+        if not records:
+            return
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            by_file: Dict[Path, List[str]] = {}
+            for record in records:
+                by_file.setdefault(self._file_for(record["t"]), []).append(
+                    json.dumps(record, separators=(",", ":"))
+                )
+            for path, lines in by_file.items():
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+        except Exception as e:
+            print(f"Error writing health segments: {e}")
+
+    def load_since(self, since: float) -> List[Dict]:
+        """Records newer than since (reads at most two daily files for 24h)"""
+        records = []
+        day = datetime.fromtimestamp(since).date()
+        today = datetime.now().date()
+        while day <= today:
+            path = self.dir / f"{day.strftime('%Y-%m-%d')}.jsonl"
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if record.get("t", 0) > since:
+                            records.append(record)
+            day += timedelta(days=1)
+        return records
+
+    def prune(self, retention_days: int = SEGMENT_RETENTION_DAYS):
+        """Delete segment files older than the retention period"""
+        if not self.dir.exists():
+            return
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+        for path in self.dir.glob("*.jsonl"):
+            if path.stem < cutoff:
+                path.unlink()
+
+
+class HealthMonitor:
+    """Interval prober feeding per-target rolling windows."""
+
+    def __init__(self,
+                 services: List[Tuple[str, int]],
+                 host: str = "localhost",
+                 interval: float = DEFAULT_INTERVAL,
+                 state_dir: Path = STATE_DIR,
+                 paths: List[str] = None,
+                 **prober_options):
+        """
+        Initialize monitor.
+
+        Args:
+            services: (service name, published port) pairs
+            host: Host the ports are published on
+            interval: Seconds between sweeps
+            state_dir: Directory for segments and status.json
+            paths: Health paths to probe (defaults to live + ready)
+            **prober_options: Passed to AsyncHealthProber (concurrency, timeout)
+        """
+        self.host = host
+        self.interval = interval
+        self.state_dir = Path(state_dir)
+        self.store = SegmentStore(self.state_dir)
+        self.prober_options = prober_options
+        self.targets = [
+            TargetMonitor(name, port, path)
+            for name, port in services
+            for path in (paths or MONITOR_PATHS)
+        ]
+        self.sweeps = 0
+
+    def restore(self, now: float = None):
+        """Refill windows from the last 24h of segments"""
+        now = now if now is not None else time.time()
+        by_key = {(t.service, t.path): t for t in self.targets}
+        for record in self.store.load_since(now - WINDOWS["24h"][0]):
+            target = by_key.get((record.get("s"), record.get("p")))
+            if target:
+                target.restore(record)
+
+    async def sweep(self, prober: AsyncHealthProber) -> float:
+        """Probe every target once; returns sweep wall time in seconds"""
+        t0 = time.perf_counter()
+        results = await prober.probe_many([(self.host, t.port, t.path) for t in self.targets])
+        now = time.time()
+
+        completed = []
+        for target, result in zip(self.targets, results):
+            record = target.record(now, result)
+            if record:
+                completed.append(record)
+        self.store.append(completed)
+        self.sweeps += 1
+        return time.perf_counter() - t0
+
+    def status(self, now: float = None) -> Dict:
+        now = now if now is not None else time.time()
+        return {
+            "updated": datetime.fromtimestamp(now).isoformat(),
+            "interval_seconds": self.interval,
+            "slo": {"availability": SLO_AVAILABILITY, "latency_ms": SLO_LATENCY_MS},
+            "targets": [t.summary(now) for t in self.targets],
+        }
+
+    def save_status(self, status: Dict) -> bool:
+        """Atomically replace status.json"""
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            status_file = self.state_dir / STATUS_FILE_NAME
+            tmp_file = status_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(status, f, indent=2)
+            os.replace(tmp_file, status_file)
+            return True
+        except Exception as e:
+            print(f"Error saving health monitor status: {e}")
+            return False
+
+    def flush(self):
+        """Persist partially filled minutes (on shutdown)"""
+        self.store.append([r for r in (t.flush_segment() for t in self.targets) if r])
+
+    async def run(self, max_sweeps: int = None, quiet: bool = False):
+        """Probe on the interval until interrupted (or max_sweeps reached)"""
+        self.restore()
+        self.store.prune()
+        prober = AsyncHealthProber(**self.prober_options)
+        try:
+            while max_sweeps is None or self.sweeps < max_sweeps:
+                started = time.monotonic()
+                elapsed = await self.sweep(prober)
+                status = self.status()
+                self.save_status(status)
+                if not quiet:
+                    print_status(status, elapsed)
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            prober.close()
+            self.flush()
+
+
+def _fmt_ms(value: Optional[float]) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def print_status(status: Dict, sweep_seconds: float = None):
+    """Print a compact per-target table"""
+    header = f"[{status['updated'][:19]}] HEALTH MONITOR"
+    if sweep_seconds is not None:
+        header += f" (sweep {sweep_seconds * 1000:.0f}ms)"
+    print("\n" + header)
+    print(f"  {'SERVICE':<22}{'PATH':<15}{'LAST':<10}{'AVAIL 1h':>9}"
+          f"{'p95 1m':>8}{'p95 15m':>9}{'p95 24h':>9}{'BURN 1h':>9}")
+
+    for target in status["targets"]:
+        w = target["windows"]
+        last = target["last"]["status"].replace("connection_", "") if target["last"] else "-"
+        avail = w["1h"]["availability"]
+        avail_str = f"{avail * 100:.2f}%" if avail is not None else "-"
+        marker = " SLOWER" if target["slower"] else ""
+        print(f"  {target['service']:<22}{target['path']:<15}{last[:9]:<10}{avail_str:>9}"
+              f"{_fmt_ms(w['1m']['p95_ms']):>8}{_fmt_ms(w['15m']['p95_ms']):>9}"
+              f"{_fmt_ms(w['24h']['p95_ms']):>9}{w['1h']['burn_rate']:>9}{marker}")
+
+        for alert in target["alerts"]:
+            print(f"    [{alert['severity'].upper()}] {alert['message']}")
+
+
+def run_monitor(services: List[Tuple[str, int]], **options):
+    """Blocking entry point used by test-health-endpoints.py --monitor"""
+    monitor = HealthMonitor(services, **options)
+    print(f"Monitoring {len(monitor.targets)} endpoints every {monitor.interval}s "
+          f"(state: {monitor.state_dir})")
+    try:
+        asyncio.run(monitor.run())
+    except KeyboardInterrupt:
+        print("\nMonitor stopped")
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Health monitor status')
+    parser.add_argument('--status', action='store_true', help='Print the last saved monitor status')
+    parser.add_argument('--state-dir', default=str(STATE_DIR), help='Monitor state directory')
+    args = parser.parse_args()
+
+    status_file = Path(args.state_dir) / STATUS_FILE_NAME
+    try:
+        with open(status_file, 'r', encoding='utf-8') as f:
+            print_status(json.load(f))
+    except FileNotFoundError:
+        print(f"No monitor status at {status_file} - start it with: "
+              f"python test-health-endpoints.py --monitor")
+
+
+if __name__ == '__main__':
+    main()
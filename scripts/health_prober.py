@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Async health prober for Vextrus ERP services
+Probes every (service, path) pair concurrently over pooled keep-alive connections
+
+Used by test-health-endpoints.py. Pure asyncio (no third-party HTTP client):
+- per-host keep-alive connection pool
+- global concurrency cap and per-request deadline
+- DNS / connect / TTFB / total timings captured for every probe
+"""
+
+import asyncio
+import json
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_PER_HOST_CONNECTIONS = 6
+DEFAULT_TIMEOUT = 5.0
+MAX_BODY_BYTES = 1024 * 1024
+USER_AGENT = "vextrus-health-prober/1.0"
+
+
+class ProbeError(Exception):
+    """Protocol-level failure while talking to a service."""
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    __slots__ = ("reader", "writer", "dns_ms", "connect_ms", "reused")
+
+    def __init__(self, reader, writer, dns_ms: float, connect_ms: float):
+        self.reader = reader
+        self.writer = writer
+        self.dns_ms = dns_ms
+        self.connect_ms = connect_ms
+        self.reused = False
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Per-host pool of idle keep-alive connections with a per-host cap."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST_CONNECTIONS):
+        self.per_host = per_host
+        self._idle: Dict[Tuple[str, int], List[_Connection]] = {}
+        self._limits: Dict[Tuple[str, int], asyncio.Semaphore] = {}
+        self._dns_cache: Dict[Tuple[str, int], Tuple] = {}
+        self.opened = 0
+
+    def limit(self, host: str, port: int) -> asyncio.Semaphore:
+        key = (host, port)
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.per_host)
+        return self._limits[key]
+
+    async def _resolve(self, host: str, port: int) -> Tuple:
+        """Resolve once per host; later connections report 0ms DNS"""
+        key = (host, port)
+        if key in self._dns_cache:
+            return self._dns_cache[key]
+
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        # Prefer IPv4 - compose publishes ports on 0.0.0.0
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        self._dns_cache[key] = infos[0][4]
+        return infos[0][4]
+
+    async def acquire(self, host: str, port: int) -> _Connection:
+        idle = self._idle.get((host, port))
+        while idle:
+            conn = idle.pop()
+            if not conn.writer.is_closing() and not conn.reader.at_eof():
+                conn.reused = True
+                return conn
+            conn.close()
+
+        t0 = time.perf_counter()
+        cached = (host, port) in self._dns_cache
+        address = await self._resolve(host, port)
+        t1 = time.perf_counter()
+        reader, writer = await asyncio.open_connection(address[0], address[1])
+        t2 = time.perf_counter()
+
+        self.opened += 1
+        dns_ms = 0.0 if cached else (t1 - t0) * 1000
+        return _Connection(reader, writer, dns_ms, (t2 - t1) * 1000)
+
+    def release(self, host: str, port: int, conn: _Connection, keep_alive: bool):
+        if keep_alive and not conn.writer.is_closing():
+            self._idle.setdefault((host, port), []).append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+
+async def _read_response(reader: asyncio.StreamReader, t_sent: float) -> Tuple[int, Dict, bytes, float, bool]:
+    """Read one HTTP/1.1 response; returns (code, headers, body, ttfb_ms, keep_alive)"""
+    status_line = await reader.readline()
+    ttfb_ms = (time.perf_counter() - t_sent) * 1000
+    if not status_line:
+        raise ProbeError("connection closed before response")
+
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ProbeError(f"malformed status line: {status_line[:60]!r}")
+    code = int(parts[1])
+    http10 = parts[0] == "HTTP/1.0"
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = headers.get("connection", "").lower() != "close" and not http10
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        size = 0
+        while True:
+            size_line = await reader.readline()
+            chunk_size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if chunk_size == 0:
+                await reader.readline()  # trailing CRLF (no trailers expected)
+                break
+            chunk = await reader.readexactly(chunk_size + 2)
+            size += chunk_size
+            if size <= MAX_BODY_BYTES:
+                chunks.append(chunk[:-2])
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        length = int(headers["content-length"])
+        body = await reader.readexactly(length)
+        body = body[:MAX_BODY_BYTES]
+    else:
+        body = await reader.read(MAX_BODY_BYTES)
+        keep_alive = False
+
+    return code, headers, body, ttfb_ms, keep_alive
+
+
+def classify_response(code: int, body: bytes) -> Dict:
+    """Map an HTTP response to the result shape used by the health report"""
+    if code == 200:
+        text = body.decode("utf-8", errors="replace")
+        try:
+            response = json.loads(text)
+        except ValueError:
+            response = text
+        return {"status": "success", "code": 200, "response": response}
+    if code == 404:
+        return {"status": "not_found", "code": 404}
+    return {"status": "failed", "code": code}
+
+
+class AsyncHealthProber:
+    """Concurrent HTTP health prober with pooling, caps and deadlines."""
+
+    def __init__(self,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 per_host_connections: int = DEFAULT_PER_HOST_CONNECTIONS):
+        """
+        Initialize prober.
+
+        Args:
+            concurrency: Global cap on in-flight probes
+            timeout: Per-request deadline in seconds (connect + response)
+            per_host_connections: Max concurrent connections per host:port
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.pool = ConnectionPool(per_host_connections)
+        self._global_limit: Optional[asyncio.Semaphore] = None
+
+    async def _exchange(self, host: str, port: int, method: str, path: str,
+                        headers: Optional[Dict], body: bytes, timings: Dict) -> Tuple[int, Dict, bytes]:
+        """One request/response on a pooled connection; fills timings in place"""
+        t_start = time.perf_counter()
+        conn = await self.pool.acquire(host, port)
+        timings["dns_ms"] = round(conn.dns_ms if not conn.reused else 0.0, 3)
+        timings["connect_ms"] = round(conn.connect_ms if not conn.reused else 0.0, 3)
+        timings["reused_connection"] = conn.reused
+
+        keep_alive = False
+        try:
+            head = (
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                f"User-Agent: {USER_AGENT}\r\n"
+                f"Accept: application/json\r\n"
+                f"Connection: keep-alive\r\n"
+            )
+            for name, value in (headers or {}).items():
+                head += f"{name}: {value}\r\n"
+            if body or method not in ("GET", "HEAD"):
+                head += f"Content-Length: {len(body)}\r\n"
+            conn.writer.write(head.encode("latin-1") + b"\r\n" + body)
+            await conn.writer.drain()
+            t_sent = time.perf_counter()
+
+            code, response_headers, response_body, ttfb_ms, keep_alive = await _read_response(conn.reader, t_sent)
+            timings["ttfb_ms"] = round(ttfb_ms, 3)
+            timings["total_ms"] = round((time.perf_counter() - t_start) * 1000, 3)
+            return code, response_headers, response_body
+        finally:
+            self.pool.release(host, port, conn, keep_alive)
+
+    async def fetch(self, host: str, port: int, method: str = "GET", path: str = "/",
+                    headers: Dict = None, body: bytes = b"") -> Dict:
+        """
+        One request under the global cap, per-host limit and deadline.
+
+        Returns:
+            Dict with status ("ok" or a transport failure status), code,
+            headers, body (bytes) and timings
+        """
+        if self._global_limit is None:
+            self._global_limit = asyncio.Semaphore(self.concurrency)
+
+        timings = {"dns_ms": None, "connect_ms": None, "ttfb_ms": None, "total_ms": None}
+        t_start = time.perf_counter()
+        result = {"status": "ok", "code": 0, "headers": {}, "body": b""}
+
+        async with self._global_limit, self.pool.limit(host, port):
+            try:
+                code, response_headers, response_body = await asyncio.wait_for(
+                    self._exchange(host, port, method, path, headers, body, timings), self.timeout
+                )
+                result.update(code=code, headers=response_headers, body=response_body)
+            except asyncio.TimeoutError:
+                result["status"] = "timeout"
+            except (ConnectionRefusedError, ConnectionResetError) as e:
+                result["status"] = "connection_refused" if isinstance(e, ConnectionRefusedError) else "connection_reset"
+            except (OSError, ProbeError, asyncio.IncompleteReadError, ValueError) as e:
+                result.update(status="error", error=str(e) or e.__class__.__name__)
+
+        if timings["total_ms"] is None:
+            timings["total_ms"] = round((time.perf_counter() - t_start) * 1000, 3)
+        result["timings"] = timings
+        return result
+
+    async def probe(self, host: str, port: int, path: str) -> Dict:
+        """
+        Probe a single URL: a GET through fetch(), classified for the report.
+
+        Returns:
+            Result dict: status, code, optional response/error, and timings
+        """
+        result = await self.fetch(host, port, "GET", path)
+        if result["status"] != "ok":
+            return {key: result[key] for key in ("status", "code", "error", "timings") if key in result}
+        return dict(classify_response(result["code"], result["body"]), timings=result["timings"])
+
+    async def probe_many(self, targets: List[Tuple[str, int, str]]) -> List[Dict]:
+        """Probe all (host, port, path) targets concurrently; results in input order"""
+        return await asyncio.gather(*(self.probe(host, port, path) for host, port, path in targets))
+
+    def close(self):
+        self.pool.close()
+
+
+def probe_sweep(targets: List[Tuple[str, int, str]], **prober_options) -> Tuple[List[Dict], float]:
+    """
+    Synchronous helper: run one concurrent sweep.
+
+    Returns:
+        (results in target order, sweep wall time in seconds)
+    """
+    async def run():
+        prober = AsyncHealthProber(**prober_options)
+        try:
+            return await prober.probe_many(targets)
+        finally:
+            prober.close()
+
+    t0 = time.perf_counter()
+    results = asyncio.run(run())
+    return results, time.perf_counter() - t0
@@ -1,42 +1,445 @@
 #!/usr/bin/env python
 """
-Simple JSON parser for Windows environments where jq is not available.
-Usage: python json-parse.py [field.path]
-Example: curl -s http://localhost:3001/api/health | python json-parse.py status
+Streaming JSON path extractor for environments where jq is not available.
+
+Input is tokenized incrementally in fixed-size chunks: subtrees off the
+requested path are skipped without being decoded, only the matched values
+are materialized, and an exact path stops reading as soon as it is found.
+Multi-MB introspection dumps and paginated responses therefore cost
+memory proportional to the selected value, not the document.
+
+Path syntax (dots and brackets mix freely):
+    status                      object key
+    data.items.0.name           array index (also data.items[0].name)
+    data.items.*.id             wildcard over array elements or object values
+    data.items[10:20].id        slice (start:stop:step, non-negative)
+    data["dotted.key"]          quoted key
+
+Strings print raw, everything else as JSON; multiple matches print one per line.
+
+Usage:
+    python json-parse.py [field.path] [--ndjson] [--limit N] [-c] [-f FILE]
+Example:
+    curl -s http://localhost:3001/api/health | python json-parse.py status
+    python json-parse.py data.__schema.types.*.name -f introspection.json
+    python json-parse.py msg --ndjson < service.log.json
 """
-import sys
+import argparse
+import io
 import json
+import re
+import sys
+from json.decoder import scanstring
+from typing import IO, Any, Iterator, List, Optional
 
-def parse_json(json_str, path=None):
-    try:
-        data = json.loads(json_str)
-
-        if path:
-            # Navigate through the path (e.g., "status" or "data.items.0.name")
-            parts = path.split('.')
-            result = data
-            for part in parts:
-                if part.isdigit():
-                    result = result[int(part)]
-                else:
-                    result = result[part]
-            return result
+# Constants
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Everything up to the next bracket, taking whole strings in one step
+NON_BRACKET_RUN = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+SCALAR_CHARS = re.compile(r'[-+.0-9eEtrufalsn]*')
+SCALAR = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+PATH_TOKEN = re.compile(r'\.?(?:\[(?P<bracket>[^\]]*)\]|(?P<name>[^.\[\]]+))')
+DECODER = json.JSONDecoder()
+
+
+# ---------------------------------------------------------------------------
+# Path compilation
+# ---------------------------------------------------------------------------
+
+class Segment:
+    """One path step: key, index, wildcard or slice"""
+
+    def __init__(self, kind: str, key: str = None, start: int = 0,
+                 stop: Optional[int] = None, step: int = 1):
+        self.kind = kind
+        self.key = key
+        self.start = start
+        self.stop = stop
+        self.step = step
+
+    @property
+    def single(self) -> bool:
+        """Matches at most one child"""
+        return self.kind in ("key", "index")
+
+    def matches_key(self, key: str) -> bool:
+        if self.kind == "key":
+            return key == self.key
+        if self.kind == "index":
+            return key == str(self.start)
+        return self.kind == "wildcard"
+
+    def matches_index(self, i: int) -> bool:
+        if self.kind == "index":
+            return i == self.start
+        if self.kind == "slice":
+            return i >= self.start and (self.stop is None or i < self.stop) \
+                and (i - self.start) % self.step == 0
+        if self.kind == "key":
+            return self.key.isdigit() and int(self.key) == i
+        return True
+
+    def exhausted(self, i: int) -> bool:
+        """No array element at index >= i can match"""
+        if self.kind == "index":
+            return i > self.start
+        if self.kind == "slice":
+            return self.stop is not None and i >= self.stop
+        return False
+
+
+def _slice_part(text: str, default: Optional[int]) -> Optional[int]:
+    text = text.strip()
+    if not text:
+        return default
+    value = int(text)
+    if value < 0:
+        raise ValueError("negative indices need the whole array and are not supported when streaming")
+    return value
+
+
+def compile_path(path: Optional[str]) -> List[Segment]:
+    """
+    Parse a dotted/bracketed path into segments
+
+    Raises:
+        ValueError: Malformed path or negative index
+    """
+    if not path or path == ".":
+        return []
+    segments = []
+    pos = 0
+    while pos < len(path):
+        m = PATH_TOKEN.match(path, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Invalid path near '{path[pos:]}'")
+        pos = m.end()
+
+        if m.group("name") is not None:
+            name = m.group("name")
+            if name == "*":
+                segments.append(Segment("wildcard"))
+            elif name.isdigit():
+                segments.append(Segment("index", start=int(name)))
+            else:
+                segments.append(Segment("key", key=name))
+            continue
+
+        inner = m.group("bracket").strip()
+        if inner == "*":
+            segments.append(Segment("wildcard"))
+        elif len(inner) >= 2 and inner[0] == inner[-1] and inner[0] in "\"'":
+            segments.append(Segment("key", key=inner[1:-1]))
+        elif ":" in inner:
+            parts = inner.split(":")
+            if len(parts) > 3:
+                raise ValueError(f"Invalid slice [{inner}]")
+            step = _slice_part(parts[2], 1) if len(parts) == 3 else 1
+            if step == 0:
+                raise ValueError("slice step cannot be zero")
+            segments.append(Segment("slice", start=_slice_part(parts[0], 0),
+                                    stop=_slice_part(parts[1], None), step=step))
+        elif inner.lstrip("-").isdigit():
+            segments.append(Segment("index", start=_slice_part(inner, 0)))
         else:
-            # Pretty print the entire JSON
-            return json.dumps(data, indent=2)
-    except json.JSONDecodeError as e:
-        return f"Error parsing JSON: {e}"
-    except (KeyError, IndexError, TypeError) as e:
-        return f"Path not found: {path}"
-    except Exception as e:
-        return f"Error: {e}"
+            segments.append(Segment("key", key=inner))
+    return segments
 
-if __name__ == "__main__":
-    # Read from stdin
-    input_data = sys.stdin.read()
 
-    # Get path argument if provided
-    path = sys.argv[1] if len(sys.argv) > 1 else None
+# ---------------------------------------------------------------------------
+# Incremental tokenizer
+# ---------------------------------------------------------------------------
+
+class JsonStream:
+    """Pull tokenizer over a text stream holding only the unconsumed window in memory"""
+
+    def __init__(self, fp: IO[str], chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.offset = 0  # characters discarded before buf[0]
+
+    def _fill(self, want: int = 0) -> bool:
+        """Append more input, dropping the consumed prefix. Returns False at EOF."""
+        if self.eof:
+            return False
+        data = self.fp.read(max(want, self.chunk_size))
+        if not data:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _grow(self) -> bool:
+        # Doubling keeps retries over one large token linear overall
+        return self._fill(len(self.buf) - self.pos)
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at char {self.offset + self.pos}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expected '{char}'")
+        self.pos += 1
+
+    def read_string(self) -> str:
+        while True:
+            try:
+                value, self.pos = scanstring(self.buf, self.pos + 1, True)
+                return value
+            except ValueError:
+                if not self._grow():
+                    raise self.error("Unterminated string")
+
+    def _complete_scalar(self) -> None:
+        """Make sure a bare scalar is not cut off at the buffer edge ("1." + "5")"""
+        while SCALAR_CHARS.match(self.buf, self.pos).end() == len(self.buf) and self._grow():
+            pass
 
-    result = parse_json(input_data, path)
-    print(result)
\ No newline at end of file
+    def read_value(self) -> Any:
+        """Decode the next complete value"""
+        if self.peek() not in ('{', '[', '"'):
+            self._complete_scalar()
+        while True:
+            try:
+                value, self.pos = DECODER.raw_decode(self.buf, self.pos)
+                return value
+            except ValueError:
+                if not self._grow():
+                    raise self.error("Invalid JSON value")
+
+    def skip_value(self) -> None:
+        """Advance past the next value without decoding it"""
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+        elif char in ("{", "["):
+            depth = 0
+            while True:
+                self.pos = NON_BRACKET_RUN.match(self.buf, self.pos).end()
+                if self.pos == len(self.buf):
+                    if not self._fill():
+                        raise self.error("Unexpected end of input")
+                    continue
+                char = self.buf[self.pos]
+                if char == '"':
+                    # String continues past the buffer edge
+                    if not self._grow():
+                        raise self.error("Unterminated string")
+                    continue
+                self.pos += 1
+                depth += 1 if char in "{[" else -1
+                if depth == 0:
+                    return
+        else:
+            self._skip_scalar()
+
+    def _skip_string(self) -> None:
+        while True:
+            m = STRING_TAIL.match(self.buf, self.pos + 1)
+            if m:
+                self.pos = m.end()
+                return
+            if not self._grow():
+                raise self.error("Unterminated string")
+
+    def _skip_scalar(self) -> None:
+        self._complete_scalar()
+        m = SCALAR.match(self.buf, self.pos)
+        if not m:
+            raise self.error("Invalid JSON value")
+        self.pos = m.end()
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield member keys; the caller must consume each value before resuming"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expected object key")
+            key = self.read_string()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self.pos -= 1
+                raise self.error("Expected ',' or '}'")
+
+    def iter_array(self) -> Iterator[int]:
+        """Yield element indices; the caller must consume each element before resuming"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self.pos -= 1
+                raise self.error("Expected ',' or ']'")
+
+
+# ---------------------------------------------------------------------------
+# Extraction
+# ---------------------------------------------------------------------------
+
+def _walk(stream: JsonStream, segments: List[Segment], i: int, final_upto: int) -> Iterator[Any]:
+    """
+    Yield values at segments[i:] below the current stream position.
+
+    While i <= final_upto every ancestor matched a single child, so once this
+    container can yield nothing more the walk stops without consuming the rest
+    of the document (the early exit).
+    """
+    if i == len(segments):
+        yield stream.read_value()
+        return
+
+    seg = segments[i]
+    final = i <= final_upto
+    char = stream.peek()
+
+    if char == "{":
+        for key in stream.iter_object():
+            if seg.matches_key(key):
+                yield from _walk(stream, segments, i + 1, final_upto)
+                if seg.single and final:
+                    return
+            else:
+                stream.skip_value()
+    elif char == "[":
+        for index in stream.iter_array():
+            if final and seg.exhausted(index):
+                return
+            if seg.matches_index(index):
+                yield from _walk(stream, segments, i + 1, final_upto)
+                if seg.single and final:
+                    return
+            else:
+                stream.skip_value()
+    elif char == "":
+        raise stream.error("Unexpected end of input")
+    else:
+        stream.skip_value()
+
+
+def extract(fp: IO[str], segments: List[Segment], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Stream values matching a compiled path from a single JSON document
+
+    Args:
+        fp: Text stream
+        segments: Output of compile_path()
+        chunk_size: Read size in characters
+
+    Raises:
+        ValueError: Malformed JSON on the part of the input that was read
+    """
+    final_upto = next((i for i, seg in enumerate(segments) if not seg.single), len(segments))
+    stream = JsonStream(fp, chunk_size)
+    yield from _walk(stream, segments, 0, final_upto)
+
+
+def select(value: Any, segments: List[Segment], i: int = 0) -> Iterator[Any]:
+    """Apply a compiled path to an already decoded value"""
+    if i == len(segments):
+        yield value
+        return
+    seg = segments[i]
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if seg.matches_key(key):
+                yield from select(child, segments, i + 1)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            if seg.matches_index(index):
+                yield from select(child, segments, i + 1)
+
+
+def extract_ndjson(fp: IO[str], segments: List[Segment]) -> Iterator[Any]:
+    """Apply a compiled path to each line of newline-delimited JSON"""
+    for lineno, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {lineno}: {e}")
+        yield from select(value, segments)
+
+
+def format_value(value: Any, compact: bool = False) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, indent=None if compact else 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming JSON path extractor (jq substitute)")
+    parser.add_argument("path", nargs="?", help="Path such as data.items.*.id (default: whole document)")
+    parser.add_argument("-f", "--file", help="Read from file instead of stdin")
+    parser.add_argument("--ndjson", action="store_true", help="Apply the path to every line")
+    parser.add_argument("--limit", type=int, help="Stop after N matches")
+    parser.add_argument("-c", "--compact", action="store_true", help="One-line JSON output")
+    args = parser.parse_args()
+
+    try:
+        segments = compile_path(args.path)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    if args.file:
+        fp = open(args.file, 'r', encoding='utf-8-sig')
+    else:
+        fp = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig')
+
+    matches = 0
+    try:
+        values = extract_ndjson(fp, segments) if args.ndjson else extract(fp, segments)
+        for value in values:
+            print(format_value(value, args.compact))
+            matches += 1
+            if args.limit and matches >= args.limit:
+                break
+    except ValueError as e:
+        print(f"Error parsing JSON: {e}")
+        sys.exit(1)
+    except BrokenPipeError:
+        sys.exit(0)
+    finally:
+        fp.close()
+
+    if not matches and not args.ndjson:
+        print(f"Path not found: {args.path}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
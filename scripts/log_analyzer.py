@@ -0,0 +1,620 @@
+#!/usr/bin/env python3
+"""
+Streaming analyzer for service logs (docker logs / docker compose logs dumps)
+Extracts request latencies, slow queries and errors from raw Nest service output
+
+Input lines are cleaned of ANSI escapes and `vextrus-<svc>  |` compose prefixes,
+then parsed into structured events:
+- request:     "GET /api/v1/invoices 200 12ms" style access logs (Nest's
+               trailing "+3ms" logger delta is not a latency)
+- slow_query:  TypeORM "query is slow: ..." followed by "execution time: N"
+- query_error: TypeORM "query failed: ..." followed by "error: ..."
+- ts_error:    tsc / nest --watch diagnostics (file:line:col - error TSxxxx: ...)
+- error:       Nest ERROR/FATAL lines and uncaught "XxxError: ..." lines
+
+Aggregates per service: latency histograms per normalized route (ids and
+UUIDs collapsed), top error signatures, slow query signatures and TS errors.
+
+Files are scanned through mmap in large chunks and only lines that can hold
+an event are decoded; files over 256 MB are split into newline-aligned ranges
+across --jobs worker processes and the partial reports merged. --follow keeps
+reading a growing file (or stdin) and prints events as they arrive.
+
+Usage:
+    python scripts/log_analyzer.py finance-full-logs.txt
+    docker compose logs --no-color > all.log && python scripts/log_analyzer.py all.log --top 20
+    docker logs -f vextrus-finance 2>&1 | python scripts/log_analyzer.py - --follow
+    python scripts/log_analyzer.py big.log --events > events.ndjson
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bench_results import Histogram
+
+# Constants
+CHUNK_BYTES = 16 * 1024 * 1024
+PARALLEL_MIN_BYTES = 256 * 1024 * 1024  # smaller files aren't worth the worker start-up
+FOLLOW_POLL_SECONDS = 0.5
+DEFAULT_TOP = 10
+DEFAULT_SLOW_MS = 1000.0
+MAX_SAMPLE_CHARS = 240
+MAX_FILES_PER_TS_ERROR = 5
+UNKNOWN_SERVICE = "unknown"
+
+# Byte-level prefilter run over whole chunks: a line holding none of these
+# markers and no " <number>ms" latency cannot produce an event (Nest's
+# "+3ms" logger delta has no leading space, so it never matches)
+CANDIDATE_MARKERS = (b"rror", b"RROR", b"slow", b"execution time", b"query failed", b"FATAL", b"Exception")
+LATENCY_PATTERN = re.compile(rb" \d+(?:\.\d+)? ?ms\b")
+
+ANSI_PATTERN = re.compile(rb"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07|\x1b[@-Z\\-_]")
+PREFIX_PATTERN = re.compile(rb"^([\w.-]+?)(?:[-_]\d+)?\s+\|\s?")
+NEST_DELTA_PATTERN = re.compile(r"\s+\+\d+ms\s*$")
+NEST_PATTERN = re.compile(
+    r"^\[Nest\]\s+\d+\s+-\s+(.+?)\s+(LOG|ERROR|WARN|DEBUG|VERBOSE|FATAL)\s+\[([^\]]+)\]\s+(.*)$"
+)
+REQUEST_PATTERN = re.compile(
+    r"\b(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS)\s+(/[^\s\"]*)(?:\s+HTTP/[\d.]+)?\"?\s+(?:-\s+)?(\d{3})\b"
+    r".*? (\d+(?:\.\d+)?) ?ms\b"
+)
+TS_ERROR_PATTERNS = (
+    re.compile(r"^(\S+\.[cm]?[jt]sx?):(\d+):(\d+) - error (TS\d+): (.*)$"),
+    re.compile(r"^(\S+\.[cm]?[jt]sx?)\((\d+),(\d+)\): error (TS\d+): (.*)$"),
+)
+SLOW_QUERY_PATTERN = re.compile(r"query is slow:\s*(.*)$", re.IGNORECASE)
+EXECUTION_TIME_PATTERN = re.compile(r"execution time:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+QUERY_FAILED_PATTERN = re.compile(r"query failed:\s*(.*)$", re.IGNORECASE)
+QUERY_ERROR_PATTERN = re.compile(r"^error:\s*(.*)$", re.IGNORECASE)
+GENERIC_ERROR_PATTERN = re.compile(r"\b([A-Z]\w*(?:Error|Exception)):\s+(.+)$")
+
+UUID_PATTERN = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b")
+HEX_PATTERN = re.compile(r"\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{16,}\b")
+NUMBER_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+SQL_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+SQL_PARAM_PATTERN = re.compile(r"\$\d+")
+SQL_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+ROUTE_ID_PATTERN = re.compile(
+    r"/(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+|"
+    r"(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{16,})(?=/|$)"
+)
+
+
+# ---------------------------------------------------------------------------
+# Normalization
+# ---------------------------------------------------------------------------
+
+def normalize_route(path: str) -> str:
+    """Collapse ids in a request path: /invoices/42/lines/<uuid> -> /invoices/:id/lines/:id"""
+    path = path.split("?", 1)[0]
+    return ROUTE_ID_PATTERN.sub("/:id", path) if any(c.isdigit() for c in path) else path
+
+
+def error_signature(message: str) -> str:
+    """Group equivalent error messages (ids, numbers and hex tokens masked)"""
+    message = UUID_PATTERN.sub("<uuid>", message)
+    message = HEX_PATTERN.sub("<hex>", message)
+    message = NUMBER_PATTERN.sub("<n>", message)
+    return WHITESPACE_PATTERN.sub(" ", message).strip()[:MAX_SAMPLE_CHARS]
+
+
+def sql_signature(sql: str) -> str:
+    """Literal-free SQL shape (strings, numbers and $n parameters become ?)"""
+    sql = sql.split(" -- PARAMETERS:", 1)[0]
+    sql = SQL_STRING_PATTERN.sub("?", sql)
+    sql = SQL_PARAM_PATTERN.sub("?", sql)
+    sql = NUMBER_PATTERN.sub("?", sql)
+    sql = SQL_IN_LIST_PATTERN.sub("(?...)", sql)
+    return WHITESPACE_PATTERN.sub(" ", sql).strip()[:MAX_SAMPLE_CHARS]
+
+
+def service_name(prefix: str) -> str:
+    """Compose container prefix -> service name (vextrus-finance -> finance)"""
+    return prefix[len("vextrus-"):] if prefix.startswith("vextrus-") else prefix
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+class LogParser:
+    """Line-oriented parser; keeps per-service state for two-line TypeORM messages."""
+
+    def __init__(self, default_service: str = UNKNOWN_SERVICE):
+        self.default_service = default_service
+        self._pending: Dict[str, Dict] = {}
+
+    def split_line(self, raw: bytes):
+        """Strip ANSI escapes and the compose prefix; returns (service, text)"""
+        if b"\x1b" in raw:
+            raw = ANSI_PATTERN.sub(b"", raw)
+        service = self.default_service
+        match = PREFIX_PATTERN.match(raw)
+        if match:
+            service = service_name(match.group(1).decode("utf-8", "replace"))
+            raw = raw[match.end():]
+        return service, raw.decode("utf-8", "replace").rstrip("\r\n")
+
+    def parse(self, raw: bytes) -> Optional[Dict]:
+        """Parse one raw line into an event (or None)"""
+        service, text = self.split_line(raw)
+        text = text.strip()
+        if not text or text.startswith("at "):
+            return None
+
+        pending = self._pending.pop(service, None)
+        if pending is not None:
+            event = self._complete(pending, text)
+            if event is not None:
+                return event
+
+        if "rror TS" in text:
+            for pattern in TS_ERROR_PATTERNS:
+                match = pattern.match(text)
+                if match:
+                    file, line, column, code, message = match.groups()
+                    return {"type": "ts_error", "service": service, "file": file, "line": int(line),
+                            "column": int(column), "code": code, "message": message}
+
+        if "slow" in text or "SLOW" in text:
+            match = SLOW_QUERY_PATTERN.search(text)
+            if match:
+                self._pending[service] = {"type": "slow_query", "service": service, "sql": match.group(1)}
+                return None
+        if "failed" in text or "FAILED" in text:
+            match = QUERY_FAILED_PATTERN.search(text)
+            if match:
+                self._pending[service] = {"type": "query_error", "service": service, "sql": match.group(1)}
+                return None
+
+        level, context = None, None
+        if text.startswith("[Nest]"):
+            match = NEST_PATTERN.match(text)
+            if match:
+                _, level, context, text = match.groups()
+                if text.endswith("ms"):
+                    text = NEST_DELTA_PATTERN.sub("", text)
+
+        match = REQUEST_PATTERN.search(text)
+        if match:
+            method, path, status, ms = match.groups()
+            return {"type": "request", "service": service, "method": method, "path": path,
+                    "route": normalize_route(path), "status": int(status), "ms": float(ms)}
+
+        if level in ("ERROR", "FATAL"):
+            return {"type": "error", "service": service, "level": level, "context": context,
+                    "message": text, "signature": f"[{context}] {error_signature(text)}"}
+
+        match = GENERIC_ERROR_PATTERN.search(text)
+        if match and level not in ("LOG", "DEBUG", "VERBOSE"):
+            kind, message = match.groups()
+            return {"type": "error", "service": service, "level": level or "ERROR", "context": context,
+                    "message": f"{kind}: {message}", "signature": f"{kind}: {error_signature(message)}"}
+        return None
+
+    def _complete(self, pending: Dict, text: str) -> Optional[Dict]:
+        """Second line of a TypeORM slow-query / failed-query pair"""
+        if pending["type"] == "slow_query":
+            match = EXECUTION_TIME_PATTERN.search(text)
+            if match:
+                return dict(pending, ms=float(match.group(1)), signature=sql_signature(pending["sql"]))
+        else:
+            match = QUERY_ERROR_PATTERN.match(text)
+            if match:
+                return dict(pending, message=match.group(1),
+                            signature=f"{error_signature(match.group(1))} <- {sql_signature(pending['sql'])}")
+        return None
+
+
+def iter_candidate_lines(data: bytes) -> Iterator[bytes]:
+    """
+    Lines of a chunk that may hold an event, in order.
+
+    Markers are located with bytes.find and one literal-prefixed regex over
+    the whole chunk, so the bulk of uninteresting lines is never split or decoded.
+    """
+    starts = set()
+    for marker in CANDIDATE_MARKERS:
+        pos = data.find(marker)
+        while pos >= 0:
+            starts.add(data.rfind(b"\n", 0, pos) + 1)
+            newline = data.find(b"\n", pos)
+            if newline < 0:
+                break
+            pos = data.find(marker, newline)
+    for match in LATENCY_PATTERN.finditer(data):
+        starts.add(data.rfind(b"\n", 0, match.start()) + 1)
+    for start in sorted(starts):
+        end = data.find(b"\n", start)
+        yield data[start:end if end >= 0 else len(data)]
+
+
+def iter_file_chunks(path: Path) -> Iterator[bytes]:
+    """Newline-aligned chunks of a file via mmap (CHUNK_BYTES at a time)"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = min(size, start + CHUNK_BYTES)
+                if end < size:
+                    newline = mm.rfind(b"\n", start, end)
+                    end = newline + 1 if newline >= start else end
+                yield mm[start:end]
+                start = end
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+class LogReport:
+    """Per-service aggregates built from parsed events."""
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS):
+        self.slow_ms = slow_ms
+        self.lines = 0
+        self.bytes = 0
+        self.services: Dict[str, Dict] = {}
+
+    def _service(self, name: str) -> Dict:
+        if name not in self.services:
+            self.services[name] = {"routes": {}, "errors": {}, "slow_queries": {}, "ts_errors": {},
+                                   "events": 0}
+        return self.services[name]
+
+    @staticmethod
+    def _bump(table: Dict, key: str, sample: str) -> Dict:
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = {"count": 0, "sample": sample[:MAX_SAMPLE_CHARS]}
+        entry["count"] += 1
+        return entry
+
+    def add(self, event: Dict):
+        service = self._service(event["service"])
+        service["events"] += 1
+        kind = event["type"]
+        if kind == "request":
+            key = f"{event['method']} {event['route']}"
+            route = service["routes"].get(key)
+            if route is None:
+                route = service["routes"][key] = {"latency": Histogram(), "status": {}, "slow": 0}
+            route["latency"].add(event["ms"])
+            status = f"{event['status'] // 100}xx"
+            route["status"][status] = route["status"].get(status, 0) + 1
+            if event["ms"] >= self.slow_ms:
+                route["slow"] += 1
+        elif kind == "slow_query":
+            entry = self._bump(service["slow_queries"], event["signature"], event["sql"])
+            entry.setdefault("latency", Histogram()).add(event["ms"])
+        elif kind == "ts_error":
+            entry = self._bump(service["ts_errors"], f"{event['code']}: {event['message']}", event["message"])
+            files = entry.setdefault("files", [])
+            location = f"{event['file']}:{event['line']}"
+            if location not in files and len(files) < MAX_FILES_PER_TS_ERROR:
+                files.append(location)
+        else:
+            self._bump(service["errors"], event["signature"], event["message"])
+
+    def merge(self, other: "LogReport"):
+        """Fold in a report built from another part of the input"""
+        self.lines += other.lines
+        self.bytes += other.bytes
+        for name, theirs in other.services.items():
+            mine = self._service(name)
+            mine["events"] += theirs["events"]
+            for key, route in theirs["routes"].items():
+                if key not in mine["routes"]:
+                    mine["routes"][key] = route
+                    continue
+                target = mine["routes"][key]
+                target["latency"].merge(route["latency"])
+                target["slow"] += route["slow"]
+                for status, count in route["status"].items():
+                    target["status"][status] = target["status"].get(status, 0) + count
+            for table in ("errors", "slow_queries", "ts_errors"):
+                for key, entry in theirs[table].items():
+                    if key not in mine[table]:
+                        mine[table][key] = entry
+                        continue
+                    target = mine[table][key]
+                    target["count"] += entry["count"]
+                    if "latency" in entry:
+                        target["latency"].merge(entry["latency"])
+                    for location in entry.get("files", []):
+                        if location not in target["files"] and len(target["files"]) < MAX_FILES_PER_TS_ERROR:
+                            target["files"].append(location)
+
+    def to_dict(self, top: int = DEFAULT_TOP) -> Dict:
+        def ranked(table: Dict) -> List[Dict]:
+            rows = sorted(table.items(), key=lambda item: -item[1]["count"])[:top]
+            result = []
+            for signature, entry in rows:
+                row = {"signature": signature, "count": entry["count"], "sample": entry["sample"]}
+                if "latency" in entry:
+                    row.update(_latency_summary(entry["latency"]))
+                if "files" in entry:
+                    row["files"] = entry["files"]
+                result.append(row)
+            return result
+
+        services = {}
+        for name, data in sorted(self.services.items()):
+            routes = {key: dict(_latency_summary(route["latency"]), status=route["status"], slow=route["slow"])
+                      for key, route in data["routes"].items()}
+            services[name] = {
+                "events": data["events"],
+                "routes": dict(sorted(routes.items(), key=lambda item: -item[1]["count"])),
+                "errors": ranked(data["errors"]),
+                "error_total": sum(e["count"] for e in data["errors"].values()),
+                "slow_queries": ranked(data["slow_queries"]),
+                "ts_errors": ranked(data["ts_errors"]),
+                "ts_error_total": sum(e["count"] for e in data["ts_errors"].values()),
+            }
+        return {"lines": self.lines, "bytes": self.bytes, "services": services}
+
+
+def _latency_summary(histogram: Histogram) -> Dict:
+    return {"count": histogram.count,
+            "avg_ms": round(histogram.total / histogram.count, 2) if histogram.count else None,
+            "p50_ms": histogram.percentile(50), "p95_ms": histogram.percentile(95),
+            "p99_ms": histogram.percentile(99),
+            "max_ms": round(histogram.max, 2) if histogram.max is not None else None}
+
+
+# ---------------------------------------------------------------------------
+# Drivers
+# ---------------------------------------------------------------------------
+
+def analyze_chunks(chunks, parser: LogParser, report: LogReport, service_filter: Optional[str] = None,
+                   on_event=None):
+    """Feed newline-aligned chunks through the prefilter, parser and report"""
+    for data in chunks:
+        report.lines += data.count(b"\n") + (0 if data.endswith(b"\n") else 1)
+        report.bytes += len(data)
+        for raw in iter_candidate_lines(data):
+            event = parser.parse(raw)
+            if event is None or (service_filter and event["service"] != service_filter):
+                continue
+            report.add(event)
+            if on_event:
+                on_event(event)
+
+
+def _file_ranges(path: Path, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into newline-aligned byte ranges"""
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    step = max(CHUNK_BYTES, size // parts + 1)
+    ranges, start = [], 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = min(size, start + step)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _analyze_range(job: Tuple) -> LogReport:
+    """Worker: analyze one byte range of a file into its own report"""
+    path, start, end, default_service, slow_ms, service_filter = job
+    report = LogReport(slow_ms)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offsets = iter(range(start, end, CHUNK_BYTES))
+
+        def read():
+            offset = next(offsets, None)
+            return None if offset is None else mm[offset:min(end, offset + CHUNK_BYTES)]
+
+        # Fixed-size slices cut lines in half; _complete_lines re-aligns them
+        analyze_chunks(_complete_lines(read, follow=False), LogParser(default_service), report, service_filter)
+    return report
+
+
+def analyze_file_parallel(path: Path, jobs: int, default_service: str, slow_ms: float,
+                          service_filter: Optional[str] = None) -> LogReport:
+    """
+    Analyze a large file with a process pool over newline-aligned ranges.
+
+    A TypeORM slow-query pair split exactly across two ranges is dropped;
+    everything else matches a sequential scan.
+    """
+    ranges = _file_ranges(path, jobs)
+    report = LogReport(slow_ms)
+    work = [(str(path), start, end, default_service, slow_ms, service_filter) for start, end in ranges]
+    if jobs <= 1 or len(work) <= 1:
+        for job in work:
+            report.merge(_analyze_range(job))
+        return report
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for partial in pool.map(_analyze_range, work):
+            report.merge(partial)
+    return report
+
+
+def _complete_lines(read, follow: bool) -> Iterator[bytes]:
+    """Chunks of whole lines from a read() callable; a trailing partial line waits for more"""
+    partial = b""
+    while True:
+        data = read()
+        if data is None:
+            break
+        if not data:
+            if not follow:
+                break
+            time.sleep(FOLLOW_POLL_SECONDS)
+            continue
+        data = partial + data
+        cut = data.rfind(b"\n") + 1
+        partial = data[cut:]
+        if cut:
+            yield data[:cut]
+    if partial:
+        yield partial
+
+
+def follow_file(path: Path, from_end: bool = False) -> Iterator[bytes]:
+    """Chunks appended to a file, surviving truncation and rotation (tail -F)"""
+    state = {"file": open(path, "rb")}
+    state["inode"] = os.fstat(state["file"].fileno()).st_ino
+    if from_end:
+        state["file"].seek(0, os.SEEK_END)
+
+    def read():
+        data = state["file"].read(CHUNK_BYTES)
+        if data:
+            return data
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return b""  # rotated away; wait for the new file
+        if stat.st_ino != state["inode"]:
+            state["file"].close()
+            state["file"] = open(path, "rb")
+            state["inode"] = os.fstat(state["file"].fileno()).st_ino
+        elif stat.st_size < state["file"].tell():
+            state["file"].seek(0)  # truncated in place
+        return b""
+
+    try:
+        yield from _complete_lines(read, follow=True)
+    finally:
+        state["file"].close()
+
+
+def iter_stdin_chunks() -> Iterator[bytes]:
+    """Chunks from stdin as soon as they arrive (works with `docker logs -f | ...`)"""
+    stream = sys.stdin.buffer
+    yield from _complete_lines(lambda: stream.read1(CHUNK_BYTES) or None, follow=False)
+
+
+def format_event(event: Dict) -> str:
+    """One-line rendering for --follow"""
+    kind, service = event["type"], event["service"]
+    if kind == "request":
+        return f"🐢 {service:<14} {event['method']} {event['path']} {event['status']} {event['ms']:.0f}ms"
+    if kind == "slow_query":
+        return f"🐌 {service:<14} slow query {event['ms']:.0f}ms: {event['signature'][:120]}"
+    if kind == "ts_error":
+        return f"🧩 {service:<14} {event['file']}:{event['line']} {event['code']} {event['message'][:120]}"
+    return f"❌ {service:<14} {event.get('signature', event.get('message', ''))[:160]}"
+
+
+def print_report(report: Dict, top: int = DEFAULT_TOP):
+    mb = report["bytes"] / (1024 * 1024)
+    print(f"{'=' * 90}")
+    print(f"LOG ANALYSIS ({report['lines']:,} lines, {mb:.1f} MB)")
+    print(f"{'=' * 90}")
+    if not report["services"]:
+        print("No events found")
+        return
+
+    for name, data in report["services"].items():
+        print(f"\n📦 {name} ({data['events']} events)")
+        if data["routes"]:
+            print(f"  {'ROUTE':<44}{'COUNT':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'MAX':>9}  STATUS")
+            for route, row in list(data["routes"].items())[:top]:
+                statuses = " ".join(f"{k}={v}" for k, v in sorted(row["status"].items()))
+                print(f"  {route[:43]:<44}{row['count']:>7}{row['p50_ms']!s:>9}{row['p95_ms']!s:>9}"
+                      f"{row['p99_ms']!s:>9}{row['max_ms']!s:>9}  {statuses}")
+        if data["errors"]:
+            print(f"  Top errors ({data['error_total']} total):")
+            for row in data["errors"]:
+                print(f"    {row['count']:>6}  {row['signature'][:110]}")
+        if data["slow_queries"]:
+            print("  Slow queries:")
+            for row in data["slow_queries"]:
+                print(f"    {row['count']:>6}  p95 {row['p95_ms']}ms  {row['signature'][:100]}")
+        if data["ts_errors"]:
+            print(f"  TypeScript errors ({data['ts_error_total']} total):")
+            for row in data["ts_errors"]:
+                where = ", ".join(row["files"][:3]) + (" ..." if len(row["files"]) > 3 else "")
+                print(f"    {row['count']:>6}  {row['signature'][:100]}")
+                print(f"            {where}")
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Extract latencies and errors from service logs')
+    parser.add_argument('logs', nargs='+', help="Log files, or '-' for stdin")
+    parser.add_argument('--service', help='Only report this service (e.g. finance)')
+    parser.add_argument('--default-service', default=UNKNOWN_SERVICE,
+                        help='Service name for lines without a compose prefix')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='Rows per table')
+    parser.add_argument('--slow-ms', type=float, default=DEFAULT_SLOW_MS,
+                        help='Requests at or above this latency count as slow')
+    parser.add_argument('--follow', '-f', action='store_true',
+                        help='Keep reading as the log grows and print events live')
+    parser.add_argument('--from-end', action='store_true', help='With --follow, skip existing content')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for large files (not used with --follow/--events)')
+    parser.add_argument('--events', action='store_true', help='Write events as NDJSON instead of a report')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    log_parser = LogParser(args.default_service)
+    report = LogReport(args.slow_ms)
+    on_event = None
+    if args.events:
+        def on_event(event):
+            sys.stdout.write(json.dumps(event) + "\n")
+    elif args.follow:
+        def on_event(event):
+            if event["type"] != "request" or event["ms"] >= args.slow_ms or event["status"] >= 500:
+                print(format_event(event), flush=True)
+
+    t0 = time.perf_counter()
+    try:
+        for name in args.logs:
+            if name != "-" and not (args.follow or args.events) and args.jobs > 1 \
+                    and Path(name).stat().st_size >= PARALLEL_MIN_BYTES:
+                report.merge(analyze_file_parallel(Path(name), args.jobs, args.default_service,
+                                                   args.slow_ms, args.service))
+                continue
+            if name == "-":
+                chunks = iter_stdin_chunks()
+            elif args.follow:
+                chunks = follow_file(Path(name), args.from_end)
+            else:
+                chunks = iter_file_chunks(Path(name))
+            analyze_chunks(chunks, log_parser, report, args.service, on_event)
+    except KeyboardInterrupt:
+        print()
+    except BrokenPipeError:
+        # Downstream (e.g. `| head`) closed early; silence the final flush too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    except OSError as e:
+        print(f"Error reading logs: {e}")
+        sys.exit(1)
+
+    if args.events:
+        return
+    result = report.to_dict(args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result, args.top)
+        elapsed = time.perf_counter() - t0
+        print(f"\nScanned in {elapsed:.2f}s ({report.bytes / (1024 * 1024) / max(elapsed, 1e-9):.0f} MB/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Wire-protocol probes for Vextrus ERP infrastructure dependencies
+Talks to Postgres, Redis and Kafka directly instead of through a service's /health/ready
+
+Each probe opens its own connection and measures:
+- connect_ms:   TCP connect
+- handshake_ms: protocol negotiation (Postgres SSLRequest/TLS, Redis AUTH)
+- rtt_ms:       one protocol round trip (Postgres startup -> auth request,
+                Redis PING -> PONG, Kafka ApiVersions request -> response)
+- total_ms:     wall time of the whole probe
+
+Targets come from the compose inventory: every Postgres/Redis/Kafka service
+that application services depend on and that publishes a port. Probes run
+concurrently under one deadline each.
+
+Usage:
+    python scripts/protocol_probes.py [--host localhost] [--timeout 5]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import ssl
+import struct
+import time
+from typing import Dict, List, Optional
+
+from compose_inventory import discover_services, environment_dict
+
+# Constants
+DEFAULT_TIMEOUT = 5.0
+CLIENT_ID = "vextrus-health-prober"
+
+POSTGRES_SSL_REQUEST_CODE = 80877103
+POSTGRES_PROTOCOL_VERSION = 196608  # 3.0
+KAFKA_API_VERSIONS_KEY = 18
+MAX_FRAME_BYTES = 1 << 20  # probe replies are tiny; anything larger is not the protocol
+
+# Compose variable interpolation: ${VAR}, ${VAR:-default}, ${VAR-default}, $VAR, $$
+COMPOSE_VARIABLE_PATTERN = re.compile(r"\$(?:\{([A-Za-z_]\w*)(?:(:?-)([^}]*))?\}|([A-Za-z_]\w*)|(\$))")
+
+# Postgres authentication request codes (message 'R')
+POSTGRES_AUTH_METHODS = {0: "ok", 3: "cleartext", 5: "md5", 10: "sasl"}
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+class _Timer:
+    """Collects the per-phase timings of one probe."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings = {"connect_ms": None, "handshake_ms": None, "rtt_ms": None, "total_ms": None}
+
+    def finish(self) -> Dict:
+        self.timings["total_ms"] = _ms(self.start)
+        return self.timings
+
+
+# ---------------------------------------------------------------------------
+# Postgres
+# ---------------------------------------------------------------------------
+
+async def _read_postgres_message(reader: asyncio.StreamReader):
+    header = await reader.readexactly(5)
+    msg_type, length = header[:1], struct.unpack("!I", header[1:])[0]
+    if not 4 <= length <= MAX_FRAME_BYTES:
+        raise ValueError(f"not a Postgres message (type {msg_type!r}, length {length})")
+    return msg_type, await reader.readexactly(length - 4)
+
+
+def _postgres_error_text(payload: bytes) -> str:
+    """Extract the M (message) field of an ErrorResponse"""
+    for field in payload.split(b"\x00"):
+        if field.startswith(b"M"):
+            return field[1:].decode("utf-8", errors="replace")
+    return "error response"
+
+
+async def probe_postgres(host: str, port: int, user: str = "postgres", database: str = "postgres",
+                         use_ssl: bool = True) -> Dict:
+    """
+    SSL negotiation plus startup message up to the server's auth request.
+
+    No password is sent: receiving an AuthenticationRequest (or an auth
+    error) proves the postmaster accepted the connection and forked a backend.
+    """
+    timer = _Timer()
+    reader, writer = await asyncio.open_connection(host, port)
+    timer.timings["connect_ms"] = _ms(timer.start)
+    detail = {}
+
+    try:
+        if use_ssl:
+            t0 = time.perf_counter()
+            writer.write(struct.pack("!II", 8, POSTGRES_SSL_REQUEST_CODE))
+            await writer.drain()
+            answer = await reader.readexactly(1)
+            if answer not in (b"S", b"N"):
+                raise ValueError(f"unexpected SSLRequest answer {answer!r}")
+            detail["ssl"] = answer == b"S"
+            if answer == b"S":
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+                await writer.start_tls(context)
+            timer.timings["handshake_ms"] = _ms(t0)
+
+        params = b"user\x00" + user.encode() + b"\x00database\x00" + database.encode() + b"\x00" + \
+            b"application_name\x00" + CLIENT_ID.encode() + b"\x00\x00"
+        t0 = time.perf_counter()
+        writer.write(struct.pack("!II", 8 + len(params), POSTGRES_PROTOCOL_VERSION) + params)
+        await writer.drain()
+        msg_type, payload = await _read_postgres_message(reader)
+        timer.timings["rtt_ms"] = _ms(t0)
+
+        if msg_type == b"R":
+            code = struct.unpack("!I", payload[:4])[0]
+            detail["auth"] = POSTGRES_AUTH_METHODS.get(code, str(code))
+            status = "success"
+            if code == 0:
+                writer.write(b"X" + struct.pack("!I", 4))  # Terminate
+        elif msg_type == b"E":
+            # Server is up and answering; the error is about us (role/db/pg_hba)
+            detail["server_error"] = _postgres_error_text(payload)
+            status = "success"
+        else:
+            status = "error"
+            detail["error"] = f"unexpected message {msg_type!r}"
+    finally:
+        writer.close()
+
+    return dict(status=status, timings=timer.finish(), **detail)
+
+
+# ---------------------------------------------------------------------------
+# Redis
+# ---------------------------------------------------------------------------
+
+def _resp_command(*args: str) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg.encode()
+        parts.append(b"$" + str(len(data)).encode() + b"\r\n" + data + b"\r\n")
+    return b"".join(parts)
+
+
+async def probe_redis(host: str, port: int, password: Optional[str] = None) -> Dict:
+    """Optional AUTH, then PING over RESP"""
+    timer = _Timer()
+    reader, writer = await asyncio.open_connection(host, port)
+    timer.timings["connect_ms"] = _ms(timer.start)
+    detail = {}
+
+    try:
+        if password:
+            t0 = time.perf_counter()
+            writer.write(_resp_command("AUTH", password))
+            await writer.drain()
+            auth_reply = (await reader.readline()).decode(errors="replace").strip()
+            timer.timings["handshake_ms"] = _ms(t0)
+            if not auth_reply.startswith("+"):
+                detail["auth_error"] = auth_reply.lstrip("-")
+
+        t0 = time.perf_counter()
+        writer.write(_resp_command("PING"))
+        await writer.drain()
+        reply = (await reader.readline()).decode(errors="replace").strip()
+        timer.timings["rtt_ms"] = _ms(t0)
+
+        if reply == "+PONG":
+            status = "success"
+        elif reply.startswith("-NOAUTH"):
+            # Alive and answering, just protected
+            status = "success"
+            detail["auth"] = "required"
+        elif reply.startswith("-"):
+            status = "failed"
+            detail["error"] = reply[1:]
+        else:
+            status = "error"
+            detail["error"] = f"unexpected reply {reply[:40]!r}"
+    finally:
+        writer.close()
+
+    return dict(status=status, timings=timer.finish(), **detail)
+
+
+# ---------------------------------------------------------------------------
+# Kafka
+# ---------------------------------------------------------------------------
+
+def kafka_api_versions_request(correlation_id: int = 1) -> bytes:
+    """ApiVersions v0 request frame"""
+    client = CLIENT_ID.encode()
+    body = struct.pack("!hhih", KAFKA_API_VERSIONS_KEY, 0, correlation_id, len(client)) + client
+    return struct.pack("!i", len(body)) + body
+
+
+async def probe_kafka(host: str, port: int) -> Dict:
+    """ApiVersions v0 round trip (what kafka-broker-api-versions does)"""
+    timer = _Timer()
+    reader, writer = await asyncio.open_connection(host, port)
+    timer.timings["connect_ms"] = _ms(timer.start)
+    detail = {}
+
+    try:
+        t0 = time.perf_counter()
+        writer.write(kafka_api_versions_request(correlation_id=1))
+        await writer.drain()
+        size = struct.unpack("!i", await reader.readexactly(4))[0]
+        if not 6 <= size <= MAX_FRAME_BYTES:
+            raise ValueError(f"not a Kafka response (frame size {size})")
+        payload = await reader.readexactly(size)
+        timer.timings["rtt_ms"] = _ms(t0)
+
+        correlation_id, error_code = struct.unpack("!ih", payload[:6])
+        if correlation_id != 1:
+            status = "error"
+            detail["error"] = f"correlation id mismatch ({correlation_id})"
+        elif error_code != 0:
+            status = "failed"
+            detail["error"] = f"error code {error_code}"
+        else:
+            status = "success"
+            detail["api_keys"] = struct.unpack("!i", payload[6:10])[0] if len(payload) >= 10 else 0
+    finally:
+        writer.close()
+
+    return dict(status=status, timings=timer.finish(), **detail)
+
+
+PROBES = {
+    "postgres": probe_postgres,
+    "redis": probe_redis,
+    "kafka": probe_kafka,
+}
+
+
+# ---------------------------------------------------------------------------
+# Targets and sweep
+# ---------------------------------------------------------------------------
+
+def expand_compose_variables(text: str, environ: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """
+    Interpolate compose-style variables from the environment
+
+    Args:
+        text: Value from a compose file
+        environ: Variables to use (default: os.environ)
+
+    Returns:
+        Expanded text, or None when a variable without a default is unset
+    """
+    environ = os.environ if environ is None else environ
+    unresolved = []
+
+    def substitute(match):
+        braced, operator, default, bare, dollar = match.groups()
+        if dollar:
+            return "$"
+        name = braced or bare
+        value = environ.get(name)
+        if (operator == ":-" and not value) or (operator == "-" and value is None):
+            return default
+        if value is None:
+            unresolved.append(name)
+            return ""
+        return value
+
+    expanded = COMPOSE_VARIABLE_PATTERN.sub(substitute, text)
+    return None if unresolved else expanded
+
+
+def _postgres_credentials(definition: Dict) -> Dict:
+    """User/database from the environment, falling back to the pg_isready healthcheck"""
+    env = environment_dict(definition)
+    test = (definition.get("healthcheck") or {}).get("test") or []
+    test_text = " ".join(str(t) for t in test) if isinstance(test, list) else str(test)
+    user = os.environ.get("POSTGRES_USER") or expand_compose_variables(env.get("POSTGRES_USER") or "")
+    database = os.environ.get("POSTGRES_DB") or expand_compose_variables(env.get("POSTGRES_DB") or "")
+
+    match = re.search(r"-U\s+(\S+)", test_text)
+    user = user or (match.group(1) if match else "postgres")
+    match = re.search(r"-d\s+(\S+)", test_text)
+    database = database or (match.group(1) if match else user)
+    return {"user": user, "database": database}
+
+
+def _redis_password(definition: Dict) -> Dict:
+    """
+    Password from REDIS_PASSWORD or the --requirepass server flag
+
+    ${VAR} references in the flag are expanded from the environment; if one
+    is unset no AUTH is sent and a protected server reports "auth required".
+    """
+    password = os.environ.get("REDIS_PASSWORD")
+    if not password:
+        command = definition.get("command") or ""
+        command = " ".join(command) if isinstance(command, list) else str(command)
+        match = re.search(r"--requirepass\s+(\S+)", command)
+        password = expand_compose_variables(match.group(1).strip("'\"")) if match else None
+    return {"password": password or None}
+
+
+def dependency_targets(inventory: Dict[str, Dict] = None, host: str = "localhost") -> List[Dict]:
+    """
+    Infrastructure dependencies to probe, derived from the compose files.
+
+    Returns:
+        List of {name, protocol, host, port, dependents, options}
+    """
+    inventory = inventory if inventory is not None else discover_services()
+
+    dependents: Dict[str, List[str]] = {}
+    for name, record in inventory.items():
+        for dependency in record["depends_on"]:
+            dependents.setdefault(dependency, []).append(name)
+
+    targets = []
+    for name, record in inventory.items():
+        if record["protocol"] not in PROBES or not record["published"]:
+            continue
+        if name not in dependents:
+            continue
+
+        options = {}
+        if record["protocol"] == "postgres":
+            options = _postgres_credentials(record["definition"])
+        elif record["protocol"] == "redis":
+            options = _redis_password(record["definition"])
+
+        targets.append({
+            "name": name,
+            "protocol": record["protocol"],
+            "host": host,
+            "port": record["port"],
+            "dependents": sorted(dependents[name]),
+            "options": options,
+        })
+    return targets
+
+
+async def probe_target(target: Dict, timeout: float = DEFAULT_TIMEOUT) -> Dict:
+    """Run one protocol probe under a deadline; never raises"""
+    probe = PROBES[target["protocol"]]
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(
+            probe(target["host"], target["port"], **target.get("options", {})), timeout
+        )
+    except asyncio.TimeoutError:
+        result = {"status": "timeout"}
+    except ConnectionRefusedError:
+        result = {"status": "connection_refused"}
+    except (OSError, ValueError, asyncio.IncompleteReadError, struct.error, ssl.SSLError) as e:
+        result = {"status": "error", "error": str(e) or e.__class__.__name__}
+
+    result.setdefault("timings", {"connect_ms": None, "handshake_ms": None, "rtt_ms": None,
+                                  "total_ms": _ms(start)})
+    result.update(service=target["name"], protocol=target["protocol"], port=target["port"],
+                  dependents=target.get("dependents", []))
+    return result
+
+
+async def probe_dependencies(targets: List[Dict], timeout: float = DEFAULT_TIMEOUT) -> List[Dict]:
+    """Probe all dependencies concurrently; results in target order"""
+    return await asyncio.gather(*(probe_target(t, timeout) for t in targets))
+
+
+def format_result(result: Dict) -> str:
+    """One report line for a dependency probe"""
+    timings = result["timings"]
+    parts = []
+    for key, label in (("connect_ms", "connect"), ("handshake_ms", "handshake"), ("rtt_ms", "rtt")):
+        if timings.get(key) is not None:
+            parts.append(f"{label} {timings[key]:.1f}ms")
+    note = result.get("error") or result.get("server_error") or ""
+    if result.get("auth") == "required":
+        note = "auth required"
+    text = f"{result['service']} ({result['protocol']}:{result['port']}): {result['status'].upper()}"
+    if parts:
+        text += " - " + ", ".join(parts)
+    if note:
+        text += f" [{note}]"
+    return text
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Probe Postgres/Redis/Kafka over their wire protocols')
+    parser.add_argument('--host', default='localhost', help='Host the dependency ports are published on')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Per-probe deadline (seconds)')
+    args = parser.parse_args()
+
+    targets = dependency_targets(host=args.host)
+    for result in asyncio.run(probe_dependencies(targets, args.timeout)):
+        print(format_result(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Stand-in Postgres, Redis and Kafka servers for testing the protocol probes
+Speak just enough of each wire protocol to answer one probe, without Docker
+
+Each stub listens on an ephemeral port and behaves according to its mode:
+- ok:      the happy path (Postgres AuthenticationOk, Redis +PONG,
+           Kafka ApiVersions v0 with a few API keys)
+- auth:    the server demands credentials (Postgres MD5 request,
+           Redis -NOAUTH until AUTH with the right password)
+- reject:  the server answers with a protocol-level error (Postgres
+           ErrorResponse, Redis -ERR, Kafka error code 35)
+- garbage: an HTTP error page instead of the protocol, then close
+
+Postgres stubs decline SSLRequest with 'N' (no certificate to offer), so
+the TLS upgrade itself is not exercised.
+
+Usage:
+    python scripts/protocol_stubs.py --mode auth --password secret
+"""
+
+import argparse
+import asyncio
+import struct
+from typing import Dict, List, Optional
+
+# Constants
+DEFAULT_HOST = "127.0.0.1"
+MODES = ("ok", "auth", "reject", "garbage")
+GARBAGE = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+POSTGRES_SSL_REQUEST_CODE = 80877103
+KAFKA_API_KEYS = [(0, 0, 9), (1, 0, 13), (3, 0, 12), (18, 0, 3)]  # Produce, Fetch, Metadata, ApiVersions
+KAFKA_UNSUPPORTED_VERSION = 35
+
+
+class ProtocolStub:
+    """One asyncio server answering a single wire protocol."""
+
+    protocol = ""
+
+    def __init__(self, mode: str = "ok", host: str = DEFAULT_HOST, port: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown stub mode: {mode}")
+        self.mode = mode
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.requests: List[Dict] = []
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await self._serve(reader, writer)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # probe hung up
+        finally:
+            writer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        raise NotImplementedError
+
+
+class StubPostgres(ProtocolStub):
+    """Postgres postmaster up to the authentication request."""
+
+    protocol = "postgres"
+
+    async def _serve(self, reader, writer):
+        length, code = struct.unpack("!II", await reader.readexactly(8))
+        if code == POSTGRES_SSL_REQUEST_CODE:
+            self.requests.append({"ssl_request": True})
+            if self.mode == "garbage":
+                writer.write(GARBAGE)
+                return
+            writer.write(b"N")
+            length, code = struct.unpack("!II", await reader.readexactly(8))
+
+        fields = (await reader.readexactly(length - 8)).split(b"\x00")
+        params = dict(zip(fields[0::2], fields[1::2]))
+        self.requests.append({"protocol_version": code,
+                              **{k.decode(): v.decode() for k, v in params.items() if k}})
+
+        if self.mode == "ok":
+            writer.write(b"R" + struct.pack("!II", 8, 0))  # AuthenticationOk
+        elif self.mode == "auth":
+            writer.write(b"R" + struct.pack("!II", 12, 5) + b"salt")  # AuthenticationMD5Password
+        elif self.mode == "reject":
+            user = params.get(b"user", b"").decode()
+            body = b"SFATAL\x00C28000\x00M" + f'role "{user}" does not exist'.encode() + b"\x00\x00"
+            writer.write(b"E" + struct.pack("!I", 4 + len(body)) + body)
+        else:
+            writer.write(GARBAGE)
+
+
+class StubRedis(ProtocolStub):
+    """Redis server answering AUTH and PING over RESP."""
+
+    protocol = "redis"
+
+    def __init__(self, mode: str = "ok", password: Optional[str] = None, host: str = DEFAULT_HOST,
+                 port: int = 0):
+        super().__init__(mode, host, port)
+        self.password = password
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[str]]:
+        header = await reader.readline()
+        if not header.startswith(b"*"):
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            size = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(size + 2))[:-2].decode())
+        return args
+
+    async def _serve(self, reader, writer):
+        authenticated = self.mode != "auth"
+        while True:
+            args = await self._read_command(reader)
+            if not args:
+                return
+            self.requests.append({"command": args[0].upper(), "args": args[1:]})
+            await self._reply(args, writer, authenticated)
+            if args[0].upper() == "AUTH" and self.mode == "auth":
+                authenticated = args[1:] == [self.password]
+            if self.mode == "garbage":
+                return
+
+    async def _reply(self, args: List[str], writer: asyncio.StreamWriter, authenticated: bool):
+        command = args[0].upper()
+        if self.mode == "garbage":
+            writer.write(GARBAGE)
+        elif self.mode == "reject":
+            writer.write(b"-ERR max number of clients reached\r\n")
+        elif command == "AUTH":
+            if self.mode == "auth" and args[1:] == [self.password]:
+                writer.write(b"+OK\r\n")
+            elif self.mode == "auth":
+                writer.write(b"-WRONGPASS invalid username-password pair or user is disabled.\r\n")
+            else:
+                writer.write(b"-ERR AUTH <password> called without any password configured\r\n")
+        elif not authenticated:
+            writer.write(b"-NOAUTH Authentication required.\r\n")
+        elif command == "PING":
+            writer.write(b"+PONG\r\n")
+        else:
+            writer.write(f"-ERR unknown command '{args[0]}'\r\n".encode())
+        await writer.drain()
+
+
+class StubKafka(ProtocolStub):
+    """Kafka broker answering ApiVersions v0."""
+
+    protocol = "kafka"
+
+    async def _serve(self, reader, writer):
+        size = struct.unpack("!i", await reader.readexactly(4))[0]
+        payload = await reader.readexactly(size)
+        api_key, api_version, correlation_id, client_length = struct.unpack("!hhih", payload[:10])
+        self.requests.append({"api_key": api_key, "api_version": api_version,
+                              "correlation_id": correlation_id,
+                              "client_id": payload[10:10 + client_length].decode()})
+
+        if self.mode == "garbage":
+            writer.write(GARBAGE)
+            return
+        if self.mode == "reject":
+            body = struct.pack("!ihi", correlation_id, KAFKA_UNSUPPORTED_VERSION, 0)
+        else:
+            # ApiVersions is answered before SASL, so "auth" looks like "ok" on the wire
+            body = struct.pack("!ihi", correlation_id, 0, len(KAFKA_API_KEYS))
+            body += b"".join(struct.pack("!hhh", *key) for key in KAFKA_API_KEYS)
+        writer.write(struct.pack("!i", len(body)) + body)
+
+
+STUBS = {
+    "postgres": StubPostgres,
+    "redis": StubRedis,
+    "kafka": StubKafka,
+}
+
+
+def main():
+    """CLI entry point - run one stub per protocol until interrupted"""
+    parser = argparse.ArgumentParser(description='Run stand-in Postgres/Redis/Kafka servers')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Bind address')
+    parser.add_argument('--mode', choices=MODES, default='ok', help='Behavior of every stub')
+    parser.add_argument('--password', help='Password the Redis stub expects in auth mode')
+    args = parser.parse_args()
+
+    async def run():
+        stubs = [StubPostgres(args.mode, args.host), StubRedis(args.mode, args.password, args.host),
+                 StubKafka(args.mode, args.host)]
+        for stub in stubs:
+            await stub.start()
+            print(f"{stub.protocol:<9} {args.host}:{stub.port} ({args.mode})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for stub in stubs:
+                await stub.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware parallel stack startup for Vextrus ERP
+Replaces fixed serial order + sleeps with a DAG gated on measured readiness
+
+The dependency graph comes from depends_on in the compose files. A service
+is started (docker compose up -d --no-deps) as soon as every dependency has
+passed its readiness probe, so independent branches start in parallel and
+nothing waits on a fixed sleep. Readiness reuses the health probes:
+- postgres / redis / kafka: wire-protocol probe (scripts/protocol_probes.py)
+- HTTP services: GET on the compose healthcheck path, else /health
+- other published ports: TCP connect
+- unpublished services: docker inspect health / running state
+
+The report lists per-service time-to-ready and the critical path (the chain
+of dependencies that determined when the last service became ready).
+
+Usage:
+    python scripts/stack_orchestrator.py                  # whole stack
+    python scripts/stack_orchestrator.py finance auth     # these + their dependencies
+    python scripts/stack_orchestrator.py --dry-run        # print the startup waves only
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from compose_inventory import PROJECT_ROOT, discover_services
+from health_prober import AsyncHealthProber
+from protocol_probes import PROBES, dependency_targets, probe_target
+
+# Constants
+DEFAULT_COMPOSE_FILES = ["docker-compose.yml"]
+DEFAULT_READY_TIMEOUT = 300.0
+POLL_INITIAL = 0.25
+POLL_MAX = 2.0
+DEFAULT_HTTP_HEALTH_PATH = "/health"
+
+
+# ---------------------------------------------------------------------------
+# Dependency graph
+# ---------------------------------------------------------------------------
+
+def build_dag(inventory: Dict[str, Dict], selected: List[str] = None) -> Dict[str, List[str]]:
+    """
+    Service -> dependencies, restricted to selected services and everything they need.
+
+    Raises:
+        ValueError: Unknown service or dependency cycle
+    """
+    wanted = list(selected or inventory.keys())
+    unknown = [name for name in wanted if name not in inventory]
+    if unknown:
+        raise ValueError(f"Unknown service(s): {', '.join(unknown)}")
+
+    dag: Dict[str, List[str]] = {}
+    stack = list(wanted)
+    while stack:
+        name = stack.pop()
+        if name in dag:
+            continue
+        deps = [d for d in inventory[name]["depends_on"] if d in inventory]
+        dag[name] = deps
+        stack.extend(deps)
+
+    startup_waves(dag)  # validates acyclicity
+    return dag
+
+
+def startup_waves(dag: Dict[str, List[str]]) -> List[List[str]]:
+    """Kahn layering: wave N depends only on waves < N"""
+    remaining = {name: set(deps) for name, deps in dag.items()}
+    waves = []
+    while remaining:
+        wave = sorted(name for name, deps in remaining.items() if not deps)
+        if not wave:
+            raise ValueError(f"Dependency cycle among: {', '.join(sorted(remaining))}")
+        waves.append(wave)
+        for name in wave:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(wave)
+    return waves
+
+
+def critical_path(dag: Dict[str, List[str]], timings: Dict[str, Dict]) -> List[str]:
+    """
+    Chain ending at the last service to become ready, following at each step
+    the dependency that became ready last (the one that gated the start).
+    """
+    ready = {name: t["ready_at"] for name, t in timings.items() if t.get("ready_at") is not None}
+    if not ready:
+        return []
+
+    node = max(ready, key=ready.get)
+    path = [node]
+    while True:
+        deps = [d for d in dag.get(node, []) if d in ready]
+        if not deps:
+            break
+        node = max(deps, key=ready.get)
+        path.append(node)
+    return list(reversed(path))
+
+
+# ---------------------------------------------------------------------------
+# Readiness
+# ---------------------------------------------------------------------------
+
+class ReadinessChecker:
+    """One readiness probe per service, chosen from its inventory record."""
+
+    def __init__(self, inventory: Dict[str, Dict], host: str = "localhost", probe_timeout: float = 2.0):
+        self.inventory = inventory
+        self.host = host
+        self.probe_timeout = probe_timeout
+        self.prober = AsyncHealthProber(timeout=probe_timeout)
+        self.protocol_targets = {t["name"]: t for t in dependency_targets(inventory, host)}
+
+    def method(self, name: str) -> str:
+        record = self.inventory[name]
+        if not record["published"]:
+            return "docker"
+        if record["protocol"] in PROBES:
+            return record["protocol"]
+        if record["protocol"] == "http":
+            return "http"
+        return "tcp"
+
+    async def is_ready(self, name: str) -> bool:
+        record = self.inventory[name]
+        method = self.method(name)
+
+        if method in PROBES:
+            target = self.protocol_targets.get(name) or {
+                "name": name, "protocol": method, "host": self.host,
+                "port": record["port"], "options": {}
+            }
+            result = await probe_target(target, self.probe_timeout)
+            return result["status"] == "success"
+
+        if method == "http":
+            path = record["health_path"] or DEFAULT_HTTP_HEALTH_PATH
+            result = await self.prober.probe(self.host, record["port"], path)
+            return result["status"] == "success"
+
+        if method == "tcp":
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, record["port"]), self.probe_timeout
+                )
+                writer.close()
+                return True
+            except (OSError, asyncio.TimeoutError):
+                return False
+
+        return await self._docker_ready(record)
+
+    async def _docker_ready(self, record: Dict) -> bool:
+        """Container health (or running state when it has no healthcheck)"""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "docker", "inspect", "--format",
+                "{{if .State.Health}}{{.State.Health.Status}}{{else}}{{.State.Status}}{{end}}",
+                record["container_name"],
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            return False
+        out, _ = await proc.communicate()
+        return out.decode().strip() in ("healthy", "running")
+
+    def close(self):
+        self.prober.close()
+
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+class ComposeRunner:
+    """Starts services with docker compose."""
+
+    def __init__(self, files: List[str], root: Path = PROJECT_ROOT):
+        self.root = Path(root)
+        self.file_args = []
+        for name in files:
+            self.file_args += ["-f", str(self.root / name)]
+
+    async def start(self, name: str) -> bool:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "docker", "compose", *self.file_args, "up", "-d", "--no-deps", name,
+                cwd=str(self.root), stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            print(f"[ERROR] {name}: docker not found on PATH")
+            return False
+        _, err = await proc.communicate()
+        if proc.returncode != 0:
+            print(f"[ERROR] {name}: docker compose up failed - {err.decode(errors='replace').strip()[-300:]}")
+        return proc.returncode == 0
+
+
+class StackOrchestrator:
+    """Start services as soon as their dependencies are ready."""
+
+    def __init__(self, dag: Dict[str, List[str]], runner, checker,
+                 ready_timeout: float = DEFAULT_READY_TIMEOUT, quiet: bool = False):
+        """
+        Initialize orchestrator.
+
+        Args:
+            dag: Service -> dependencies (from build_dag)
+            runner: Object with async start(name) -> bool
+            checker: Object with async is_ready(name) -> bool
+            ready_timeout: Seconds a service may take to become ready after start
+            quiet: Suppress progress lines
+        """
+        self.dag = dag
+        self.runner = runner
+        self.checker = checker
+        self.ready_timeout = ready_timeout
+        self.quiet = quiet
+        self.timings: Dict[str, Dict] = {name: {} for name in dag}
+        self._ready_events = {name: asyncio.Event() for name in dag}
+        self._failed: Set[str] = set()
+        self._t0 = 0.0
+
+    def _now(self) -> float:
+        return round(time.perf_counter() - self._t0, 3)
+
+    def _log(self, message: str):
+        if not self.quiet:
+            print(f"[{self._now():7.1f}s] {message}")
+
+    async def _wait_ready(self, name: str) -> bool:
+        deadline = time.perf_counter() + self.ready_timeout
+        delay = POLL_INITIAL
+        probes = 0
+        while time.perf_counter() < deadline:
+            probes += 1
+            if await self.checker.is_ready(name):
+                self.timings[name]["probes"] = probes
+                return True
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, POLL_MAX)
+        self.timings[name]["probes"] = probes
+        return False
+
+    async def _bring_up(self, name: str):
+        timing = self.timings[name]
+        try:
+            await asyncio.gather(*(self._ready_events[d].wait() for d in self.dag[name]))
+            blocked = [d for d in self.dag[name] if d in self._failed]
+            if blocked:
+                timing["status"] = "skipped"
+                timing["error"] = f"dependency not ready: {', '.join(blocked)}"
+                self._failed.add(name)
+                self._log(f"SKIP  {name} ({timing['error']})")
+                return
+
+            timing["start_at"] = self._now()
+            self._log(f"START {name}")
+            if not await self.runner.start(name):
+                timing["status"] = "start_failed"
+                self._failed.add(name)
+                return
+            timing["started_at"] = self._now()
+
+            if await self._wait_ready(name):
+                timing["ready_at"] = self._now()
+                timing["time_to_ready"] = round(timing["ready_at"] - timing["start_at"], 3)
+                timing["status"] = "ready"
+                self._log(f"READY {name} ({timing['time_to_ready']:.1f}s)")
+            else:
+                timing["status"] = "timeout"
+                self._failed.add(name)
+                self._log(f"TIMEOUT {name} (not ready after {self.ready_timeout:.0f}s)")
+        finally:
+            self._ready_events[name].set()
+
+    async def run(self) -> Dict:
+        """Bring the whole DAG up; returns the startup report"""
+        self._t0 = time.perf_counter()
+        await asyncio.gather(*(self._bring_up(name) for name in self.dag))
+        return self.report()
+
+    def report(self) -> Dict:
+        path = critical_path(self.dag, self.timings)
+        segments = []
+        for name in path:
+            t = self.timings[name]
+            segments.append({"service": name, "start_at": t.get("start_at"),
+                             "ready_at": t.get("ready_at"), "time_to_ready": t.get("time_to_ready")})
+        ready_times = [t["ready_at"] for t in self.timings.values() if t.get("ready_at") is not None]
+        return {
+            "total_seconds": max(ready_times) if ready_times else 0.0,
+            "waves": startup_waves(self.dag),
+            "services": self.timings,
+            "critical_path": segments,
+            "failed": sorted(self._failed),
+        }
+
+
+def _fmt_seconds(value: Optional[float]) -> str:
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def print_report(report: Dict):
+    """Per-service time-to-ready table and critical path"""
+    print("\n" + "=" * 70)
+    print("STACK STARTUP REPORT")
+    print("=" * 70)
+    print(f"  {'SERVICE':<26}{'STATUS':<14}{'START':>8}{'READY':>8}{'TO READY':>10}")
+    ordered = sorted(report["services"].items(),
+                     key=lambda item: (item[1].get("ready_at") is None, item[1].get("ready_at") or 0))
+    for name, t in ordered:
+        print(f"  {name:<26}{t.get('status', '-'):<14}{_fmt_seconds(t.get('start_at')):>8}"
+              f"{_fmt_seconds(t.get('ready_at')):>8}{_fmt_seconds(t.get('time_to_ready')):>10}")
+
+    print(f"\nCRITICAL PATH ({report['total_seconds']:.1f}s total):")
+    for segment in report["critical_path"]:
+        print(f"  -> {segment['service']:<26} ready at {segment['ready_at']:.1f}s "
+              f"(took {segment['time_to_ready']:.1f}s)")
+
+    if report["failed"]:
+        print(f"\nNOT READY: {', '.join(report['failed'])}")
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Start the compose stack in dependency order, gated on readiness')
+    parser.add_argument('services', nargs='*', help='Services to start (default: all) - dependencies are added')
+    parser.add_argument('--files', default=",".join(DEFAULT_COMPOSE_FILES),
+                        help='Comma-separated compose files (e.g. docker-compose.yml,docker-compose.prod.yml)')
+    parser.add_argument('--host', default='localhost', help='Host the service ports are published on')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_READY_TIMEOUT, help='Per-service readiness timeout')
+    parser.add_argument('--dry-run', action='store_true', help='Print the startup waves and exit')
+    parser.add_argument('--json', help='Write the report as JSON to this file')
+    args = parser.parse_args()
+
+    files = [f for f in args.files.split(",") if f]
+    inventory = discover_services(files=files)
+    try:
+        dag = build_dag(inventory, args.services or None)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.dry_run:
+        for i, wave in enumerate(startup_waves(dag), 1):
+            print(f"Wave {i}: {', '.join(wave)}")
+        return
+
+    checker = ReadinessChecker(inventory, args.host)
+
+    async def run():
+        try:
+            return await StackOrchestrator(dag, ComposeRunner(files), checker, args.timeout).run()
+        finally:
+            checker.close()
+
+    report = asyncio.run(run())
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to: {args.json}")
+
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == '__main__':
+    main()
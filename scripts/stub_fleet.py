@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Stub service fleet for testing the health prober without Docker
+Starts N lightweight asyncio HTTP servers that emulate ERP health endpoints
+
+Each stub answers /health, /health/live and /health/ready (200 JSON) and
+404s anything else. Faults are injected per request with configurable
+probabilities:
+- latency:   fixed / uniform / exponential / lognormal delay before responding
+- not_found: 404 even for health paths
+- reset:     close the socket with SO_LINGER=0 (client sees ECONNRESET)
+- slowloris: dribble the response out one byte at a time
+- hang:      read the request and never answer
+
+The fleet can run in-process (StubFleet) or in a child process
+(FleetProcess) so benchmarks can measure the prober's CPU separately.
+
+StubGraphQLService adds a POST /graphql endpoint (root-field introspection,
+a login mutation issuing a bearer token, Apollo tracing extensions) so the
+GraphQL profiler can be exercised without the federation gateway.
+
+Usage:
+    python scripts/stub_fleet.py --count 20 --latency lognormal:20:0.5 --p-hang 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import re
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+# Constants
+HEALTH_PATHS = ("/health", "/health/live", "/health/ready")
+DEFAULT_HOST = "127.0.0.1"
+GRAPHQL_PATH = "/graphql"
+GRAPHQL_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|[{}():]|[A-Za-z_]\w*')
+
+
+class StubBehavior:
+    """Latency distribution and fault probabilities for a stub."""
+
+    def __init__(self,
+                 latency: str = "fixed:0",
+                 p_not_found: float = 0.0,
+                 p_reset: float = 0.0,
+                 p_slowloris: float = 0.0,
+                 p_hang: float = 0.0,
+                 slowloris_byte_delay: float = 0.05,
+                 seed: Optional[int] = None):
+        """
+        Initialize behavior.
+
+        Args:
+            latency: "fixed:MS", "uniform:LO:HI", "exponential:MEAN" or "lognormal:MEDIAN:SIGMA"
+            p_not_found: Probability of answering 404
+            p_reset: Probability of resetting the connection
+            p_slowloris: Probability of a byte-at-a-time response
+            p_hang: Probability of never answering
+            slowloris_byte_delay: Seconds between bytes of a slowloris response
+            seed: Random seed (for reproducible benchmark runs)
+        """
+        self.latency = latency
+        self.kind, *params = latency.split(":")
+        self.params = [float(p) for p in params]
+        if self.kind not in ("fixed", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.p_not_found = p_not_found
+        self.p_reset = p_reset
+        self.p_slowloris = p_slowloris
+        self.p_hang = p_hang
+        self.slowloris_byte_delay = slowloris_byte_delay
+        self.random = random.Random(seed)
+
+    def delay_seconds(self) -> float:
+        """Draw one response delay"""
+        r = self.random
+        if self.kind == "fixed":
+            ms = self.params[0] if self.params else 0.0
+        elif self.kind == "uniform":
+            ms = r.uniform(self.params[0], self.params[1])
+        elif self.kind == "exponential":
+            ms = r.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        else:
+            ms = r.lognormvariate(math.log(max(self.params[0], 0.001)), self.params[1])
+        return max(ms, 0.0) / 1000.0
+
+    def pick_fault(self) -> Optional[str]:
+        """Choose the fault (if any) for one request"""
+        roll = self.random.random()
+        for fault, p in (("hang", self.p_hang), ("reset", self.p_reset),
+                         ("slowloris", self.p_slowloris), ("not_found", self.p_not_found)):
+            if roll < p:
+                return fault
+            roll -= p
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency": self.latency,
+            "p_not_found": self.p_not_found,
+            "p_reset": self.p_reset,
+            "p_slowloris": self.p_slowloris,
+            "p_hang": self.p_hang,
+        }
+
+
+class StubService:
+    """One asyncio HTTP/1.1 keep-alive stub."""
+
+    def __init__(self, name: str, behavior: StubBehavior, host: str = DEFAULT_HOST, port: int = 0):
+        self.name = name
+        self.behavior = behavior
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+        self.stats = {"connections": 0, "requests": 0, "hang": 0, "reset": 0, "slowloris": 0, "not_found": 0}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            # Drop open (possibly hung) connections so their handlers finish
+            for writer in list(self._writers):
+                writer.transport.abort()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                self.stats["requests"] += 1
+                parts = request_line.split()
+                path = parts[1].decode("latin-1") if len(parts) > 1 else "/"
+                if not await self._respond(path, reader, writer, headers, body):
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # client went away, or the loop is shutting down mid-response
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _route(self, path: str, headers: Dict[str, str], body: bytes, delay: float) -> Tuple[str, Dict]:
+        """Status line and JSON payload for one request"""
+        if path.split("?")[0] not in HEALTH_PATHS:
+            return "404 Not Found", {"statusCode": 404, "message": "Not Found"}
+        return "200 OK", {"status": "ok", "service": self.name, "info": {}}
+
+    async def _respond(self, path: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                       headers: Optional[Dict[str, str]] = None, body: bytes = b"") -> bool:
+        """Write one response; returns False when the connection must end"""
+        fault = self.behavior.pick_fault()
+        if fault:
+            self.stats[fault] += 1
+
+        if fault == "hang":
+            await reader.read()  # until the client gives up (EOF) or the fleet stops
+            return False
+
+        if fault == "reset":
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            writer.transport.abort()
+            return False
+
+        delay = self.behavior.delay_seconds()
+        await asyncio.sleep(delay)
+
+        if fault == "not_found":
+            status, payload = "404 Not Found", {"statusCode": 404, "message": "Not Found"}
+        else:
+            status, payload = self._route(path, headers or {}, body, delay)
+
+        data = json.dumps(payload).encode()
+        response = (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode() + data
+
+        if fault == "slowloris":
+            for i in range(len(response)):
+                if writer.is_closing():
+                    return False
+                writer.write(response[i:i + 1])
+                await writer.drain()
+                await asyncio.sleep(self.behavior.slowloris_byte_delay)
+        else:
+            writer.write(response)
+            await writer.drain()
+        return True
+
+
+def root_fields(query: str) -> List[str]:
+    """Top-level field names of a GraphQL operation (aliases resolve to the field)"""
+    tokens = GRAPHQL_TOKEN.findall(query)
+    fields, depth, parens = [], 0, 0
+    for i, token in enumerate(tokens):
+        if token == "(":
+            parens += 1
+        elif token == ")":
+            parens -= 1
+        elif parens:
+            continue
+        elif token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+        elif depth == 1 and token != ":" and not token.startswith('"'):
+            if i + 1 < len(tokens) and tokens[i + 1] == ":":
+                continue  # alias
+            fields.append(token)
+    return fields
+
+
+class StubGraphQLService(StubService):
+    """GraphQL endpoint stand-in with introspection, bearer auth and Apollo tracing."""
+
+    def __init__(self, name: str, behavior: StubBehavior, root_fields: Optional[Dict[str, List[str]]] = None,
+                 token: Optional[str] = None, host: str = DEFAULT_HOST, port: int = 0):
+        """
+        Initialize service.
+
+        Args:
+            name: Service name
+            behavior: Latency and fault profile
+            root_fields: {"Query": [...], "Mutation": [...]} returned by introspection
+            token: Bearer token required on every operation but `login` (None: no auth)
+            host: Bind address
+            port: Bind port (0: ephemeral)
+        """
+        super().__init__(name, behavior, host, port)
+        self.root_fields = root_fields or {"Query": [], "Mutation": ["login"]}
+        self.token = token
+        self.stats.update({"graphql": 0, "unauthorized": 0})
+
+    def _route(self, path: str, headers: Dict[str, str], body: bytes, delay: float) -> Tuple[str, Dict]:
+        if path.split("?")[0] != GRAPHQL_PATH:
+            return super()._route(path, headers, body, delay)
+        try:
+            query = json.loads(body)["query"]
+        except (ValueError, KeyError, TypeError):
+            return "400 Bad Request", {"errors": [{"message": "POST body must be JSON with a query"}]}
+
+        self.stats["graphql"] += 1
+        if "__schema" in query:
+            return "200 OK", {"data": {"__schema": {
+                "queryType": {"fields": [{"name": f} for f in self.root_fields.get("Query", [])]},
+                "mutationType": {"fields": [{"name": f} for f in self.root_fields.get("Mutation", [])]},
+            }}}
+
+        fields = root_fields(query)
+        if "login" in fields:
+            return "200 OK", {"data": {"login": {"accessToken": self.token or "stub-token"}}}
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            self.stats["unauthorized"] += 1
+            return "200 OK", {"data": None, "errors": [{"message": "Unauthorized"}]}
+
+        parent = "Mutation" if query.lstrip().startswith("mutation") else "Query"
+        duration_ns = int(delay * 1e9)
+        return "200 OK", {
+            "data": {field: {} for field in fields},
+            "extensions": {"tracing": {"version": 1, "duration": duration_ns, "execution": {"resolvers": [
+                {"path": [field], "parentType": parent, "fieldName": field, "returnType": "JSON",
+                 "startOffset": 0, "duration": duration_ns}
+                for field in fields
+            ]}}}
+        }
+
+
+class StubFleet:
+    """N stubs sharing one behavior profile (each with its own RNG stream)."""
+
+    def __init__(self, count: int, behavior_options: Dict = None, host: str = DEFAULT_HOST,
+                 seed: int = 0):
+        behavior_options = dict(behavior_options or {})
+        self.stubs = [
+            StubService(f"stub-{i:03d}", StubBehavior(seed=seed + i, **behavior_options), host)
+            for i in range(count)
+        ]
+
+    async def start(self) -> List[Tuple[str, int]]:
+        """Start all stubs; returns (name, port) pairs"""
+        await asyncio.gather(*(stub.start() for stub in self.stubs))
+        return [(stub.name, stub.port) for stub in self.stubs]
+
+    async def stop(self):
+        await asyncio.gather(*(stub.stop() for stub in self.stubs))
+
+    def stats(self) -> Dict:
+        totals: Dict[str, int] = {}
+        for stub in self.stubs:
+            for key, value in stub.stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def reset_stats(self):
+        for stub in self.stubs:
+            stub.stats = {key: 0 for key in stub.stats}
+
+
+def _fleet_process_main(conn, count: int, behavior_options: Dict, host: str, seed: int):
+    """Child process: run the fleet and answer stats/stop commands over the pipe"""
+
+    async def run():
+        fleet = StubFleet(count, behavior_options, host, seed)
+        conn.send(await fleet.start())
+        loop = asyncio.get_running_loop()
+        while True:
+            command = await loop.run_in_executor(None, conn.recv)
+            if command == "stats":
+                conn.send(fleet.stats())
+            elif command == "reset_stats":
+                fleet.reset_stats()
+                conn.send(True)
+            else:
+                break
+        await fleet.stop()
+        conn.send(True)
+
+    asyncio.run(run())
+
+
+class FleetProcess:
+    """Run a StubFleet in a child process (context manager)."""
+
+    def __init__(self, count: int, behavior_options: Dict = None, host: str = DEFAULT_HOST, seed: int = 0):
+        self.args = (count, behavior_options or {}, host, seed)
+        self.services: List[Tuple[str, int]] = []
+        self._conn = None
+        self._process = None
+
+    def __enter__(self) -> "FleetProcess":
+        parent, child = multiprocessing.Pipe()
+        self._conn = parent
+        self._process = multiprocessing.Process(target=_fleet_process_main, args=(child,) + self.args,
+                                                daemon=True)
+        self._process.start()
+        self.services = self._conn.recv()
+        return self
+
+    def stats(self) -> Dict:
+        self._conn.send("stats")
+        return self._conn.recv()
+
+    def reset_stats(self):
+        self._conn.send("reset_stats")
+        self._conn.recv()
+
+    def __exit__(self, *exc):
+        try:
+            self._conn.send("stop")
+            if self._conn.poll(10):
+                self._conn.recv()
+        finally:
+            self._process.join(5)
+            if self._process.is_alive():
+                self._process.terminate()
+
+
+def behavior_options_from_args(args) -> Dict:
+    """StubBehavior keyword arguments from parsed CLI flags"""
+    return {
+        "latency": args.latency,
+        "p_not_found": args.p_not_found,
+        "p_reset": args.p_reset,
+        "p_slowloris": args.p_slowloris,
+        "p_hang": args.p_hang,
+    }
+
+
+def add_behavior_arguments(parser: argparse.ArgumentParser):
+    """Shared fault-injection flags (also used by the benchmark)"""
+    parser.add_argument('--latency', default='fixed:0',
+                        help='fixed:MS | uniform:LO:HI | exponential:MEAN | lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--p-not-found', type=float, default=0.0, help='Probability of a 404')
+    parser.add_argument('--p-reset', type=float, default=0.0, help='Probability of a connection reset')
+    parser.add_argument('--p-slowloris', type=float, default=0.0, help='Probability of a byte-at-a-time reply')
+    parser.add_argument('--p-hang', type=float, default=0.0, help='Probability of never replying')
+
+
+def main():
+    """CLI entry point - run a fleet until interrupted"""
+    parser = argparse.ArgumentParser(description='Run a fleet of stub health-endpoint services')
+    parser.add_argument('--count', type=int, default=10, help='Number of stubs')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Bind address')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    async def run():
+        fleet = StubFleet(args.count, behavior_options_from_args(args), args.host, args.seed)
+        services = await fleet.start()
+        for name, port in services:
+            print(f"{name} http://{args.host}:{port}/health")
+        print(f"{len(services)} stubs running - Ctrl+C to stop")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await fleet.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for compose_audit.py Dockerfile ENV resolution
+
+Writes a multi-stage Dockerfile to a temp directory. Covers:
+- ENV comes from the build target and the stages it is built FROM
+- No target (or an unknown one) means the last stage
+- Sibling stages never leak into each other
+- Stage names match case-insensitively; legacy "ENV KEY value" is parsed
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from compose_audit import dockerfile_env, dockerfile_stages, heap_settings, service_model  # noqa: E402
+
+DOCKERFILE = """\
+FROM node:18-alpine AS dependencies
+ENV NODE_OPTIONS="--max-old-space-size=512"
+
+FROM --platform=linux/amd64 node:18-bookworm-slim AS Base
+ENV NODE_ENV=development \\
+    # comment inside a continuation
+    LOG_LEVEL=debug
+
+FROM base AS development
+ENV NODE_OPTIONS="--max-old-space-size=1024"
+
+FROM base AS builder
+ENV BUILD_ONLY true
+
+FROM node:18-alpine AS production
+ENV NODE_ENV=production \\
+    NODE_OPTIONS="--max-old-space-size=4096 --max-semi-space-size=256"
+"""
+
+
+def test_stage_aware_env():
+    """Test ENV follows the target's FROM chain and ignores other stages."""
+    print("\n" + "=" * 60)
+    print("TEST: Stage-Aware Dockerfile ENV")
+    print("=" * 60)
+
+    root = Path(tempfile.mkdtemp(prefix="compose-audit-"))
+    try:
+        path = root / "Dockerfile"
+        path.write_text(DOCKERFILE, encoding="utf-8")
+
+        names = [stage["name"] for stage in dockerfile_stages(path)]
+        assert names == ["dependencies", "base", "development", "builder", "production"], names
+
+        development = dockerfile_env(path, "development")
+        assert development == {"NODE_ENV": "development", "LOG_LEVEL": "debug",
+                               "NODE_OPTIONS": "--max-old-space-size=1024"}, development
+        assert dockerfile_env(path, "BUILDER") == {"NODE_ENV": "development", "LOG_LEVEL": "debug",
+                                                   "BUILD_ONLY": "true"}, "case-insensitive, legacy ENV"
+        print("[OK] development / builder inherit base only")
+
+        production = dockerfile_env(path, "production")
+        assert production["NODE_ENV"] == "production" and "LOG_LEVEL" not in production, production
+        assert dockerfile_env(path) == production, "no target: last stage"
+        assert dockerfile_env(path, "missing") == production, "unknown target: last stage"
+        assert dockerfile_env(root / "Nope") == {}, "missing Dockerfile"
+        print("[OK] production (and the no-target default) ignore earlier stages")
+
+        built = {"build": {"context": ".", "dockerfile": "Dockerfile", "target": "development"}}
+        assert service_model("finance", built, root)["node_heap"] == 1024 * 1024 * 1024
+        assert heap_settings(production)["node_heap"] == 4096 * 1024 * 1024
+        print("[OK] service_model honours build.target")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("COMPOSE AUDIT - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_stage_aware_env()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
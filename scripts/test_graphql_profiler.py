@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for graphql_profiler.py
+
+Runs the profiler against StubGraphQLService (scripts/stub_fleet.py), so
+no gateway or Docker is needed. Covers:
+- Nearest-rank percentiles
+- Fixture loading (queries only unless mutations are requested)
+- Latency, error-rate and resolver aggregation from Apollo tracing
+- Login fixture token injection and unauthenticated errors
+- Root-field attribution to subgraphs
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from graphql_profiler import GraphQLProfiler, distribution, load_fixtures, percentile  # noqa: E402
+from stub_fleet import StubBehavior, StubGraphQLService, root_fields  # noqa: E402
+
+TOKEN = "stub-jwt"
+ROOT_FIELDS = {"Query": ["invoices", "customers"], "Mutation": ["login"]}
+FIXTURES = {
+    "test-finance-invoices.json": {"query": "query GetInvoices { invoices { id invoiceNumber } }"},
+    "test-masterdata-customers.json": {"query": "{ list: customers(page: 1) { id name } }"},
+    "test-create-customer.json": {"query": "mutation { createCustomer(input: {name: \"x\"}) { id } }"},
+    "test-login.json": {"query": "mutation { login(input: {email: \"a\", password: \"b\"}) { accessToken } }"},
+}
+
+
+def _write_fixtures() -> Path:
+    root = Path(tempfile.mkdtemp(prefix="graphql-fixtures-"))
+    for name, payload in FIXTURES.items():
+        (root / name).write_text(json.dumps(payload), encoding="utf-8")
+    return root
+
+
+async def _profile(stub: StubGraphQLService, fixtures, login=None, owners=None, iterations=10):
+    """Start the stub, optionally log in, and profile the fixtures against it"""
+    await stub.start()
+    profiler = GraphQLProfiler(f"http://127.0.0.1:{stub.port}/graphql", concurrency=4, timeout=5.0)
+    profiler.root_field_owner.update(owners or {})
+    try:
+        if login:
+            assert await profiler.login(login), "login fixture should yield an accessToken"
+            assert profiler.token == TOKEN, "accessToken should be injected"
+        return await profiler.profile(fixtures, iterations=iterations, warmup=1)
+    finally:
+        profiler.close()
+        await stub.stop()
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles pick the ceil(p*n)-th smallest sample."""
+    print("\n" + "=" * 60)
+    print("TEST: Nearest-Rank Percentiles")
+    print("=" * 60)
+
+    values = list(range(10, 0, -1))
+    assert percentile(values, 50) == 5, "p50 of 1..10 is the 5th value"
+    assert percentile(values, 90) == 9, "p90 of 1..10 is the 9th value"
+    assert percentile(values, 95) == 10, "p95 of 1..10 is the 10th value"
+    assert percentile(values, 0) == 1, "p0 is the minimum"
+    assert percentile(list(range(1, 101)), 95) == 95, "p95 of 1..100 is 95"
+    assert percentile(list(range(1, 101)), 99) == 99, "p99 of 1..100 is 99"
+    assert percentile([], 50) is None, "empty sample has no percentile"
+    assert distribution([2.0, 4.0])["p50"] == 2.0, "p50 of two samples is the lower one"
+
+    print("[OK] p50/p90/p95/p99 match nearest-rank definition")
+
+
+def test_root_field_parsing():
+    """Test the stub's root-field scanner used for tracing."""
+    print("\n" + "=" * 60)
+    print("TEST: Root Field Parsing")
+    print("=" * 60)
+
+    assert root_fields(FIXTURES["test-finance-invoices.json"]["query"]) == ["invoices"]
+    assert root_fields(FIXTURES["test-masterdata-customers.json"]["query"]) == ["customers"], "aliases resolve"
+    assert root_fields(FIXTURES["test-login.json"]["query"]) == ["login"], "arguments are skipped"
+
+    print("[OK] Root fields, aliases and arguments handled")
+
+
+def test_fixture_loading():
+    """Test mutations are skipped unless requested."""
+    print("\n" + "=" * 60)
+    print("TEST: Fixture Loading")
+    print("=" * 60)
+
+    root = _write_fixtures()
+    try:
+        names = [f["name"] for f in load_fixtures(root)]
+        assert names == ["test-finance-invoices", "test-masterdata-customers"], f"queries only: {names}"
+        with_mutations = load_fixtures(root, include_mutations=True)
+        assert len(with_mutations) == 4, "mutations included on request"
+        print(f"[OK] {len(names)} query fixtures, {len(with_mutations)} with mutations")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_profile_with_login():
+    """Test latency, tracing and subgraph aggregation against an authenticated stub."""
+    print("\n" + "=" * 60)
+    print("TEST: Profile With Login")
+    print("=" * 60)
+
+    root = _write_fixtures()
+    try:
+        fixtures = load_fixtures(root)
+        stub = StubGraphQLService("api-gateway", StubBehavior("fixed:5", seed=1), ROOT_FIELDS, token=TOKEN)
+        owners = {"invoices": "finance", "customers": "master-data"}
+        report = asyncio.run(_profile(stub, fixtures, login=root / "test-login.json", owners=owners))
+
+        invoices = report["queries"]["test-finance-invoices"]
+        assert invoices["count"] == 10 and invoices["errors"] == 0, f"10 clean samples: {invoices}"
+        assert invoices["p50"] >= 5.0, "latency includes the stub's 5 ms delay"
+        assert set(report["resolvers"]) == {"Query.invoices", "Query.customers"}, report["resolvers"].keys()
+        assert abs(report["resolvers"]["Query.invoices"]["p95"] - 5.0) < 0.01, "tracing ns -> ms"
+        assert report["subgraphs"]["finance"]["count"] == 10, "root fields attributed to owners"
+        assert report["subgraphs"]["master-data"]["count"] == 10
+
+        print(f"[OK] {sum(q['count'] for q in report['queries'].values())} requests, 0 errors")
+        print(f"[OK] Resolver and subgraph timings aggregated from tracing")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_profile_without_token():
+    """Test GraphQL errors from an auth-required stub count as failures."""
+    print("\n" + "=" * 60)
+    print("TEST: Profile Without Token")
+    print("=" * 60)
+
+    root = _write_fixtures()
+    try:
+        fixtures = load_fixtures(root)
+        stub = StubGraphQLService("api-gateway", StubBehavior(seed=2), ROOT_FIELDS, token=TOKEN)
+        report = asyncio.run(_profile(stub, fixtures, iterations=5))
+
+        for name, query in report["queries"].items():
+            assert query["error_rate"] == 1.0, f"{name} should fail unauthenticated"
+            assert query["error_samples"] == ["Unauthorized"], query["error_samples"]
+        assert not report["resolvers"], "no tracing from rejected requests"
+        assert stub.stats["unauthorized"] == 5 * len(fixtures) + len(fixtures), "warmup + measured requests"
+
+        print(f"[OK] Unauthenticated requests reported as errors")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("GRAPHQL PROFILER - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_percentile_nearest_rank()
+        test_root_field_parsing()
+        test_fixture_loading()
+        test_profile_with_login()
+        test_profile_without_token()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
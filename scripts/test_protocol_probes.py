@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for protocol_probes.py
+
+Probes the stand-in servers from scripts/protocol_stubs.py, so no Docker
+is needed. Covers, per protocol:
+- Success (Postgres SSLRequest + startup, Redis PING, Kafka ApiVersions v0)
+- Auth required (Postgres MD5 request, Redis AUTH / NOAUTH)
+- Protocol errors and garbage (non-protocol) responses
+- --requirepass ${VAR} expansion from the environment
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from protocol_probes import (  # noqa: E402
+    CLIENT_ID,
+    KAFKA_API_VERSIONS_KEY,
+    POSTGRES_PROTOCOL_VERSION,
+    _redis_password,
+    expand_compose_variables,
+    probe_target
+)
+from protocol_stubs import KAFKA_API_KEYS, StubKafka, StubPostgres, StubRedis  # noqa: E402
+
+PASSWORD = "vextrus_redis_2024"
+
+
+def _probe(stub, options=None, timeout=5.0):
+    """Start the stub, run one probe against it, stop it"""
+    async def run():
+        await stub.start()
+        try:
+            target = {"name": f"{stub.protocol}-stub", "protocol": stub.protocol, "host": stub.host,
+                      "port": stub.port, "options": options or {}}
+            return await probe_target(target, timeout)
+        finally:
+            await stub.stop()
+    return asyncio.run(run())
+
+
+def test_postgres():
+    """Test Postgres success, auth-required, rejection and garbage paths."""
+    print("\n" + "=" * 60)
+    print("TEST: Postgres Probe")
+    print("=" * 60)
+
+    stub = StubPostgres("ok")
+    result = _probe(stub, {"user": "vextrus", "database": "vextrus_erp"})
+    assert result["status"] == "success" and result["auth"] == "ok", result
+    assert result["ssl"] is False, "stub declines TLS"
+    assert result["timings"]["handshake_ms"] is not None and result["timings"]["rtt_ms"] is not None
+    assert stub.requests[0] == {"ssl_request": True}, "SSLRequest sent first"
+    startup = stub.requests[1]
+    assert startup["protocol_version"] == POSTGRES_PROTOCOL_VERSION, startup
+    assert (startup["user"], startup["database"], startup["application_name"]) == \
+        ("vextrus", "vextrus_erp", CLIENT_ID), startup
+    print("[OK] SSLRequest -> 'N', startup -> AuthenticationOk")
+
+    result = _probe(StubPostgres("auth"))
+    assert result["status"] == "success" and result["auth"] == "md5", result
+    print("[OK] Password-protected server reported as up (md5)")
+
+    result = _probe(StubPostgres("reject"), {"user": "ghost"})
+    assert result["status"] == "success" and 'role "ghost"' in result["server_error"], result
+    print("[OK] ErrorResponse reported as up with the server's message")
+
+    result = _probe(StubPostgres("garbage"))
+    assert result["status"] == "error" and "SSLRequest" in result["error"], result
+    result = _probe(StubPostgres("garbage"), {"use_ssl": False})
+    assert result["status"] == "error" and "not a Postgres message" in result["error"], result
+    print("[OK] Garbage answers reported as errors")
+
+
+def test_redis():
+    """Test Redis success, auth-required, rejection and garbage paths."""
+    print("\n" + "=" * 60)
+    print("TEST: Redis Probe")
+    print("=" * 60)
+
+    stub = StubRedis("ok")
+    result = _probe(stub)
+    assert result["status"] == "success" and result["timings"]["handshake_ms"] is None, result
+    assert [r["command"] for r in stub.requests] == ["PING"], stub.requests
+    print("[OK] PING -> +PONG without AUTH")
+
+    stub = StubRedis("auth", PASSWORD)
+    result = _probe(stub, {"password": PASSWORD})
+    assert result["status"] == "success" and "auth" not in result and "auth_error" not in result, result
+    assert stub.requests[0] == {"command": "AUTH", "args": [PASSWORD]}, stub.requests
+    assert result["timings"]["handshake_ms"] is not None
+    print("[OK] AUTH + PING with the right password")
+
+    result = _probe(StubRedis("auth", PASSWORD))
+    assert result["status"] == "success" and result["auth"] == "required", result
+    result = _probe(StubRedis("auth", PASSWORD), {"password": "wrong"})
+    assert result["auth"] == "required" and result["auth_error"].startswith("WRONGPASS"), result
+    print("[OK] Protected server without / with a wrong password: auth required")
+
+    result = _probe(StubRedis("reject"))
+    assert result["status"] == "failed" and result["error"].startswith("ERR max number"), result
+    result = _probe(StubRedis("garbage"))
+    assert result["status"] == "error" and "unexpected reply" in result["error"], result
+    print("[OK] -ERR reported as failed, garbage as error")
+
+
+def test_kafka():
+    """Test Kafka success, error-code and garbage paths."""
+    print("\n" + "=" * 60)
+    print("TEST: Kafka Probe")
+    print("=" * 60)
+
+    stub = StubKafka("ok")
+    result = _probe(stub)
+    assert result["status"] == "success" and result["api_keys"] == len(KAFKA_API_KEYS), result
+    request = stub.requests[0]
+    assert (request["api_key"], request["api_version"], request["correlation_id"], request["client_id"]) == \
+        (KAFKA_API_VERSIONS_KEY, 0, 1, CLIENT_ID), request
+    print(f"[OK] ApiVersions v0 -> {result['api_keys']} API keys")
+
+    result = _probe(StubKafka("reject"))
+    assert result["status"] == "failed" and result["error"] == "error code 35", result
+    result = _probe(StubKafka("garbage"))
+    assert result["status"] == "error" and "not a Kafka response" in result["error"], result
+    print("[OK] Error code reported as failed, garbage as error")
+
+
+def test_requirepass_expansion():
+    """Test ${VAR} in --requirepass is expanded, or AUTH skipped when unset."""
+    print("\n" + "=" * 60)
+    print("TEST: --requirepass Expansion")
+    print("=" * 60)
+
+    saved = {k: os.environ.pop(k, None) for k in ("REDIS_PASSWORD", "VEXTRUS_TEST_REDIS_PASS")}
+    try:
+        literal = {"command": f"redis-server --appendonly yes --requirepass {PASSWORD}"}
+        variable = {"command": ["redis-server", "--requirepass", "${VEXTRUS_TEST_REDIS_PASS}"]}
+        fallback = {"command": "redis-server --requirepass ${VEXTRUS_TEST_REDIS_PASS:-fallback}"}
+
+        assert _redis_password(literal) == {"password": PASSWORD}
+        assert _redis_password(variable) == {"password": None}, "unset variable: skip AUTH"
+        assert _redis_password(fallback) == {"password": "fallback"}
+
+        os.environ["VEXTRUS_TEST_REDIS_PASS"] = "from-env"
+        assert _redis_password(variable) == {"password": "from-env"}
+        assert _redis_password(fallback) == {"password": "from-env"}
+        assert expand_compose_variables("$$literal") == "$literal", "$$ escapes a dollar"
+        print("[OK] ${VAR}, ${VAR:-default} and unset variables handled")
+    finally:
+        for key, value in saved.items():
+            os.environ.pop(key, None)
+            if value is not None:
+                os.environ[key] = value
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("PROTOCOL PROBES - TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_postgres()
+        test_redis()
+        test_kafka()
+        test_requirepass_expansion()
+
+        print("\n" + "=" * 60)
+        print("[OK] ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n[FAIL] TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_all_tests())
@@ -1,31 +1,53 @@
 #!/usr/bin/env python3
 """
 Health Endpoint Testing Script for Vextrus ERP Services
-Tests all health endpoint variations for all 13 services systematically
+Tests all health endpoint variations for every service in docker-compose
+
+All (service, path) pairs are probed concurrently over pooled keep-alive
+connections (see scripts/health_prober.py), so a sweep takes roughly as long
+as the slowest endpoint instead of the sum of all of them. Each endpoint
+result carries DNS / connect / TTFB / total timings. Postgres, Redis and
+Kafka are probed in the same sweep over their wire protocols (see
+scripts/protocol_probes.py) so a slow dependency can be told apart from a
+slow service.
+
+Usage:
+    python test-health-endpoints.py              # one-shot report
+    python test-health-endpoints.py --monitor    # continuous monitor (scripts/health_monitor.py)
 """
 
-import requests
+import argparse
+import asyncio
 import json
+import sys
 import time
+from pathlib import Path
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+from health_prober import DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, AsyncHealthProber
+from health_monitor import DEFAULT_INTERVAL, run_monitor
+from compose_inventory import application_services, display_name
+from protocol_probes import dependency_targets, format_result, probe_dependencies
+
 class HealthEndpointTester:
-    def __init__(self):
-        self.services = {
-            1: {"name": "Auth", "port": 3001, "status": "running"},
-            2: {"name": "Master Data", "port": 3002, "status": "running"},
-            3: {"name": "Notification", "port": 3003, "status": "port_not_exposed"},
-            4: {"name": "Configuration", "port": 3004, "status": "port_not_exposed"},
-            5: {"name": "Scheduler", "port": 3005, "status": "port_not_exposed"},
-            6: {"name": "Document Generator", "port": 3006, "status": "port_not_exposed"},
-            7: {"name": "Import-Export", "port": 3007, "status": "not_running"},
-            8: {"name": "File Storage", "port": 3008, "status": "not_running"},
-            9: {"name": "Audit", "port": 3009, "status": "port_not_exposed"},
-            11: {"name": "Workflow", "port": 3011, "status": "running"},
-            12: {"name": "Rules Engine", "port": 3012, "status": "running"},
-            16: {"name": "Organization", "port": 3016, "status": "running"},
-            4000: {"name": "API Gateway", "port": 4000, "status": "running"}
-        }
+    def __init__(self, host: str = "localhost", concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.host = host
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.sweep_seconds = 0.0
+
+        # Inventory comes from the compose files; unpublished services are
+        # reported without spending a connection attempt on them
+        self.services = {}
+        for name, record in application_services().items():
+            self.services[name] = {
+                "name": display_name(name),
+                "port": record["port"],
+                "status": "running" if record["published"] else "port_not_exposed",
+                "health_path": record["health_path"]
+            }
 
         self.health_paths = [
             "/health",
@@ -36,91 +58,113 @@ class HealthEndpointTester:
         ]
 
         self.results = {}
+        self.dependency_results = []
 
-    def test_service_health(self, service_id: int, service_info: Dict) -> Dict:
-        """Test all health endpoints for a single service"""
-        service_name = service_info["name"]
-        port = service_info["port"]
+    def _unavailable_result(self, service_info: Dict) -> Optional[Dict]:
+        """Result for services that are known not to be reachable"""
         status = service_info["status"]
+        if status in ["not_running", "port_not_exposed"]:
+            return {"service": service_info["name"], "port": service_info["port"], "status": status, "endpoints": {}}
+        return None
 
-        print(f"\n=== Testing {service_name} Service ({port}) ===")
+    def _print_service_result(self, result: Dict):
+        """Print per-endpoint lines for one service"""
+        print(f"\n=== Testing {result['service']} Service ({result['port']}) ===")
 
-        if status in ["not_running", "port_not_exposed"]:
-            print(f"[WARNING] Service {service_name}: {status.replace('_', ' ').title()}")
-            return {"service": service_name, "port": port, "status": status, "endpoints": {}}
+        if result["status"] != "running":
+            print(f"[WARNING] Service {result['service']}: {result['status'].replace('_', ' ').title()}")
+            return
 
-        service_results = {
-            "service": service_name,
-            "port": port,
-            "status": "running",
-            "endpoints": {}
-        }
+        for path, endpoint in result["endpoints"].items():
+            status = endpoint["status"]
+            total_ms = endpoint.get("timings", {}).get("total_ms")
+            took = f" [{total_ms:.1f}ms]" if total_ms is not None else ""
 
-        for path in self.health_paths:
-            url = f"http://localhost:{port}{path}"
+            if status == "success":
+                print(f"[SUCCESS] {path}: SUCCESS (200){took}")
+            elif status == "not_found":
+                print(f"[FAILED] {path}: NOT FOUND (404){took}")
+            elif status == "failed":
+                print(f"[FAILED] {path}: FAILED ({endpoint['code']}){took}")
+            elif status == "error":
+                print(f"[ERROR] {path}: ERROR - {endpoint.get('error', '')}")
+            else:
+                print(f"[FAILED] {path}: {status.replace('_', ' ').upper()}")
+
+    def _probe_services(self, services: Dict, dependencies: List[Dict] = None):
+        """
+        Probe every (service, path) pair, plus infrastructure dependencies over
+        their wire protocols, in one concurrent sweep.
+
+        Returns:
+            (service results, dependency results)
+        """
+        results = {}
+        targets = []
+        owners = []
+
+        for service_id, service_info in services.items():
+            unavailable = self._unavailable_result(service_info)
+            if unavailable:
+                results[service_id] = unavailable
+                continue
+
+            results[service_id] = {
+                "service": service_info["name"],
+                "port": service_info["port"],
+                "status": "running",
+                "endpoints": {}
+            }
+            paths = list(self.health_paths)
+            if service_info.get("health_path") and service_info["health_path"] not in paths:
+                paths.append(service_info["health_path"])
+            for path in paths:
+                targets.append((self.host, service_info["port"], path))
+                owners.append((service_id, path))
+
+        async def sweep():
+            prober = AsyncHealthProber(concurrency=self.concurrency, timeout=self.timeout)
             try:
-                response = requests.get(url, timeout=5)
-                status_code = response.status_code
-
-                if status_code == 200:
-                    print(f"[SUCCESS] {path}: SUCCESS (200)")
-                    try:
-                        content = response.json()
-                        service_results["endpoints"][path] = {
-                            "status": "success",
-                            "code": 200,
-                            "response": content
-                        }
-                    except:
-                        service_results["endpoints"][path] = {
-                            "status": "success",
-                            "code": 200,
-                            "response": response.text
-                        }
-                elif status_code == 404:
-                    print(f"[FAILED] {path}: NOT FOUND (404)")
-                    service_results["endpoints"][path] = {
-                        "status": "not_found",
-                        "code": 404
-                    }
-                else:
-                    print(f"[FAILED] {path}: FAILED ({status_code})")
-                    service_results["endpoints"][path] = {
-                        "status": "failed",
-                        "code": status_code
-                    }
-
-            except requests.exceptions.ConnectionError:
-                print(f"[FAILED] {path}: CONNECTION REFUSED")
-                service_results["endpoints"][path] = {
-                    "status": "connection_refused",
-                    "code": 0
-                }
-            except requests.exceptions.Timeout:
-                print(f"[FAILED] {path}: TIMEOUT")
-                service_results["endpoints"][path] = {
-                    "status": "timeout",
-                    "code": 0
-                }
-            except Exception as e:
-                print(f"[ERROR] {path}: ERROR - {str(e)}")
-                service_results["endpoints"][path] = {
-                    "status": "error",
-                    "code": 0,
-                    "error": str(e)
-                }
+                return await asyncio.gather(
+                    prober.probe_many(targets),
+                    probe_dependencies(dependencies or [], self.timeout)
+                )
+            finally:
+                prober.close()
+
+        started = time.perf_counter()
+        probe_results, dependency_results = asyncio.run(sweep())
+        self.sweep_seconds = time.perf_counter() - started
+
+        for (service_id, path), endpoint in zip(owners, probe_results):
+            results[service_id]["endpoints"][path] = endpoint
+
+        return results, dependency_results
 
-        return service_results
+    def test_service_health(self, service_id: str, service_info: Dict) -> Dict:
+        """Test all health endpoints for a single service"""
+        result = self._probe_services({service_id: service_info})[0][service_id]
+        self._print_service_result(result)
+        return result
 
     def test_all_services(self):
-        """Test health endpoints for all services"""
+        """Test health endpoints for all services (all paths probed concurrently)"""
         print("HEALTH ENDPOINT TESTING FOR VEXTRUS ERP SERVICES")
         print("=" * 60)
 
-        for service_id, service_info in self.services.items():
-            result = self.test_service_health(service_id, service_info)
-            self.results[service_id] = result
-            time.sleep(0.5)  # Brief pause between services
+        self.results, self.dependency_results = self._probe_services(
+            self.services, dependency_targets(host=self.host)
+        )
+        for result in self.results.values():
+            self._print_service_result(result)
+
+        if self.dependency_results:
+            print("\n=== Infrastructure Dependencies (wire protocol) ===")
+            for result in self.dependency_results:
+                tag = "SUCCESS" if result["status"] == "success" else "FAILED"
+                print(f"[{tag}] {format_result(result)}")
+
+        print(f"\nSweep completed in {self.sweep_seconds * 1000:.1f}ms")
 
     def generate_report(self):
         """Generate comprehensive health endpoint report"""
@@ -195,24 +239,51 @@ class HealthEndpointTester:
                 success_rate = (stats["success"] / stats["total"]) * 100
                 print(f"  {path}: {stats['success']}/{stats['total']} ({success_rate:.1f}%)")
 
+        # Dependency latency next to service latency: a slow /health/ready with a
+        # fast database round trip points at the service, not the database
+        if self.dependency_results:
+            print(f"\nINFRASTRUCTURE DEPENDENCIES ({len(self.dependency_results)}):")
+            for result in self.dependency_results:
+                print(f"  * {format_result(result)}")
+                print(f"    used by: {', '.join(result['dependents'])}")
+
     def save_results(self, filename: str = "health_endpoint_test_results.json"):
         """Save detailed results to JSON file"""
         with open(filename, 'w') as f:
             json.dump({
                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "sweep_ms": round(self.sweep_seconds * 1000, 3),
                 "test_results": self.results,
+                "dependencies": self.dependency_results,
                 "summary": {
                     "total_services": len(self.services),
                     "tested_services": len([r for r in self.results.values() if r["status"] == "running"]),
                     "working_services": len([r for r in self.results.values()
                                            if r["status"] == "running" and
-                                           any(ep["status"] == "success" for ep in r.get("endpoints", {}).values())])
+                                           any(ep["status"] == "success" for ep in r.get("endpoints", {}).values())]),
+                    "healthy_dependencies": len([d for d in self.dependency_results if d["status"] == "success"])
                 }
             }, f, indent=2)
         print(f"\nDetailed results saved to: {filename}")
 
 def main():
-    tester = HealthEndpointTester()
+    parser = argparse.ArgumentParser(description='Vextrus ERP health endpoint tester')
+    parser.add_argument('--monitor', action='store_true',
+                        help='Keep probing /health/live and /health/ready on an interval')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='Seconds between monitor sweeps')
+    parser.add_argument('--host', default='localhost', help='Host the service ports are published on')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Per-request deadline (seconds)')
+    args = parser.parse_args()
+
+    tester = HealthEndpointTester(host=args.host, timeout=args.timeout)
+
+    if args.monitor:
+        services = [(info["name"], info["port"]) for info in tester.services.values()
+                    if info["status"] == "running"]
+        run_monitor(services, host=args.host, interval=args.interval, timeout=args.timeout)
+        return
+
     tester.test_all_services()
     tester.generate_report()
     tester.save_results()